@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+# benchmarks/bench_account_snapshot.py
+"""
+Positions- und Balance-Abfragen pro Kerze: Einzelabfragen je Strategie vs.
+AccountSnapshotService (ein Abruf für alle Strategien, geteilt über den State-Store)
+
+1. Nacheinander (master_runner, 2s Startabstand): N Strategien ohne offene
+   Position, ohne bzw. mit Signal. Bisher fragte jede Strategie ihre Position
+   dreimal ab (full_trade_cycle, Housekeeper vor/nach dem Aufräumen), bei
+   Signal ein viertes Mal (Entry-Prüfung) plus die Balance; dazu ein
+   fetch_balance für die Equity-Zeitreihe.
+2. Gleichzeitig: N Prozesse finden zur selben Zeit einen veralteten Snapshot -
+   ohne Lease rufen alle ab, mit Lease einer.
+
+Die Exchange ist ein Stub mit fester Latenz pro REST-Aufruf.
+
+Aufruf:
+    python benchmarks/bench_account_snapshot.py --strategies 7 --latency-ms 150
+"""
+import os
+import sys
+import time
+import logging
+import argparse
+import tempfile
+import multiprocessing as mp
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(os.path.join(PROJECT_ROOT, 'src'))
+
+from pbot.utils import account_snapshot, state_store, trade_manager
+from pbot.utils.account_snapshot import AccountSnapshotService, get_account_snapshot
+from pbot.utils.state_store import StateStore
+
+_sleep = time.sleep
+
+
+class StubExchange:
+    def __init__(self, latency_s, calls=None):
+        self.latency_s = latency_s
+        self.calls = calls  # mp.Value für Prozesse, sonst lokaler Zähler
+        self.rest_calls = 0
+        self.account = {'name': 'bench'}
+
+    def _request(self, result):
+        self.rest_calls += 1
+        if self.calls is not None:
+            with self.calls.get_lock():
+                self.calls.value += 1
+        _sleep(self.latency_s)
+        return result
+
+    def fetch_open_positions(self, symbol):
+        return self._request([])
+
+    def fetch_all_open_positions(self):
+        return self._request([])
+
+    def fetch_balance_usdt(self):
+        return self._request(100.0)
+
+    def fetch_account_balance(self):
+        return self._request({'free': 100.0, 'equity': {'equity': 100.0, 'available': 100.0, 'unrealized_pnl': 0.0}})
+
+    def cancel_all_orders_for_symbol(self, symbol):
+        pass
+
+
+def legacy_cycle(exchange, symbol, signal):
+    """Abfragemuster vor dem AccountSnapshotService"""
+    if not exchange.fetch_open_positions(symbol):       # full_trade_cycle
+        exchange.fetch_open_positions(symbol)           # Housekeeper: verwaiste Position?
+        exchange.fetch_open_positions(symbol)           # Housekeeper: sauber?
+        if signal and not exchange.fetch_open_positions(symbol):  # Entry: Position bereits offen?
+            exchange.fetch_balance_usdt()               # Positionsgröße
+
+
+def service_cycle(exchange, symbol, signal, logger):
+    account_snapshot._services.clear()  # neuer Prozess
+
+    def entry(ex, model, scaler, params, telegram_config, log):
+        # Abfragen wie in check_and_open_new_position, ohne Daten/Modell/Order
+        if signal and not get_account_snapshot(ex).open_positions(params['market']['symbol']):
+            get_account_snapshot(ex).free_balance()
+
+    trade_manager.check_and_open_new_position = entry
+    trade_manager.full_trade_cycle(exchange, None, None, {'market': {'symbol': symbol}}, {}, logger)
+
+
+def bench_sequential(symbols, latency_s, signal, logger):
+    results = {}
+    trade_manager.record_equity_snapshot = lambda ex, log: None
+    exchange = StubExchange(latency_s)
+    t0 = time.perf_counter()
+    exchange.fetch_balance_usdt()  # Equity-Zeitreihe (erste Strategie des Laufs)
+    for symbol in symbols:
+        legacy_cycle(exchange, symbol, signal)
+    results['Einzelabfragen'] = (exchange.rest_calls, time.perf_counter() - t0)
+
+    trade_manager.record_equity_snapshot = lambda ex, log: get_account_snapshot(ex).equity()
+    exchange = StubExchange(latency_s)
+    t0 = time.perf_counter()
+    for symbol in symbols:
+        service_cycle(exchange, symbol, signal, logger)
+    results['AccountSnapshotService'] = (exchange.rest_calls, time.perf_counter() - t0)
+    return results
+
+
+def _concurrent_worker(db_path, latency_s, lease_ttl_s, calls, start_event):
+    service = AccountSnapshotService(StubExchange(latency_s, calls), store=StateStore(db_path), lease_ttl_s=lease_ttl_s)
+    start_event.wait()
+    service.open_positions('BTC/USDT:USDT')
+    service.free_balance()
+
+
+def bench_concurrent(tmp, processes, latency_s):
+    results = {}
+    ctx = mp.get_context('fork')
+    for label, lease_ttl_s in (('ohne Lease', 0.0), ('mit Lease', 10.0)):
+        db_path = os.path.join(tmp, f'concurrent_{lease_ttl_s}.db')
+        StateStore(db_path)
+        calls, start_event = ctx.Value('i', 0), ctx.Event()
+        procs = [ctx.Process(target=_concurrent_worker, args=(db_path, latency_s, lease_ttl_s, calls, start_event))
+                 for _ in range(processes)]
+        for p in procs: p.start()
+        _sleep(0.2)
+        t0 = time.perf_counter()
+        start_event.set()
+        for p in procs: p.join()
+        results[label] = (calls.value, time.perf_counter() - t0)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--strategies', default=7, type=int)
+    parser.add_argument('--latency-ms', default=150, type=float, help="Simulierte Dauer eines REST-Aufrufs")
+    args = parser.parse_args()
+
+    logger = logging.getLogger('bench')
+    logger.disabled = True
+    logging.getLogger(account_snapshot.__name__).disabled = True  # "ohne Lease" warnt bei jedem Prozess
+    latency_s = args.latency_ms / 1000
+    symbols = [f"SYM{i}/USDT:USDT" for i in range(args.strategies)]
+    trade_manager.time.sleep = lambda s: None  # Wartezeiten des Housekeepers nicht mitmessen
+
+    with tempfile.TemporaryDirectory() as tmp:
+        state_store._store_instance = StateStore(os.path.join(tmp, 'state.db'))
+        print(f"{args.strategies} Strategien ohne offene Position, {args.latency_ms:.0f} ms pro REST-Aufruf")
+        print(f"{'Szenario':<40}{'REST-Aufrufe':>13}{'Wartezeit':>12}")
+        for signal in (False, True):
+            state_store._store_instance.delete(account_snapshot.ACCOUNT_NAMESPACE, 'snapshot:bench')
+            for label, (calls, elapsed) in bench_sequential(symbols, latency_s, signal, logger).items():
+                name = f"{label} ({'mit' if signal else 'ohne'} Signal)"
+                print(f"{name:<40}{calls:>13}{elapsed:>10.2f} s")
+        time.sleep = _sleep
+
+        for label, (calls, elapsed) in bench_concurrent(tmp, args.strategies, latency_s).items():
+            name = f"Gleichzeitig, {label}"
+            print(f"{name:<40}{calls:>13}{elapsed:>10.2f} s")
+
+
+if __name__ == '__main__':
+    main()
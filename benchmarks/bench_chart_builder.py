@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+# benchmarks/bench_chart_builder.py
+"""
+Interaktiver Chart über ein Jahr 5m-Kerzen: HTML-Größe und Renderzeit
+
+Vergleicht
+  - legacy:  alle Kerzen, drei Traces pro Trade (Verhalten vor chart_builder)
+  - builder: Sammel-Traces für Trades, Downsampling auf max_points
+
+Die Renderzeit im Browser ist hier nicht messbar; als Näherung dienen
+Figure-Aufbau, JSON-Serialisierung und write_html sowie die Anzahl Traces/Punkte.
+
+Aufruf:
+    python benchmarks/bench_chart_builder.py --days 365 --trades 500
+"""
+import os
+import sys
+import time
+import argparse
+import tempfile
+
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(os.path.join(PROJECT_ROOT, 'src'))
+
+from pbot.analysis.chart_builder import build_price_chart, DEFAULT_MAX_POINTS
+from pbot.analysis.interactive_status import add_smc_ema_indicators
+
+
+def synthetic_ohlcv(days, seed=7):
+    rng = np.random.default_rng(seed)
+    n = days * 288
+    close = 30000 * np.exp(np.cumsum(rng.normal(0, 0.002, n)))
+    open_ = np.concatenate([[close[0]], close[:-1]])
+    spread = np.abs(rng.normal(0, 0.0015, n)) * close
+    index = pd.date_range(end=pd.Timestamp.now(tz='UTC').floor('5min'), periods=n, freq='5min')
+    return pd.DataFrame({
+        'open': open_, 'high': np.maximum(open_, close) + spread,
+        'low': np.minimum(open_, close) - spread, 'close': close,
+        'volume': rng.uniform(1, 100, n)
+    }, index=index)
+
+
+def synthetic_trades(df, count, seed=7):
+    rng = np.random.default_rng(seed)
+    entries = np.sort(rng.choice(len(df) - 50, count, replace=False))
+    trades = []
+    for i in entries:
+        j = i + int(rng.integers(2, 50))
+        trades.append({
+            'entry_time': df.index[i], 'entry_price': df['close'].iloc[i],
+            'exit_time': df.index[j], 'exit_price': df['close'].iloc[j],
+            'profit': df['close'].iloc[j] - df['close'].iloc[i],
+        })
+    return trades
+
+
+def legacy_chart(df, trades, title):
+    """Frühere Implementierung: alle Punkte, Entry/Exit/Linie als eigene Traces pro Trade"""
+    fig = go.Figure()
+    fig.add_trace(go.Candlestick(x=df.index, open=df['open'], high=df['high'], low=df['low'], close=df['close'], name='OHLC'))
+    for column, color in (('ema_20', 'orange'), ('ema_50', 'blue'), ('ema_200', 'red')):
+        fig.add_trace(go.Scatter(x=df.index, y=df[column], name=column, line=dict(color=color)))
+    fig.add_trace(go.Scatter(x=df.index, y=df['bb_upper'], name='BB Upper'))
+    fig.add_trace(go.Scatter(x=df.index, y=df['bb_lower'], name='BB Lower', fill='tonexty'))
+    for t in trades:
+        color = 'green' if t['profit'] > 0 else 'red'
+        fig.add_trace(go.Scatter(x=[t['entry_time']], y=[t['entry_price']], mode='markers', showlegend=False))
+        fig.add_trace(go.Scatter(x=[t['exit_time']], y=[t['exit_price']], mode='markers', marker=dict(color=color), showlegend=False))
+        fig.add_trace(go.Scatter(x=[t['entry_time'], t['exit_time']], y=[t['entry_price'], t['exit_price']],
+                                 mode='lines', line=dict(color=color, dash='dash'), showlegend=False))
+    fig.update_layout(title=title, height=800, template='plotly_dark')
+    return fig
+
+
+def measure(name, build, tmp):
+    t0 = time.perf_counter()
+    fig = build()
+    build_s = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    fig.to_json()
+    json_s = time.perf_counter() - t0
+
+    path = os.path.join(tmp, f'{name}.html')
+    t0 = time.perf_counter()
+    fig.write_html(path, include_plotlyjs='cdn')
+    html_s = time.perf_counter() - t0
+
+    points = sum(len(trace.x) for trace in fig.data if trace.x is not None)
+    return {'name': name, 'traces': len(fig.data), 'points': points, 'build_s': build_s,
+            'json_s': json_s, 'html_s': html_s, 'size_mb': os.path.getsize(path) / 1e6}
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--days', default=365, type=int)
+    parser.add_argument('--trades', default=500, type=int)
+    parser.add_argument('--max_points', default=DEFAULT_MAX_POINTS, type=int)
+    args = parser.parse_args()
+
+    df = add_smc_ema_indicators(synthetic_ohlcv(args.days))
+    trades = synthetic_trades(df, args.trades)
+    print(f"{len(df):,} Kerzen (5m, {args.days} Tage), {len(trades)} Trades, max_points={args.max_points}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        results = [
+            measure('legacy', lambda: legacy_chart(df, trades, 'legacy'), tmp),
+            measure('builder', lambda: build_price_chart(df, trades, 'builder', max_points=args.max_points), tmp),
+        ]
+
+    print(f"\n{'Modus':<9}{'Traces':>8}{'Punkte':>10}{'Aufbau':>9}{'JSON':>9}{'HTML':>9}{'Größe':>10}")
+    for r in results:
+        print(f"{r['name']:<9}{r['traces']:>8}{r['points']:>10,}{r['build_s']:>8.2f}s{r['json_s']:>8.2f}s"
+              f"{r['html_s']:>8.2f}s{r['size_mb']:>7.1f} MB")
+
+
+if __name__ == '__main__':
+    main()
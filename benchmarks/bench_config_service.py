@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+# benchmarks/bench_config_service.py
+"""
+Config-Zugriff pro Handelszyklus: Datei lesen vs. ConfigService
+
+- Disk (bisheriges run.load_config): bis zu drei os.path.exists-Proben,
+  open + json.load, HTF bestimmen
+- ConfigService.get_config: Kopie aus dem Speicher
+- ConfigService.reload ohne Änderung: Kosten eines Poll-Durchgangs
+  (scandir + stat aller Configs und der settings.json)
+- Erstladen: alle Configs einlesen und validieren (einmal pro Prozess)
+
+Gemessen gegen die echten Dateien in src/pbot/strategy/configs/.
+
+Aufruf:
+    python benchmarks/bench_config_service.py --repeat 2000
+"""
+import os
+import sys
+import json
+import time
+import argparse
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(os.path.join(PROJECT_ROOT, 'src'))
+
+from pbot.utils.config_service import CONFIGS_DIR, ConfigService, config_basename
+from pbot.utils.timeframe_utils import determine_htf
+
+SYMBOL, TIMEFRAME = 'BTC/USDT:USDT', '30m'
+
+
+def disk_load(symbol, timeframe, use_macd_filter=True):
+    """Wie run.load_config vor dem ConfigService (use_macd=True: ungünstigster Fall mit Fallback-Probe)"""
+    base = config_basename(symbol, timeframe)
+    for suffix in ("_macd" if use_macd_filter else "", "", "_macd"):
+        path = os.path.join(CONFIGS_DIR, f"{base}{suffix}.json")
+        if os.path.exists(path):
+            break
+    with open(path, 'r') as f:
+        config = json.load(f)
+    config['market']['htf'] = determine_htf(config['market']['timeframe'])
+    return config
+
+
+def per_call_us(fn, repeat):
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - t0) / repeat * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--repeat', default=2000, type=int)
+    args = parser.parse_args()
+
+    t0 = time.perf_counter()
+    service = ConfigService()
+    initial_ms = (time.perf_counter() - t0) * 1000
+    assert service.get_config(SYMBOL, TIMEFRAME, True) == disk_load(SYMBOL, TIMEFRAME)
+
+    print(f"{len(service.snapshot.strategies)} Configs, {args.repeat:,} Wiederholungen")
+    print(f"{'Verfahren':<36}{'pro Aufruf':>14}")
+    print(f"{'Disk (run.load_config bisher)':<36}{per_call_us(lambda: disk_load(SYMBOL, TIMEFRAME), args.repeat):>11.1f} µs")
+    print(f"{'ConfigService.get_config':<36}"
+          f"{per_call_us(lambda: service.get_config(SYMBOL, TIMEFRAME, True), args.repeat):>11.1f} µs")
+    print(f"{'ConfigService.reload (ohne Änderung)':<36}{per_call_us(service.reload, args.repeat // 10):>11.1f} µs")
+    print(f"{'Erstladen aller Configs':<36}{initial_ms * 1000:>11.1f} µs")
+
+
+if __name__ == '__main__':
+    main()
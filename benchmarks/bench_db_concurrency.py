@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+# benchmarks/bench_db_concurrency.py
+"""
+Nebenläufige Schreiber auf die Trade-Datenbank: Durchsatz und Lock-Fehler
+
+Vergleicht
+  - legacy:  neue Connection pro Aufruf, Rollback-Journal (Verhalten vor WAL-Umstellung)
+  - pooled:  TradeDatabase (WAL, langlebige Connection, busy_timeout)
+  - batched: TradeDatabase mit batch() (mehrere Inserts pro Transaktion)
+
+Aufruf:
+    python benchmarks/bench_db_concurrency.py --processes 16 --writes 200
+"""
+import os
+import sys
+import time
+import sqlite3
+import argparse
+import tempfile
+import multiprocessing as mp
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(os.path.join(PROJECT_ROOT, 'src'))
+
+from pbot.utils.database import TradeDatabase
+
+INSERT_SQL = '''
+    INSERT INTO signal_latency (symbol, timeframe, side, candle_close_ts, data_received_ts, status)
+    VALUES (?, ?, ?, ?, ?, ?)
+'''
+
+
+def _row(worker, i):
+    now = time.time()
+    return (f"SYM{worker}/USDT:USDT", '15m', 'buy', now - 1.0, now, 'skipped')
+
+
+def _latency_info(worker, i):
+    symbol, timeframe, side, close_ts, data_ts, status = _row(worker, i)
+    return {'symbol': symbol, 'timeframe': timeframe, 'side': side,
+            'candle_close_ts': close_ts, 'data_received_ts': data_ts, 'status': status}
+
+
+def _legacy_worker(db_path, worker, writes, start_event, results):
+    start_event.wait()
+    errors = 0
+    for i in range(writes):
+        try:
+            conn = sqlite3.connect(db_path)
+            try:
+                conn.execute(INSERT_SQL, _row(worker, i))
+                conn.commit()
+            finally:
+                conn.close()
+        except sqlite3.OperationalError:
+            errors += 1
+    results.put(errors)
+
+
+def _pooled_worker(db_path, worker, writes, start_event, results):
+    db = TradeDatabase(db_path)
+    start_event.wait()
+    errors = 0
+    for i in range(writes):
+        try:
+            db.log_signal_latency(_latency_info(worker, i))
+        except sqlite3.OperationalError:
+            errors += 1
+    db.close()
+    results.put(errors)
+
+
+def _batched_worker(db_path, worker, writes, start_event, results, batch_size=20):
+    db = TradeDatabase(db_path)
+    start_event.wait()
+    errors = 0
+    for start in range(0, writes, batch_size):
+        chunk = range(start, min(start + batch_size, writes))
+        try:
+            with db.batch():
+                for i in chunk:
+                    db.log_signal_latency(_latency_info(worker, i))
+        except sqlite3.OperationalError:
+            errors += len(chunk)
+    db.close()
+    results.put(errors)
+
+
+def _prepare_db(db_path, legacy):
+    TradeDatabase(db_path).close()
+    if legacy:
+        conn = sqlite3.connect(db_path)
+        conn.execute('PRAGMA journal_mode=DELETE')
+        conn.close()
+
+
+def run_scenario(name, worker_fn, processes, writes):
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, 'bench.db')
+        _prepare_db(db_path, legacy=(name == 'legacy'))
+
+        start_event = mp.Event()
+        results = mp.Queue()
+        procs = [mp.Process(target=worker_fn, args=(db_path, w, writes, start_event, results)) for w in range(processes)]
+        for p in procs: p.start()
+        time.sleep(0.5)  # alle Prozesse bereit
+
+        t0 = time.perf_counter()
+        start_event.set()
+        errors = sum(results.get() for _ in procs)
+        for p in procs: p.join()
+        elapsed = time.perf_counter() - t0
+
+        conn = sqlite3.connect(db_path)
+        rows = conn.execute('SELECT COUNT(*) FROM signal_latency').fetchone()[0]
+        conn.close()
+
+    return {'name': name, 'rows': rows, 'errors': errors, 'seconds': elapsed, 'writes_per_s': rows / elapsed if elapsed else 0}
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--processes', default=16, type=int)
+    parser.add_argument('--writes', default=200, type=int, help="Schreibvorgänge pro Prozess")
+    args = parser.parse_args()
+
+    print(f"{args.processes} Prozesse x {args.writes} Writes")
+    print(f"{'Modus':<10}{'Zeilen':>8}{'Lock-Fehler':>13}{'Sekunden':>10}{'Writes/s':>11}")
+    for name, fn in [('legacy', _legacy_worker), ('pooled', _pooled_worker), ('batched', _batched_worker)]:
+        r = run_scenario(name, fn, args.processes, args.writes)
+        print(f"{r['name']:<10}{r['rows']:>8}{r['errors']:>13}{r['seconds']:>10.2f}{r['writes_per_s']:>11.0f}")
+
+
+if __name__ == '__main__':
+    main()
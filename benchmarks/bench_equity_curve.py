@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+# benchmarks/bench_equity_curve.py
+"""
+Equity-Kurve des Portfolio-Simulators: ein Dict pro Kerze + pandas-Nachberechnung
+vs. vorab allozierte Arrays (EquityCurveRecorder) vs. ohne Kurve
+
+Gemessen wird nur die Kurven-Buchführung einer Simulation (Default: 5m über
+ein Jahr = 105.120 Kerzen): Zeit in der Schleife, Zeit bis zum fertigen
+DataFrame und tracemalloc-Spitze. Im Greedy-Optimierer fällt der Teil
+"Schleife" pro Kandidat an, der DataFrame nur noch für das finale Team.
+
+Aufruf:
+    python benchmarks/bench_equity_curve.py --bars 105120
+"""
+import os
+import sys
+import time
+import argparse
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(os.path.join(PROJECT_ROOT, 'src'))
+
+from pbot.analysis.equity_curve import EquityCurveRecorder
+
+
+def legacy(timestamps, values):
+    """Bisheriges Verfahren aus run_portfolio_simulation"""
+    equity_curve = []
+    for ts, value in zip(timestamps, values):
+        equity_curve.append({'timestamp': ts, 'equity': value})
+    loop_done = time.perf_counter()
+    equity_df = pd.DataFrame(equity_curve)
+    equity_df['peak'] = equity_df['equity'].cummax()
+    equity_df['drawdown_pct'] = ((equity_df['peak'] - equity_df['equity']) / equity_df['peak'].replace(0, np.nan)).fillna(0)
+    equity_df.set_index('timestamp', inplace=True, drop=False)
+    return loop_done, equity_df
+
+
+def arrays(timestamps, values):
+    recorder = EquityCurveRecorder(timestamps)
+    for value in values:
+        recorder.record(value)
+    return time.perf_counter(), recorder.to_frame()
+
+
+def skipped(timestamps, values):
+    final_equity = None
+    for value in values:
+        final_equity = value
+    return time.perf_counter(), final_equity
+
+
+def measure(fn, timestamps, values, repeat):
+    best_loop, best_total = float('inf'), float('inf')
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        loop_done, _ = fn(timestamps, values)
+        best_loop = min(best_loop, loop_done - t0)
+        best_total = min(best_total, time.perf_counter() - t0)
+    tracemalloc.start()
+    result = fn(timestamps, values)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    del result
+    return best_loop, best_total, peak
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--bars', default=105120, type=int, help="Kerzen (5m über ein Jahr = 105120)")
+    parser.add_argument('--repeat', default=5, type=int)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    timestamps = list(pd.date_range('2025-01-01', periods=args.bars, freq='5min', tz='UTC'))
+    values = (1000 * np.cumprod(1 + rng.normal(0, 0.001, args.bars))).tolist()
+
+    print(f"Equity-Kurve, {args.bars:,} Kerzen")
+    print(f"{'Verfahren':<26}{'Schleife':>11}{'inkl. DataFrame':>18}{'Peak-Speicher':>16}")
+    for label, fn in (('Dict pro Kerze + pandas', legacy), ('Vorab allozierte Arrays', arrays), ('Ohne Kurve', skipped)):
+        loop, total, peak = measure(fn, timestamps, values, args.repeat)
+        total_col = f"{total * 1000:>15.1f} ms" if fn is not skipped else f"{'-':>18}"
+        print(f"{label:<26}{loop * 1000:>8.1f} ms{total_col}{peak / 2**20:>13.1f} MB")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+# benchmarks/bench_fill_confirmation.py
+"""
+Housekeeper + Entry-Bestätigung: feste Sleeps vs. Exchange.wait_until
+
+Stub-Börse mit fester Latenz pro Request; Zustandswechsel (Orders gelöscht,
+Order gefüllt, Position geschlossen) werden erst nach --settle-ms sichtbar.
+Die Order-Antwort enthält keinen Fill (ungünstigster Fall).
+
+- Entry-Zyklus: Orders löschen, Market-Order, Fill bestätigen
+- Verwaiste Position: Orders löschen, Position schließen, Schließen bestätigen
+
+Aufruf:
+    python benchmarks/bench_fill_confirmation.py --latency-ms 100 --settle-ms 150
+"""
+import os
+import sys
+import time
+import argparse
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(os.path.join(PROJECT_ROOT, 'src'))
+
+from pbot.utils.exchange import Exchange
+
+SYMBOL = 'BTC/USDT:USDT'
+
+
+class StubCcxt:
+    def __init__(self, latency_s, settle_s, position_open):
+        self.latency_s = latency_s
+        self.settle_s = settle_s
+        self.triggers_gone_at = None
+        self.position_open = position_open
+        self.position_flip_at = None
+
+    def _request(self):
+        time.sleep(self.latency_s)
+        return time.monotonic()
+
+    def amount_to_precision(self, symbol, amount):
+        return str(amount)
+
+    def cancel_all_orders(self, symbol, params=None):
+        self.triggers_gone_at = self._request() + self.settle_s
+
+    def fetch_open_orders(self, symbol, params=None):
+        gone = self.triggers_gone_at is not None and self._request() >= self.triggers_gone_at
+        return [] if gone else [{'id': 'sl'}]
+
+    def cancel_order(self, order_id, symbol, params=None):
+        self._request()
+
+    def create_order(self, symbol, type_, side, amount, params=None):
+        self.position_flip_at = self._request() + self.settle_s
+        return {'id': 'entry', 'filled': None}
+
+    def _position_now(self, now):
+        flipped = self.position_flip_at is not None and now >= self.position_flip_at
+        return self.position_open != flipped
+
+    def fetch_order(self, order_id, symbol, params=None):
+        filled = self._position_now(self._request())
+        return {'id': order_id, 'amount': 1.0, 'filled': 1.0 if filled else 0.0, 'status': 'closed' if filled else 'open',
+                'average': 100.0 if filled else None}
+
+    def fetch_positions(self, symbols, params=None):
+        return [{'contracts': 1.0, 'side': 'long'}] if self._position_now(self._request()) else []
+
+
+def offline_exchange(client):
+    exchange = Exchange.__new__(Exchange)
+    exchange.account, exchange.exchange, exchange.markets, exchange.market_feed = {}, client, {SYMBOL: {}}, None
+    return exchange
+
+
+def legacy_cancel(client):
+    client.cancel_all_orders(SYMBOL)
+    client.cancel_all_orders(SYMBOL)
+    time.sleep(0.5)
+    for order in client.fetch_open_orders(SYMBOL):
+        client.cancel_order(order['id'], SYMBOL)
+        time.sleep(0.1)
+    time.sleep(2)  # housekeeper_routine
+
+
+def legacy(client, orphan):
+    legacy_cancel(client)
+    client.fetch_positions([SYMBOL])
+    client.create_order(SYMBOL, 'market', 'sell' if orphan else 'buy', 1.0)
+    time.sleep(3 if orphan else 2)
+    client.fetch_positions([SYMBOL])
+
+
+def waiting(client, orphan):
+    exchange = offline_exchange(client)
+    exchange.cancel_all_orders_for_symbol(SYMBOL)
+    client.fetch_positions([SYMBOL])
+    order = exchange.create_market_order(SYMBOL, 'sell' if orphan else 'buy', 1.0)
+    if orphan:
+        exchange.wait_for_position(SYMBOL, is_open=False)
+    else:
+        exchange.wait_for_order_fill(order['id'], SYMBOL)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--latency-ms', default=100, type=float, help="Simulierte Dauer eines REST-Aufrufs")
+    parser.add_argument('--settle-ms', default=150, type=float, help="Bis die Börse den neuen Zustand meldet")
+    args = parser.parse_args()
+    latency_s, settle_s = args.latency_ms / 1000, args.settle_ms / 1000
+
+    print(f"REST-Latenz {args.latency_ms:.0f} ms, Zustandswechsel nach {args.settle_ms:.0f} ms")
+    print(f"{'Szenario':<22}{'feste Sleeps':>14}{'wait_until':>14}")
+    for label, orphan in (('Entry-Zyklus', False), ('Verwaiste Position', True)):
+        durations = []
+        for fn in (legacy, waiting):
+            client = StubCcxt(latency_s, settle_s, position_open=orphan)
+            t0 = time.perf_counter()
+            fn(client, orphan)
+            durations.append(time.perf_counter() - t0)
+        print(f"{label:<22}{durations[0] * 1000:>11.0f} ms{durations[1] * 1000:>11.0f} ms")
+
+
+if __name__ == '__main__':
+    main()
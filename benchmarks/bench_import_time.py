@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+# benchmarks/bench_import_time.py
+"""
+Startzeit der Skripte: Import-Report auf Basis von `python -X importtime`
+
+Pro Skript werden gemessen
+  - Import-Zeit: Summe der Top-Level-Imports laut -X importtime
+  - Wandzeit:    kompletter Prozess (Median aus --repeat Läufen)
+  - die schwersten Top-Level-Imports
+Mit --ref wird derselbe Aufruf zusätzlich auf einem Git-Stand (z.B. HEAD~1)
+gemessen, der per `git archive` in ein temporäres Verzeichnis entpackt wird.
+
+Aufruf:
+    python benchmarks/bench_import_time.py --ref HEAD~1
+"""
+import os
+import re
+import sys
+import time
+import argparse
+import tarfile
+import tempfile
+import statistics
+import subprocess
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+# (Bezeichnung, Skript relativ zum Projektverzeichnis, Argumente)
+TARGETS = [
+    ('run.py --help', 'src/pbot/strategy/run.py', ['--help']),
+    ('show_risk_status.py', 'show_risk_status.py', []),
+    ('master_runner.py', 'master_runner.py', []),
+    ('optimizer.py --help', 'src/pbot/analysis/optimizer.py', ['--help']),
+]
+
+IMPORT_LINE = re.compile(r'import time:\s+(\d+) \|\s+(\d+) \|( +)(\S+)')
+
+
+def parse_importtime(stderr):
+    """Top-Level-Imports (Einrückung 1) als {Modul: kumulierte µs}"""
+    top = {}
+    for line in stderr.splitlines():
+        m = IMPORT_LINE.match(line)
+        if m and len(m.group(3)) == 1:
+            top[m.group(4)] = top.get(m.group(4), 0) + int(m.group(2))
+    return top
+
+
+def measure(root, script, args, repeat):
+    cmd = [sys.executable, os.path.join(root, script), *args]
+    env = dict(os.environ, PYTHONDONTWRITEBYTECODE='1')
+    walls = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        subprocess.run(cmd, cwd=root, env=env, stdin=subprocess.DEVNULL, capture_output=True)
+        walls.append(time.perf_counter() - t0)
+    proc = subprocess.run([sys.executable, '-X', 'importtime', *cmd[1:]], cwd=root, env=env,
+                          stdin=subprocess.DEVNULL, capture_output=True, text=True)
+    top = parse_importtime(proc.stderr)
+    return sum(top.values()) / 1000, statistics.median(walls), top
+
+
+def export_ref(ref, target_dir):
+    """Entpackt den Git-Stand ref (ohne Arbeitskopie-Änderungen) nach target_dir"""
+    archive = subprocess.run(['git', 'archive', '--format=tar', ref], cwd=PROJECT_ROOT,
+                             capture_output=True, check=True).stdout
+    tar_path = os.path.join(target_dir, 'ref.tar')
+    with open(tar_path, 'wb') as f:
+        f.write(archive)
+    with tarfile.open(tar_path) as tar:
+        tar.extractall(target_dir)
+    os.remove(tar_path)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--ref', default=None, help="Git-Stand zum Vergleich (z.B. HEAD~1)")
+    parser.add_argument('--repeat', default=5, type=int)
+    parser.add_argument('--top', default=5, type=int, help="Anzahl der schwersten Imports pro Skript")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        roots = [('aktuell', PROJECT_ROOT)]
+        if args.ref:
+            export_ref(args.ref, tmp)
+            roots.insert(0, (args.ref, tmp))
+
+        results = {}
+        for label, script, script_args in TARGETS:
+            for name, root in roots:
+                results[(label, name)] = measure(root, script, script_args, args.repeat)
+
+    header = f"{'Skript':<22}" + "".join(f"{f'{name} Import':>18}{f'{name} Wand':>16}" for name, _ in roots)
+    print(header)
+    for label, _, _ in TARGETS:
+        row = f"{label:<22}"
+        for name, _ in roots:
+            imp, wall, _ = results[(label, name)]
+            row += f"{imp:>15.0f} ms{wall * 1000:>13.0f} ms"
+        print(row)
+
+    print(f"\nSchwerste Top-Level-Imports ({roots[-1][0]}):")
+    for label, _, _ in TARGETS:
+        top = results[(label, roots[-1][0])][2]
+        heavy = sorted(top.items(), key=lambda kv: -kv[1])[:args.top]
+        print(f"  {label:<22}" + ", ".join(f"{mod} {us / 1000:.0f} ms" for mod, us in heavy))
+
+
+if __name__ == '__main__':
+    main()
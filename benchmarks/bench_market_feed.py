@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+# benchmarks/bench_market_feed.py
+"""
+Kerzenschluss -> Daten für PredictorEngine.analyze bereit: REST-Abruf vs. MarketFeed
+
+- REST (Cron-Pfad): Exchange.fetch_recent_ohlcv für LTF (300 Kerzen) und HTF
+  (100 Kerzen) gegen einen ccxt-Stub mit fester Latenz pro Aufruf
+- MarketFeed: ReplayCandleSource spielt Kerzen ab; gemessen wird vom Senden
+  des ersten Updates der neuen Kerze bis LTF- und HTF-DataFrame über
+  fetch_recent_ohlcv (aus dem Feed) im Callback vorliegen
+
+Aufruf:
+    python benchmarks/bench_market_feed.py --closes 50 --latency-ms 150
+"""
+import os
+import sys
+import time
+import argparse
+import statistics
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(os.path.join(PROJECT_ROOT, 'src'))
+
+from pbot.utils.exchange import Exchange
+from pbot.utils.market_feed import MarketFeed, ReplayCandleSource
+
+SYMBOL, LTF, HTF = 'BTC/USDT:USDT', '15m', '1h'
+STEP_MS = {LTF: 15 * 60 * 1000, HTF: 60 * 60 * 1000}
+
+
+def candles(timeframe, count, updates_per_candle=1):
+    rows = []
+    for i in range(count):
+        for u in range(updates_per_candle):
+            rows.append([i * STEP_MS[timeframe], 100.0 + i, 101.0 + i + u, 99.0 + i, 100.5 + i, 1.0 + u])
+    return rows
+
+
+class StubCcxt:
+    def __init__(self, latency_s):
+        self.latency_s = latency_s
+        self.rows = {LTF: candles(LTF, 300), HTF: candles(HTF, 100)}
+
+    def fetch_ohlcv(self, symbol, timeframe, limit=None):
+        time.sleep(self.latency_s)
+        return self.rows[timeframe][-limit:]
+
+
+def offline_exchange(client):
+    exchange = Exchange.__new__(Exchange)
+    exchange.account, exchange.exchange, exchange.markets, exchange.market_feed = {}, client, {SYMBOL: {}}, None
+    return exchange
+
+
+def bench_rest(closes, latency_s):
+    exchange = offline_exchange(StubCcxt(latency_s))
+    samples = []
+    for _ in range(closes):
+        t0 = time.perf_counter()
+        exchange.fetch_recent_ohlcv(SYMBOL, LTF, limit=300)
+        exchange.fetch_recent_ohlcv(SYMBOL, HTF, limit=100)
+        samples.append(time.perf_counter() - t0)
+    return samples, 400 * closes
+
+
+def bench_feed(closes):
+    exchange = offline_exchange(None)
+    ltf = candles(LTF, 300 + closes + 1, updates_per_candle=3)
+    source = ReplayCandleSource({(SYMBOL, LTF): ltf[300 * 3:], (SYMBOL, HTF): candles(HTF, 101)[100:]},
+                                history={(SYMBOL, LTF): ltf[:300 * 3], (SYMBOL, HTF): candles(HTF, 100)},
+                                interval_s=0.002)
+    samples = []
+
+    def on_close(symbol, timeframe):
+        if timeframe != LTF:
+            return
+        exchange.fetch_recent_ohlcv(SYMBOL, LTF, limit=300)
+        exchange.fetch_recent_ohlcv(SYMBOL, HTF, limit=100)
+        samples.append(time.perf_counter() - source.sent_ts[(SYMBOL, LTF)])
+
+    feed = MarketFeed([(SYMBOL, LTF), (SYMBOL, HTF)], on_close=on_close, source_factory=lambda: source)
+    feed.start()
+    exchange.attach_market_feed(feed)
+    deadline = time.time() + 60
+    while len(samples) < closes and time.time() < deadline:
+        time.sleep(0.01)
+    feed.stop()
+    streamed = sum(source.position.values())
+    return samples[:closes], streamed
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--closes', default=50, type=int, help="Anzahl Kerzenschlüsse")
+    parser.add_argument('--latency-ms', default=150, type=float, help="Simulierte Dauer eines REST-Aufrufs")
+    args = parser.parse_args()
+
+    print(f"Kerzenschluss -> LTF(300)+HTF(100) bereit, {args.closes} Schlüsse, REST-Latenz {args.latency_ms:.0f} ms")
+    print(f"{'Verfahren':<22}{'Median':>10}{'p95':>10}{'übertragene Kerzen':>22}")
+    for label, (samples, rows) in (('REST fetch_ohlcv', bench_rest(args.closes, args.latency_ms / 1000)),
+                                   ('MarketFeed', bench_feed(args.closes))):
+        p95 = sorted(samples)[int(len(samples) * 0.95) - 1]
+        print(f"{label:<22}{statistics.median(samples) * 1000:>7.1f} ms{p95 * 1000:>7.1f} ms{rows:>22,}")
+
+
+if __name__ == '__main__':
+    main()
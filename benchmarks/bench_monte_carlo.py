@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+# benchmarks/bench_monte_carlo.py
+"""
+Monte-Carlo über ein Trade-Log: vektorisiert vs. Python-Schleife pro Pfad
+
+Aufruf:
+    python benchmarks/bench_monte_carlo.py --trades 400 --paths 50000 --workers 1 4
+"""
+import os
+import sys
+import time
+import random
+import argparse
+
+import numpy as np
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(os.path.join(PROJECT_ROOT, 'src'))
+
+from pbot.analysis.monte_carlo import run_monte_carlo, trade_returns
+
+
+def loop_monte_carlo(returns, n_paths, seed=0):
+    """Referenz: ein Pfad nach dem anderen in reinem Python"""
+    rng = random.Random(seed)
+    returns = returns.tolist()
+    finals, drawdowns = [], []
+    for _ in range(n_paths):
+        equity, peak, max_dd = 1.0, 1.0, 0.0
+        for _ in range(len(returns)):
+            equity *= 1 + returns[rng.randrange(len(returns))]
+            peak = max(peak, equity)
+            max_dd = max(max_dd, 1 - equity / peak)
+        finals.append(equity)
+        drawdowns.append(max_dd)
+    return np.percentile(finals, 50), np.percentile(drawdowns, 95)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--trades', default=400, type=int)
+    parser.add_argument('--paths', default=50_000, type=int)
+    parser.add_argument('--workers', default=[1, 4], type=int, nargs='+')
+    parser.add_argument('--loop_paths', default=2_000, type=int, help="Pfade für die Python-Referenz (hochgerechnet)")
+    args = parser.parse_args()
+
+    pnl = np.random.default_rng(1).normal(2.0, 20.0, args.trades)
+    returns = trade_returns(pnl, 1000.0)
+    print(f"{args.trades} Trades, {args.paths:,} Pfade")
+
+    t0 = time.perf_counter()
+    median_factor, dd95 = loop_monte_carlo(returns, args.loop_paths)
+    loop_s = (time.perf_counter() - t0) * args.paths / args.loop_paths
+    print(f"  Python-Schleife      {loop_s:8.2f}s (hochgerechnet aus {args.loop_paths:,} Pfaden), DD p95 {dd95*100:.1f}%")
+
+    for method in ('bootstrap', 'shuffle'):
+        for workers in args.workers:
+            t0 = time.perf_counter()
+            mc = run_monte_carlo(pnl, 1000.0, n_paths=args.paths, method=method, seed=1, workers=workers)
+            elapsed = time.perf_counter() - t0
+            print(f"  {method:<9} {workers:>2} Worker {elapsed:8.2f}s ({loop_s / elapsed:5.0f}x), DD p95 {mc['max_drawdown_p95']*100:.1f}%")
+
+
+if __name__ == '__main__':
+    main()
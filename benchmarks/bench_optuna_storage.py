@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+# benchmarks/bench_optuna_storage.py
+"""
+Optuna-Storage-Backends unter parallelen Worker-Prozessen: Trials/Sekunde und Fehler
+
+Jeder Worker ist ein eigener Prozess (wie mehrere Optimierer-Instanzen) mit
+RandomSampler und einer trivialen Objective, damit nur der Storage gemessen wird.
+  - shared:   alle Worker an derselben Studie (--jobs / mehrere Prozesse pro Symbol)
+  - distinct: jeder Worker an einer eigenen Studie (parallele Symbole/Timeframes)
+
+Aufruf:
+    python benchmarks/bench_optuna_storage.py --workers 1 4 16 --trials 50
+"""
+import os
+import sys
+import time
+import argparse
+import tempfile
+import multiprocessing as mp
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(os.path.join(PROJECT_ROOT, 'src'))
+
+import optuna
+
+from pbot.analysis.optuna_storage import create_storage
+
+optuna.logging.set_verbosity(optuna.logging.ERROR)
+
+
+def _objective(trial):
+    x = trial.suggest_float('x', -10, 10)
+    y = trial.suggest_int('y', 0, 100)
+    return (x - 2) ** 2 + y
+
+
+def _worker(args):
+    backend, study_name, db_dir, trials = args
+    study = optuna.load_study(study_name=study_name, storage=create_storage(backend, study_name, db_dir),
+                              sampler=optuna.samplers.RandomSampler())
+    done = errors = 0
+    for _ in range(trials):
+        try:
+            study.optimize(_objective, n_trials=1)  # Storage-Fehler (z.B. 'database is locked') kommen hier an
+            done += 1
+        except Exception:
+            errors += 1
+    return done, errors
+
+
+def _prepare(backend, study_names, db_dir):
+    for name in set(study_names):
+        optuna.create_study(study_name=name, storage=create_storage(backend, name, db_dir),
+                            direction='minimize', load_if_exists=True)
+
+
+def run_case(backend, scenario, workers, trials):
+    with tempfile.TemporaryDirectory() as db_dir:
+        names = ['bench'] * workers if scenario == 'shared' else [f"bench_{i}" for i in range(workers)]
+        _prepare(backend, names, db_dir)
+
+        ctx = mp.get_context('fork')
+        t0 = time.perf_counter()
+        with ctx.Pool(workers) as pool:
+            results = pool.map(_worker, [(backend, name, db_dir, trials) for name in names])
+        elapsed = time.perf_counter() - t0
+
+    done = sum(r[0] for r in results)
+    errors = sum(r[1] for r in results)
+    return done / elapsed, errors
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--workers', nargs='+', default=[1, 4, 16], type=int)
+    parser.add_argument('--trials', default=50, type=int, help="Trials pro Worker")
+    args = parser.parse_args()
+
+    print(f"CPU-Kerne: {os.cpu_count()}, Trials pro Worker: {args.trials}")
+    print(f"\n{'Szenario':<10}{'Backend':<11}" + "".join(f"{f'{w} Worker':>18}" for w in args.workers))
+    cases = [('shared', 'sqlite'), ('shared', 'journal'),
+             ('distinct', 'sqlite'), ('distinct', 'journal'), ('distinct', 'per_study')]
+    for scenario, backend in cases:
+        cells = []
+        for workers in args.workers:
+            rate, errors = run_case(backend, scenario, workers, args.trials)
+            cells.append(f"{rate:>9.1f} T/s" + (f" ({errors} F)" if errors else "      "))
+        print(f"{scenario:<10}{backend:<11}" + "".join(f"{c:>18}" for c in cells))
+    print("\nT/s = abgeschlossene Trials pro Sekunde über alle Worker, F = fehlgeschlagene Trials")
+
+
+if __name__ == '__main__':
+    main()
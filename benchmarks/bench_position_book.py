@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+# benchmarks/bench_position_book.py
+"""
+Positions-Zustand der Simulatoren: String-Dicts vs. PositionBook (__slots__)
+
+1. Buchführung isoliert: 30 Slots, pro Kerze Margin-Summe + Trailing/Exit-Check
+   über alle offenen Positionen, zufällige Öffnungen/Schließungen
+   (Zeit pro Kerze, Speicher pro Position via tracemalloc)
+2. Komplette Portfolio-Simulation mit 30 Strategien auf 15m (lokale Daten aus
+   data/cache, Symbole mit Parametervarianten aufgefüllt): Laufzeit und
+   tracemalloc-Spitze. Mit --ref zusätzlich auf einem Git-Stand (z.B. HEAD~1),
+   entpackt per `git archive` wie in bench_import_time.py.
+
+Aufruf:
+    python benchmarks/bench_position_book.py --ref HEAD~1 --start_date 2025-08-01 --end_date 2025-10-15
+"""
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import tempfile
+import tracemalloc
+import subprocess
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(os.path.join(PROJECT_ROOT, 'src'))
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from bench_import_time import export_ref
+
+N_STRATEGIES = 30
+
+
+# --- 1. Buchführung isoliert ---
+
+def _events(bars, seed=3):
+    """Pro Kerze: (high, low, Öffnungen [(slot, margin)])"""
+    rng = random.Random(seed)
+    price, events = 100.0, []
+    for _ in range(bars):
+        price *= 1 + rng.gauss(0, 0.004)
+        opens = [(rng.randrange(N_STRATEGIES), round(rng.uniform(1, 50), 2)) for _ in range(rng.randrange(3))]
+        events.append((price * 1.003, price * 0.997, opens))
+    return events
+
+
+def run_dicts(events):
+    open_positions = {}
+    for high, low, opens in events:
+        used_margin = sum(p['margin_used'] for p in open_positions.values())
+        for slot, margin in opens:
+            if slot in open_positions or margin > 10000 - used_margin:
+                continue
+            entry = (high + low) / 2
+            open_positions[slot] = {
+                'side': 'sell', 'entry_price': entry, 'stop_loss': entry * 1.01, 'take_profit': entry * 0.98,
+                'notional_value': margin * 10, 'margin_used': margin, 'trailing_active': False,
+                'activation_price': entry * 0.985, 'peak_price': entry, 'callback_rate': 0.005,
+                'last_known_price': entry
+            }
+        to_close = []
+        for key, pos in open_positions.items():
+            pos['last_known_price'] = low
+            if not pos['trailing_active'] and low <= pos['activation_price']:
+                pos['trailing_active'] = True
+            if pos['trailing_active']:
+                pos['peak_price'] = min(pos['peak_price'], low)
+                pos['stop_loss'] = min(pos['stop_loss'], pos['peak_price'] * (1 + pos['callback_rate']))
+            if high >= pos['stop_loss'] or (not pos['trailing_active'] and low <= pos['take_profit']):
+                to_close.append(key)
+        for key in to_close:
+            del open_positions[key]
+    return open_positions
+
+
+def run_book(events):
+    from pbot.analysis.position_book import Position, PositionBook
+    book = PositionBook(N_STRATEGIES)
+    for high, low, opens in events:
+        used_margin = book.margin_used
+        for slot, margin in opens:
+            if book.positions[slot] is not None or margin > 10000 - used_margin:
+                continue
+            entry = (high + low) / 2
+            book.open(slot, Position('sell', entry, entry * 1.01, entry * 0.98, entry * 0.985, 0.005,
+                                     margin * 10, margin=margin))
+        for slot, pos in book.open_items():
+            pos.last_price = low
+            pos.update_trailing(high, low)
+            if pos.check_exit(high, low)[0]:
+                book.close(slot)
+    return book
+
+
+def position_bytes(make, count=10000):
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    items = [make(100.0 + i) for i in range(count)]
+    size = (tracemalloc.get_traced_memory()[0] - before) / count
+    tracemalloc.stop()
+    del items
+    return size
+
+
+def bench_bookkeeping(bars, repeat):
+    from pbot.analysis.position_book import Position
+    events = _events(bars)
+    timings = {}
+    for label, fn in (('Dicts', run_dicts), ('PositionBook', run_book)):
+        best = min(_timed(lambda: fn(events)) for _ in range(repeat))
+        timings[label] = best / bars * 1e6
+
+    sizes = {
+        'Dicts': position_bytes(lambda p: {
+            'side': 'sell', 'entry_price': p, 'stop_loss': p * 1.01, 'take_profit': p * 0.98,
+            'notional_value': p * 10, 'margin_used': p, 'trailing_active': False, 'activation_price': p * 0.985,
+            'peak_price': p, 'callback_rate': 0.005, 'last_known_price': p}),
+        'PositionBook': position_bytes(lambda p: Position('sell', p, p * 1.01, p * 0.98, p * 0.985, 0.005,
+                                                          p * 10, margin=p)),
+    }
+    print(f"Buchführung isoliert ({N_STRATEGIES} Slots, {bars:,} Kerzen)")
+    print(f"{'Zustand':<16}{'µs/Kerze':>12}{'Bytes/Position':>17}")
+    for label in timings:
+        print(f"{label:<16}{timings[label]:>12.2f}{sizes[label]:>17.0f}")
+
+
+# --- 2. Komplette Simulation (im Kindprozess, damit --ref den alten Code lädt) ---
+
+def child(root, start_date, end_date):
+    sys.path.insert(0, os.path.join(root, 'src'))
+    import io
+    import contextlib
+    from pbot.analysis.backtester import load_data
+    from pbot.analysis.portfolio_simulator import run_portfolio_simulation
+
+    cache_dir = os.path.join(root, 'data', 'cache')
+    frames = {}
+    for fname in sorted(f for f in os.listdir(cache_dir) if f.endswith('-USDT-USDT_15m.csv')):
+        symbol = fname.replace('-USDT-USDT_15m.csv', '/USDT:USDT')
+        with contextlib.redirect_stdout(io.StringIO()):
+            data = load_data(symbol, '15m', start_date, end_date)
+        if not data.empty:
+            frames[symbol] = data
+
+    # Symbole mit Parametervarianten auf N_STRATEGIES auffüllen
+    strategies = {}
+    symbol_list = sorted(frames)
+    for i in range(N_STRATEGIES):
+        symbol = symbol_list[i % len(symbol_list)]
+        variant = i // len(symbol_list)
+        strategies[f"{symbol}_15m_v{variant}"] = {
+            'symbol': symbol, 'timeframe': '15m', 'htf': '15m', 'data': frames[symbol],
+            'smc_params': {'length': 10 + 2 * variant, 'rsi_weight': 1.5, 'score_threshold': 0.5 + 0.1 * variant},
+            'risk_params': {'leverage': 10, 'risk_per_trade_pct': 1.0, 'risk_reward_ratio': 2.0,
+                            'atr_multiplier_sl': 2.0, 'trailing_stop_activation_rr': 1.5},
+        }
+
+    tracemalloc.start()
+    t0 = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()), contextlib.redirect_stderr(io.StringIO()):
+        result = run_portfolio_simulation(1000, strategies, start_date, end_date, use_cache=False)
+    elapsed = time.perf_counter() - t0
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    print(json.dumps({'seconds': elapsed, 'peak_mb': peak / 2**20, 'trades': result['trade_count'],
+                      'end_capital': result['end_capital'], 'candles': sum(len(f) for f in frames.values())}))
+
+
+def run_child(root, args):
+    proc = subprocess.run([sys.executable, os.path.abspath(__file__), '--child', root,
+                           '--start_date', args.start_date, '--end_date', args.end_date],
+                          cwd=PROJECT_ROOT, capture_output=True, text=True, check=True)
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def _timed(fn):
+    t0 = time.perf_counter()
+    fn()
+    return time.perf_counter() - t0
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--ref', default=None, help="Git-Stand zum Vergleich (z.B. HEAD~1)")
+    parser.add_argument('--start_date', default='2025-08-01')
+    parser.add_argument('--end_date', default='2025-10-15')
+    parser.add_argument('--bars', default=50000, type=int, help="Kerzen für die isolierte Buchführung")
+    parser.add_argument('--repeat', default=3, type=int)
+    parser.add_argument('--child', default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child(args.child, args.start_date, args.end_date)
+        return
+
+    bench_bookkeeping(args.bars, args.repeat)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        roots = [('aktuell', PROJECT_ROOT)]
+        if args.ref:
+            export_ref(args.ref, tmp)
+            roots.insert(0, (args.ref, tmp))
+        results = [(name, run_child(root, args)) for name, root in roots]
+
+    print(f"\nPortfolio-Simulation ({N_STRATEGIES} Strategien, 15m, {args.start_date} bis {args.end_date}, "
+          f"{results[-1][1]['candles']:,} Kerzen)")
+    print(f"{'Stand':<12}{'Laufzeit':>11}{'Peak (tracemalloc)':>21}{'Trades':>9}{'Endkapital':>16}")
+    for name, r in results:
+        print(f"{name:<12}{r['seconds']:>10.1f}s{r['peak_mb']:>18.1f} MB{r['trades']:>9}{r['end_capital']:>16.2f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+# benchmarks/bench_protection.py
+"""
+Entry-Order -> Schutz-Orders platziert (Time-to-Protection)
+
+Gegen eine Stub-Börse mit fester Latenz pro Request:
+- bisher: 2 s warten, Position abfragen, dann SL und TSL nacheinander
+- neu: Fill aus der Order-Antwort, SL und TSL gleichzeitig (_place_protection)
+
+Aufruf:
+    python benchmarks/bench_protection.py --latency-ms 150 --runs 5
+"""
+import os
+import sys
+import time
+import logging
+import argparse
+import statistics
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(os.path.join(PROJECT_ROOT, 'src'))
+
+from pbot.utils import trade_manager
+
+SYMBOL = 'BTC/USDT:USDT'
+ENTRY_ORDER = {'id': '1', 'filled': 1.0, 'amount': 1.0, 'status': 'closed', 'average': 100.0}
+
+
+class StubCcxt:
+    def price_to_precision(self, symbol, price):
+        return f"{price:.2f}"
+
+
+class StubExchange:
+    def __init__(self, latency_s):
+        self.exchange = StubCcxt()
+        self.latency_s = latency_s
+
+    def fetch_open_positions(self, symbol):
+        time.sleep(self.latency_s)
+        return [{'contracts': 1.0, 'entryPrice': 100.0}]
+
+    def place_trigger_market_order(self, symbol, side, amount, trigger_price, params={}):
+        time.sleep(self.latency_s)
+        return {'id': 'sl'}
+
+    def place_trailing_stop_order(self, symbol, side, amount, activation_price, callback_rate_decimal, params={}):
+        time.sleep(self.latency_s)
+        return {'id': 'tsl'}
+
+
+def sequential(exchange, confirm_sleep_s):
+    time.sleep(confirm_sleep_s)
+    contracts = float(exchange.fetch_open_positions(SYMBOL)[0]['contracts'])
+    exchange.place_trigger_market_order(SYMBOL, 'sell', contracts, 95.0, {'reduceOnly': True})
+    exchange.place_trailing_stop_order(SYMBOL, 'sell', contracts, 110.0, 0.005, {'reduceOnly': True})
+
+
+def concurrent(exchange, logger):
+    fill = trade_manager._confirm_entry_fill(exchange, SYMBOL, ENTRY_ORDER)
+    trade_manager._place_protection(exchange, SYMBOL, 'sell', fill['contracts'], 95.0, 110.0, 0.005, 120.0, logger)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--latency-ms', default=150, type=float, help="Simulierte Dauer eines REST-Aufrufs")
+    parser.add_argument('--confirm-sleep', default=2.0, type=float, help="Bisherige Wartezeit vor der Positionsabfrage (s)")
+    parser.add_argument('--runs', default=5, type=int)
+    args = parser.parse_args()
+
+    exchange = StubExchange(args.latency_ms / 1000)
+    logger = logging.getLogger('bench')
+    print(f"Entry -> SL+TSL platziert, REST-Latenz {args.latency_ms:.0f} ms, {args.runs} Durchläufe")
+    print(f"{'Verfahren':<34}{'Median':>10}")
+    for label, fn in (('sleep + Position + seriell', lambda: sequential(exchange, args.confirm_sleep)),
+                      ('Order-Antwort + parallel', lambda: concurrent(exchange, logger))):
+        samples = []
+        for _ in range(args.runs):
+            t0 = time.perf_counter()
+            fn()
+            samples.append(time.perf_counter() - t0)
+        print(f"{label:<34}{statistics.median(samples) * 1000:>7.0f} ms")
+
+
+if __name__ == '__main__':
+    main()
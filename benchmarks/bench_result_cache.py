@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+# benchmarks/bench_result_cache.py
+"""
+Ergebnis-Cache: Einzel-Backtests aller Configs und eine Portfolio-Simulation,
+jeweils ohne Cache, mit leerem Cache (Schreiben) und mit warmem Cache
+
+Entspricht einem wiederholten Lauf von show_results.py mit unveränderten
+Configs und gleichem Zeitraum (nur lokale Daten aus data/cache).
+
+Aufruf:
+    python benchmarks/bench_result_cache.py --start_date 2025-01-01 --end_date 2025-12-01
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import contextlib
+import io
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(os.path.join(PROJECT_ROOT, 'src'))
+
+from pbot.analysis import result_cache
+from pbot.analysis.backtester import load_data, run_pbot_backtest, data_cache_path
+from pbot.analysis.portfolio_simulator import run_portfolio_simulation
+
+
+def load_inputs(start_date, end_date):
+    configs_dir = os.path.join(PROJECT_ROOT, 'src', 'pbot', 'strategy', 'configs')
+    inputs = []
+    for fname in sorted(f for f in os.listdir(configs_dir) if f.startswith('config_') and f.endswith('.json')):
+        with open(os.path.join(configs_dir, fname)) as f:
+            config = json.load(f)
+        symbol, timeframe = config['market']['symbol'], config['market']['timeframe']
+        if not os.path.exists(data_cache_path(symbol, timeframe)):
+            continue
+        data = load_data(symbol, timeframe, start_date, end_date)
+        if data.empty:
+            continue
+        strategy = dict(config['strategy'], symbol=symbol, timeframe=timeframe, htf=config['market'].get('htf'))
+        inputs.append((fname, symbol, timeframe, config['market'].get('htf'), data, strategy, config['risk']))
+    return inputs
+
+
+def run_single(inputs, use_cache):
+    for _, _, _, _, data, strategy, risk in inputs:
+        run_pbot_backtest(data.copy(), strategy, risk, 1000, record_trades=True, use_cache=use_cache)
+
+
+def run_portfolio(inputs, start_date, end_date, use_cache):
+    strategies = {f"{symbol}_{tf}": {'symbol': symbol, 'timeframe': tf, 'htf': htf, 'data': data,
+                                     'smc_params': dict(strategy), 'risk_params': dict(risk)}
+                  for _, symbol, tf, htf, data, strategy, risk in inputs}
+    with contextlib.redirect_stdout(io.StringIO()), contextlib.redirect_stderr(io.StringIO()):
+        run_portfolio_simulation(1000, strategies, start_date, end_date, use_cache=use_cache)
+
+
+def _timed(fn):
+    t0 = time.perf_counter()
+    fn()
+    return time.perf_counter() - t0
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--start_date', default='2025-01-01')
+    parser.add_argument('--end_date', default='2025-12-01')
+    parser.add_argument('--portfolio_size', default=4, type=int)
+    args = parser.parse_args()
+
+    inputs = load_inputs(args.start_date, args.end_date)
+    candles = sum(len(i[4]) for i in inputs)
+    print(f"{len(inputs)} Configs mit lokalen Daten, {candles:,} Kerzen gesamt")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        result_cache.configure(cache_dir=tmp)
+        team = inputs[:args.portfolio_size]
+        cases = [
+            ('Einzel-Backtests', lambda c: run_single(inputs, c)),
+            (f'Portfolio ({len(team)} Strategien)', lambda c: run_portfolio(team, args.start_date, args.end_date, c)),
+        ]
+        print(f"\n{'Lauf':<28}{'ohne Cache':>12}{'kalt':>10}{'warm':>10}{'Faktor':>9}")
+        for label, fn in cases:
+            uncached = _timed(lambda: fn(False))
+            cold = _timed(lambda: fn(True))
+            warm = _timed(lambda: fn(True))
+            print(f"{label:<28}{uncached:>11.2f}s{cold:>9.2f}s{warm:>9.3f}s{uncached / warm:>8.0f}x")
+
+        size = sum(os.path.getsize(os.path.join(tmp, f)) for f in os.listdir(tmp))
+        print(f"\nCache: {len(os.listdir(tmp))} Einträge, {size / 1024:.0f} KiB")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+# benchmarks/bench_ring_buffer.py
+"""
+Live-Kerzen pro Update: DataFrame neu bauen vs. OHLCVRingBuffer
+
+Pro neuer Kerze wird das 300er-Fenster für den Predictor bereitgestellt:
+- fetch_recent_ohlcv-Stil: Zeilenliste -> DataFrame, to_datetime, set_index, sort_index
+- deque + DataFrame: Zeilen-deque (bisheriger MarketFeed), DataFrame aus Listen
+- Ringpuffer -> to_frame(): append + DataFrame aus den Spalten-Arrays
+- Ringpuffer -> window(): append + NumPy-Views ohne Kopie (z.B. für Indikatoren)
+
+Aufruf:
+    python benchmarks/bench_ring_buffer.py --window 300 --updates 2000
+"""
+import os
+import sys
+import time
+import argparse
+from collections import deque
+
+import numpy as np
+import pandas as pd
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(os.path.join(PROJECT_ROOT, 'src'))
+
+from pbot.utils.ring_buffer import OHLCVRingBuffer
+
+COLUMNS = ['timestamp', 'open', 'high', 'low', 'close', 'volume']
+
+
+def rows(count):
+    rng = np.random.default_rng(0)
+    close = 100 * np.cumprod(1 + rng.normal(0, 0.002, count))
+    return [[i * 900_000, c, c * 1.001, c * 0.999, c, 1.0] for i, c in enumerate(close.tolist())]
+
+
+def rest_style(data, window, updates):
+    for i in range(window, window + updates):
+        df = pd.DataFrame(data[i - window:i], columns=COLUMNS)
+        df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms', utc=True)
+        df.set_index('timestamp', inplace=True)
+        df.sort_index(inplace=True)
+
+
+def deque_frame(data, window, updates):
+    buffer = deque(data[:window], maxlen=window)
+    for row in data[window:window + updates]:
+        buffer.append(row)
+        df = pd.DataFrame(list(buffer), columns=COLUMNS)
+        df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms', utc=True)
+        df.set_index('timestamp', inplace=True)
+
+
+def ring_frame(data, window, updates):
+    buffer = OHLCVRingBuffer(window)
+    buffer.extend(data[:window])
+    for row in data[window:window + updates]:
+        buffer.append(*row)
+        buffer.to_frame()
+
+
+def ring_window(data, window, updates):
+    buffer = OHLCVRingBuffer(window)
+    buffer.extend(data[:window])
+    for row in data[window:window + updates]:
+        buffer.append(*row)
+        view = buffer.window()
+        view.close[-14:].mean()  # Beispiel-Indikator auf dem View
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--window', default=300, type=int)
+    parser.add_argument('--updates', default=2000, type=int)
+    args = parser.parse_args()
+
+    data = rows(args.window + args.updates)
+    print(f"{args.updates:,} Kerzen-Updates, Fenster {args.window}")
+    print(f"{'Verfahren':<30}{'pro Update':>14}")
+    for label, fn in (('fetch_recent_ohlcv-Stil', rest_style), ('deque + DataFrame', deque_frame),
+                      ('Ringpuffer -> to_frame()', ring_frame), ('Ringpuffer -> window()', ring_window)):
+        t0 = time.perf_counter()
+        fn(data, args.window, args.updates)
+        print(f"{label:<30}{(time.perf_counter() - t0) / args.updates * 1e6:>11.1f} µs")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+# benchmarks/bench_scheduler.py
+"""
+Strategie-Läufe pro Tag: Cron-Takt vs. CandleScheduler
+
+Simuliert einen Tag mit den aktiven Strategien aus settings.json:
+- Cron: master_runner alle --cron-min Minuten, startet jede Strategie
+  (2 s Abstand zwischen den Prozessen)
+- Scheduler: master_runner --loop, startet nach jedem Kerzenschluss nur die
+  fälligen Strategien (gemeinsam, grace_s nach dem Schluss)
+
+"ohne neue Kerze" = Läufe, bei denen seit dem letzten Lauf der Strategie
+keine Kerze ihres Timeframes geschlossen hat (reine Verschwendung von
+API-Aufrufen und CPU).
+
+Aufruf:
+    python benchmarks/bench_scheduler.py --cron-min 15 --grace 2
+"""
+import os
+import sys
+import json
+import argparse
+import statistics
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(os.path.join(PROJECT_ROOT, 'src'))
+
+from pbot.utils.scheduler import CandleScheduler
+from pbot.utils.timeframe_utils import last_candle_close_ts
+
+DAY_S = 86_400
+START_TS = 1_714_521_600  # 2024-05-01 00:00 UTC
+
+
+def active_strategies():
+    with open(os.path.join(PROJECT_ROOT, 'settings.json')) as f:
+        live = json.load(f)['live_trading_settings']
+    return [s for s in live['active_strategies'] if s.get('active', True)]
+
+
+def simulate(launches, strategies):
+    """launches: [(Startzeit, Strategie)] -> (Läufe, ohne neue Kerze, Verzögerungen nach Schluss)"""
+    last_close_seen, wasted, delays = {}, 0, []
+    for start_ts, strategy in launches:
+        close_ts = last_candle_close_ts(strategy['timeframe'], start_ts)
+        key = strategy['symbol']
+        if last_close_seen.get(key) == close_ts:
+            wasted += 1
+        else:
+            delays.append(start_ts - close_ts)
+        last_close_seen[key] = close_ts
+    return len(launches), wasted, delays
+
+
+def cron_launches(strategies, cron_s):
+    return [(tick + 2 * i, s) for tick in range(START_TS + 1, START_TS + DAY_S, cron_s)
+            for i, s in enumerate(strategies)]
+
+
+def scheduler_launches(strategies, grace_s):
+    now = [START_TS + 1]
+    scheduler = CandleScheduler(strategies, grace_s=grace_s, clock=lambda: now[0])
+    launches = []
+    while True:
+        close_ts, due = scheduler.next_close(now[0] - grace_s)
+        if close_ts >= START_TS + DAY_S:
+            return launches
+        now[0] = close_ts + grace_s
+        launches += [(now[0], s) for s in due]
+        now[0] += 1  # Laufzeit des master_runner-Durchgangs
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--cron-min', default=15, type=int, help="Cron-Intervall des master_runner")
+    parser.add_argument('--grace', default=2.0, type=float, help="Wartezeit nach Kerzenschluss (s)")
+    args = parser.parse_args()
+
+    strategies = active_strategies()
+    timeframes = ', '.join(sorted({s['timeframe'] for s in strategies}))
+    print(f"{len(strategies)} Strategien ({timeframes}), simulierter Tag")
+    print(f"{'Verfahren':<22}{'Läufe':>8}{'ohne neue Kerze':>18}{'Start nach Schluss (Median/Max)':>34}")
+    for label, launches in ((f"Cron alle {args.cron_min} min", cron_launches(strategies, args.cron_min * 60)),
+                            ('CandleScheduler', scheduler_launches(strategies, args.grace))):
+        runs, wasted, delays = simulate(launches, strategies)
+        print(f"{label:<22}{runs:>8}{wasted:>18}{statistics.median(delays):>25.0f} s / {max(delays):.0f} s")
+
+
+if __name__ == '__main__':
+    main()
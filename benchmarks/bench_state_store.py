@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+# benchmarks/bench_state_store.py
+"""
+Gemeinsamer Zustand: JSON-Dateien (trade_lock.json / risk_state.json) vs. StateStore
+
+1. Lookup: is_trade_locked bei N Locks - JSON-Datei pro Prüfung parsen vs.
+   Primärschlüssel-Lookup im StateStore
+2. Nebenläufige Updates: P Prozesse erhöhen je W-mal einen gemeinsamen Zähler
+   (Read-Modify-Write wie set_trade_lock/_save_state) - verlorene Updates und Dauer
+
+Aufruf:
+    python benchmarks/bench_state_store.py --processes 7 --writes 200
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import multiprocessing as mp
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(os.path.join(PROJECT_ROOT, 'src'))
+
+from pbot.utils.state_store import StateStore
+
+
+def _json_lookup(path, key):
+    with open(path, 'r') as f:
+        locks = json.load(f)
+    return locks.get(key) is not None and time.time() < locks[key]
+
+
+def bench_lookup(tmp, locks, lookups):
+    json_path = os.path.join(tmp, 'trade_lock.json')
+    store = StateStore(os.path.join(tmp, 'lookup.db'))
+    entries = {f"SYM{i}/USDT:USDT_15m": time.time() + 3600 for i in range(locks)}
+    with open(json_path, 'w') as f:
+        json.dump(entries, f, indent=4)
+    for key, value in entries.items():
+        store.put('trade_lock', key, value)
+
+    keys = list(entries)
+    results = {}
+    for label, check in (('JSON-Datei', lambda k: _json_lookup(json_path, k)),
+                         ('StateStore', lambda k: time.time() < store.get('trade_lock', k, 0))):
+        t0 = time.perf_counter()
+        for i in range(lookups):
+            check(keys[i % len(keys)])
+        results[label] = (time.perf_counter() - t0) / lookups * 1e6
+    return results
+
+
+def _json_worker(path, writes, start_event):
+    start_event.wait()
+    for _ in range(writes):
+        try:
+            with open(path, 'r') as f:
+                state = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            state = {}  # halb geschriebene Datei -> wie load_or_create_trade_lock: leerer Zustand
+        state['counter'] = state.get('counter', 0) + 1
+        with open(path, 'w') as f:
+            json.dump(state, f, indent=4)
+
+
+def _store_worker(db_path, writes, start_event):
+    store = StateStore(db_path)
+    start_event.wait()
+    for _ in range(writes):
+        store.update('bench', 'counter', lambda n: n + 1, default=0)
+    store.close()
+
+
+def bench_concurrency(tmp, processes, writes):
+    json_path = os.path.join(tmp, 'state.json')
+    db_path = os.path.join(tmp, 'concurrency.db')
+    with open(json_path, 'w') as f:
+        json.dump({}, f)
+    StateStore(db_path)
+
+    results = {}
+    for label, target, path in (('JSON-Datei', _json_worker, json_path), ('StateStore', _store_worker, db_path)):
+        start_event = mp.Event()
+        procs = [mp.Process(target=target, args=(path, writes, start_event)) for _ in range(processes)]
+        for p in procs: p.start()
+        time.sleep(0.2)
+        t0 = time.perf_counter()
+        start_event.set()
+        for p in procs: p.join()
+        elapsed = time.perf_counter() - t0
+        if target is _json_worker:
+            try:
+                with open(json_path) as f:
+                    counter = json.load(f).get('counter', 0)
+            except json.JSONDecodeError:
+                counter = 0
+        else:
+            counter = StateStore(db_path).get('bench', 'counter', 0)
+        results[label] = (counter, elapsed)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--locks', default=50, type=int, help="Anzahl Einträge in trade_lock.json")
+    parser.add_argument('--lookups', default=20000, type=int)
+    parser.add_argument('--processes', default=7, type=int)
+    parser.add_argument('--writes', default=200, type=int)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        lookup = bench_lookup(tmp, args.locks, args.lookups)
+        print(f"is_trade_locked ({args.locks} Locks, {args.lookups:,} Prüfungen)")
+        for label, us in lookup.items():
+            print(f"  {label:<12}{us:>8.1f} µs/Prüfung")
+
+        expected = args.processes * args.writes
+        concurrency = bench_concurrency(tmp, args.processes, args.writes)
+        print(f"\nNebenläufige Updates ({args.processes} Prozesse x {args.writes}, erwartet {expected})")
+        for label, (counter, elapsed) in concurrency.items():
+            lost = expected - counter
+            print(f"  {label:<12}Zähler {counter:>6}  verloren {lost:>6} ({lost / expected * 100:5.1f}%)  {elapsed:6.2f}s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+# benchmarks/bench_static_charts.py
+"""
+Statische Report-Charts: Startkosten, Renderzeit und Cache-Treffer
+
+- Import-Zeit in einem frischen Interpreter: plotly vs. matplotlib (Agg) vs.
+  static_charts ohne Rendern (matplotlib wird erst bei einem Cache-Miss geladen)
+- render_equity_chart auf einer Equity-Kurve (kalt / aus dem Cache)
+- render_candlestick_snapshot auf 300 Kerzen (kalt / aus dem Cache)
+
+Aufruf:
+    python benchmarks/bench_static_charts.py --points 10000
+"""
+import os
+import sys
+import time
+import argparse
+import tempfile
+import subprocess
+
+import numpy as np
+import pandas as pd
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(os.path.join(PROJECT_ROOT, 'src'))
+
+from pbot.analysis.static_charts import render_equity_chart, render_candlestick_snapshot
+
+
+def import_time(statement):
+    t0 = time.perf_counter()
+    subprocess.run([sys.executable, '-c', statement], check=True)
+    return time.perf_counter() - t0
+
+
+def timed(fn):
+    t0 = time.perf_counter()
+    result = fn()
+    return time.perf_counter() - t0, result
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--points', default=10_000, type=int, help="Punkte der Equity-Kurve")
+    args = parser.parse_args()
+
+    print("Interpreter-Start + Import:")
+    print(f"  python leer               {import_time('pass'):.2f}s")
+    print(f"  plotly.graph_objects      {import_time('import plotly.graph_objects, pandas'):.2f}s")
+    print(f"  matplotlib Agg (Figure)   {import_time('from matplotlib.figure import Figure; from matplotlib.backends.backend_agg import FigureCanvasAgg; import pandas'):.2f}s")
+    src = os.path.join(PROJECT_ROOT, 'src')
+    print(f"  static_charts (Cache-Hit) {import_time(f'import sys; sys.path.append({src!r}); import pbot.analysis.static_charts'):.2f}s")
+
+    rng = np.random.default_rng(3)
+    ts = pd.date_range('2025-01-01', periods=args.points, freq='h', tz='UTC')
+    equity = 1000 * np.exp(np.cumsum(rng.normal(0, 0.002, args.points)))
+    peak = np.maximum.accumulate(equity)
+    drawdown = (peak - equity) / peak
+
+    close = 100 + np.cumsum(rng.normal(0, 0.5, 300))
+    candles = pd.DataFrame({'open': close, 'high': close + 1, 'low': close - 1, 'close': close + rng.normal(0, 0.5, 300)},
+                           index=pd.date_range('2025-01-01', periods=300, freq='15min', tz='UTC'))
+    candles['ema_20'] = candles['close'].ewm(span=20).mean()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        cold, path = timed(lambda: render_equity_chart(ts, equity, drawdown, 'Bench', cache_dir=tmp))
+        warm, _ = timed(lambda: render_equity_chart(ts, equity, drawdown, 'Bench', cache_dir=tmp))
+        print(f"\nEquity ({args.points:,} Punkte): kalt {cold * 1000:.0f} ms, Cache {warm * 1000:.1f} ms, {os.path.getsize(path) / 1e3:.0f} kB")
+
+        cold, path = timed(lambda: render_candlestick_snapshot(candles, 'Bench', cache_dir=tmp))
+        warm, _ = timed(lambda: render_candlestick_snapshot(candles, 'Bench', cache_dir=tmp))
+        print(f"Kerzen (300):             kalt {cold * 1000:.0f} ms, Cache {warm * 1000:.1f} ms, {os.path.getsize(path) / 1e3:.0f} kB")
+
+
+if __name__ == '__main__':
+    main()
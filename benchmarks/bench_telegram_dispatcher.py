@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+# benchmarks/bench_telegram_dispatcher.py
+"""
+Telegram im Handelszyklus: synchrones send_message vs. queue_message (TelegramDispatcher)
+
+Ein lokaler HTTP-Server ersetzt api.telegram.org und antwortet nach fester
+Latenz. Gemessen wird, wie lange der Aufrufer (z.B. check_and_open_new_position
+vor dem Setzen von SL/TP) pro Burst von N Nachrichten blockiert ist, und wie
+viele HTTP-Requests insgesamt anfallen.
+
+Aufruf:
+    python benchmarks/bench_telegram_dispatcher.py --latency-ms 300 --burst 3 --bursts 5
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(os.path.join(PROJECT_ROOT, 'src'))
+
+from pbot.utils import telegram
+from pbot.utils.telegram import TelegramDispatcher, send_message
+
+
+def start_server(latency_s, counter):
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            self.rfile.read(int(self.headers['Content-Length']))
+            counter.append(1)
+            time.sleep(latency_s)
+            data = json.dumps({'ok': True}).encode()
+            self.send_response(200)
+            self.send_header('Content-Length', str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    telegram.TELEGRAM_API_URL = f"http://127.0.0.1:{server.server_port}"
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--latency-ms', default=300, type=float, help="Antwortzeit der Telegram-Attrappe")
+    parser.add_argument('--burst', default=3, type=int, help="Nachrichten pro Burst")
+    parser.add_argument('--bursts', default=5, type=int)
+    args = parser.parse_args()
+
+    counter = []
+    server = start_server(args.latency_ms / 1000, counter)
+    print(f"{args.bursts} Bursts à {args.burst} Nachrichten, Telegram-Latenz {args.latency_ms:.0f} ms")
+    print(f"{'Verfahren':<18}{'blockiert/Burst':>17}{'HTTP-Requests':>15}{'bis zugestellt':>16}")
+
+    dispatcher = TelegramDispatcher(min_interval_s=0.0)
+    for label, send in (('send_message', send_message), ('queue_message', dispatcher.enqueue)):
+        counter.clear()
+        blocked = 0.0
+        t_start = time.perf_counter()
+        for b in range(args.bursts):
+            t0 = time.perf_counter()
+            for i in range(args.burst):
+                send('TOKEN', '42', f"Burst {b} Nachricht {i}")
+            blocked += time.perf_counter() - t0
+            if send == dispatcher.enqueue:
+                dispatcher.flush()
+        delivered = time.perf_counter() - t_start
+        print(f"{label:<18}{blocked / args.bursts * 1000:>14.2f} ms{len(counter):>15}{delivered:>14.2f} s")
+    server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+# benchmarks/bench_trade_statistics.py
+"""
+get_trade_statistics auf einer synthetischen Datenbank mit 1 Mio. Trades
+
+Vergleicht die frühere Python-Schleife (alle Zeilen als Dicts laden) mit
+der SQL-Aggregation über den Covering-Index.
+
+Aufruf:
+    python benchmarks/bench_trade_statistics.py --trades 1000000
+"""
+import os
+import sys
+import time
+import random
+import argparse
+import tempfile
+from datetime import datetime, timedelta
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(os.path.join(PROJECT_ROOT, 'src'))
+
+from pbot.utils.database import TradeDatabase
+
+SYMBOLS = ['BTC/USDT:USDT', 'ETH/USDT:USDT', 'SOL/USDT:USDT', 'XRP/USDT:USDT', 'ADA/USDT:USDT', 'DOGE/USDT:USDT', 'AAVE/USDT:USDT']
+TIMEFRAMES = ['5m', '15m', '30m', '1h', '4h']
+
+
+def build_database(db, trades, span_days=730, seed=42):
+    rng = random.Random(seed)
+    now = datetime.now()
+    chunk = []
+    with db._get_connection() as conn:
+        for i in range(trades):
+            exit_time = now - timedelta(seconds=rng.random() * span_days * 86400)
+            chunk.append((
+                f"T{i}", rng.choice(SYMBOLS), rng.choice(TIMEFRAMES), 'buy',
+                exit_time - timedelta(hours=1), 100.0, 99.0, 1.0, 100.0, 10, 1.0, 10.0,
+                exit_time, rng.gauss(0.5, 10.0), 'closed'
+            ))
+            if len(chunk) >= 50000:
+                _insert(conn, chunk); chunk = []
+        if chunk:
+            _insert(conn, chunk)
+        conn.execute('ANALYZE')
+
+
+def _insert(conn, rows):
+    conn.executemany('''
+        INSERT INTO trades (trade_id, symbol, timeframe, side, entry_time, entry_price, stop_loss,
+            position_size, notional_value, leverage, risk_pct, risk_usd, exit_time, pnl_usd, status)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    ''', rows)
+
+
+def legacy_statistics(db, days):
+    """Frühere Implementierung: alle Zeilen laden und in Python aggregieren"""
+    with db._get_connection() as conn:
+        cursor = conn.execute('''
+            SELECT * FROM trades
+            WHERE status = 'closed'
+            AND exit_time >= datetime('now', '-' || ? || ' days')
+            ORDER BY exit_time DESC
+        ''', (days,))
+        trades = [dict(row) for row in cursor.fetchall()]
+
+    wins = [t for t in trades if t['pnl_usd'] > 0]
+    losses = [t for t in trades if t['pnl_usd'] <= 0]
+    total_pnl = sum(t['pnl_usd'] for t in trades)
+    total_wins = sum(t['pnl_usd'] for t in wins) if wins else 0
+    total_losses = abs(sum(t['pnl_usd'] for t in losses)) if losses else 1
+    return {
+        'trades_count': len(trades),
+        'wins_count': len(wins),
+        'total_pnl_usd': total_pnl,
+        'max_win': max((t['pnl_usd'] for t in wins), default=0),
+        'max_loss': min((t['pnl_usd'] for t in losses), default=0),
+        'profit_factor': total_wins / total_losses if total_losses > 0 else 0,
+    }
+
+
+def _timeit(fn, repeat=3):
+    best = float('inf')
+    result = None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - t0)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--trades', default=1_000_000, type=int)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db = TradeDatabase(os.path.join(tmp, 'bench.db'))
+        t0 = time.perf_counter()
+        build_database(db, args.trades)
+        print(f"Synthetische DB mit {args.trades:,} Trades erstellt ({time.perf_counter() - t0:.1f}s)")
+
+        with db._get_connection() as conn:
+            plan = conn.execute('''
+                EXPLAIN QUERY PLAN SELECT symbol, timeframe, COUNT(*), SUM(pnl_usd) FROM trades INDEXED BY idx_trades_closed_stats
+                WHERE status = 'closed' AND exit_time >= datetime('now', '-30 days')
+                GROUP BY symbol, timeframe
+            ''').fetchall()
+        print("Query-Plan: " + " | ".join(row['detail'] for row in plan))
+
+        print(f"\n{'Tage':>6}{'Trades':>10}{'Python-Schleife':>18}{'SQL-Aggregation':>18}{'Faktor':>8}")
+        for days in (30, 365, 3650):
+            legacy_s, legacy = _timeit(lambda: legacy_statistics(db, days), repeat=1 if days > 30 else 3)
+            sql_s, stats = _timeit(lambda: db.get_trade_statistics(days=days))
+            assert legacy['trades_count'] == stats['trades_count']
+            assert abs(legacy['total_pnl_usd'] - stats['total_pnl_usd']) < 1e-6 * max(1.0, abs(legacy['total_pnl_usd']))
+            assert legacy['max_win'] == stats['max_win'] and legacy['max_loss'] == stats['max_loss']
+            print(f"{days:>6}{stats['trades_count']:>10,}{legacy_s * 1000:>15.1f} ms{sql_s * 1000:>15.1f} ms{legacy_s / sql_s:>7.1f}x")
+        db.close()
+
+
+if __name__ == '__main__':
+    main()
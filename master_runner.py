@@ -1,17 +1,133 @@
 # master_runner.py
+import argparse
 import json
 import subprocess
 import sys
 import os
 import time
+from datetime import datetime, timezone
 
 # Pfad anpassen, damit die utils importiert werden können
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 PROJECT_ROOT = SCRIPT_DIR
 sys.path.append(os.path.join(PROJECT_ROOT, 'src'))
 
-# *** Geändert: Importpfad ***
-from pbot.utils.exchange import Exchange
+from pbot.utils.config_service import ConfigService
+from pbot.utils.scheduler import CandleScheduler, DEFAULT_GRACE_S
+from pbot.utils.timeframe_utils import timeframe_to_seconds
+
+
+def load_strategies(live_settings, optimization_results_file):
+    """
+    Aktive Strategien aus den Live-Einstellungen (Autopilot oder manuell)
+
+    Returns:
+        Liste von Dicts {'symbol', 'timeframe', 'use_macd'}
+    """
+    use_autopilot = live_settings.get('use_auto_optimizer_results', False)
+
+    strategy_list = []
+    if use_autopilot:
+        print("Modus: Autopilot. Lese Strategien aus den Optimierungs-Ergebnissen...")
+        with open(optimization_results_file, 'r') as f:
+            strategy_config = json.load(f)
+        strategy_list = strategy_config.get('optimal_portfolio', [])
+    else:
+        print("Modus: Manuell. Lese Strategien aus den manuellen Einstellungen...")
+        strategy_list = live_settings.get('active_strategies', [])
+
+    strategies = []
+    for strategy_info in strategy_list:
+        if isinstance(strategy_info, dict) and not strategy_info.get("active", True):
+            symbol = strategy_info.get('symbol', 'N/A')
+            timeframe = strategy_info.get('timeframe', 'N/A')
+            print(f"\n--- Überspringe inaktive Strategie: {symbol} ({timeframe}) ---")
+            continue
+
+        symbol, timeframe, use_macd = None, None, None 
+
+        if use_autopilot and isinstance(strategy_info, str):
+            # Autopilot-Logik (unverändert)
+            try:
+                use_macd = '_macd' in strategy_info
+                base_name = strategy_info.replace('config_', '').replace('.json', '').replace('_macd', '')
+                parts = base_name.split('_')
+                timeframe = parts[-1]
+                symbol_base = parts[0].replace('USDTUSDT', '')
+                symbol = f"{symbol_base}/USDT:USDT"
+            except Exception as e:
+                print(f"Warnung: Konnte Autopilot-Strategie '{strategy_info}' nicht verarbeiten. Fehler: {e}")
+                continue
+
+        elif isinstance(strategy_info, dict):
+            symbol = strategy_info.get('symbol')
+            timeframe = strategy_info.get('timeframe')
+            # use_macd wird nicht mehr benötigt, aber wir müssen einen Dummy-Wert übergeben
+            use_macd = strategy_info.get('use_macd_filter', False)
+
+        if not all([symbol, timeframe, use_macd is not None]):
+            print(f"Warnung: Unvollständige Strategie-Info: {strategy_info}. Überspringe.")
+            continue
+
+        strategies.append({'symbol': symbol, 'timeframe': timeframe, 'use_macd': use_macd})
+    return strategies
+
+
+def launch_strategy(python_executable, bot_runner_script, strategy):
+    """Startet run.py für eine Strategie als eigenen Prozess"""
+    print(f"\n--- Starte Bot für: {strategy['symbol']} ({strategy['timeframe']}) ---")
+    print(f"  - MACD-Filter-Version: {'JA' if strategy['use_macd'] else 'NEIN'}")
+
+    command = [
+        python_executable,
+        bot_runner_script,
+        "--symbol", strategy['symbol'],
+        "--timeframe", strategy['timeframe'],
+        "--use_macd", str(strategy['use_macd'])
+    ]
+    return subprocess.Popen(command)
+
+
+def run_scheduled(settings_file, optimization_results_file, python_executable, bot_runner_script, grace_s):
+    """
+    Dauerbetrieb: startet nach jedem Kerzenschluss nur die fälligen Strategien
+
+    Die settings.json hält der ConfigService im Speicher; Änderungen werden vor
+    jedem Schluss übernommen (ungültige Stände verworfen), also ohne Neustart.
+    Ohne gültige Strategien wartet der Scheduler im Poll-Intervall auf neue.
+    """
+    running, strategies = [], []
+    config_service = ConfigService(settings_file=settings_file)
+    print(f"Modus: Scheduler (Kerzenschluss + {grace_s:.1f}s). Beenden mit Strg+C.")
+    try:
+        while True:
+            config_service.reload()
+            try:
+                strategies = load_strategies(config_service.live_settings, optimization_results_file)
+            except (OSError, json.JSONDecodeError) as e:
+                print(f"Warnung: Strategien nicht lesbar ({e}). Nutze bisherige Strategien.")
+            for strategy in strategies:
+                if not timeframe_to_seconds(strategy['timeframe']):
+                    print(f"Warnung: Unbekannter Timeframe {strategy['timeframe']} ({strategy['symbol']}). Überspringe.")
+            strategies = [s for s in strategies if timeframe_to_seconds(s['timeframe'])]
+
+            upcoming = CandleScheduler(strategies, grace_s=grace_s).wait_for_next_close()
+            if upcoming is None:
+                # Daemon bleibt aktiv: settings.json weiter beobachten, bis wieder Strategien gültig sind
+                print(f"Keine aktiven Strategien gefunden. Neuer Versuch in {config_service.poll_interval_s:.0f}s.")
+                time.sleep(config_service.poll_interval_s)
+                continue
+
+            close_ts, due = upcoming
+            close_time = datetime.fromtimestamp(close_ts, tz=timezone.utc).strftime('%Y-%m-%d %H:%M')
+            print("=======================================================")
+            print(f"Kerzenschluss {close_time} UTC: {len(due)} von {len(strategies)} Strategien fällig")
+            running = [p for p in running if p.poll() is None]  # beendete Läufe einsammeln
+            for strategy in due:
+                running.append(launch_strategy(python_executable, bot_runner_script, strategy))
+    except KeyboardInterrupt:
+        print("\nScheduler beendet.")
+
 
 def main():
     """
@@ -19,7 +135,14 @@ def main():
     - Liest die settings.json, um den Modus (Autopilot/Manuell) zu bestimmen.
     - Startet für jede als "active" markierte Strategie einen separaten run.py Prozess
       innerhalb der korrekten virtuellen Umgebung.
+    - Mit --loop: Dauerbetrieb, nach jedem Kerzenschluss nur die fälligen Strategien.
     """
+    parser = argparse.ArgumentParser(description="PBot Master Runner")
+    parser.add_argument('--loop', action='store_true', help="Dauerbetrieb: Strategien bei Kerzenschluss ihres Timeframes starten")
+    parser.add_argument('--grace', type=float, default=None,
+                        help=f"Sekunden nach Kerzenschluss (Standard: candle_close_grace_s aus settings.json bzw. {DEFAULT_GRACE_S})")
+    args = parser.parse_args()
+
     settings_file = os.path.join(SCRIPT_DIR, 'settings.json')
     optimization_results_file = os.path.join(SCRIPT_DIR, 'artifacts', 'results', 'optimization_results.json')
     # *** Geändert: Pfad zum Bot-Runner ***
@@ -53,68 +176,19 @@ def main():
         print(f"Frage Kontostand für Account '{main_account_config.get('name', 'Standard')}' ab...")
         
         live_settings = settings.get('live_trading_settings', {})
-        use_autopilot = live_settings.get('use_auto_optimizer_results', False)
-
-        strategy_list = []
-        if use_autopilot:
-            print("Modus: Autopilot. Lese Strategien aus den Optimierungs-Ergebnissen...")
-            with open(optimization_results_file, 'r') as f:
-                strategy_config = json.load(f)
-            strategy_list = strategy_config.get('optimal_portfolio', [])
-        else:
-            print("Modus: Manuell. Lese Strategien aus den manuellen Einstellungen...")
-            strategy_list = live_settings.get('active_strategies', [])
-
-        if not strategy_list:
+        strategies = load_strategies(live_settings, optimization_results_file)
+        if not strategies:
             print("Keine aktiven Strategien zum Ausführen gefunden.")
             return
 
-        print("=======================================================")
-
-        for strategy_info in strategy_list:
-            if isinstance(strategy_info, dict) and not strategy_info.get("active", True):
-                symbol = strategy_info.get('symbol', 'N/A')
-                timeframe = strategy_info.get('timeframe', 'N/A')
-                print(f"\n--- Überspringe inaktive Strategie: {symbol} ({timeframe}) ---")
-                continue
-
-            symbol, timeframe, use_macd = None, None, None 
-
-            if use_autopilot and isinstance(strategy_info, str):
-                # Autopilot-Logik (unverändert)
-                try:
-                    use_macd = '_macd' in strategy_info
-                    base_name = strategy_info.replace('config_', '').replace('.json', '').replace('_macd', '')
-                    parts = base_name.split('_')
-                    timeframe = parts[-1]
-                    symbol_base = parts[0].replace('USDTUSDT', '')
-                    symbol = f"{symbol_base}/USDT:USDT"
-                except Exception as e:
-                    print(f"Warnung: Konnte Autopilot-Strategie '{strategy_info}' nicht verarbeiten. Fehler: {e}")
-                    continue
-
-            elif isinstance(strategy_info, dict):
-                symbol = strategy_info.get('symbol')
-                timeframe = strategy_info.get('timeframe')
-                # use_macd wird nicht mehr benötigt, aber wir müssen einen Dummy-Wert übergeben
-                use_macd = strategy_info.get('use_macd_filter', False)
-
-            if not all([symbol, timeframe, use_macd is not None]):
-                print(f"Warnung: Unvollständige Strategie-Info: {strategy_info}. Überspringe.")
-                continue
-
-            print(f"\n--- Starte Bot für: {symbol} ({timeframe}) ---")
-            print(f"  - MACD-Filter-Version: {'JA' if use_macd else 'NEIN'}")
-
-            command = [
-                python_executable,
-                bot_runner_script,
-                "--symbol", symbol,
-                "--timeframe", timeframe,
-                "--use_macd", str(use_macd)
-            ]
+        if args.loop:
+            grace_s = args.grace if args.grace is not None else live_settings.get('candle_close_grace_s', DEFAULT_GRACE_S)
+            run_scheduled(settings_file, optimization_results_file, python_executable, bot_runner_script, grace_s)
+            return
 
-            subprocess.Popen(command)
+        print("=======================================================")
+        for strategy in strategies:
+            launch_strategy(python_executable, bot_runner_script, strategy)
             time.sleep(2)
 
     except FileNotFoundError as e:
@@ -40,14 +40,19 @@ read -p "Enddatum (JJJJ-MM-TT) [Standard: Heute]: " END_DATE; END_DATE=${END_DAT
 read -p "Startkapital in USDT [Standard: 1000]: " START_CAPITAL; START_CAPITAL=${START_CAPITAL:-1000}
 read -p "CPU-Kerne [Standard: -1 für alle]: " N_CORES; N_CORES=${N_CORES:--1}
 read -p "Anzahl Trials [Standard: 200]: " N_TRIALS; N_TRIALS=${N_TRIALS:-200}
+echo -e "\n${YELLOW}Optuna-Speicher:${NC} sqlite = eine Datei (Standard), journal = viele parallele Worker, per_study = eine Datei pro Studie"
+read -p "Storage-Backend (sqlite/journal/per_study) [Standard: sqlite]: " OPTUNA_STORAGE; OPTUNA_STORAGE=${OPTUNA_STORAGE:-sqlite}
 
-echo -e "\n${YELLOW}Wähle einen Optimierungs-Modus:${NC}"; echo "  1) Strenger Modus (Profitabel & Sicher)"; echo "  2) 'Finde das Beste'-Modus (Max Profit)"
-read -p "Auswahl (1-2) [Standard: 1]: " OPTIM_MODE; OPTIM_MODE=${OPTIM_MODE:-1}
+echo -e "\n${YELLOW}Wähle einen Optimierungs-Modus:${NC}"; echo "  1) Strenger Modus (Profitabel & Sicher)"; echo "  2) 'Finde das Beste'-Modus (Max Profit)"; echo "  3) Pareto-Modus (PnL / Drawdown / Sharpe, Auswahl aus der Front)"
+read -p "Auswahl (1-3) [Standard: 1]: " OPTIM_MODE; OPTIM_MODE=${OPTIM_MODE:-1}
 if [ "$OPTIM_MODE" == "1" ]; then
     OPTIM_MODE_ARG="strict"; read -p "Max Drawdown % [Standard: 30]: " MAX_DD; MAX_DD=${MAX_DD:-30}; read -p "Min Win-Rate % [Standard: 55]: " MIN_WR; MIN_WR=${MIN_WR:-55}; read -p "Min PnL % [Standard: 0]: " MIN_PNL; MIN_PNL=${MIN_PNL:-0}
+elif [ "$OPTIM_MODE" == "3" ]; then
+    OPTIM_MODE_ARG="pareto"; read -p "Max Drawdown % (Constraint) [Standard: 30]: " MAX_DD; MAX_DD=${MAX_DD:-30}; MIN_WR=0; MIN_PNL=-99999
 else
     OPTIM_MODE_ARG="best_profit"; read -p "Max Drawdown % [Standard: 30]: " MAX_DD; MAX_DD=${MAX_DD:-30}; MIN_WR=0; MIN_PNL=-99999
 fi
+read -p "Monte-Carlo-Robustheitsfilter: Pfade pro Kandidat [Standard: 0 = aus, z.B. 5000]: " MC_PATHS; MC_PATHS=${MC_PATHS:-0}
 
 for symbol in $SYMBOLS; do
     for timeframe in $TIMEFRAMES; do
@@ -80,13 +85,29 @@ for symbol in $SYMBOLS; do
             --start_date "$FINAL_START_DATE" --end_date "$END_DATE" \
             --jobs "$N_CORES" --max_drawdown "$MAX_DD" \
             --start_capital "$START_CAPITAL" --min_win_rate "$MIN_WR" \
-            --trials "$N_TRIALS" --min_pnl "$MIN_PNL" --mode "$OPTIM_MODE_ARG"
+            --trials "$N_TRIALS" --min_pnl "$MIN_PNL" --mode "$OPTIM_MODE_ARG" \
+            --mc_paths "$MC_PATHS" --storage "$OPTUNA_STORAGE"
         
         if [ $? -ne 0 ]; then
             echo -e "${RED}Fehler im Optimierer für $symbol ($timeframe). Überspringe...${NC}";
+        elif [ "$OPTIM_MODE_ARG" == "pareto" ]; then
+            # Der Optimierer hat bereits den 'balanced'-Punkt gespeichert; hier kann ein anderer gewählt werden
+            echo -e "\n${YELLOW}Welchen Punkt der Pareto-Front als Config übernehmen?${NC}"
+            read -p "Nr aus der Tabelle, max_pnl, min_drawdown, max_sharpe oder balanced [Standard: balanced]: " PARETO_PICK; PARETO_PICK=${PARETO_PICK:-balanced}
+            if [ "$PARETO_PICK" != "balanced" ]; then
+                python3 "$OPTIMIZER" --symbols "$symbol" --timeframes "$timeframe" \
+                    --start_date "$FINAL_START_DATE" --end_date "$END_DATE" \
+                    --mode pareto --select_only --pareto_pick "$PARETO_PICK"
+            fi
         fi
     done
 done
 
+# Journal-/Per-Study-Studien in die gemeinsame optuna_pbot.db übernehmen (Auswertung/Dashboard)
+if [ "$OPTUNA_STORAGE" != "sqlite" ]; then
+    echo -e "\n${GREEN}>>> Übernehme Optuna-Studien nach artifacts/db/optuna_pbot.db...${NC}"
+    python3 src/pbot/analysis/optuna_storage.py --merge
+fi
+
 deactivate
 echo -e "\n${BLUE}✔ Alle Pipeline-Aufgaben erfolgreich abgeschlossen!${NC}"
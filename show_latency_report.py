@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+# show_latency_report.py
+"""
+Zeigt die Ausführungs-Latenz (Kerzenschluss -> Order-Fill -> Schutz-Orders) pro Symbol/Timeframe an
+"""
+import os
+import sys
+import argparse
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = SCRIPT_DIR
+sys.path.append(os.path.join(PROJECT_ROOT, 'src'))
+
+from pbot.utils.database import get_trade_db, LATENCY_STAGES
+
+STAGE_LABELS = {
+    'close_to_data': 'Kerzenschluss -> Daten',
+    'data_to_decision': 'Daten -> Entscheidung',
+    'decision_to_order': 'Entscheidung -> Order',
+    'order_to_fill': 'Order -> Fill',
+    'close_to_fill': 'GESAMT Schluss -> Fill',
+    'fill_to_protection': 'Fill -> Schutz (SL/TSL)',
+}
+
+
+def print_header(text):
+    print(f"\n{'='*78}")
+    print(f"  {text}")
+    print(f"{'='*78}")
+
+
+def _fmt(value):
+    return f"{value:>9.0f}" if value is not None else f"{'-':>9}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="PBot Latenz-Report")
+    parser.add_argument('--days', default=30, type=int, help="Zeitraum in Tagen")
+    args = parser.parse_args()
+
+    print_header(f"⏱️ PBOT AUSFÜHRUNGS-LATENZ ({args.days} Tage, Angaben in ms)")
+
+    report = get_trade_db().get_latency_report(days=args.days)
+    if not report:
+        print("\n  Keine Latenz-Daten vorhanden.")
+        print("\n" + "="*78)
+        return
+
+    for entry in report:
+        print(f"\n📈 {entry['symbol']} ({entry['timeframe']}) – {entry['signals']} Signale")
+        print(f"  {'Stufe':<26}{'n':>5}{'p50':>10}{'p90':>10}{'p99':>10}")
+        for stage in LATENCY_STAGES:
+            print(
+                f"  {STAGE_LABELS[stage]:<26}{entry[f'{stage}_count']:>5}"
+                f" {_fmt(entry[f'{stage}_p50'])} {_fmt(entry[f'{stage}_p90'])} {_fmt(entry[f'{stage}_p99'])}"
+            )
+
+    print("\n" + "="*78)
+
+
+if __name__ == '__main__':
+    main()
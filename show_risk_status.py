@@ -22,6 +22,30 @@ def print_header(text):
     print(f"{'='*60}")
 
 
+def print_equity_history(db):
+    last = db.get_last_equity_snapshot()
+    if not last:
+        return
+    
+    print(f"\n💰 EQUITY (Stand {datetime.fromtimestamp(last['ts']).strftime('%d.%m.%Y %H:%M')}):")
+    print(f"  Equity: ${last['equity']:,.2f}")
+    if last['unrealized_pnl'] is not None:
+        print(f"  Unrealized PnL: ${last['unrealized_pnl']:+,.2f}")
+    if last['open_risk_pct'] is not None:
+        print(f"  Open Risk: {last['open_risk_pct']:.2f}% ({last['open_positions']} Positionen)")
+    
+    for label, resolution, days in (("24 Stunden", 'hour', 1), ("30 Tage", 'day', 30), ("365 Tage", 'day', 365)):
+        history = db.get_equity_history(resolution=resolution, days=days)
+        if not history:
+            continue
+        start = history[0]['equity_open']
+        end = history[-1]['equity_close']
+        low = min(h['equity_low'] for h in history)
+        high = max(h['equity_high'] for h in history)
+        change_pct = (end - start) / start * 100 if start else 0
+        print(f"  {label:<11} {change_pct:+6.2f}%  (Low ${low:,.2f} / High ${high:,.2f})")
+
+
 def main():
     print_header("📊 PBOT PORTFOLIO RISK STATUS")
     
@@ -85,6 +109,12 @@ def main():
     except Exception as e:
         print(f"\n⚠️ Keine Trade-Statistiken verfügbar: {e}")
     
+    # 3. Equity-Verlauf aus der Zeitreihe (ohne Börsen-Abfrage)
+    try:
+        print_equity_history(get_trade_db())
+    except Exception as e:
+        print(f"\n⚠️ Kein Equity-Verlauf verfügbar: {e}")
+    
     print("\n" + "="*60)
 
 
@@ -0,0 +1,4 @@
+# src/pbot/__main__.py
+from pbot.cli import main
+
+main()
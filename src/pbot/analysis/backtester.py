@@ -6,24 +6,29 @@ import numpy as np
 import json
 import sys
 import math
-import ta
 
 PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', '..'))
 sys.path.append(os.path.join(PROJECT_ROOT, 'src'))
 
-from pbot.utils.exchange import Exchange
 from pbot.strategy.predictor_engine import PredictorEngine
 from pbot.strategy.trade_logic import get_pbot_signal
+from pbot.analysis.trade_log import TradeLogRecorder, empty_trade_log
+from pbot.analysis.position_book import Position, PendingOrder
+from pbot.analysis import result_cache
 
 secrets_cache = None
 
+def data_cache_path(symbol, timeframe):
+    """Pfad der OHLCV-Cache-Datei (data/cache/SYMBOL_TF.csv)"""
+    symbol_filename = symbol.replace('/', '-').replace(':', '-')
+    return os.path.join(PROJECT_ROOT, 'data', 'cache', f"{symbol_filename}_{timeframe}.csv")
+
 def load_data(symbol, timeframe, start_date_str, end_date_str):
     """Lädt Daten aus dem Cache oder von der API."""
     global secrets_cache
     data_dir = os.path.join(PROJECT_ROOT, 'data')
     cache_dir = os.path.join(data_dir, 'cache')
-    symbol_filename = symbol.replace('/', '-').replace(':', '-')
-    cache_file = os.path.join(cache_dir, f"{symbol_filename}_{timeframe}.csv")
+    cache_file = data_cache_path(symbol, timeframe)
 
     try:
         if not os.path.exists(data_dir): os.makedirs(data_dir)
@@ -52,6 +57,8 @@ def load_data(symbol, timeframe, start_date_str, end_date_str):
         acc_key = 'pbot' if 'pbot' in secrets_cache else 'titanbot'
         if acc_key not in secrets_cache: return pd.DataFrame()
 
+        from pbot.utils.exchange import Exchange  # ccxt nur laden, wenn wirklich von der API geladen wird
+
         api_setup = secrets_cache[acc_key][0]
         exchange = Exchange(api_setup)
         if not exchange.markets: return pd.DataFrame()
@@ -67,12 +74,28 @@ def load_data(symbol, timeframe, start_date_str, end_date_str):
         print(f"Fehler: {e}")
         return pd.DataFrame()
 
-def run_pbot_backtest(data, strategy_params, risk_params, start_capital=1000, verbose=False):
+def run_pbot_backtest(data, strategy_params, risk_params, start_capital=1000, verbose=False, record_trades=False, use_cache=True):
     """
     Backtest Logik - EXAKT wie Portfolio Simulator.
+
+    record_trades=True liefert zusätzlich 'trade_log' (Structured Array, siehe
+    trade_log.py; Indizes beziehen sich auf die Zeilen von data).
+    Identische Läufe (gleiche Daten, Parameter, Engine-Version) kommen aus
+    dem Ergebnis-Cache (siehe result_cache.py); use_cache=False rechnet immer neu.
     """
+    if not use_cache:
+        return _simulate_backtest(data, strategy_params, risk_params, start_capital, verbose, record_trades)
+    params = {'strategy': strategy_params, 'risk': risk_params, 'start_capital': start_capital, 'record_trades': record_trades}
+    return result_cache.cached_call(
+        'backtest', [data], params,
+        lambda: _simulate_backtest(data, strategy_params, risk_params, start_capital, verbose, record_trades)
+    )
+
+def _simulate_backtest(data, strategy_params, risk_params, start_capital, verbose, record_trades):
     if data.empty or len(data) < 50:
-        return {"total_pnl_pct": -100, "trades_count": 0, "win_rate": 0, "max_drawdown_pct": 1.0, "end_capital": start_capital}
+        result = {"total_pnl_pct": -100, "trades_count": 0, "win_rate": 0, "max_drawdown_pct": 1.0, "end_capital": start_capital}
+        if record_trades: result['trade_log'] = empty_trade_log()
+        return result
 
     # 1. Indikatoren
     engine = PredictorEngine(strategy_params)
@@ -89,8 +112,9 @@ def run_pbot_backtest(data, strategy_params, risk_params, start_capital=1000, ve
     trades_count = 0
     wins_count = 0
 
-    position = None
-    pending_order = None # {side, atr}
+    position = None       # Position (position_book.py)
+    pending_order = None  # PendingOrder: Signal von Kerze i-1, Entry zum Open von i
+    trade_log = TradeLogRecorder() if record_trades else None
 
     # Risk Parameter
     risk_reward_ratio = float(risk_params.get('risk_reward_ratio', 2.0))
@@ -129,7 +153,7 @@ def run_pbot_backtest(data, strategy_params, risk_params, start_capital=1000, ve
             
             # Slippage-Simulation (gegen uns)
             if use_realistic_fills:
-                if pending_order['side'] == 'buy':
+                if pending_order.side == 'buy':
                     entry_price = raw_entry_price * (1 + base_slippage_pct)  # Buy höher
                 else:
                     entry_price = raw_entry_price * (1 - base_slippage_pct)  # Sell tiefer
@@ -137,8 +161,8 @@ def run_pbot_backtest(data, strategy_params, risk_params, start_capital=1000, ve
                 entry_price = raw_entry_price
 
             # ATR vom Signal-Zeitpunkt (gestern)
-            atr_val = pending_order['atr']
-            signal_side = pending_order['side']
+            atr_val = pending_order.atr
+            signal_side = pending_order.side
 
             sl_dist = max(atr_val * atr_multiplier_sl, entry_price * min_sl_pct)
             
@@ -172,65 +196,39 @@ def run_pbot_backtest(data, strategy_params, risk_params, start_capital=1000, ve
 
                         act_price = entry_price + (sl_dist * act_rr) if signal_side == 'buy' else entry_price - (sl_dist * act_rr)
 
-                        position = {
-                            'side': signal_side, 'entry_price': entry_price,
-                            'stop_loss': sl_price, 'take_profit': tp_price,
-                            'notional': final_notional,
-                            'trailing_active': False, 'activation_price': act_price,
-                            'peak_price': entry_price, 'callback_rate': cb_rate
-                        }
+                        position = Position(
+                            signal_side, entry_price, sl_price, tp_price, act_price, cb_rate,
+                            final_notional, entry_idx=i
+                        )
 
             pending_order = None
 
         # --- B) EXIT (High/Low) ---
         if position:
-            exit_price = None
-
-            # Trailing Logic Update
-            if position['side'] == 'long':
-                if not position['trailing_active'] and current_candle['high'] >= position['activation_price']:
-                    position['trailing_active'] = True
-                if position['trailing_active']:
-                    position['peak_price'] = max(position['peak_price'], current_candle['high'])
-                    new_sl = position['peak_price'] * (1 - position['callback_rate'])
-                    position['stop_loss'] = max(position['stop_loss'], new_sl)
-
-                # Check Hits (Conservative: Check SL first)
-                if current_candle['low'] <= position['stop_loss']:
-                    exit_price = position['stop_loss']
-                elif not position['trailing_active'] and current_candle['high'] >= position['take_profit']:
-                    exit_price = position['take_profit']
-
-            else: # Short
-                if not position['trailing_active'] and current_candle['low'] <= position['activation_price']:
-                    position['trailing_active'] = True
-                if position['trailing_active']:
-                    position['peak_price'] = min(position['peak_price'], current_candle['low'])
-                    new_sl = position['peak_price'] * (1 + position['callback_rate'])
-                    position['stop_loss'] = min(position['stop_loss'], new_sl)
-
-                # Check Hits
-                if current_candle['high'] >= position['stop_loss']:
-                    exit_price = position['stop_loss']
-                elif not position['trailing_active'] and current_candle['low'] <= position['take_profit']:
-                    exit_price = position['take_profit']
+            # Trailing-Update, danach Hit-Check (konservativ: SL zuerst)
+            position.update_trailing(current_candle['high'], current_candle['low'])
+            exit_price, exit_reason = position.check_exit(current_candle['high'], current_candle['low'])
 
             if exit_price:
                 # Slippage auf Exit anwenden (auch gegen uns)
                 if use_realistic_fills:
-                    if position['side'] == 'long':
+                    if position.direction > 0:
                         exit_price = exit_price * (1 - base_slippage_pct)  # Sell tiefer
                     else:
                         exit_price = exit_price * (1 + base_slippage_pct)  # Buy Cover höher
                 
-                pnl_pct = (exit_price / position['entry_price'] - 1) if position['side'] == 'long' else (1 - exit_price / position['entry_price'])
-                pnl_usd = position['notional'] * pnl_pct
-                costs = position['notional'] * fee_pct * 2
+                pnl_usd = position.notional * position.pnl_pct(exit_price)
+                costs = position.notional * fee_pct * 2
 
                 equity += (pnl_usd - costs)
 
                 if (pnl_usd - costs) > 0: wins_count += 1
                 trades_count += 1
+                if trade_log is not None:
+                    trade_log.record(
+                        position.entry_idx, i, position.side, position.entry_price, exit_price,
+                        pnl_usd - costs, (pnl_usd - costs) / position.notional, exit_reason
+                    )
                 position = None
 
                 # Drawdown Check
@@ -241,7 +239,7 @@ def run_pbot_backtest(data, strategy_params, risk_params, start_capital=1000, ve
         # --- C) SIGNAL (Close) ---
         if not position and not pending_order:
             # Engine Logic
-            score = engine.get_score(current_candle, None)
+            score, _ = engine.get_score(current_candle, None)
 
             is_choppy = False
             if engine.use_adx:
@@ -258,18 +256,18 @@ def run_pbot_backtest(data, strategy_params, risk_params, start_capital=1000, ve
             signal_side, _ = get_pbot_signal(analysis_result, {'strategy': strategy_params})
 
             if signal_side:
-                pending_order = {
-                    'side': signal_side,
-                    'atr': analysis_result['atr']
-                }
+                pending_order = PendingOrder(signal_side, analysis_result['atr'])
 
     final_pnl = ((equity - start_capital) / start_capital) * 100 if start_capital > 0 else 0
     win_rate = (wins_count / trades_count * 100) if trades_count > 0 else 0
 
-    return {
+    result = {
         "total_pnl_pct": final_pnl,
         "trades_count": trades_count,
         "win_rate": win_rate,
         "max_drawdown_pct": max_drawdown_pct,
         "end_capital": equity
     }
+    if trade_log is not None:
+        result['trade_log'] = trade_log.to_array()
+    return result
@@ -0,0 +1,216 @@
+# src/pbot/analysis/chart_builder.py
+"""
+Chart-Builder für interaktive Plotly-Charts
+
+- Trade-Marker: ein Trace pro Marker-Klasse (Entry, Exit Gewinn/Verlust,
+  Verbindungslinien als NaN-getrennte Segmente) statt drei Traces pro Trade;
+  akzeptiert Trade-Dicts oder direkt das Trade-Log des Backtesters
+- Downsampling bei mehr Kerzen als max_points:
+  Kerzen werden zu OHLC-Buckets zusammengefasst (High/Low bleiben erhalten),
+  Linien (EMAs) per LTTB reduziert, Bollinger-Bänder als Min/Max-Hülle
+  auf den Kerzen-Buckets (damit die Füllung zwischen den Bändern passt)
+"""
+import numpy as np
+import pandas as pd
+
+from pbot.utils.lazy_import import lazy_module
+
+go = lazy_module('plotly.graph_objects')
+
+DEFAULT_MAX_POINTS = 2000  # Punkt-Budget pro Trace
+
+LINE_STYLES = {
+    'ema_20': dict(name='EMA 20', line=dict(color='orange', width=1.5)),
+    'ema_50': dict(name='EMA 50', line=dict(color='blue', width=1.5)),
+    'ema_200': dict(name='EMA 200', line=dict(color='red', width=2)),
+}
+
+
+def _bucket_starts(n, n_buckets):
+    """Startpositionen von n_buckets gleich großen, zusammenhängenden Buckets über n Zeilen"""
+    return np.unique(np.linspace(0, n, n_buckets + 1, dtype=np.int64)[:-1])
+
+
+def resample_ohlc(df, max_points):
+    """
+    Fasst Kerzen zu höchstens max_points OHLC-Buckets zusammen
+
+    Open = erste, Close = letzte Kerze des Buckets, High/Low = Extremwerte;
+    Zeitstempel ist der Beginn des Buckets. Weitere Spalten werden nicht übernommen.
+    """
+    if max_points is None or len(df) <= max_points:
+        return df[['open', 'high', 'low', 'close']]
+
+    starts = _bucket_starts(len(df), max_points)
+    ends = np.append(starts[1:], len(df)) - 1
+    return pd.DataFrame({
+        'open': df['open'].to_numpy()[starts],
+        'high': np.maximum.reduceat(df['high'].to_numpy(), starts),
+        'low': np.minimum.reduceat(df['low'].to_numpy(), starts),
+        'close': df['close'].to_numpy()[ends],
+    }, index=df.index[starts])
+
+
+def resample_band(df, column, max_points, reducer):
+    """Reduziert eine Band-Linie auf die Kerzen-Buckets (np.maximum für oben, np.minimum für unten)"""
+    if max_points is None or len(df) <= max_points:
+        return df[column]
+
+    starts = _bucket_starts(len(df), max_points)
+    values = df[column].to_numpy(dtype=float)
+    # NaN am Anfang (Indikator-Warmup) darf den Bucket nicht komplett auslöschen
+    fill = -np.inf if reducer is np.maximum else np.inf
+    reduced = reducer.reduceat(np.where(np.isnan(values), fill, values), starts)
+    reduced[np.isinf(reduced)] = np.nan
+    return pd.Series(reduced, index=df.index[starts], name=column)
+
+
+def lttb_indices(x, y, n_out):
+    """
+    Largest-Triangle-Three-Buckets: Indizes der n_out Punkte, die die Form
+    der Linie am besten erhalten (erster und letzter Punkt bleiben immer)
+    """
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    # Innere Punkte auf n_out - 2 Buckets verteilen
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    selected = np.empty(n_out, dtype=np.int64)
+    selected[0] = 0
+    selected[-1] = n - 1
+
+    a = 0
+    for i in range(n_out - 2):
+        lo, hi = edges[i], edges[i + 1]
+        # Durchschnittspunkt des nächsten Buckets (beim letzten: der Endpunkt)
+        if i + 2 < len(edges):
+            nxt_lo, nxt_hi = edges[i + 1], edges[i + 2]
+            avg_x = x[nxt_lo:nxt_hi].mean()
+            avg_y = y[nxt_lo:nxt_hi].mean()
+        else:
+            avg_x, avg_y = x[-1], y[-1]
+
+        area = np.abs(
+            (x[a] - avg_x) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (avg_y - y[a])
+        )
+        a = lo + int(np.argmax(area))
+        selected[i + 1] = a
+
+    return selected
+
+
+def downsample_line(series, max_points):
+    """Reduziert eine Indikator-Linie per LTTB (NaN-Werte werden vorher entfernt)"""
+    series = series.dropna()
+    if max_points is None or len(series) <= max_points:
+        return series
+    x = series.index.asi8 if isinstance(series.index, pd.DatetimeIndex) else np.arange(len(series))
+    return series.iloc[lttb_indices(x, series.to_numpy(), max_points)]
+
+
+def trade_columns(trades, index):
+    """Entry-/Exit-Zeiten, Preise und PnL als Arrays aus Trade-Dicts oder einem Trade-Log"""
+    if isinstance(trades, np.ndarray):
+        # Structured Array aus run_pbot_backtest(record_trades=True): Zeiten über den Kerzen-Index
+        return (np.asarray(index[trades['entry_idx']], dtype=object), trades['entry_price'],
+                np.asarray(index[trades['exit_idx']], dtype=object), trades['exit_price'], trades['pnl'])
+
+    columns = ('entry_time', 'entry_price', 'exit_time', 'exit_price', 'profit')
+    entry_x, entry_y, exit_x, exit_y, profit = ([t[c] for t in trades] for c in columns)
+    return (np.asarray(entry_x, dtype=object), np.asarray(entry_y, dtype=float),
+            np.asarray(exit_x, dtype=object), np.asarray(exit_y, dtype=float), np.asarray(profit, dtype=float))
+
+
+def build_trade_traces(trades, index=None):
+    """
+    Trade-Marker als wenige Sammel-Traces
+
+    Args:
+        trades: Liste von Dicts mit entry_time, entry_price, exit_time, exit_price, profit
+                oder Trade-Log (Structured Array, siehe trade_log.py)
+        index: Kerzen-Index zum Trade-Log (nur für Structured Arrays nötig)
+
+    Returns:
+        Liste von go.Scatter (höchstens 5, unabhängig von der Anzahl Trades)
+    """
+    if trades is None or len(trades) == 0:
+        return []
+
+    entry_x, entry_y, exit_x, exit_y, profit = trade_columns(trades, index)
+    traces = [go.Scatter(
+        x=entry_x, y=entry_y, mode='markers', name='Entry',
+        marker=dict(size=10, color='green', symbol='triangle-up'),
+        hovertemplate='Entry %{y:.2f}<extra></extra>', showlegend=False
+    )]
+
+    for label, color, mask in (('Gewinn', 'green', profit > 0), ('Verlust', 'red', profit <= 0)):
+        if not mask.any():
+            continue
+
+        traces.append(go.Scatter(
+            x=exit_x[mask], y=exit_y[mask], mode='markers', name=f'Exit ({label})',
+            marker=dict(size=10, color=color, symbol='triangle-down'),
+            customdata=profit[mask],
+            hovertemplate='Exit %{y:.2f} (PnL %{customdata:.2f})<extra></extra>', showlegend=False
+        ))
+
+        # Verbindungslinien: Entry, Exit, None je Trade -> ein Trace mit unterbrochenen Segmenten
+        n = int(mask.sum())
+        seg_x = np.full(3 * n, None, dtype=object)
+        seg_y = np.full(3 * n, np.nan)
+        seg_x[0::3], seg_x[1::3] = entry_x[mask], exit_x[mask]
+        seg_y[0::3], seg_y[1::3] = entry_y[mask], exit_y[mask]
+        traces.append(go.Scatter(
+            x=seg_x, y=seg_y, mode='lines', connectgaps=False,
+            line=dict(color=color, width=1, dash='dash'), hoverinfo='skip', showlegend=False
+        ))
+
+    return traces
+
+
+def build_price_chart(df, trades, title, max_points=DEFAULT_MAX_POINTS, trade_index=None):
+    """
+    Erstellt den Candlestick-Chart mit EMAs, Bollinger-Bändern und Trades
+
+    Args:
+        df: OHLCV-DataFrame mit Indikator-Spalten (ema_*, bb_upper, bb_lower)
+        trades: Trade-Dicts oder Trade-Log (siehe build_trade_traces)
+        title: Chart-Titel
+        max_points: Punkt-Budget pro Trace (None = kein Downsampling)
+        trade_index: Kerzen-Index, auf den sich das Trade-Log bezieht (Standard: df.index)
+    """
+    fig = go.Figure()
+
+    candles = resample_ohlc(df, max_points)
+    fig.add_trace(go.Candlestick(
+        x=candles.index, open=candles['open'], high=candles['high'],
+        low=candles['low'], close=candles['close'], name='OHLC', showlegend=True
+    ))
+
+    for column, style in LINE_STYLES.items():
+        if column in df:
+            line = downsample_line(df[column], max_points)
+            fig.add_trace(go.Scatter(x=line.index, y=line.to_numpy(), **style))
+
+    if 'bb_upper' in df and 'bb_lower' in df:
+        upper = resample_band(df, 'bb_upper', max_points, np.maximum)
+        lower = resample_band(df, 'bb_lower', max_points, np.minimum)
+        fig.add_trace(go.Scatter(
+            x=upper.index, y=upper.to_numpy(), name='BB Upper',
+            line=dict(color='green', width=1, dash='dash')
+        ))
+        fig.add_trace(go.Scatter(
+            x=lower.index, y=lower.to_numpy(), name='BB Lower',
+            line=dict(color='green', width=1, dash='dash'),
+            fill='tonexty', fillcolor='rgba(0,255,0,0.1)'
+        ))
+
+    fig.add_traces(build_trade_traces(trades, df.index if trade_index is None else trade_index))
+
+    fig.update_layout(title=title, height=800, hovermode='x unified', template='plotly_dark')
+    fig.update_yaxes(title_text="Price")
+    fig.update_xaxes(title_text="Time")
+    return fig
@@ -0,0 +1,75 @@
+# src/pbot/analysis/equity_curve.py
+"""
+Equity-Kurve des Portfolio-Simulators als vorab allozierte Arrays
+
+Pro Kerze werden Equity, Hochstand und Drawdown direkt in float64-Arrays
+geschrieben (Länge = Anzahl Zeitstempel) statt ein Dict pro Kerze anzuhängen
+und Peak/Drawdown danach mit pandas nachzurechnen. Der DataFrame entsteht
+erst, wenn jemand result['equity_curve'] liest (SimulationResult).
+"""
+import numpy as np
+import pandas as pd
+
+
+class EquityCurveRecorder:
+    """Schreibt Equity/Peak/Drawdown pro Kerze in vorab allozierte Arrays"""
+
+    __slots__ = ('timestamps', 'equity', 'peak', 'drawdown', 'length', '_peak')
+
+    def __init__(self, timestamps):
+        size = len(timestamps)
+        self.timestamps = timestamps
+        self.equity = np.empty(size, dtype=np.float64)
+        self.peak = np.empty(size, dtype=np.float64)
+        self.drawdown = np.empty(size, dtype=np.float64)
+        self.length = 0
+        self._peak = None
+
+    def record(self, value):
+        """Equity der nächsten Kerze (Reihenfolge wie timestamps)"""
+        i = self.length
+        peak = self._peak = value if self._peak is None or value > self._peak else self._peak
+        self.equity[i] = value
+        self.peak[i] = peak
+        # wie zuvor: Peak 0 -> Drawdown 0 statt Division durch 0
+        self.drawdown[i] = (peak - value) / peak if peak != 0 else 0.0
+        self.length = i + 1
+
+    def to_frame(self):
+        """DataFrame mit timestamp, equity, peak, drawdown_pct (Index = timestamp)"""
+        n = self.length
+        if n == 0:
+            return pd.DataFrame()
+        timestamps = pd.DatetimeIndex(self.timestamps[:n], name='timestamp')
+        return pd.DataFrame({
+            'timestamp': timestamps, 'equity': self.equity[:n].copy(),
+            'peak': self.peak[:n].copy(), 'drawdown_pct': self.drawdown[:n].copy(),
+        }, index=timestamps)
+
+
+class SimulationResult(dict):
+    """
+    Ergebnis-Dict des Portfolio-Simulators
+
+    'equity_curve' wird beim ersten Zugriff aus dem Recorder gebaut und dann
+    im Dict behalten; ohne Recorder (record_equity_curve=False) ist der Wert None.
+    """
+
+    def __init__(self, values, curve=None):
+        super().__init__(values)
+        self.curve = curve
+        if curve is None:
+            self['equity_curve'] = None
+
+    def __missing__(self, key):
+        if key != 'equity_curve':
+            raise KeyError(key)
+        df = self.curve.to_frame()
+        self['equity_curve'] = df
+        return df
+
+    def __contains__(self, key):
+        return key == 'equity_curve' or super().__contains__(key)
+
+    def get(self, key, default=None):
+        return self[key] if key in self else default
@@ -13,12 +13,20 @@ import logging
 
 import pandas as pd
 import numpy as np
-import plotly.graph_objects as go
-import ta
 
 PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', '..'))
 sys.path.append(os.path.join(PROJECT_ROOT, 'src'))
 
+from pbot.utils.lazy_import import lazy_module
+
+from pbot.analysis.backtester import run_pbot_backtest
+from pbot.analysis.chart_builder import build_price_chart, DEFAULT_MAX_POINTS
+from pbot.analysis.static_charts import render_candlestick_snapshot
+
+ta = lazy_module('ta')
+
+START_CAPITAL = 1000  # nur für die Trade-Simulation im Chart
+
 def setup_logging():
     logger = logging.getLogger('interactive_status')
     if not logger.handlers:
@@ -119,115 +127,66 @@ def add_smc_ema_indicators(df):
     
     return df
 
-def create_interactive_chart(symbol, timeframe, df, trades, start_date, end_date, window=None):
-    """Erstellt interaktiven Chart mit SMC+EMA Indikatoren und Trades"""
-    
+def simulate_trades(config, df, start_capital=START_CAPITAL):
+    """Backtest der Config auf den geladenen Kerzen; Trade-Log (Indizes beziehen sich auf die Zeilen von df)"""
+    strategy_params = dict(config.get('strategy', {}))
+    strategy_params['symbol'] = config['market']['symbol']
+    strategy_params['timeframe'] = config['market']['timeframe']
+    strategy_params['htf'] = config['market'].get('htf')
+    result = run_pbot_backtest(df.copy(), strategy_params, config.get('risk', {}), start_capital, record_trades=True)
+    return result['trade_log']
+
+def select_window(df, trades, start_date=None, end_date=None, window=None):
+    """
+    Kerzen und Trades im gewählten Zeitraum
+
+    Behalten werden nur Trades, deren Entry und Exit in den gefilterten Kerzen
+    liegen; die Indizes eines Trade-Logs beziehen sich danach auf die
+    gefilterten Kerzen.
+    """
+    full_index = df.index
+
     # Filter auf Fenster
     if window:
         cutoff_date = datetime.now(timezone.utc) - timedelta(days=window)
         df = df[df.index >= cutoff_date].copy()
-    
+
     # Filter auf Start/End Datum
     if start_date:
         df = df[df.index >= pd.to_datetime(start_date, utc=True)]
     if end_date:
         df = df[df.index <= pd.to_datetime(end_date, utc=True)]
-    
-    fig = go.Figure()
-    
-    # Candlestick
-    fig.add_trace(
-        go.Candlestick(
-            x=df.index,
-            open=df['open'],
-            high=df['high'],
-            low=df['low'],
-            close=df['close'],
-            name='OHLC',
-            showlegend=True
-        )
-    )
-    
-    # EMAs
-    fig.add_trace(
-        go.Scatter(x=df.index, y=df['ema_20'], name='EMA 20', line=dict(color='orange', width=1.5))
-    )
-    fig.add_trace(
-        go.Scatter(x=df.index, y=df['ema_50'], name='EMA 50', line=dict(color='blue', width=1.5))
-    )
-    fig.add_trace(
-        go.Scatter(x=df.index, y=df['ema_200'], name='EMA 200', line=dict(color='red', width=2))
-    )
-    
-    # Bollinger Bands
-    fig.add_trace(
-        go.Scatter(x=df.index, y=df['bb_upper'], 
-                   name='BB Upper', line=dict(color='green', width=1, dash='dash'))
-    )
-    fig.add_trace(
-        go.Scatter(x=df.index, y=df['bb_lower'], 
-                   name='BB Lower', line=dict(color='green', width=1, dash='dash'),
-                   fill='tonexty', fillcolor='rgba(0,255,0,0.1)')
-    )
-    
-    # Trade Marker
-    for trade in trades:
-        entry_time = trade['entry_time']
-        entry_price = trade['entry_price']
-        exit_time = trade['exit_time']
-        exit_price = trade['exit_price']
-        profit = trade['profit']
-        
-        color = 'green' if profit > 0 else 'red'
-        
-        # Entry
-        fig.add_trace(
-            go.Scatter(
-                x=[entry_time],
-                y=[entry_price],
-                mode='markers',
-                marker=dict(size=10, color='green', symbol='triangle-up'),
-                name=f'Entry ({entry_price:.2f})',
-                showlegend=False
-            )
-        )
-        
-        # Exit
-        fig.add_trace(
-            go.Scatter(
-                x=[exit_time],
-                y=[exit_price],
-                mode='markers',
-                marker=dict(size=10, color=color, symbol='triangle-down'),
-                name=f'Exit ({exit_price:.2f})',
-                showlegend=False
-            )
-        )
-        
-        # Verbindungslinie
-        fig.add_trace(
-            go.Scatter(
-                x=[entry_time, exit_time],
-                y=[entry_price, exit_price],
-                mode='lines',
-                line=dict(color=color, width=1, dash='dash'),
-                showlegend=False
-            )
-        )
-    
+
+    if trades is None or len(trades) == 0:
+        return df, trades
+    if isinstance(trades, np.ndarray):
+        if df.empty:
+            return df, trades[:0]
+        # Filter ergeben einen zusammenhängenden Ausschnitt: Zeilen first..last der ungefilterten Kerzen
+        first = full_index.get_loc(df.index[0])
+        last = first + len(df) - 1
+        kept = trades[(trades['entry_idx'] >= first) & (trades['exit_idx'] <= last)].copy()
+        kept['entry_idx'] -= first
+        kept['exit_idx'] -= first
+        return df, kept
+    if df.empty:
+        return df, []
+    return df, [t for t in trades if t['entry_time'] >= df.index[0] and t['exit_time'] <= df.index[-1]]
+
+def create_interactive_chart(symbol, timeframe, df, trades, start_date, end_date, window=None, max_points=DEFAULT_MAX_POINTS):
+    """
+    Erstellt interaktiven Chart mit SMC+EMA Indikatoren und Trades
+
+    trades: Trade-Dicts oder Trade-Log aus run_pbot_backtest(record_trades=True),
+    bezogen auf die ungefilterten Kerzen (siehe select_window).
+    max_points begrenzt die Punkte pro Trace (Downsampling bei langen Zeiträumen),
+    None zeigt alle Kerzen.
+    """
+    df, trades = select_window(df, trades, start_date, end_date, window)
+
     bot_display = BOT_NAME.upper()
     title = f"{symbol} {timeframe} - {bot_display} (SMC+EMA Strategy)"
-    fig.update_layout(
-        title=title,
-        height=800,
-        hovermode='x unified',
-        template='plotly_dark'
-    )
-    
-    fig.update_yaxes(title_text="Price")
-    fig.update_xaxes(title_text="Time")
-    
-    return fig
+    return build_price_chart(df, trades, title, max_points=max_points)
 
 def main():
     # Wähle Konfigurationsdateien
@@ -243,6 +202,7 @@ def main():
     window_input = input("Letzten N Tage anzeigen [leer=alle]: ").strip()
     window = int(window_input) if window_input.isdigit() else None
     send_telegram = input("Telegram versenden? (j/n) [Standard: n]: ").strip().lower() in ['j', 'y', 'yes']
+    send_as_image = send_telegram and input("Als Bild (PNG) statt HTML senden? (j/n) [Standard: n]: ").strip().lower() in ['j', 'y', 'yes']
     
     try:
         with open(os.path.join(PROJECT_ROOT, 'secret.json'), 'r') as f:
@@ -279,8 +239,13 @@ def main():
                 logger.warning(f"Keine Daten für {symbol} {timeframe}")
                 continue
             
+            logger.info("Simuliere Trades...")
+            trade_log = simulate_trades(config, df)
+            logger.info(f"{len(trade_log)} Trades simuliert")
+
             logger.info("Berechne Indikatoren...")
             df = add_smc_ema_indicators(df)
+            df, trade_log = select_window(df, trade_log, start_date, end_date, window)
             
             # Erstelle Chart
             logger.info("Erstelle Chart...")
@@ -288,10 +253,9 @@ def main():
                 symbol,
                 timeframe,
                 df,
-                [],  # Keine Trades für diese vereinachte Version
-                start_date,
-                end_date,
-                window
+                trade_log,
+                None,
+                None
             )
             
             # Speichere HTML
@@ -304,12 +268,15 @@ def main():
             if send_telegram and telegram_config:
                 try:
                     logger.info(f"Sende Chart via Telegram...")
-                    telegram_module = __import__(f'{BOT_NAME}.utils.telegram', fromlist=['send_document'])
-                    send_document = telegram_module.send_document
+                    telegram_module = __import__(f'{BOT_NAME}.utils.telegram', fromlist=['send_document', 'send_photo'])
                     bot_token = telegram_config.get('bot_token')
                     chat_id = telegram_config.get('chat_id')
-                    if bot_token and chat_id:
-                        send_document(bot_token, chat_id, output_file, caption=f"Chart: {symbol} {timeframe}")
+                    caption = f"Chart: {symbol} {timeframe}"
+                    if bot_token and chat_id and send_as_image:
+                        image_file = render_candlestick_snapshot(df, caption, trades=trade_log)
+                        telegram_module.send_photo(bot_token, chat_id, image_file, caption=caption)
+                    elif bot_token and chat_id:
+                        telegram_module.send_document(bot_token, chat_id, output_file, caption=caption)
                 except Exception as e:
                     logger.warning(f"Konnte Chart nicht via Telegram versenden: {e}")
         
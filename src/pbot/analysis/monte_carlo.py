@@ -0,0 +1,128 @@
+# src/pbot/analysis/monte_carlo.py
+"""
+Monte-Carlo-Robustheit über die Trade-Sequenz eines Backtests
+
+Aus dem Trade-Log (siehe trade_log.py) werden die Renditen pro Trade
+bezogen auf die Equity vor dem Trade berechnet. Daraus entstehen viele
+alternative Equity-Pfade:
+- 'bootstrap': Trades mit Zurücklegen ziehen (andere Trade-Mischung)
+- 'shuffle':   dieselben Trades in zufälliger Reihenfolge (Endkapital
+               bleibt gleich, nur der Drawdown-Verlauf ändert sich)
+
+Alle Pfade eines Blocks werden als 2-D-Array (Pfade x Trades) gerechnet,
+ohne Python-Schleife pro Pfad. Große Läufe können auf Prozesse verteilt
+werden; jeder Worker bekommt einen eigenen Zufallsstrom aus einer
+SeedSequence (gleicher Seed + gleiche Worker-Anzahl = gleiches Ergebnis).
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+METHODS = ('bootstrap', 'shuffle')
+DEFAULT_PERCENTILES = (5, 50, 95)
+BLOCK_ELEMENTS = 4_000_000  # max. Pfade x Trades pro Block (~32 MB float64)
+
+
+def trade_returns(trade_log, start_capital):
+    """Rendite jedes Trades relativ zur Equity unmittelbar vor dem Trade"""
+    pnl = np.asarray(trade_log['pnl'] if trade_log.dtype.names else trade_log, dtype=float)
+    equity_before = start_capital + np.concatenate(([0.0], np.cumsum(pnl)[:-1]))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        returns = np.where(equity_before > 0, pnl / equity_before, -1.0)
+    return np.maximum(returns, -1.0)  # mehr als Totalverlust geht nicht
+
+
+def simulate_paths(returns, n_paths, method='bootstrap', rng=None):
+    """
+    Simuliert n_paths Pfade und liefert (Endkapital-Faktor, max. Drawdown) pro Pfad
+
+    Args:
+        returns: 1-D Array der Trade-Renditen
+        n_paths: Anzahl Pfade
+        method: 'bootstrap' oder 'shuffle'
+        rng: np.random.Generator
+
+    Returns:
+        (final_factor, max_drawdown) als 1-D Arrays der Länge n_paths
+    """
+    if method not in METHODS:
+        raise ValueError(f"Unbekannte Methode: {method}")
+    rng = rng or np.random.default_rng()
+    returns = np.asarray(returns, dtype=float)
+    n_trades = len(returns)
+    if n_trades == 0:
+        return np.ones(n_paths), np.zeros(n_paths)
+
+    final = np.empty(n_paths)
+    max_dd = np.empty(n_paths)
+    block = max(1, BLOCK_ELEMENTS // n_trades)
+    log_returns = np.log1p(np.maximum(returns, -1.0 + 1e-12))
+
+    for start in range(0, n_paths, block):
+        rows = min(block, n_paths - start)
+        if method == 'bootstrap':
+            sample = log_returns[rng.integers(0, n_trades, size=(rows, n_trades))]
+        else:
+            sample = rng.permuted(np.broadcast_to(log_returns, (rows, n_trades)), axis=1)
+
+        # Log-Equity je Pfad; Startpunkt 0 (= Startkapital) gehört zur Peak-Berechnung
+        log_equity = np.cumsum(sample, axis=1)
+        peak = np.maximum(np.maximum.accumulate(log_equity, axis=1), 0.0)
+        drawdown = -np.expm1(log_equity - peak)  # 1 - equity / peak
+
+        final[start:start + rows] = np.exp(log_equity[:, -1])
+        max_dd[start:start + rows] = drawdown.max(axis=1)
+
+    return final, max_dd
+
+
+def _simulate_shard(args):
+    returns, n_paths, method, seed = args
+    return simulate_paths(returns, n_paths, method, np.random.default_rng(seed))
+
+
+def run_monte_carlo(trade_log, start_capital, n_paths=10_000, method='bootstrap', seed=None,
+                    workers=1, percentiles=DEFAULT_PERCENTILES, max_drawdown_limit=None):
+    """
+    Monte-Carlo-Auswertung eines Trade-Logs
+
+    Args:
+        trade_log: Structured Array aus run_pbot_backtest(record_trades=True)
+                   oder 1-D Array der Trade-PnLs (USDT)
+        start_capital: Startkapital des Backtests
+        n_paths: Anzahl simulierter Pfade
+        method: 'bootstrap' oder 'shuffle'
+        seed: Seed für reproduzierbare Ergebnisse
+        workers: Anzahl Prozesse (1 = im aktuellen Prozess, -1 = alle Kerne)
+        percentiles: gewünschte Perzentile
+        max_drawdown_limit: optionale DD-Schwelle (Anteil) für 'prob_drawdown_exceeds'
+
+    Returns:
+        Dict mit final_equity_p*, max_drawdown_p*, prob_loss, paths, trades
+        (und prob_drawdown_exceeds, falls max_drawdown_limit gesetzt)
+    """
+    returns = trade_returns(trade_log, start_capital)
+    seed_seq = np.random.SeedSequence(seed)
+
+    workers = max(1, workers if workers > 0 else (os.cpu_count() or 1))
+    if workers == 1:
+        final, max_dd = simulate_paths(returns, n_paths, method, np.random.default_rng(seed_seq))
+    else:
+        shares = np.full(workers, n_paths // workers)
+        shares[:n_paths % workers] += 1
+        shards = [(returns, int(n), method, child) for n, child in zip(shares, seed_seq.spawn(workers)) if n > 0]
+        with ProcessPoolExecutor(max_workers=len(shards)) as pool:
+            parts = list(pool.map(_simulate_shard, shards))
+        final = np.concatenate([p[0] for p in parts])
+        max_dd = np.concatenate([p[1] for p in parts])
+
+    final_equity = final * start_capital
+    summary = {'paths': n_paths, 'trades': len(returns), 'method': method,
+               'prob_loss': float(np.mean(final_equity < start_capital))}
+    for p, fe, dd in zip(percentiles, np.percentile(final_equity, percentiles), np.percentile(max_dd, percentiles)):
+        summary[f'final_equity_p{p}'] = float(fe)
+        summary[f'max_drawdown_p{p}'] = float(dd)
+    if max_drawdown_limit is not None:
+        summary['prob_drawdown_exceeds'] = float(np.mean(max_dd > max_drawdown_limit))
+    return summary
@@ -2,23 +2,22 @@
 import os
 import sys
 import json
-import optuna
 import argparse
-import logging
 import warnings
 
-os.environ['TF_CPP_MIN_LOG_LEVEL'] = '2'
-logging.getLogger('tensorflow').setLevel(logging.ERROR)
 warnings.filterwarnings('ignore')
 
 PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', '..'))
 sys.path.append(os.path.join(PROJECT_ROOT, 'src'))
 
 from pbot.analysis.backtester import load_data, run_pbot_backtest
+from pbot.analysis.monte_carlo import run_monte_carlo
+from pbot.analysis import pareto
+from pbot.analysis.optuna_storage import STORAGE_BACKENDS, create_storage
 from pbot.utils.timeframe_utils import determine_htf
+from pbot.utils.lazy_import import lazy_module
 
-# Verbosity auf INFO setzen, falls du auch Textausgaben willst (sonst WARNING lassen)
-optuna.logging.set_verbosity(optuna.logging.WARNING)
+optuna = lazy_module('optuna')
 
 HISTORICAL_DATA = None
 CURRENT_SYMBOL = None
@@ -27,10 +26,21 @@ CURRENT_HTF = None
 CONFIG_SUFFIX = ""
 START_CAPITAL = 1000
 
+# Monte-Carlo-Nachfilter (0 Pfade = aus)
+MC_PATHS = 0
+MC_PERCENTILE = 95
+MC_MAX_DRAWDOWN = 0.30
+
+# Constraints im Pareto-Modus (statt Pruning)
+MAX_DRAWDOWN = 0.30
+MIN_TRADES = 15
+
+STRATEGY_KEYS = ['length', 'rsi_weight', 'wick_weight', 'use_adx_filter', 'adx_threshold', 'use_mtf', 'min_score']
+
 def create_safe_filename(symbol, timeframe):
     return f"{symbol.replace('/', '').replace(':', '')}_{timeframe}"
 
-def objective(trial):
+def suggest_params(trial):
     # --- PBot Parameter-Raum ---
     strategy_params = {
         # Strategie-Werte (Predictor Logik)
@@ -66,9 +76,14 @@ def objective(trial):
         'trailing_stop_activation_rr': trial.suggest_float('trailing_stop_activation_rr', 1.0, 3.0),
         'trailing_stop_callback_rate_pct': trial.suggest_float('trailing_stop_callback_rate_pct', 0.5, 3.0)
     }
+    return strategy_params, risk_params
 
-    # Simulation starten
-    result = run_pbot_backtest(HISTORICAL_DATA.copy(), strategy_params, risk_params, START_CAPITAL)
+def objective(trial):
+    strategy_params, risk_params = suggest_params(trial)
+
+    # Simulation starten (ohne Ergebnis-Cache: jeder Trial hat neue Parameter, Treffer gibt es praktisch nie)
+    result = run_pbot_backtest(HISTORICAL_DATA.copy(), strategy_params, risk_params, START_CAPITAL,
+                               record_trades=MC_PATHS > 0, use_cache=False)
 
     pnl = result.get('total_pnl_pct', -1000)
     drawdown = result.get('max_drawdown_pct', 1.0)
@@ -84,10 +99,83 @@ def objective(trial):
     if win_rate < 40:
         raise optuna.exceptions.TrialPruned()
 
+    # Robustheits-Check: Drawdown über viele umgemischte Trade-Folgen (nur für Kandidaten)
+    if MC_PATHS > 0:
+        mc = run_monte_carlo(result['trade_log'], START_CAPITAL, n_paths=MC_PATHS, seed=trial.number,
+                             percentiles=sorted({5, 50, MC_PERCENTILE}))
+        trial.set_user_attr('monte_carlo', mc)
+        if mc[f'max_drawdown_p{MC_PERCENTILE}'] > MC_MAX_DRAWDOWN:
+            raise optuna.exceptions.TrialPruned()
+
     return pnl
 
+def objective_pareto(trial):
+    """Mehrziel-Variante: (PnL %, Max DD, Sharpe); Grenzen als Constraints statt Pruning"""
+    strategy_params, risk_params = suggest_params(trial)
+    result = run_pbot_backtest(HISTORICAL_DATA.copy(), strategy_params, risk_params, START_CAPITAL,
+                               record_trades=True, use_cache=False)
+
+    pnl = result.get('total_pnl_pct', -1000)
+    drawdown = result.get('max_drawdown_pct', 1.0)
+    trades = result.get('trades_count', 0)
+    sharpe = pareto.trade_sharpe(result['trade_log'], START_CAPITAL)
+
+    # Constraint-Werte <= 0 = erfüllt
+    constraints = [drawdown - MAX_DRAWDOWN, MIN_TRADES - trades]
+    if MC_PATHS > 0 and trades >= MIN_TRADES and drawdown <= MAX_DRAWDOWN:
+        mc = run_monte_carlo(result['trade_log'], START_CAPITAL, n_paths=MC_PATHS, seed=trial.number,
+                             percentiles=sorted({5, 50, MC_PERCENTILE}))
+        trial.set_user_attr('monte_carlo', mc)
+        constraints.append(mc[f'max_drawdown_p{MC_PERCENTILE}'] - MC_MAX_DRAWDOWN)
+
+    trial.set_user_attr('constraints', constraints)
+    trial.set_user_attr('trades_count', trades)
+    trial.set_user_attr('win_rate', result.get('win_rate', 0))
+    return pnl, drawdown, sharpe
+
+def save_config(best_params):
+    config_dir = os.path.join(PROJECT_ROOT, 'src', 'pbot', 'strategy', 'configs')
+    os.makedirs(config_dir, exist_ok=True)
+
+    config = {
+        "market": {"symbol": CURRENT_SYMBOL, "timeframe": CURRENT_TIMEFRAME, "htf": CURRENT_HTF},
+        "strategy": {k: v for k, v in best_params.items() if k in STRATEGY_KEYS},
+        "risk": {k: v for k, v in best_params.items() if k not in STRATEGY_KEYS},
+        "behavior": {"use_longs": True, "use_shorts": True}
+    }
+    config['risk']['margin_mode'] = 'isolated'
+
+    fname = f"config_{create_safe_filename(CURRENT_SYMBOL, CURRENT_TIMEFRAME)}{CONFIG_SUFFIX}.json"
+    # Atomar ersetzen: laufende Bots (ConfigService) sehen nie eine halb geschriebene Datei
+    tmp_path = os.path.join(config_dir, f".{fname}.tmp")
+    with open(tmp_path, 'w') as f:
+        json.dump(config, f, indent=4)
+    os.replace(tmp_path, os.path.join(config_dir, fname))
+    print(f"💾 Config gespeichert: {fname}")
+
+def select_from_front(path, pick):
+    """Übernimmt einen Punkt der gespeicherten Pareto-Front als Config"""
+    if not os.path.exists(path):
+        print(f"❌ Keine Pareto-Front gefunden: {path}")
+        return False
+    front = pareto.load_front(path)['front']
+    if not front:
+        print("⚠️ Pareto-Front ist leer (kein Trial hat die Constraints erfüllt).")
+        return False
+    try:
+        point = pareto.pick_from_front(front, pick)
+    except ValueError as e:
+        print(f"❌ {e}")
+        return False
+
+    print(f"🎯 Auswahl '{pick}': Trial {point['trial']} | PnL {point['total_pnl_pct']:.2f}% | "
+          f"Max DD {point['max_drawdown_pct']*100:.2f}% | Sharpe {point['sharpe']:.2f}")
+    save_config(point['params'])
+    return True
+
 def main():
     global HISTORICAL_DATA, CURRENT_SYMBOL, CURRENT_TIMEFRAME, CURRENT_HTF, CONFIG_SUFFIX, START_CAPITAL
+    global MC_PATHS, MC_PERCENTILE, MC_MAX_DRAWDOWN, MAX_DRAWDOWN
     parser = argparse.ArgumentParser()
     parser.add_argument('--symbols', required=True)
     parser.add_argument('--timeframes', required=True)
@@ -101,12 +189,31 @@ def main():
     parser.add_argument('--max_drawdown', default=30, type=float)
     parser.add_argument('--min_win_rate', default=0, type=float)
     parser.add_argument('--min_pnl', default=0, type=float)
-    parser.add_argument('--mode', default='strict', type=str)
+    parser.add_argument('--mode', default='strict', type=str, help="strict, best_profit oder pareto (Mehrziel)")
     parser.add_argument('--config_suffix', type=str, default="")
 
+    # Monte-Carlo-Nachfilter: Bootstrap der Trades, DD-Perzentil muss unter --max_drawdown bleiben
+    parser.add_argument('--mc_paths', default=0, type=int, help="Pfade pro Kandidat (0 = aus)")
+    parser.add_argument('--mc_percentile', default=95, type=int)
+
+    # Optuna-Storage: sqlite (eine Datei), journal (viele Worker) oder per_study (eine Datei pro Studie)
+    parser.add_argument('--storage', default='sqlite', choices=STORAGE_BACKENDS)
+
+    # Pareto-Modus: Punkt der Front als Config übernehmen
+    parser.add_argument('--pareto_pick', default='balanced', type=str,
+                        help=f"{', '.join(pareto.PICKS)} oder Nummer aus der Front-Tabelle")
+    parser.add_argument('--select_only', action='store_true',
+                        help="Nicht optimieren, nur aus der gespeicherten Front auswählen")
+
     args = parser.parse_args()
+    # Verbosity auf INFO setzen, falls du auch Textausgaben willst (sonst WARNING lassen)
+    optuna.logging.set_verbosity(optuna.logging.WARNING)
     START_CAPITAL = args.start_capital
     CONFIG_SUFFIX = args.config_suffix
+    MC_PATHS = args.mc_paths
+    MC_PERCENTILE = args.mc_percentile
+    MC_MAX_DRAWDOWN = MAX_DRAWDOWN = args.max_drawdown / 100.0
+    multi_objective = args.mode == 'pareto'
 
     symbols, timeframes = args.symbols.split(), args.timeframes.split()
     tasks = [{'symbol': f"{s}/USDT:USDT", 'timeframe': tf} for s in symbols for tf in timeframes]
@@ -114,6 +221,11 @@ def main():
     for task in tasks:
         CURRENT_SYMBOL, CURRENT_TIMEFRAME = task['symbol'], task['timeframe']
         CURRENT_HTF = determine_htf(CURRENT_TIMEFRAME)
+        safe_name = f"{create_safe_filename(CURRENT_SYMBOL, CURRENT_TIMEFRAME)}{CONFIG_SUFFIX}"
+
+        if args.select_only:
+            select_from_front(pareto.front_path(safe_name), args.pareto_pick)
+            continue
 
         print(f"\n===== Optimiere PBot: {CURRENT_SYMBOL} ({CURRENT_TIMEFRAME}) =====")
         HISTORICAL_DATA = load_data(CURRENT_SYMBOL, CURRENT_TIMEFRAME, args.start_date, args.end_date)
@@ -122,16 +234,20 @@ def main():
             print(f"❌ Keine Daten für {CURRENT_SYMBOL}. Überspringe.")
             continue
 
-        study_name = f"pbot_{create_safe_filename(CURRENT_SYMBOL, CURRENT_TIMEFRAME)}{CONFIG_SUFFIX}"
-        db_path = os.path.join(PROJECT_ROOT, 'artifacts', 'db', 'optuna_pbot.db')
-        os.makedirs(os.path.dirname(db_path), exist_ok=True)
-        storage = f"sqlite:///{db_path}"
+        # Eigene Studie im Pareto-Modus: Ein- und Mehrziel-Trials lassen sich nicht mischen
+        study_name = f"pbot_{safe_name}_pareto" if multi_objective else f"pbot_{safe_name}"
+        storage = create_storage(args.storage, study_name)
 
-        study = optuna.create_study(storage=storage, study_name=study_name, direction="maximize", load_if_exists=True)
+        if multi_objective:
+            study = optuna.create_study(storage=storage, study_name=study_name, directions=pareto.DIRECTIONS,
+                                        sampler=optuna.samplers.NSGAIISampler(constraints_func=pareto.trial_constraints),
+                                        load_if_exists=True)
+        else:
+            study = optuna.create_study(storage=storage, study_name=study_name, direction="maximize", load_if_exists=True)
 
         print(f"🚀 Starte {args.trials} Trials...")
         try:
-            study.optimize(objective, n_trials=args.trials, n_jobs=args.jobs, show_progress_bar=True)
+            study.optimize(objective_pareto if multi_objective else objective, n_trials=args.trials, n_jobs=args.jobs, show_progress_bar=True)
         except KeyboardInterrupt:
             print("\n🛑 Optimierung durch Benutzer abgebrochen.")
             break
@@ -140,27 +256,28 @@ def main():
             print("⚠️ Keine Trials abgeschlossen.")
             continue
 
+        if multi_objective:
+            front = pareto.front_from_study(study)
+            path = pareto.front_path(safe_name)
+            market = {"symbol": CURRENT_SYMBOL, "timeframe": CURRENT_TIMEFRAME, "htf": CURRENT_HTF}
+            pareto.save_front(path, market, front, study_name=study.study_name)
+            feasible = sum(1 for t in study.trials if t.values and all(c <= 0 for c in pareto.trial_constraints(t)))
+            print(f"\n📈 Pareto-Front: {len(front)} Punkte aus {feasible}/{len(study.trials)} zulässigen Trials")
+            if front:
+                print(pareto.format_front(front))
+            print(f"   Gespeichert: {os.path.relpath(path, PROJECT_ROOT)}")
+            select_from_front(path, args.pareto_pick)
+            continue
+
         best = study.best_trial
         print(f"\n🏆 Bestes Ergebnis: PnL {best.value:.2f}%")
         print(f"   Parameter: {best.params}")
+        mc = best.user_attrs.get('monte_carlo')
+        if mc:
+            print(f"   Monte Carlo ({mc['paths']} Pfade): Max DD p{MC_PERCENTILE} {mc[f'max_drawdown_p{MC_PERCENTILE}']*100:.1f}%, "
+                  f"Endkapital p5 {mc['final_equity_p5']:.2f}, Verlustwahrscheinlichkeit {mc['prob_loss']*100:.1f}%")
 
-        # Config speichern
-        config_dir = os.path.join(PROJECT_ROOT, 'src', 'pbot', 'strategy', 'configs')
-        os.makedirs(config_dir, exist_ok=True)
-
-        best_params = best.params
-        config = {
-            "market": {"symbol": CURRENT_SYMBOL, "timeframe": CURRENT_TIMEFRAME, "htf": CURRENT_HTF},
-            "strategy": {k: v for k, v in best_params.items() if k in ['length', 'rsi_weight', 'wick_weight', 'use_adx_filter', 'adx_threshold', 'use_mtf', 'min_score']},
-            "risk": {k: v for k, v in best_params.items() if k not in ['length', 'rsi_weight', 'wick_weight', 'use_adx_filter', 'adx_threshold', 'use_mtf', 'min_score']},
-            "behavior": {"use_longs": True, "use_shorts": True}
-        }
-        config['risk']['margin_mode'] = 'isolated'
-
-        fname = f"config_{create_safe_filename(CURRENT_SYMBOL, CURRENT_TIMEFRAME)}{CONFIG_SUFFIX}.json"
-        with open(os.path.join(config_dir, fname), 'w') as f:
-            json.dump(config, f, indent=4)
-        print(f"💾 Config gespeichert: {fname}")
+        save_config(best.params)
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,143 @@
+# src/pbot/analysis/optuna_storage.py
+"""
+Storage-Backends für die Optuna-Studien des Optimierers
+
+- 'sqlite':    eine gemeinsame Datei artifacts/db/optuna_pbot.db (bisheriges
+               Verhalten, jetzt mit Busy-Timeout statt sofortigem
+               'database is locked')
+- 'journal':   Optuna JournalStorage (Append-only-Log mit Datei-Lock),
+               artifacts/db/optuna_pbot.journal - skaliert mit vielen
+               parallelen Workern, weil nur angehängt statt gesperrt wird
+- 'per_study': eine SQLite-Datei pro Studie unter artifacts/db/optuna_studies;
+               parallel laufende Symbole/Timeframes blockieren sich nicht
+
+Journal- und Per-Study-Studien lassen sich danach mit merge_into_sqlite()
+(bzw. `python src/pbot/analysis/optuna_storage.py --merge`) in die gemeinsame
+SQLite-Datei übernehmen, damit Auswertungen und das Optuna-Dashboard weiter
+nur eine Datei brauchen.
+"""
+import os
+import sys
+import glob
+import argparse
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', '..'))
+sys.path.append(os.path.join(PROJECT_ROOT, 'src'))
+
+from pbot.utils.lazy_import import lazy_module
+
+optuna = lazy_module('optuna')
+
+OPTUNA_DB_DIR = os.path.join(PROJECT_ROOT, 'artifacts', 'db')
+
+STORAGE_BACKENDS = ('sqlite', 'journal', 'per_study')
+SQLITE_TIMEOUT_S = 60
+
+
+def sqlite_path(db_dir=OPTUNA_DB_DIR):
+    return os.path.join(db_dir, 'optuna_pbot.db')
+
+
+def journal_path(db_dir=OPTUNA_DB_DIR):
+    return os.path.join(db_dir, 'optuna_pbot.journal')
+
+
+def study_db_path(study_name, db_dir=OPTUNA_DB_DIR):
+    return os.path.join(db_dir, 'optuna_studies', f"{study_name}.db")
+
+
+def _sqlite_storage(path):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    return optuna.storages.RDBStorage(
+        f"sqlite:///{path}",
+        engine_kwargs={'connect_args': {'timeout': SQLITE_TIMEOUT_S}},
+    )
+
+
+def _journal_storage(path):
+    from optuna.storages.journal import JournalFileBackend, JournalStorage
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    return JournalStorage(JournalFileBackend(path))
+
+
+def create_storage(backend, study_name, db_dir=OPTUNA_DB_DIR):
+    """
+    Liefert das Optuna-Storage-Objekt für eine Studie
+
+    Args:
+        backend: 'sqlite', 'journal' oder 'per_study'
+        study_name: Name der Studie (bestimmt bei 'per_study' die Datei)
+        db_dir: Verzeichnis der Storage-Dateien
+    """
+    if backend == 'sqlite':
+        return _sqlite_storage(sqlite_path(db_dir))
+    if backend == 'journal':
+        return _journal_storage(journal_path(db_dir))
+    if backend == 'per_study':
+        return _sqlite_storage(study_db_path(study_name, db_dir))
+    raise ValueError(f"Unbekanntes Storage-Backend: {backend} (erlaubt: {', '.join(STORAGE_BACKENDS)})")
+
+
+def _copy_replacing(study_name, source, target):
+    """Kopiert eine Studie; eine gleichnamige Studie im Ziel wird ersetzt (die Quelle ist maßgeblich)"""
+    try:
+        optuna.delete_study(study_name=study_name, storage=target)
+    except KeyError:
+        pass
+    optuna.copy_study(from_study_name=study_name, from_storage=source, to_storage=target)
+
+
+def merge_into_sqlite(db_dir=OPTUNA_DB_DIR, study_names=None):
+    """
+    Übernimmt Journal- und Per-Study-Studien in die gemeinsame SQLite-Datei
+
+    Args:
+        db_dir: Verzeichnis der Storage-Dateien
+        study_names: nur diese Studien (None = alle gefundenen)
+
+    Returns:
+        Liste der übernommenen Studiennamen
+    """
+    target = _sqlite_storage(sqlite_path(db_dir))
+    merged = []
+
+    if os.path.exists(journal_path(db_dir)):
+        source = _journal_storage(journal_path(db_dir))
+        for summary in optuna.get_all_study_summaries(source, include_best_trial=False):
+            if study_names is None or summary.study_name in study_names:
+                _copy_replacing(summary.study_name, source, target)
+                merged.append(summary.study_name)
+
+    for path in sorted(glob.glob(study_db_path('*', db_dir))):
+        name = os.path.splitext(os.path.basename(path))[0]
+        if study_names is not None and name not in study_names:
+            continue
+        source = _sqlite_storage(path)
+        source_names = [s.study_name for s in optuna.get_all_study_summaries(source, include_best_trial=False)]
+        for study_name in source_names:
+            _copy_replacing(study_name, source, target)
+            merged.append(study_name)
+        source.engine.dispose()
+
+    return merged
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Optuna-Studien in die gemeinsame SQLite-Datei übernehmen")
+    parser.add_argument('--merge', action='store_true', required=True)
+    parser.add_argument('--studies', type=str, default=None, help="Leerzeichen-getrennte Studiennamen (Standard: alle)")
+    args = parser.parse_args()
+
+    optuna.logging.set_verbosity(optuna.logging.WARNING)
+    merged = merge_into_sqlite(study_names=args.studies.split() if args.studies else None)
+    if not merged:
+        print("ℹ️ Keine Journal- oder Per-Study-Studien gefunden.")
+        return
+    print(f"✔ {len(merged)} Studie(n) nach {os.path.relpath(sqlite_path(), PROJECT_ROOT)} übernommen:")
+    for name in merged:
+        print(f"   - {name}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,189 @@
+# src/pbot/analysis/pareto.py
+"""
+Pareto-Front für die Mehrziel-Optimierung (optimizer.py --mode pareto)
+
+Statt einer Zielgröße mit harten Abbruchkriterien werden drei Ziele
+gleichzeitig optimiert (siehe OBJECTIVES). Die harten Grenzen (Max-DD,
+Mindestanzahl Trades, optional Monte-Carlo-DD) laufen als Constraints in
+den NSGA-II-Sampler: verletzende Trials bleiben in der Studie und lenken
+die Suche, landen aber nie auf der Front.
+
+Die Front wird pro (Symbol, Timeframe) als JSON exportiert; daraus wird
+später je nach Risikoappetit ein Punkt als Config übernommen.
+"""
+import os
+import json
+from datetime import datetime
+
+import numpy as np
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', '..'))
+PARETO_DIR = os.path.join(PROJECT_ROOT, 'artifacts', 'results', 'pareto')
+
+# (Metrik im Backtest-Ergebnis, Richtung) - Reihenfolge = Rückgabe der Objective
+OBJECTIVES = (
+    ('total_pnl_pct', 'maximize'),
+    ('max_drawdown_pct', 'minimize'),
+    ('sharpe', 'maximize'),
+)
+DIRECTIONS = [direction for _, direction in OBJECTIVES]
+PICKS = ('balanced', 'max_pnl', 'min_drawdown', 'max_sharpe')
+# Trials ohne gespeicherte Constraints (z.B. Abbruch vor dem Backtest) gelten als unzulässig
+MISSING_CONSTRAINTS = (1.0,)
+
+
+def trade_sharpe(trade_log, start_capital):
+    """
+    Sharpe-Ratio über die Trade-Renditen (bezogen auf die Equity vor dem Trade)
+
+    Nicht annualisiert: Mittelwert / Standardabweichung * sqrt(Anzahl Trades),
+    damit Strategien mit wenigen Zufallstreffern nicht vorne landen.
+    """
+    from pbot.analysis.monte_carlo import trade_returns
+
+    if len(trade_log) < 2:
+        return 0.0
+    returns = trade_returns(trade_log, start_capital)
+    std = returns.std(ddof=1)
+    if not np.isfinite(std) or std == 0:
+        return 0.0
+    return float(returns.mean() / std * np.sqrt(len(returns)))
+
+
+def non_dominated_mask(values, directions=DIRECTIONS):
+    """
+    Markiert die nicht dominierten Zeilen
+
+    Args:
+        values: 2-D Array (Punkte x Ziele)
+        directions: 'maximize'/'minimize' pro Ziel
+
+    Returns:
+        Bool-Array: True = Punkt liegt auf der Pareto-Front
+    """
+    values = np.asarray(values, dtype=float)
+    if values.size == 0:
+        return np.zeros(len(values), dtype=bool)
+    # Alles auf "kleiner ist besser" drehen
+    signs = np.array([-1.0 if d == 'maximize' else 1.0 for d in directions])
+    costs = values * signs
+
+    # a dominiert b: in allen Zielen <= und in mindestens einem <
+    no_worse = (costs[:, None, :] <= costs[None, :, :]).all(axis=2)
+    better = (costs[:, None, :] < costs[None, :, :]).any(axis=2)
+    dominated = (no_worse & better).any(axis=0)
+    return ~dominated
+
+
+def trial_constraints(trial):
+    """Constraint-Werte eines Trials (<= 0 = erfüllt); fehlende zählen als verletzt"""
+    return list(trial.user_attrs.get('constraints', MISSING_CONSTRAINTS))
+
+
+def front_from_study(study):
+    """
+    Pareto-Front der abgeschlossenen, zulässigen Trials einer Mehrziel-Studie
+
+    Returns:
+        Liste von Dicts (trial, Metriken, params), aufsteigend nach Drawdown sortiert
+    """
+    import optuna
+
+    trials = [
+        t for t in study.get_trials(deepcopy=False, states=(optuna.trial.TrialState.COMPLETE,))
+        if all(c <= 0 for c in trial_constraints(t))
+    ]
+    if not trials:
+        return []
+
+    mask = non_dominated_mask([t.values for t in trials])
+    front = []
+    for trial in (t for t, keep in zip(trials, mask) if keep):
+        point = {'trial': trial.number}
+        point.update({name: float(v) for (name, _), v in zip(OBJECTIVES, trial.values)})
+        point['trades_count'] = trial.user_attrs.get('trades_count')
+        point['win_rate'] = trial.user_attrs.get('win_rate')
+        point['params'] = trial.params
+        front.append(point)
+    front.sort(key=lambda p: (p['max_drawdown_pct'], -p['total_pnl_pct']))
+    return front
+
+
+def pick_from_front(front, pick='balanced'):
+    """
+    Wählt einen Punkt der Front
+
+    Args:
+        front: Liste aus front_from_study / load_front
+        pick: 'balanced' (nächster Punkt zum Idealpunkt nach Normierung),
+              'max_pnl', 'min_drawdown', 'max_sharpe' oder eine Positionsnummer
+
+    Returns:
+        Der gewählte Punkt (Dict)
+    """
+    if not front:
+        raise ValueError("Pareto-Front ist leer")
+
+    pick = str(pick)
+    if pick.isdigit():
+        index = int(pick)
+        if index >= len(front):
+            raise ValueError(f"Punkt {index} existiert nicht (Front hat {len(front)} Punkte)")
+        return front[index]
+    if pick == 'max_pnl':
+        return max(front, key=lambda p: p['total_pnl_pct'])
+    if pick == 'min_drawdown':
+        return min(front, key=lambda p: (p['max_drawdown_pct'], -p['total_pnl_pct']))
+    if pick == 'max_sharpe':
+        return max(front, key=lambda p: p['sharpe'])
+    if pick != 'balanced':
+        raise ValueError(f"Unbekannte Auswahl: {pick} (erlaubt: {', '.join(PICKS)} oder Nummer)")
+
+    # Jedes Ziel auf [0, 1] normieren (1 = bester Wert der Front), dann Abstand zum Idealpunkt
+    values = np.array([[p[name] for name, _ in OBJECTIVES] for p in front], dtype=float)
+    lo, hi = values.min(axis=0), values.max(axis=0)
+    span = np.where(hi > lo, hi - lo, 1.0)
+    score = (values - lo) / span
+    for i, (_, direction) in enumerate(OBJECTIVES):
+        if direction == 'minimize':
+            score[:, i] = 1.0 - score[:, i]
+    distance = np.sqrt(((1.0 - score) ** 2).sum(axis=1))
+    return front[int(np.argmin(distance))]
+
+
+def front_path(safe_name, pareto_dir=PARETO_DIR):
+    return os.path.join(pareto_dir, f"pareto_{safe_name}.json")
+
+
+def save_front(path, market, front, study_name=None):
+    """Schreibt die Front atomar als JSON (market = symbol/timeframe/htf)"""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    payload = {
+        'market': market,
+        'study_name': study_name,
+        'objectives': [{'name': name, 'direction': d} for name, d in OBJECTIVES],
+        'created_at': datetime.now().isoformat(timespec='seconds'),
+        'front': front,
+    }
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(payload, f, indent=4)
+    os.replace(tmp_path, path)
+
+
+def load_front(path):
+    with open(path, 'r') as f:
+        return json.load(f)
+
+
+def format_front(front):
+    """Tabellarische Ausgabe der Front (Nummer = Auswahl für --pareto_pick)"""
+    lines = [f"{'Nr':>3} {'Trial':>6} {'PnL %':>9} {'Max DD %':>9} {'Sharpe':>7} {'Trades':>7} {'Win-Rate %':>11}"]
+    for i, p in enumerate(front):
+        win_rate = p.get('win_rate')
+        lines.append(
+            f"{i:>3} {p['trial']:>6} {p['total_pnl_pct']:>9.2f} {p['max_drawdown_pct'] * 100:>9.2f} "
+            f"{p['sharpe']:>7.2f} {p.get('trades_count') or 0:>7} "
+            f"{(win_rate if win_rate is not None else 0):>11.1f}"
+        )
+    return "\n".join(lines)
@@ -37,7 +37,7 @@ def run_portfolio_optimizer(start_capital, strategies_data, start_date, end_date
             print(f"WARNUNG: Keine Daten für {filename} in Einzelanalyse.")
             continue
 
-        result = run_portfolio_simulation(start_capital, sim_data, start_date, end_date)
+        result = run_portfolio_simulation(start_capital, sim_data, start_date, end_date, record_equity_curve=False)
 
         if result and not result.get("liquidation_date"):
             # Max DD aus Ergebnis holen (als Dezimalzahl)
@@ -135,7 +135,7 @@ def run_portfolio_optimizer(start_capital, strategies_data, start_date, end_date
             if not valid_data_for_sim: continue
 
             # Portfolio simulieren
-            result = run_portfolio_simulation(start_capital, current_team_data, start_date, end_date)
+            result = run_portfolio_simulation(start_capital, current_team_data, start_date, end_date, record_equity_curve=False)
 
             # Prüfen ob Ergebnis gültig UND Max DD eingehalten wird
             if result and not result.get("liquidation_date"):
@@ -170,6 +170,13 @@ def run_portfolio_optimizer(start_capital, strategies_data, start_date, end_date
             print("Keine weitere Verbesserung des Profits (unter Einhaltung des Max DD & ohne Coin-Kollision) durch Hinzufügen von Strategien gefunden. Optimierung beendet.")
             break # Verlasse die while-Schleife
 
+    # Equity-Kurve nur für das finale Team (Kandidaten oben ohne Kurve simuliert)
+    final_team_data = {
+        f"{strategies_data[f]['symbol']}_{strategies_data[f]['timeframe']}": strategies_data[f]
+        for f in best_portfolio_files
+    }
+    best_portfolio_result = run_portfolio_simulation(start_capital, final_team_data, start_date, end_date) or best_portfolio_result
+
     # --- Ergebnisse speichern ---
     try:
         results_dir = os.path.join(PROJECT_ROOT, 'artifacts', 'results')
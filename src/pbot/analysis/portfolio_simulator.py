@@ -1,11 +1,9 @@
 # /root/pbot/src/pbot/analysis/portfolio_simulator.py
 # VERSION: SYNCHRONIZED-V4 (Structure Protection Added)
 import pandas as pd
-import numpy as np
 from tqdm import tqdm
 import sys
 import os
-import ta
 import math
 import json
 
@@ -14,14 +12,51 @@ sys.path.append(os.path.join(PROJECT_ROOT, 'src'))
 
 from pbot.strategy.predictor_engine import PredictorEngine
 from pbot.strategy.trade_logic import get_pbot_signal
-from pbot.analysis.backtester import load_data
+from pbot.analysis.backtester import load_data, data_cache_path
+from pbot.analysis import result_cache
+from pbot.analysis.position_book import Position, PendingOrder, PositionBook
+from pbot.analysis.equity_curve import EquityCurveRecorder, SimulationResult
 from pbot.utils.timeframe_utils import determine_htf
+from pbot.utils.lazy_import import lazy_module
 
-def run_portfolio_simulation(start_capital, strategies_data, start_date, end_date):
+ta = lazy_module('ta')
+
+def run_portfolio_simulation(start_capital, strategies_data, start_date, end_date, use_cache=True,
+                             record_equity_curve=True):
     """
     Führt eine chronologische Portfolio-Simulation durch.
     LOGIK: 1:1 Synchronisiert mit Backtester (Realistic-V1).
+
+    Mit record_equity_curve=False wird keine Equity-Kurve geführt (nur
+    Kennzahlen, z.B. in der inneren Schleife des Portfolio-Optimierers);
+    result['equity_curve'] ist dann None. Sonst entsteht der DataFrame erst
+    beim ersten Zugriff (siehe equity_curve.py).
+
+    Identische Teams (gleiche Daten, Parameter, HTF-Cache-Dateien, Engine-Version)
+    kommen aus dem Ergebnis-Cache (siehe result_cache.py).
     """
+    if not use_cache:
+        return _simulate_portfolio(start_capital, strategies_data, start_date, end_date, record_equity_curve)
+
+    keys = sorted(k for k, strat in strategies_data.items() if 'data' in strat and not strat['data'].empty)
+    params = {'start_capital': start_capital, 'start_date': start_date, 'end_date': end_date,
+              'record_equity_curve': record_equity_curve, 'strategies': {}}
+    for key in keys:
+        strat = strategies_data[key]
+        htf = strat.get('htf') or determine_htf(strat['timeframe'])
+        params['strategies'][key] = {
+            'smc_params': strat.get('smc_params', {}), 'risk_params': strat.get('risk_params', {}),
+            'symbol': strat['symbol'], 'timeframe': strat['timeframe'], 'htf': htf,
+            # HTF-Daten werden während der Simulation nachgeladen -> Prüfsumme der Cache-Datei
+            'htf_checksum': result_cache.file_checksum(data_cache_path(strat['symbol'], htf)) if htf else None,
+        }
+    frames = [strategies_data[key]['data'] for key in keys]
+    return result_cache.cached_call(
+        'portfolio', frames, params,
+        lambda: _simulate_portfolio(start_capital, strategies_data, start_date, end_date, record_equity_curve)
+    )
+
+def _simulate_portfolio(start_capital, strategies_data, start_date, end_date, record_equity_curve=True):
     print("\n--- Starte Portfolio-Simulation (PBot)... ---")
 
     # --- 1. Vorbereitung ---
@@ -84,10 +119,12 @@ def run_portfolio_simulation(start_capital, strategies_data, start_date, end_dat
     min_equity_ever = start_capital
     liquidation_date = None
 
-    open_positions = {}
-    pending_orders = {} # Key: Strategy_Key -> {side, atr_from_signal}
+    # Ein Slot pro Strategie; Positionen/Pending Orders als __slots__-Records
+    slots = list(valid_strategies.items())  # [(Strategy_Key, strat_pack)], Index = Slot
+    book = PositionBook(len(slots))
     trade_history = []
-    equity_curve = []
+    equity_curve = EquityCurveRecorder(sorted_timestamps) if record_equity_curve else None
+    final_equity = start_capital
 
     # Konstanten
     fee_pct = 0.06 / 100
@@ -98,14 +135,12 @@ def run_portfolio_simulation(start_capital, strategies_data, start_date, end_dat
     for ts in tqdm(sorted_timestamps, desc="Simuliere"):
         if liquidation_date: break
 
-        used_margin = sum(p['margin_used'] for p in open_positions.values())
-        free_equity_at_start = equity - used_margin
+        free_equity_at_start = equity - book.margin_used
 
         # --- A) PENDING ORDERS (Entry @ Open) ---
-        keys_to_delete_pending = []
-        for key, order_info in pending_orders.items():
-            strat_pack = valid_strategies.get(key)
-            if not strat_pack or ts not in strat_pack['data'].index: continue
+        for slot, order_info in book.pending_items():
+            strat_pack = slots[slot][1]
+            if ts not in strat_pack['data'].index: continue
 
             current_candle = strat_pack['data'].loc[ts]
             entry_price = current_candle['open'] # STRICTLY OPEN
@@ -114,14 +149,14 @@ def run_portfolio_simulation(start_capital, strategies_data, start_date, end_dat
             leverage = int(risk.get('leverage', 10))
 
             # WICHTIG: ATR kommt aus dem SIGNAL (gestern), nicht von heute!
-            atr = order_info['atr']
+            atr = order_info.atr
 
             atr_mult = risk.get('atr_multiplier_sl', 2.0)
             min_sl = risk.get('min_sl_pct', 0.5) / 100.0
             sl_dist = max(atr * atr_mult, entry_price * min_sl)
             
             # NEU: Structure Check
-            signal_side = order_info['side']
+            signal_side = order_info.side
             if signal_side == 'buy' and not pd.isna(current_candle['prev_low']):
                 struct_dist = entry_price - current_candle['prev_low']
                 sl_dist = max(sl_dist, struct_dist)
@@ -130,7 +165,7 @@ def run_portfolio_simulation(start_capital, strategies_data, start_date, end_dat
                 sl_dist = max(sl_dist, struct_dist)
 
             if sl_dist <= 0:
-                keys_to_delete_pending.append(key); continue
+                book.remove_pending(slot); continue
 
             # Sizing
             # --- SICHERHEITS-BREMSE SIMULATION ---
@@ -144,19 +179,19 @@ def run_portfolio_simulation(start_capital, strategies_data, start_date, end_dat
 
             sl_dist_pct = sl_dist / entry_price
             if sl_dist_pct == 0:
-                keys_to_delete_pending.append(key); continue
+                book.remove_pending(slot); continue
 
             raw_notional = risk_usd / sl_dist_pct
             max_lev_notional = equity * max_allowed_effective_leverage
             final_notional = min(raw_notional, max_lev_notional, absolute_max_notional_value)
 
             if final_notional < min_notional:
-                keys_to_delete_pending.append(key); continue
+                book.remove_pending(slot); continue
 
             margin_req = math.ceil((final_notional / leverage) * 100) / 100
 
             if margin_req > free_equity_at_start:
-                keys_to_delete_pending.append(key); continue
+                book.remove_pending(slot); continue
 
             # Setup Position
             rr = risk.get('risk_reward_ratio', 2.0)
@@ -167,88 +202,45 @@ def run_portfolio_simulation(start_capital, strategies_data, start_date, end_dat
             act_price = entry_price + (sl_dist * act_rr) if signal_side == 'buy' else entry_price - (sl_dist * act_rr)
             cb_rate = risk.get('trailing_stop_callback_rate_pct', 0.5) / 100.0
 
-            open_positions[key] = {
-                'side': signal_side,
-                'entry_price': entry_price,
-                'stop_loss': sl_price,
-                'take_profit': tp_price,
-                'notional_value': final_notional,
-                'margin_used': margin_req,
-                'trailing_active': False,
-                'activation_price': act_price,
-                'peak_price': entry_price,
-                'callback_rate': cb_rate,
-                'last_known_price': entry_price
-            }
+            book.open(slot, Position(signal_side, entry_price, sl_price, tp_price, act_price, cb_rate,
+                                     final_notional, margin=margin_req))
 
             free_equity_at_start -= margin_req
-            keys_to_delete_pending.append(key)
-
-        for k in keys_to_delete_pending:
-            if k in pending_orders: del pending_orders[k]
+            book.remove_pending(slot)
 
 
         # --- B) EXIT (High/Low) ---
         current_total_equity = equity
         unrealized_pnl = 0
-        positions_to_close = []
 
-        for key, pos in open_positions.items():
-            strat_pack = valid_strategies.get(key)
+        for slot, pos in book.open_items():
+            key, strat_pack = slots[slot]
             if ts not in strat_pack['data'].index:
-                if pos.get('last_known_price'):
-                    pnl_mult = 1 if pos['side'] == 'long' else -1
-                    unrealized_pnl += pos['notional_value'] * (pos['last_known_price'] / pos['entry_price'] - 1) * pnl_mult
+                if pos.last_price:
+                    unrealized_pnl += pos.notional * (pos.last_price / pos.entry_price - 1) * pos.direction
                 continue
 
             current_candle = strat_pack['data'].loc[ts]
-            pos['last_known_price'] = current_candle['close']
-
-            exit_price = None
-
-            # Trailing Logic
-            if pos['side'] == 'long':
-                if not pos['trailing_active'] and current_candle['high'] >= pos['activation_price']:
-                    pos['trailing_active'] = True
-                if pos['trailing_active']:
-                    pos['peak_price'] = max(pos['peak_price'], current_candle['high'])
-                    new_sl = pos['peak_price'] * (1 - pos['callback_rate'])
-                    pos['stop_loss'] = max(pos['stop_loss'], new_sl)
-            else:
-                if not pos['trailing_active'] and current_candle['low'] <= pos['activation_price']:
-                    pos['trailing_active'] = True
-                if pos['trailing_active']:
-                    pos['peak_price'] = min(pos['peak_price'], current_candle['low'])
-                    new_sl = pos['peak_price'] * (1 + pos['callback_rate'])
-                    pos['stop_loss'] = min(pos['stop_loss'], new_sl)
-
-            # Hit Check (Conservative order: SL first)
-            if pos['side'] == 'long':
-                if current_candle['low'] <= pos['stop_loss']: exit_price = pos['stop_loss']
-                elif not pos['trailing_active'] and current_candle['high'] >= pos['take_profit']: exit_price = pos['take_profit']
-            else:
-                if current_candle['high'] >= pos['stop_loss']: exit_price = pos['stop_loss']
-                elif not pos['trailing_active'] and current_candle['low'] <= pos['take_profit']: exit_price = pos['take_profit']
+            pos.last_price = current_candle['close']
+
+            # Trailing-Update, danach Hit-Check (konservativ: SL zuerst)
+            pos.update_trailing(current_candle['high'], current_candle['low'])
+            exit_price, _ = pos.check_exit(current_candle['high'], current_candle['low'])
 
             if exit_price:
-                pnl_pct = (exit_price / pos['entry_price'] - 1) if pos['side'] == 'long' else (1 - exit_price / pos['entry_price'])
-                pnl_usd = pos['notional_value'] * pnl_pct
-                total_fees = pos['notional_value'] * fee_pct * 2
+                pnl_usd = pos.notional * pos.pnl_pct(exit_price)
+                total_fees = pos.notional * fee_pct * 2
                 equity += (pnl_usd - total_fees)
 
                 trade_history.append({'strategy_key': key, 'symbol': strat_pack['symbol'], 'pnl': (pnl_usd - total_fees), 'timestamp': ts})
-                positions_to_close.append(key)
+                book.close(slot)
             else:
-                pnl_mult = 1 if pos['side'] == 'long' else -1
-                unrealized_pnl += pos['notional_value'] * (current_candle['close'] / pos['entry_price'] - 1) * pnl_mult
-
-        for key in positions_to_close:
-            del open_positions[key]
+                unrealized_pnl += pos.notional * (current_candle['close'] / pos.entry_price - 1) * pos.direction
 
 
         # --- C) SIGNAL GENERATION (Close) ---
-        for key, strat_pack in valid_strategies.items():
-            if key in open_positions or key in pending_orders: continue
+        for slot, (key, strat_pack) in enumerate(slots):
+            if book.is_busy(slot): continue
             if ts not in strat_pack['data'].index: continue
 
             current_candle = strat_pack['data'].loc[ts]
@@ -258,7 +250,7 @@ def run_portfolio_simulation(start_capital, strategies_data, start_date, end_dat
             # Simple MTF Check
             mtf_bullish = None
             
-            score = engine.get_score(current_candle, mtf_bullish)
+            score, _ = engine.get_score(current_candle, mtf_bullish)
 
             is_choppy = False
             if engine.use_adx:
@@ -276,15 +268,13 @@ def run_portfolio_simulation(start_capital, strategies_data, start_date, end_dat
 
             if signal_side:
                 # WICHTIG: Wir speichern die ATR vom Signal-Zeitpunkt!
-                pending_orders[key] = {
-                    'side': signal_side,
-                    'timestamp_signal': ts,
-                    'atr': analysis_result['atr'] 
-                }
+                book.add_pending(slot, PendingOrder(signal_side, analysis_result['atr'], signal_ts=ts))
 
         # --- D) Stats ---
         current_total_equity = equity + unrealized_pnl
-        equity_curve.append({'timestamp': ts, 'equity': current_total_equity})
+        final_equity = current_total_equity
+        if equity_curve is not None:
+            equity_curve.record(current_total_equity)
 
         peak_equity = max(peak_equity, current_total_equity)
         if peak_equity > 0:
@@ -298,7 +288,6 @@ def run_portfolio_simulation(start_capital, strategies_data, start_date, end_dat
 
     # --- 3. Report ---
     print("3/3: Analyse abgeschlossen.")
-    final_equity = equity_curve[-1]['equity'] if equity_curve else start_capital
     total_pnl_pct = ((final_equity / start_capital) - 1) * 100
     wins = sum(1 for t in trade_history if t['pnl'] > 0)
     win_rate = (wins / len(trade_history) * 100) if trade_history else 0
@@ -310,15 +299,10 @@ def run_portfolio_simulation(start_capital, strategies_data, start_date, end_dat
         pnl_per_strategy = trade_df.groupby('strategy_key')['pnl'].sum().reset_index()
         trades_per_strategy = trade_df.groupby('strategy_key').size().reset_index(name='trades')
 
-    equity_df = pd.DataFrame(equity_curve)
-    if not equity_df.empty:
-        equity_df['peak'] = equity_df['equity'].cummax()
-        equity_df['drawdown_pct'] = ((equity_df['peak'] - equity_df['equity']) / equity_df['peak'].replace(0, np.nan)).fillna(0)
-        equity_df.set_index('timestamp', inplace=True, drop=False)
-
-    return {
+    # Equity-Kurve als DataFrame erst bei Bedarf (result['equity_curve'])
+    return SimulationResult({
         "start_capital": start_capital, "end_capital": final_equity, "total_pnl_pct": total_pnl_pct,
         "trade_count": len(trade_history), "win_rate": win_rate, "max_drawdown_pct": max_drawdown_pct * 100,
         "max_drawdown_date": max_drawdown_date, "min_equity": min_equity_ever, "liquidation_date": liquidation_date,
-        "pnl_per_strategy": pnl_per_strategy, "trades_per_strategy": trades_per_strategy, "equity_curve": equity_df
-    }
+        "pnl_per_strategy": pnl_per_strategy, "trades_per_strategy": trades_per_strategy
+    }, curve=equity_curve)
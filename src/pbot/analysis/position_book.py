@@ -0,0 +1,153 @@
+# src/pbot/analysis/position_book.py
+"""
+Kompakter Positions- und Order-Zustand für Backtester und Portfolio-Simulator
+
+- Position / PendingOrder: __slots__-Records statt String-Dicts (kein
+  Hash-Lookup pro Feld, ~3x weniger Speicher pro Position)
+- PositionBook: feste Kapazität, ein Slot pro Strategie; die gebundene
+  Margin wird laufend in ganzen Cent mitgeführt (Margins sind auf Cent
+  aufgerundet) statt jede Kerze neu aufsummiert - ohne Float-Drift beim
+  Öffnen/Schließen.
+  Iteriert wird in Eröffnungsreihenfolge (wie zuvor über die Dicts), damit
+  Summen von Equity/PnL bitgenau gleich bleiben.
+"""
+
+# Seite -> Richtung (+1 Long, -1 Short)
+SIDE_DIRECTIONS = {'buy': 1, 'long': 1, 'sell': -1, 'short': -1}
+
+
+class Position:
+    """Offene Position eines Simulators"""
+
+    __slots__ = ('side', 'direction', 'entry_price', 'stop_loss', 'take_profit', 'activation_price',
+                 'peak_price', 'callback_rate', 'notional', 'margin', 'trailing_active', 'last_price',
+                 'entry_idx')
+
+    def __init__(self, side, entry_price, stop_loss, take_profit, activation_price, callback_rate,
+                 notional, margin=0.0, entry_idx=-1):
+        self.side = side
+        # Simulatoren übergeben die Signal-Seite ('buy'/'sell'); 'long'/'short' ebenfalls erlaubt
+        self.direction = SIDE_DIRECTIONS[side]
+        self.entry_price = entry_price
+        self.stop_loss = stop_loss
+        self.take_profit = take_profit
+        self.activation_price = activation_price
+        self.peak_price = entry_price
+        self.callback_rate = callback_rate
+        self.notional = notional
+        self.margin = margin
+        self.trailing_active = False
+        self.last_price = entry_price
+        self.entry_idx = entry_idx
+
+    def update_trailing(self, high, low):
+        """Aktiviert/zieht den Trailing-Stop mit dem Hoch/Tief der Kerze nach"""
+        if self.direction > 0:
+            if not self.trailing_active and high >= self.activation_price:
+                self.trailing_active = True
+            if self.trailing_active:
+                self.peak_price = max(self.peak_price, high)
+                self.stop_loss = max(self.stop_loss, self.peak_price * (1 - self.callback_rate))
+        else:
+            if not self.trailing_active and low <= self.activation_price:
+                self.trailing_active = True
+            if self.trailing_active:
+                self.peak_price = min(self.peak_price, low)
+                self.stop_loss = min(self.stop_loss, self.peak_price * (1 + self.callback_rate))
+
+    def check_exit(self, high, low):
+        """
+        Prüft SL/TP gegen die Kerze (konservativ: SL zuerst)
+
+        Returns:
+            (exit_price, exit_reason) oder (None, None)
+        """
+        if self.direction > 0:
+            if low <= self.stop_loss:
+                return self.stop_loss, ('trailing_stop' if self.trailing_active else 'stop_loss')
+            if not self.trailing_active and high >= self.take_profit:
+                return self.take_profit, 'take_profit'
+        else:
+            if high >= self.stop_loss:
+                return self.stop_loss, ('trailing_stop' if self.trailing_active else 'stop_loss')
+            if not self.trailing_active and low <= self.take_profit:
+                return self.take_profit, 'take_profit'
+        return None, None
+
+    def pnl_pct(self, price):
+        """Rendite auf das Notional bei Kurs price (ohne Gebühren)"""
+        return (price / self.entry_price - 1) if self.direction > 0 else (1 - price / self.entry_price)
+
+
+class PendingOrder:
+    """Signal der letzten Kerze, Entry zum nächsten Open"""
+
+    __slots__ = ('side', 'atr', 'signal_ts')
+
+    def __init__(self, side, atr, signal_ts=None):
+        self.side = side
+        self.atr = atr
+        self.signal_ts = signal_ts
+
+
+class PositionBook:
+    """
+    Positionen und Pending Orders für eine feste Anzahl Strategien (Slots 0..capacity-1)
+
+    margin_used ist die laufende Summe der Margin aller offenen Positionen.
+    """
+
+    __slots__ = ('capacity', 'positions', 'pending', '_open_slots', '_pending_slots', '_margin_cents')
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.positions = [None] * capacity
+        self.pending = [None] * capacity
+        self._open_slots = []       # Eröffnungsreihenfolge
+        self._pending_slots = []    # Reihenfolge der Signale
+        self._margin_cents = 0
+
+    @property
+    def margin_used(self):
+        return self._margin_cents / 100
+
+    def __len__(self):
+        return len(self._open_slots)
+
+    def is_busy(self, slot):
+        """Offene Position oder wartende Order in diesem Slot"""
+        return self.positions[slot] is not None or self.pending[slot] is not None
+
+    def open(self, slot, position):
+        if self.positions[slot] is not None:
+            raise ValueError(f"Slot {slot} hat bereits eine offene Position")
+        self.positions[slot] = position
+        self._open_slots.append(slot)
+        self._margin_cents += round(position.margin * 100)
+
+    def close(self, slot):
+        position = self.positions[slot]
+        self.positions[slot] = None
+        self._open_slots.remove(slot)
+        self._margin_cents -= round(position.margin * 100)
+        return position
+
+    def open_items(self):
+        """(slot, position) in Eröffnungsreihenfolge; Kopie, damit close() während der Iteration erlaubt ist"""
+        return [(slot, self.positions[slot]) for slot in self._open_slots]
+
+    def add_pending(self, slot, order):
+        if self.pending[slot] is None:
+            self._pending_slots.append(slot)
+        self.pending[slot] = order
+
+    def remove_pending(self, slot):
+        order = self.pending[slot]
+        if order is not None:
+            self.pending[slot] = None
+            self._pending_slots.remove(slot)
+        return order
+
+    def pending_items(self):
+        """(slot, order) in Signal-Reihenfolge; Kopie, damit remove_pending() während der Iteration erlaubt ist"""
+        return [(slot, self.pending[slot]) for slot in self._pending_slots]
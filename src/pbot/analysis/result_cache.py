@@ -0,0 +1,204 @@
+# src/pbot/analysis/result_cache.py
+"""
+Inhaltsadressierter Cache für Backtest- und Portfolio-Ergebnisse
+
+Der Schlüssel ist ein Hash über
+- die Eingabedaten (Inhalt der DataFrames inkl. Zeitraum) bzw. Prüfsummen
+  der nachgeladenen Cache-Dateien,
+- Strategie-/Risiko-Parameter und Startkapital,
+- ENGINE_VERSION und den Quelltext der Simulations-Module (jede Code-Änderung
+  an Backtester/Strategie invalidiert den Cache automatisch).
+
+Ergebnisse liegen als Pickle in artifacts/cache/results; die Größe ist
+begrenzt, verdrängt wird das am längsten nicht benutzte Ergebnis (mtime).
+Aufgeräumt wird nicht bei jedem store(), sondern jeweils nach
+max_bytes / PRUNE_INTERVAL_DIVISOR neu geschriebenen Bytes (und beim ersten
+store() im Prozess); der Cache kann die Grenze also kurz um diesen Anteil
+pro Prozess überschreiten.
+Genutzt von show_results, walk_forward (Test-Fenster) und dem
+Portfolio-Simulator; die Optimizer-Trials rechnen ohne Cache (jeder Trial hat
+neue Parameter, Treffer gäbe es praktisch nie).
+Abschalten: --no-cache von show_results/walk_forward oder Umgebungsvariable
+PBOT_RESULT_CACHE=0.
+"""
+import os
+import json
+import pickle
+import hashlib
+
+import numpy as np
+import pandas as pd
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', '..'))
+RESULT_CACHE_DIR = os.path.join(PROJECT_ROOT, 'artifacts', 'cache', 'results')
+RESULT_CACHE_MAX_BYTES = 256 * 1024 * 1024
+PRUNE_INTERVAL_DIVISOR = 16  # prune() nach je max_bytes / 16 geschriebenen Bytes
+ENGINE_VERSION = 1  # erhöhen, wenn sich Ergebnisse ohne Quelltext-Änderung ändern (z.B. Abhängigkeiten)
+
+# Module, deren Quelltext das Simulationsergebnis bestimmt
+ENGINE_SOURCES = (
+    'analysis/backtester.py',
+    'analysis/equity_curve.py',
+    'analysis/portfolio_simulator.py',
+    'analysis/position_book.py',
+    'analysis/trade_log.py',
+    'strategy/predictor_engine.py',
+    'strategy/trade_logic.py',
+    'utils/timeframe_utils.py',
+)
+
+_settings = {
+    'enabled': os.environ.get('PBOT_RESULT_CACHE', '1') != '0',
+    'cache_dir': RESULT_CACHE_DIR,
+    'max_bytes': RESULT_CACHE_MAX_BYTES,
+}
+_engine_digest = None
+_file_checksums = {}
+_unpruned_bytes = float('inf')  # seit dem letzten prune() geschrieben; inf = erster store() räumt auf
+
+
+def configure(enabled=None, cache_dir=None, max_bytes=None):
+    """Setzt Cache-Optionen für den laufenden Prozess (z.B. configure(enabled=False) für --no-cache)"""
+    global _unpruned_bytes
+    if cache_dir is not None or max_bytes is not None:
+        _unpruned_bytes = float('inf')
+    if enabled is not None:
+        _settings['enabled'] = enabled
+    if cache_dir is not None:
+        _settings['cache_dir'] = cache_dir
+    if max_bytes is not None:
+        _settings['max_bytes'] = max_bytes
+
+
+def is_enabled():
+    return _settings['enabled']
+
+
+def engine_digest():
+    """Hash über ENGINE_VERSION, Bibliotheksversionen und Quelltext der Simulations-Module"""
+    global _engine_digest
+    if _engine_digest is None:
+        digest = hashlib.sha1(f"{ENGINE_VERSION}:{np.__version__}:{pd.__version__}".encode())
+        pkg_dir = os.path.join(PROJECT_ROOT, 'src', 'pbot')
+        for rel_path in ENGINE_SOURCES:
+            with open(os.path.join(pkg_dir, rel_path), 'rb') as f:
+                digest.update(f.read())
+        _engine_digest = digest.hexdigest()
+    return _engine_digest
+
+
+def data_fingerprint(df):
+    """Hash über Index, Spalten und Werte eines DataFrames"""
+    digest = hashlib.sha1(json.dumps([list(map(str, df.columns)), list(map(str, df.dtypes))]).encode())
+    digest.update(np.ascontiguousarray(pd.util.hash_pandas_object(df, index=True).to_numpy()).tobytes())
+    return digest.hexdigest()
+
+
+def file_checksum(path):
+    """SHA-1 einer Datei (None, falls sie fehlt); pro (Größe, mtime) nur einmal gelesen"""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    memo_key = (path, stat.st_size, stat.st_mtime_ns)
+    if memo_key not in _file_checksums:
+        digest = hashlib.sha1()
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 20), b''):
+                digest.update(chunk)
+        _file_checksums[memo_key] = digest.hexdigest()
+    return _file_checksums[memo_key]
+
+
+def result_key(kind, frames, params):
+    """
+    Inhaltsadresse eines Ergebnisses
+
+    Args:
+        kind: Art der Simulation ('backtest', 'portfolio', ...)
+        frames: Liste der Eingabe-DataFrames
+        params: JSON-serialisierbare Parameter (Reihenfolge der Dict-Keys egal)
+    """
+    digest = hashlib.sha1(f"{kind}:{engine_digest()}".encode())
+    for df in frames:
+        digest.update(data_fingerprint(df).encode())
+    digest.update(json.dumps(params, sort_keys=True, default=str).encode())
+    return digest.hexdigest()
+
+
+def _path(kind, key):
+    return os.path.join(_settings['cache_dir'], f"{kind}_{key}.pkl")
+
+
+def load(kind, key):
+    """Gecachtes Ergebnis oder None"""
+    path = _path(kind, key)
+    try:
+        with open(path, 'rb') as f:
+            result = pickle.load(f)
+    except FileNotFoundError:
+        return None
+    except Exception:
+        # Beschädigter/inkompatibler Eintrag: entfernen und neu rechnen
+        try: os.remove(path)
+        except OSError: pass
+        return None
+    try:
+        os.utime(path)  # als zuletzt benutzt markieren
+    except OSError:
+        pass
+    return result
+
+
+def store(kind, key, result):
+    global _unpruned_bytes
+    cache_dir = _settings['cache_dir']
+    os.makedirs(cache_dir, exist_ok=True)
+    path = _path(kind, key)
+    tmp_path = f"{path}.{os.getpid()}.{id(result)}.tmp"
+    with open(tmp_path, 'wb') as f:
+        pickle.dump(result, f, protocol=pickle.HIGHEST_PROTOCOL)
+        size = f.tell()
+    os.replace(tmp_path, path)  # atomar: parallele Worker sehen nie halbe Dateien
+    _unpruned_bytes += size
+    if _unpruned_bytes >= _settings['max_bytes'] / PRUNE_INTERVAL_DIVISOR:
+        prune(cache_dir, _settings['max_bytes'])
+        _unpruned_bytes = 0
+
+
+def prune(cache_dir, max_bytes):
+    """Entfernt die am längsten nicht benutzten Einträge, bis die Gesamtgröße unter max_bytes liegt"""
+    entries = []
+    total = 0
+    with os.scandir(cache_dir) as it:
+        for entry in it:
+            if entry.name.endswith('.pkl'):
+                stat = entry.stat()
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+                total += stat.st_size
+    if total <= max_bytes:
+        return
+    entries.sort()
+    for _, size, path in entries:
+        try:
+            os.remove(path)
+        except OSError:
+            continue
+        total -= size
+        if total <= max_bytes:
+            break
+
+
+def cached_call(kind, frames, params, compute):
+    """Liefert das gecachte Ergebnis oder berechnet es mit compute() und legt es ab"""
+    if not _settings['enabled']:
+        return compute()
+    key = result_key(kind, frames, params)
+    result = load(kind, key)
+    if result is None:
+        result = compute()
+        try:
+            store(kind, key, result)
+        except (OSError, pickle.PicklingError):
+            pass  # Cache ist optional - Ergebnis trotzdem zurückgeben
+    return result
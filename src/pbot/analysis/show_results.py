@@ -16,9 +16,13 @@ PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..
 sys.path.append(os.path.join(PROJECT_ROOT, 'src'))
 
 from pbot.analysis.backtester import load_data, run_pbot_backtest
+from pbot.analysis.trade_log import EXIT_REASONS, summarize_exit_reasons
+from pbot.analysis.monte_carlo import run_monte_carlo
 from pbot.analysis.portfolio_simulator import run_portfolio_simulation
 from pbot.analysis.portfolio_optimizer import run_portfolio_optimizer
-from pbot.utils.telegram import send_document
+from pbot.analysis import result_cache
+from pbot.utils.telegram import send_document, send_photo
+from pbot.analysis.static_charts import render_equity_chart
 
 # --- Einzel-Analyse ---
 def run_single_analysis(start_date, end_date, start_capital):
@@ -64,7 +68,10 @@ def run_single_analysis(start_date, end_date, start_capital):
             strategy_params['timeframe'] = timeframe
             strategy_params['htf'] = config['market'].get('htf')
 
-            result = run_pbot_backtest(data.copy(), strategy_params, risk_params, start_capital, verbose=False)
+            result = run_pbot_backtest(data.copy(), strategy_params, risk_params, start_capital, verbose=False, record_trades=True)
+            trade_log = result['trade_log']
+            exits = summarize_exit_reasons(trade_log)
+            mc = run_monte_carlo(trade_log, start_capital, n_paths=5000, seed=0)
 
             all_results.append({
                 "Strategie": strategy_name,
@@ -72,6 +79,10 @@ def run_single_analysis(start_date, end_date, start_capital):
                 "Win Rate %": result.get('win_rate', 0),
                 "PnL %": result.get('total_pnl_pct', -100),
                 "Max DD %": result.get('max_drawdown_pct', 1.0) * 100,
+                "Ø Trade %": trade_log['ret'].mean() * 100 if len(trade_log) else 0.0,
+                "SL/TP/TSL": "/".join(str(exits[r][0]) for r in EXIT_REASONS),
+                "MC DD p95 %": mc['max_drawdown_p95'] * 100,
+                "MC Verlust %": mc['prob_loss'] * 100,
                 "Endkapital": result.get('end_capital', start_capital)
             })
 
@@ -276,6 +287,9 @@ def run_shared_mode(is_auto: bool, start_date, end_date, start_capital, target_m
             if telegram_config.get('bot_token'):
                 print("Sende Bericht an Telegram...")
                 send_document(telegram_config.get('bot_token'), telegram_config.get('chat_id'), csv_path, caption)
+                if {'equity', 'drawdown_pct'}.issubset(equity_df.columns):
+                    chart_path = render_equity_chart(equity_df.index, equity_df['equity'], equity_df['drawdown_pct'], caption)
+                    send_photo(telegram_config.get('bot_token'), telegram_config.get('chat_id'), chart_path, caption)
                 print("✔ Gesendet.")
         except Exception as e:
             print(f"Fehler beim Export/Senden: {e}")
@@ -285,7 +299,10 @@ if __name__ == "__main__":
     parser = argparse.ArgumentParser()
     parser.add_argument('--mode', default='1', type=str)
     parser.add_argument('--target_max_drawdown', default=30.0, type=float)
+    parser.add_argument('--no-cache', dest='no_cache', action='store_true', help="Ergebnis-Cache nicht verwenden")
     args = parser.parse_args()
+    if args.no_cache:
+        result_cache.configure(enabled=False)
 
     print("\n--- Bitte Konfiguration für den Backtest festlegen ---")
     start_date = input(f"Startdatum (JJJJ-MM-TT) [Standard: 2023-01-01]: ") or "2023-01-01"
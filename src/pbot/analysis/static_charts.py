@@ -0,0 +1,187 @@
+# src/pbot/analysis/static_charts.py
+"""
+Statische PNG-Charts für Telegram-Berichte (headless, ohne Plotly/Kaleido)
+
+- matplotlib über das Agg-Canvas (kein pyplot-State, kein Display nötig),
+  erst bei einem Cache-Miss importiert
+- Zeichnen aus vorab berechneten numpy-Arrays (vlines/bar statt Schleifen)
+- Cache in artifacts/charts: Dateiname = Hash über Daten + Darstellung,
+  ein unveränderter Chart wird nie neu gerendert
+"""
+import os
+import json
+import hashlib
+
+import numpy as np
+import pandas as pd
+
+from pbot.analysis.chart_builder import trade_columns
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', '..'))
+CHART_CACHE_DIR = os.path.join(PROJECT_ROOT, 'artifacts', 'charts')
+CHART_CACHE_MAX_FILES = 200
+RENDERER_VERSION = 1  # erhöhen, wenn sich das Aussehen ändert (invalidiert den Cache)
+
+
+def _date_num(timestamps):
+    """Zeitstempel als matplotlib-Datumszahl (Tage seit 1970, UTC) ohne matplotlib-Import"""
+    return pd.DatetimeIndex(pd.to_datetime(timestamps)).asi8 / 86_400e9
+
+
+def _chart_key(kind, arrays, meta):
+    """Hash über Array-Inhalte und Darstellungs-Parameter"""
+    digest = hashlib.sha1(f"{kind}:{RENDERER_VERSION}".encode())
+    for array in arrays:
+        array = np.ascontiguousarray(array)
+        digest.update(str(array.dtype).encode())
+        digest.update(array.tobytes())
+    digest.update(json.dumps(meta, sort_keys=True, default=str).encode())
+    return digest.hexdigest()[:20]
+
+
+def _cached_render(kind, arrays, meta, draw, cache_dir):
+    """Liefert den Pfad zum PNG; draw(fig) wird nur bei einem Cache-Miss aufgerufen"""
+    os.makedirs(cache_dir, exist_ok=True)
+    path = os.path.join(cache_dir, f"{kind}_{_chart_key(kind, arrays, meta)}.png")
+    if os.path.exists(path):
+        os.utime(path)  # als zuletzt benutzt markieren
+        return path
+
+    from matplotlib.figure import Figure
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+    fig = Figure(figsize=meta.get('figsize', (12, 8)), facecolor='white')
+    FigureCanvasAgg(fig)
+    draw(fig)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    fig.savefig(tmp_path, format='png', dpi=meta.get('dpi', 100))
+    os.replace(tmp_path, path)  # atomar: parallele Prozesse sehen nie halbe Dateien
+    _prune_cache(cache_dir)
+    return path
+
+
+def _prune_cache(cache_dir, max_files=CHART_CACHE_MAX_FILES):
+    """Entfernt die am längsten nicht benutzten PNGs über max_files"""
+    files = [os.path.join(cache_dir, f) for f in os.listdir(cache_dir) if f.endswith('.png')]
+    if len(files) <= max_files:
+        return
+    files.sort(key=os.path.getmtime)
+    for path in files[:len(files) - max_files]:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+def _compact_formatter():
+    import matplotlib.ticker as mticker
+    return mticker.FuncFormatter(lambda x, p: f'{x/1e6:.2f}M' if x >= 1e6 else (f'{x/1e3:.1f}k' if x >= 1e3 else f'{x:.0f}'))
+
+
+def render_equity_chart(timestamps, equity, drawdown_pct, title, cache_dir=CHART_CACHE_DIR):
+    """
+    Equity-Kurve mit Drawdown-Verlauf als PNG
+
+    Args:
+        timestamps: Zeitstempel (DatetimeIndex, Series oder Array)
+        equity: Kontostand pro Zeitpunkt
+        drawdown_pct: Drawdown als Anteil (0.25 = 25%)
+        title: Überschrift
+
+    Returns:
+        Pfad zum (ggf. gecachten) PNG
+    """
+    x = _date_num(timestamps)
+    equity = np.asarray(equity, dtype=float)
+    drawdown = -np.asarray(drawdown_pct, dtype=float) * 100
+
+    def draw(fig):
+        import matplotlib.ticker as mticker
+        ax1, ax2 = fig.subplots(2, 1, sharex=True)
+        fig.suptitle(title, fontsize=16)
+
+        ax1.plot(x, equity, color='#007ACC', label='Kontostand', linewidth=2)
+        ax1.set_title('Equity Curve (Kontostand-Entwicklung)')
+        ax1.set_ylabel('Kontostand (USDT)')
+        ax1.grid(True, linestyle='--', alpha=0.6)
+        ax1.legend()
+        ax1.yaxis.set_major_formatter(_compact_formatter())
+        ax1.set_facecolor('#f0f0f0')
+
+        ax2.fill_between(x, drawdown, 0, color='#D32F2F', alpha=0.4, label='Drawdown')
+        ax2.set_title('Drawdown-Verlauf')
+        ax2.set_xlabel('Datum')
+        ax2.set_ylabel('Drawdown (%)')
+        ax2.grid(True, linestyle='--', alpha=0.6)
+        ax2.yaxis.set_major_formatter(mticker.FuncFormatter(lambda v, p: f'{-v:.1f}%'))
+        ax2.legend()
+        ax2.set_facecolor('#f0f0f0')
+        ax2.xaxis_date()
+
+        fig.tight_layout(rect=[0, 0.03, 1, 0.95])
+
+    meta = {'title': title, 'figsize': (12, 10)}
+    return _cached_render('equity', [x, equity, drawdown], meta, draw, cache_dir)
+
+
+def render_candlestick_snapshot(df, title, trades=None, max_candles=300, cache_dir=CHART_CACHE_DIR, trade_index=None):
+    """
+    Candlestick-Ausschnitt (letzte max_candles Kerzen) mit EMAs und Trades als PNG
+
+    Args:
+        df: OHLCV-DataFrame mit DatetimeIndex, optional ema_20/ema_50/ema_200
+        title: Überschrift
+        trades: Liste von Dicts mit entry_time, entry_price, exit_time, exit_price, profit
+                oder Trade-Log (Structured Array, siehe trade_log.py)
+        max_candles: Anzahl der gezeigten (jüngsten) Kerzen
+        trade_index: Kerzen-Index zum Trade-Log (Standard: df.index)
+
+    Returns:
+        Pfad zum (ggf. gecachten) PNG
+    """
+    trade_index = df.index if trade_index is None else trade_index
+    df = df.iloc[-max_candles:]
+    x = _date_num(df.index)
+    o, h, l, c = (df[col].to_numpy(dtype=float) for col in ('open', 'high', 'low', 'close'))
+    width = np.median(np.diff(x)) * 0.7 if len(x) > 1 else 0.0005
+    up = c >= o
+
+    ema_columns = [col for col in ('ema_20', 'ema_50', 'ema_200') if col in df]
+    ema_values = [df[col].to_numpy(dtype=float) for col in ema_columns]
+
+    trade_arrays = []
+    if trades is not None and len(trades) and len(x):
+        # Spalten: Entry-Zeit, Entry-Preis, Exit-Zeit, Exit-Preis, PnL
+        entry_x, entry_y, exit_x, exit_y, profit = trade_columns(trades, trade_index)
+        t = np.column_stack([_date_num(entry_x), entry_y, _date_num(exit_x), exit_y, profit]).astype(float)
+        t = t[t[:, 2] >= x[0]]  # nur Trades im Ausschnitt
+        if len(t):
+            trade_arrays = [t]
+
+    def draw(fig):
+        import matplotlib.dates as mdates
+        ax = fig.subplots()
+        ax.set_title(title)
+
+        ax.vlines(x, l, h, colors=np.where(up, '#26a69a', '#ef5350'), linewidth=0.8)
+        for mask, color in ((up, '#26a69a'), (~up, '#ef5350')):
+            ax.bar(x[mask], (c - o)[mask], width, bottom=o[mask], color=color, linewidth=0)
+
+        for col, values, color in zip(ema_columns, ema_values, ('orange', 'blue', 'red')):
+            ax.plot(x, values, color=color, linewidth=1.2, label=col.upper().replace('_', ' '))
+
+        for t in trade_arrays:
+            ax.scatter(t[:, 0], t[:, 1], marker='^', color='green', s=60, zorder=3)
+            colors = np.where(t[:, 4] > 0, 'green', 'red')
+            ax.scatter(t[:, 2], t[:, 3], marker='v', c=colors, s=60, zorder=3)
+
+        ax.grid(True, linestyle='--', alpha=0.4)
+        ax.xaxis_date()
+        ax.xaxis.set_major_formatter(mdates.DateFormatter('%d.%m %H:%M'))
+        if ema_columns:
+            ax.legend(loc='upper left')
+        fig.autofmt_xdate()
+        fig.tight_layout()
+
+    meta = {'title': title, 'figsize': (12, 6)}
+    return _cached_render('candles', [x, o, h, l, c, *ema_values, *trade_arrays], meta, draw, cache_dir)
@@ -0,0 +1,75 @@
+# src/pbot/analysis/trade_log.py
+"""
+Spaltenbasiertes Trade-Log für Backtests
+
+Ein Trade = eine Zeile in einem NumPy Structured Array (TRADE_LOG_DTYPE).
+Indizes beziehen sich auf die Kerzen des Backtest-DataFrames, so dass
+Zeitstempel erst bei Bedarf (Charts, Reports) über den Index aufgelöst werden.
+"""
+import numpy as np
+
+TRADE_LOG_DTYPE = np.dtype([
+    ('entry_idx', np.int64),     # Kerze des Entrys (Open)
+    ('exit_idx', np.int64),      # Kerze des Exits
+    ('side', np.int8),           # +1 = buy/long, -1 = sell/short
+    ('entry_price', np.float64),
+    ('exit_price', np.float64),
+    ('pnl', np.float64),         # USDT nach Gebühren
+    ('ret', np.float64),         # pnl / Notional
+    ('exit_reason', np.int8),    # Index in EXIT_REASONS
+])
+
+EXIT_REASONS = ('stop_loss', 'take_profit', 'trailing_stop')
+SIDE_CODES = {'buy': 1, 'long': 1, 'sell': -1, 'short': -1}
+
+
+class TradeLogRecorder:
+    """Sammelt Trades während der Simulation und liefert am Ende das Structured Array"""
+
+    __slots__ = ('_rows',)
+
+    def __init__(self):
+        self._rows = []
+
+    def record(self, entry_idx, exit_idx, side, entry_price, exit_price, pnl, ret, exit_reason):
+        self._rows.append((
+            entry_idx, exit_idx, SIDE_CODES[side], entry_price, exit_price,
+            pnl, ret, EXIT_REASONS.index(exit_reason)
+        ))
+
+    def to_array(self):
+        return np.array(self._rows, dtype=TRADE_LOG_DTYPE)
+
+
+def empty_trade_log():
+    return np.empty(0, dtype=TRADE_LOG_DTYPE)
+
+
+def trade_log_to_chart_trades(trade_log, index):
+    """
+    Wandelt das Trade-Log in die Trade-Dicts der Chart-Funktionen um
+
+    Args:
+        trade_log: Structured Array (TRADE_LOG_DTYPE)
+        index: DatetimeIndex der Backtest-Kerzen
+
+    Returns:
+        Liste von Dicts mit entry_time, entry_price, exit_time, exit_price, profit
+    """
+    entry_times = index[trade_log['entry_idx']]
+    exit_times = index[trade_log['exit_idx']]
+    return [
+        {'entry_time': et, 'entry_price': ep, 'exit_time': xt, 'exit_price': xp, 'profit': pnl}
+        for et, ep, xt, xp, pnl in zip(
+            entry_times, trade_log['entry_price'].tolist(), exit_times,
+            trade_log['exit_price'].tolist(), trade_log['pnl'].tolist()
+        )
+    ]
+
+
+def summarize_exit_reasons(trade_log):
+    """Anzahl und PnL-Summe pro Exit-Grund: {'stop_loss': (count, pnl), ...}"""
+    reasons = trade_log['exit_reason']
+    counts = np.bincount(reasons, minlength=len(EXIT_REASONS))
+    pnl = np.bincount(reasons, weights=trade_log['pnl'], minlength=len(EXIT_REASONS))
+    return {name: (int(counts[i]), float(pnl[i])) for i, name in enumerate(EXIT_REASONS)}
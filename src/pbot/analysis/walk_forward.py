@@ -14,8 +14,11 @@ PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..
 sys.path.append(os.path.join(PROJECT_ROOT, 'src'))
 
 from pbot.analysis.backtester import load_data, run_pbot_backtest
+from pbot.analysis import result_cache
 from pbot.analysis.optimizer import objective as run_single_optimization
-import optuna
+from pbot.utils.lazy_import import lazy_module
+
+optuna = lazy_module('optuna')
 
 
 class WalkForwardTester:
@@ -281,8 +284,11 @@ def main():
     parser.add_argument('--test_months', type=int, default=2)
     parser.add_argument('--step_months', type=int, default=2)
     parser.add_argument('--trials', type=int, default=50)
+    parser.add_argument('--no-cache', dest='no_cache', action='store_true', help="Ergebnis-Cache nicht verwenden")
     
     args = parser.parse_args()
+    if args.no_cache:
+        result_cache.configure(enabled=False)
     
     tester = WalkForwardTester(
         training_months=args.train_months,
@@ -0,0 +1,55 @@
+# src/pbot/cli.py
+"""
+Einheitlicher Einstiegspunkt: python -m pbot <befehl> [argumente]
+
+Die Befehle verweisen auf die bestehenden Skripte; deren Argumente werden
+unverändert durchgereicht. Diese Schicht importiert selbst nur argparse und
+runpy - schwere Abhängigkeiten lädt erst das gewählte Skript, und auch dort
+erst bei Bedarf (siehe utils/lazy_import.py).
+
+Aufruf (aus dem Projektverzeichnis):
+    PYTHONPATH=src python -m pbot risk
+    PYTHONPATH=src python -m pbot run --symbol BTC/USDT:USDT --timeframe 1h --use_macd false
+    PYTHONPATH=src python -m pbot optimize --help
+"""
+import os
+import sys
+import argparse
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+# Befehl -> (Skript relativ zum Projektverzeichnis, Beschreibung)
+COMMANDS = {
+    'run': ('src/pbot/strategy/run.py', "Handelszyklus für eine Strategie ausführen"),
+    'master': ('master_runner.py', "Alle aktiven Strategien starten"),
+    'risk': ('show_risk_status.py', "Portfolio-Risk-Status und Equity-Verlauf anzeigen"),
+    'latency': ('show_latency_report.py', "Ausführungs-Latenz pro Symbol/Timeframe"),
+    'leverage': ('show_leverage.py', "Hebel der aktiven Strategien anzeigen"),
+    'optimize': ('src/pbot/analysis/optimizer.py', "Parameter-Optimierung (Optuna)"),
+    'results': ('src/pbot/analysis/show_results.py', "Backtest-/Portfolio-Auswertung"),
+    'walk-forward': ('src/pbot/analysis/walk_forward.py', "Walk-Forward-Test"),
+    'chart': ('src/pbot/analysis/interactive_status.py', "Interaktive Charts erzeugen"),
+    'studies': ('src/pbot/analysis/optuna_storage.py', "Optuna-Studien zusammenführen (--merge)"),
+}
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog='python -m pbot',
+        description="PBot Befehle",
+        epilog="Befehle:\n" + "\n".join(f"  {name:<14}{desc}" for name, (_, desc) in COMMANDS.items()),
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument('command', choices=list(COMMANDS), metavar='befehl')
+    parser.add_argument('args', nargs=argparse.REMAINDER, help="Argumente für das Skript")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    script = os.path.join(PROJECT_ROOT, COMMANDS[args.command][0])
+
+    import runpy
+
+    sys.argv = [script, *args.args]
+    runpy.run_path(script, run_name='__main__')
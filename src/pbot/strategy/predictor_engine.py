@@ -1,7 +1,10 @@
 # /root/pbot/src/pbot/strategy/predictor_engine.py
 import pandas as pd
 import numpy as np
-import ta
+
+from pbot.utils.lazy_import import lazy_module
+
+ta = lazy_module('ta')
 
 class PredictorEngine:
     """
@@ -11,10 +11,12 @@ Regime-Typen:
 """
 import pandas as pd
 import numpy as np
-import ta
+from pbot.utils.lazy_import import lazy_module
 from typing import Dict, Literal
 from enum import Enum
 
+ta = lazy_module('ta')
+
 
 class MarketRegime(Enum):
     """Definiert verschiedene Marktphasen"""
@@ -5,16 +5,18 @@ import json
 import logging
 from logging.handlers import RotatingFileHandler
 import time
+import queue
 import argparse
-import ccxt
 
 PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', '..'))
 sys.path.append(os.path.join(PROJECT_ROOT, 'src'))
 
-from pbot.utils.exchange import Exchange
-from pbot.utils.telegram import send_message
-from pbot.utils.trade_manager import full_trade_cycle
-from pbot.utils.timeframe_utils import determine_htf # NEU: Import für HTF Bestimmung
+from pbot.utils.telegram import queue_message
+from pbot.utils.config_service import config_basename, get_config_service
+from pbot.utils import timing
+from pbot.utils.timeframe_utils import timeframe_to_seconds
+
+HTF_CLOSE_WAIT_S = 5.0  # Resident-Modus: Wartezeit auf den HTF-Schluss, wenn er mit dem LTF-Schluss zusammenfällt
 
 def setup_logging(symbol, timeframe):
     safe_filename = f"{symbol.replace('/', '').replace(':', '')}_{timeframe}"
@@ -44,50 +46,33 @@ def setup_logging(symbol, timeframe):
 
 
 def load_config(symbol, timeframe, use_macd_filter):
-    configs_dir = os.path.join(PROJECT_ROOT, 'src', 'pbot', 'strategy', 'configs')
-    safe_filename_base = f"{symbol.replace('/', '').replace(':', '')}_{timeframe}"
-
-    # Suffix-Logik beibehalten für Flexibilität, aber für SMC meist leer
-    suffix = "_macd" if use_macd_filter else ""
-    config_filename = f"config_{safe_filename_base}{suffix}.json"
-    config_path = os.path.join(configs_dir, config_filename)
-
-    if not os.path.exists(config_path):
-        config_filename_fallback = f"config_{safe_filename_base}.json"
-        config_path_fallback = os.path.join(configs_dir, config_filename_fallback)
-        if os.path.exists(config_path_fallback):
-            config_path = config_path_fallback
-            config_filename = config_filename_fallback
-        else:
-            config_filename_macd = f"config_{safe_filename_base}_macd.json"
-            config_path_macd = os.path.join(configs_dir, config_filename_macd)
-            if os.path.exists(config_path_macd):
-                config_path = config_path_macd
-                config_filename = config_filename_macd
-            else:
-                raise FileNotFoundError(f"Konfigurationsdatei '{config_filename}' oder Fallbacks nicht gefunden.")
-
-    with open(config_path, 'r') as f:
-        config = json.load(f)
-        
-    # NEU: Füge den automatisch bestimmten HTF zur Config hinzu
-    # Dadurch weiß trade_manager, welchen HTF er holen muss
-    config['market']['htf'] = determine_htf(config['market']['timeframe']) 
-    
+    """Strategie-Config aus dem ConfigService (alle Configs einmal geladen und validiert)"""
+    config = get_config_service().get_config(symbol, timeframe, use_macd_filter)
+    if config is None:
+        suffix = "_macd" if use_macd_filter else ""
+        config_filename = f"{config_basename(symbol, timeframe)}{suffix}.json"
+        raise FileNotFoundError(f"Konfigurationsdatei '{config_filename}' oder Fallbacks nicht gefunden (oder ungültig).")
     return config
 
 
-def run_for_account(account, telegram_config, params, model, scaler, logger):
-    """ Führt den Handelszyklus für einen Account aus. """
+def run_for_account(account, telegram_config, params, model, scaler, logger, exchange=None):
+    """ Führt den Handelszyklus für einen Account aus (exchange: bereits initialisiert, z.B. im Resident-Modus). """
+    # Schwere Module (ccxt, pandas, ta) erst hier laden - Argument- und Config-Fehler bleiben schnell
+    from pbot.utils.exchange import Exchange
+    from pbot.utils.trade_manager import full_trade_cycle
+
     try:
         account_name = account.get('name', 'Standard-Account')
         symbol = params['market']['symbol']
         timeframe = params['market']['timeframe']
         htf = params['market']['htf'] # HTF aus Parametern lesen
-        
+
+        timing.start_cycle(f"{symbol} ({timeframe}) [{account_name}]")
         logger.info(f"--- Starte TitanBot für {symbol} ({timeframe}) mit MTF-Bias von {htf} ---")
         
-        exchange = Exchange(account)
+        if exchange is None:
+            with timing.span('exchange.init'):
+                exchange = Exchange(account)
 
         if not exchange.markets:
             logger.critical("Exchange konnte nicht initialisiert werden (Märkte nicht geladen). Breche Zyklus ab.")
@@ -105,13 +90,109 @@ def run_for_account(account, telegram_config, params, model, scaler, logger):
         # Sende Telegram Nachricht bei kritischem Fehler
         try:
             error_message = f"🚨 *Kritischer Fehler* in TitanBot für *{symbol_f} ({tf_f})*:\n\n`{e}`\n\nBot-Instanz könnte instabil sein."
-            send_message(
+            queue_message(
                 telegram_config.get('bot_token'),
                 telegram_config.get('chat_id'),
                 error_message
             )
         except Exception as tel_e:
             logger.error(f"Konnte keine Telegram-Fehlermeldung senden: {tel_e}")
+    finally:
+        # Latenz-Aufschlüsselung des Zyklus ausgeben (nur bei aktivem Timing)
+        timing.end_cycle(logger)
+
+
+def htf_closed(feed, symbol, timeframe, htf):
+    """
+    True, wenn der HTF-Puffer zum letzten LTF-Schluss passt
+
+    Fällt der LTF-Schluss auf eine HTF-Grenze (z.B. 30m/2h um 06:00), muss auch
+    die HTF-Kerze bis dahin geschlossen sein - sonst würde der Zyklus die
+    vorletzte HTF-Kerze auswerten, was der Cron-/REST-Pfad nie tut.
+    """
+    ltf_ms, htf_ms = timeframe_to_seconds(timeframe) * 1000, timeframe_to_seconds(htf) * 1000
+    ltf_closed = feed.last_closed_ts(symbol, timeframe)
+    if ltf_closed is None:
+        return True
+    close_ms = ltf_closed + ltf_ms
+    if close_ms % htf_ms:
+        return True
+    htf_closed_ts = feed.last_closed_ts(symbol, htf)
+    return htf_closed_ts is not None and htf_closed_ts + htf_ms >= close_ms
+
+
+def wait_for_htf_close(closes, feed, symbol, timeframe, htf, timeout_s=HTF_CLOSE_WAIT_S):
+    """Wartet auf Schluss-Events der Queue, bis htf_closed() gilt; False nach timeout_s"""
+    deadline = time.monotonic() + timeout_s
+    while not htf_closed(feed, symbol, timeframe, htf):
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return False
+        try:
+            closes.get(timeout=remaining)
+        except queue.Empty:
+            return False
+    return True
+
+
+def run_resident(accounts, telegram_config, params, logger, use_macd=False):
+    """
+    Dauerbetrieb: Kerzen per WebSocket (MarketFeed), Handelszyklus direkt bei Kerzenschluss
+
+    Exchange-Instanzen und Kerzen-Historie bleiben über die Zyklen erhalten;
+    fetch_recent_ohlcv liefert LTF/HTF aus dem Speicher statt per REST.
+    Neue Optimizer-Configs übernimmt der ConfigService ohne Neustart.
+    """
+    from pbot.utils.exchange import Exchange
+    from pbot.utils.market_feed import MarketFeed
+
+    symbol = params['market']['symbol']
+    timeframe = params['market']['timeframe']
+    htf = params['market']['htf']
+
+    exchanges = []
+    for account in accounts:
+        exchange = Exchange(account)
+        if not exchange.markets:
+            logger.critical(f"Exchange für Account '{account.get('name', 'Standard-Account')}' nicht initialisiert – übersprungen.")
+            continue
+        exchanges.append((account, exchange))
+    if not exchanges:
+        return
+
+    closes = queue.Queue()
+    feed = MarketFeed([(symbol, timeframe), (symbol, htf)], on_close=lambda s, tf: closes.put(tf))
+    if not feed.start():
+        logger.critical("MarketFeed konnte nicht gestartet werden (Historie nicht geladen).")
+        feed.stop()
+        return
+    for _, exchange in exchanges:
+        exchange.attach_market_feed(feed)
+    logger.info(f"Resident-Modus: warte auf Kerzenschlüsse {symbol} ({timeframe}, HTF {htf})...")
+
+    config_service = get_config_service()
+    config_service.start()
+    config_version = config_service.version
+
+    try:
+        while True:
+            if closes.get() != timeframe:
+                continue  # HTF-Schluss: Puffer ist aktualisiert, Zyklus läuft mit der LTF-Kerze
+            htf_ready = wait_for_htf_close(closes, feed, symbol, timeframe, htf)
+            if not htf_ready:
+                logger.warning(f"HTF-Kerze ({htf}) nach {HTF_CLOSE_WAIT_S:.0f}s nicht geschlossen – Zyklus lädt Kerzen per REST.")
+            if config_service.version != config_version:
+                params = config_service.get_config(symbol, timeframe, use_macd) or params
+                config_version = config_service.version
+                logger.info(f"Neue Konfiguration aktiv (Version {config_version}).")
+            for account, exchange in exchanges:
+                exchange.attach_market_feed(feed if htf_ready else None)
+                run_for_account(account, telegram_config, params, None, None, logger, exchange=exchange)
+    except KeyboardInterrupt:
+        logger.info("Resident-Modus beendet.")
+    finally:
+        config_service.stop()
+        feed.stop()
 
 
 def main():
@@ -119,8 +200,13 @@ def main():
     parser.add_argument('--symbol', required=True, type=str)
     parser.add_argument('--timeframe', required=True, type=str)
     parser.add_argument('--use_macd', required=True, type=str) # Behalten als Dummy für master_runner
+    parser.add_argument('--timing', action='store_true', help="Stage-Timing des Handelszyklus messen und ausgeben")
+    parser.add_argument('--resident', action='store_true', help="Dauerbetrieb: Kerzen per WebSocket, Zyklus bei Kerzenschluss")
     args = parser.parse_args()
 
+    if args.timing:
+        timing.enable()
+
     symbol, timeframe = args.symbol, args.timeframe
     use_macd = args.use_macd.lower() == 'true' # Wird von load_config ggf. für Dateinamen genutzt
 
@@ -156,6 +242,10 @@ def main():
         logger.critical("Fehler: 'pbot'-Eintrag in secret.json ist keine Liste von Accounts.")
         sys.exit(1)
 
+    if args.resident:
+        run_resident(accounts_to_run, telegram_config, params, logger, use_macd=use_macd)
+        return
+
     # Führe für jeden Account den Handelszyklus aus
     for account in accounts_to_run:
         # Übergebe MODEL und SCALER als None
@@ -0,0 +1,189 @@
+# src/pbot/utils/account_snapshot.py
+"""
+Account-Snapshot (offene Positionen + Balance) für alle Strategie-Prozesse
+
+Statt dass jede Strategie pro Zyklus ihre Position (fetch_positions([symbol]),
+bis zu viermal) und ihre Balance (fetch_balance) einzeln abfragt, holt EIN
+Prozess pro Kerze alle offenen Positionen und die Balance und legt den
+Snapshot im gemeinsamen State-Store ab. Alle run.py-Prozesse, die innerhalb
+von SNAPSHOT_TTL_S starten, lesen denselben Snapshot - und sizen damit auf
+derselben Balance.
+
+Abruf per Lease: Ist der Snapshot veraltet, holt ihn nur der Prozess, der den
+Lease im Store per compare_and_set bekommt; die anderen warten kurz auf das
+Ergebnis statt gleichzeitig dieselben Endpunkte abzufragen. Hängt der Halter,
+läuft der Lease nach LEASE_TTL_S ab.
+
+Eigene Orders verändern Positionen und freie Balance: danach invalidate().
+invalidate() überschreibt den Snapshot (Version steigt), statt ihn zu löschen;
+refresh() schreibt nur per compare_and_set gegen die vor dem Abruf gelesene
+Version. Ein Abruf, der vor einer Invalidierung begonnen hat, wird damit nicht
+mehr geteilt - die Invalidierung gewinnt immer. Gelesen wird stets aus dem
+Store, damit Invalidierungen anderer Prozesse sofort greifen.
+apply_update()/consume() nehmen Push-Events eines Positions-Streams
+(watch_positions) entgegen.
+"""
+import logging
+import os
+import time
+from typing import Dict, Iterable, List, Optional
+
+from pbot.utils.state_store import StateStore, get_state_store
+from pbot.utils.timing import timed
+
+logger = logging.getLogger(__name__)
+
+ACCOUNT_NAMESPACE = 'account'
+SNAPSHOT_TTL_S = 15.0  # master_runner startet bis zu 7 Strategien im Abstand von 2s
+LEASE_TTL_S = 10.0     # maximale Dauer eines Abrufs, danach darf ein anderer Prozess
+LEASE_POLL_S = 0.05    # Warteintervall auf den Snapshot des Lease-Halters
+
+# Felder, die aus den ccxt-Positionen übernommen werden (JSON-serialisierbar)
+POSITION_FIELDS = ('symbol', 'side', 'contracts', 'entryPrice', 'markPrice', 'notional', 'leverage',
+                   'marginMode', 'unrealizedPnl', 'liquidationPrice', 'timestamp')
+
+
+def compact_position(position: Dict) -> Dict:
+    """Reduziert eine ccxt-Position auf POSITION_FIELDS"""
+    return {field: position.get(field) for field in POSITION_FIELDS}
+
+
+def group_open_positions(positions: Iterable[Dict]) -> Dict[str, List[Dict]]:
+    """Offene Positionen (contracts > 0) gruppiert nach Symbol"""
+    grouped = {}
+    for position in positions:
+        if float(position.get('contracts') or 0) > 0:
+            grouped.setdefault(position['symbol'], []).append(compact_position(position))
+    return grouped
+
+
+class AccountSnapshotService:
+    """
+    Positionen und Balance eines Accounts aus einem geteilten Snapshot
+
+    Snapshot im Store: {'ts': Abrufzeit, 'positions': {symbol: [position, ...]},
+                        'balance': {'free': float, 'equity': {...} oder None}}
+    """
+
+    def __init__(self, exchange, store: Optional[StateStore] = None, ttl_s: float = SNAPSHOT_TTL_S,
+                 account: str = 'default', lease_ttl_s: float = LEASE_TTL_S):
+        self.exchange = exchange
+        self.store = store or get_state_store()
+        self.ttl_s = ttl_s
+        self.lease_ttl_s = lease_ttl_s
+        self.key = f"snapshot:{account}"
+        self.lease_key = f"lease:{account}"
+
+    def _fresh(self, snapshot: Optional[Dict]) -> bool:
+        return snapshot is not None and time.time() - snapshot['ts'] < self.ttl_s
+
+    # ------------------------------------------------------------------ #
+    # Lease
+    # ------------------------------------------------------------------ #
+    def _acquire_lease(self) -> Optional[int]:
+        """Version des eigenen Leases oder None, wenn ein anderer Prozess ihn hält"""
+        lease, version = self.store.get_versioned(ACCOUNT_NAMESPACE, self.lease_key)
+        if version and lease['expires'] > time.time():
+            return None
+        new_lease = {'owner': os.getpid(), 'expires': time.time() + self.lease_ttl_s}
+        if self.store.compare_and_set(ACCOUNT_NAMESPACE, self.lease_key, new_lease, version):
+            return version + 1
+        return None
+
+    def _release_lease(self, version: int):
+        """Gibt den Lease frei, sofern ihn inzwischen niemand übernommen hat"""
+        self.store.compare_and_set(ACCOUNT_NAMESPACE, self.lease_key, {'owner': None, 'expires': 0}, version)
+
+    # ------------------------------------------------------------------ #
+    # Abruf
+    # ------------------------------------------------------------------ #
+    @timed('account.refresh')
+    def refresh(self) -> Dict:
+        """Ein Abruf aller offenen Positionen und der Balance, danach für alle Prozesse im Store"""
+        _, version = self.store.get_versioned(ACCOUNT_NAMESPACE, self.key)
+        positions = self.exchange.fetch_all_open_positions()
+        balance = self.exchange.fetch_account_balance()
+        snapshot = {'ts': time.time(), 'positions': group_open_positions(positions or []), 'balance': balance}
+        if positions is None or balance is None:
+            # Abruf (teilweise) fehlgeschlagen: nicht teilen, nächster Zugriff versucht es erneut
+            snapshot['ts'] = 0.0
+            return snapshot
+        if not self.store.compare_and_set(ACCOUNT_NAMESPACE, self.key, snapshot, version):
+            # Während des Abrufs invalidiert (eigene Order eines anderen Prozesses) oder neu geschrieben:
+            # Ergebnis nur für diesen Aufrufer, nicht für alle
+            logger.debug("Account-Snapshot: Store während des Abrufs geändert – Ergebnis wird nicht geteilt.")
+        return snapshot
+
+    def snapshot(self) -> Dict:
+        """Aktueller Snapshot: aus dem Store (eigener oder anderer Prozess) oder selbst abgerufen"""
+        deadline = time.time() + self.lease_ttl_s
+        while True:
+            shared = self.store.get(ACCOUNT_NAMESPACE, self.key)
+            if self._fresh(shared):
+                return shared
+            lease_version = self._acquire_lease()
+            if lease_version is not None:
+                try:
+                    return self.refresh()
+                finally:
+                    self._release_lease(lease_version)
+            if time.time() >= deadline:
+                logger.warning("Account-Snapshot: Lease-Halter liefert nicht – rufe selbst ab.")
+                return self.refresh()
+            time.sleep(LEASE_POLL_S)
+
+    def open_positions(self, symbol: str) -> List[Dict]:
+        """Offene Positionen eines Symbols (wie Exchange.fetch_open_positions)"""
+        return self.snapshot()['positions'].get(symbol, [])
+
+    def free_balance(self) -> float:
+        """Freies USDT (wie Exchange.fetch_balance_usdt); 0 bei fehlgeschlagenem Abruf"""
+        balance = self.snapshot()['balance']
+        return balance['free'] if balance else 0
+
+    def equity(self) -> Optional[Dict]:
+        """Equity, verfügbares Guthaben, unrealisierter PnL (wie Exchange.fetch_equity_snapshot)"""
+        balance = self.snapshot()['balance']
+        return dict(balance['equity']) if balance and balance['equity'] else None
+
+    # ------------------------------------------------------------------ #
+    # Aktualisierung
+    # ------------------------------------------------------------------ #
+    def apply_update(self, symbol: str, positions: List[Dict]):
+        """Ersetzt die Positionen eines Symbols (Stream-Event); Alter des Snapshots bleibt"""
+        open_positions = group_open_positions(positions).get(symbol, [])
+
+        def patch(snapshot):
+            if snapshot is None:
+                return None
+            if open_positions:
+                snapshot['positions'][symbol] = open_positions
+            else:
+                snapshot['positions'].pop(symbol, None)
+            return snapshot
+
+        if self.store.get(ACCOUNT_NAMESPACE, self.key) is not None:
+            self.store.update(ACCOUNT_NAMESPACE, self.key, patch)
+
+    def consume(self, events: Iterable[List[Dict]]):
+        """Verarbeitet Positions-Events (Listen von ccxt-Positionen, wie watch_positions sie liefert)"""
+        for batch in events:
+            symbols = {p['symbol'] for p in batch}
+            for symbol in symbols:
+                self.apply_update(symbol, [p for p in batch if p['symbol'] == symbol])
+
+    def invalidate(self):
+        """Verwirft den Snapshot für alle Prozesse; nächster Zugriff ruft neu ab, laufende Abrufe werden nicht geteilt"""
+        self.store.put(ACCOUNT_NAMESPACE, self.key, None)
+
+
+# Ein Service pro Exchange-Instanz
+_services = {}
+
+def get_account_snapshot(exchange) -> AccountSnapshotService:
+    """Gibt den Service dieser Exchange-Instanz zurück (Account-Name als Schlüssel im Store)"""
+    service = _services.get(id(exchange))
+    if service is None or service.exchange is not exchange:
+        account = (getattr(exchange, 'account', None) or {}).get('name', 'default')
+        service = _services[id(exchange)] = AccountSnapshotService(exchange, account=account)
+    return service
@@ -0,0 +1,263 @@
+# src/pbot/utils/config_service.py
+"""
+Strategie-Konfigurationen und settings.json im Speicher, mit Hot-Reload
+
+Alle config_*.json aus src/pbot/strategy/configs/ werden einmal geladen und
+validiert; danach erkennt reload() (bzw. der Hintergrund-Thread von start())
+Änderungen per mtime/Größe (os.scandir + os.stat, kein inotify nötig) und
+liest nur geänderte Dateien neu.
+
+- Ungültige Dateien (JSON-Fehler, halb geschriebene Optimizer-Ausgabe,
+  fehlende Felder) werden verworfen; die bisherige Version bleibt aktiv und
+  die Datei wird erst bei der nächsten Änderung erneut gelesen.
+- Neue Stände werden als komplettes ConfigSnapshot-Objekt gebaut und per
+  Referenzzuweisung getauscht: Leser sehen immer einen konsistenten Stand.
+"""
+import copy
+import json
+import logging
+import os
+import threading
+import time
+from typing import Dict, NamedTuple, Optional, Tuple
+
+from pbot.utils.timeframe_utils import determine_htf, timeframe_to_seconds
+
+logger = logging.getLogger(__name__)
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', '..'))
+CONFIGS_DIR = os.path.join(PROJECT_ROOT, 'src', 'pbot', 'strategy', 'configs')
+SETTINGS_FILE = os.path.join(PROJECT_ROOT, 'settings.json')
+POLL_INTERVAL_S = 2.0
+TEMPLATE_PREFIX = 'config_TEMPLATE'  # z.B. config_TEMPLATE_v2.json (QUICKSTART_v2.md)
+
+# Risiko-Parameter, die (falls vorhanden) positive Zahlen sein müssen
+POSITIVE_RISK_KEYS = ('risk_reward_ratio', 'risk_per_trade_pct', 'leverage', 'atr_multiplier_sl',
+                      'trailing_stop_activation_rr', 'trailing_stop_callback_rate_pct')
+MARGIN_MODES = ('isolated', 'cross')
+
+
+class ConfigError(ValueError):
+    """Konfiguration ist ungültig und wird nicht übernommen"""
+
+
+class ConfigSnapshot(NamedTuple):
+    """Aktiver Konfigurationsstand (nur lesen)"""
+    version: int
+    settings: Dict               # Inhalt der settings.json
+    strategies: Dict[str, Dict]  # Dateiname -> validierte Strategie-Config (inkl. market.htf)
+    loaded_at: float
+
+
+def config_basename(symbol: str, timeframe: str) -> str:
+    """Dateiname ohne Suffix, z.B. config_BTCUSDTUSDT_30m (wie optimizer.save_config)"""
+    return f"config_{symbol.replace('/', '').replace(':', '')}_{timeframe}"
+
+
+def validate_config(config, filename: Optional[str] = None) -> Dict:
+    """
+    Prüft eine Strategie-Config und ergänzt market.htf
+
+    Args:
+        config: Geladenes JSON
+        filename: Dateiname; wenn angegeben, müssen Symbol/Timeframe dazu passen
+
+    Returns:
+        Validierte Kopie
+
+    Raises:
+        ConfigError: bei fehlenden/ungültigen Feldern
+    """
+    if not isinstance(config, dict):
+        raise ConfigError("Config ist kein JSON-Objekt")
+    for section in ('market', 'strategy', 'risk'):
+        if not isinstance(config.get(section), dict):
+            raise ConfigError(f"Abschnitt '{section}' fehlt")
+
+    market = config['market']
+    symbol, timeframe = market.get('symbol'), market.get('timeframe')
+    if not isinstance(symbol, str) or not symbol:
+        raise ConfigError("market.symbol fehlt")
+    if not timeframe_to_seconds(timeframe):
+        raise ConfigError(f"Unbekannter Timeframe: {timeframe}")
+    if filename and not filename.startswith(config_basename(symbol, timeframe)):
+        raise ConfigError(f"{symbol} ({timeframe}) passt nicht zum Dateinamen {filename}")
+
+    risk = config['risk']
+    for key in POSITIVE_RISK_KEYS:
+        value = risk.get(key)
+        if value is not None and (isinstance(value, bool) or not isinstance(value, (int, float)) or value <= 0):
+            raise ConfigError(f"risk.{key} muss eine positive Zahl sein (ist {value!r})")
+    if risk.get('risk_per_trade_pct', 0) > 100:
+        raise ConfigError("risk.risk_per_trade_pct über 100%")
+    if risk.get('margin_mode', 'isolated') not in MARGIN_MODES:
+        raise ConfigError(f"Unbekannter margin_mode: {risk.get('margin_mode')}")
+
+    validated = copy.deepcopy(config)
+    # HTF wird immer aus dem Timeframe abgeleitet (wie bisher in run.load_config)
+    validated['market']['htf'] = determine_htf(timeframe)
+    return validated
+
+
+def validate_settings(settings) -> Dict:
+    """Prüft die Grundstruktur der settings.json; Raises: ConfigError"""
+    if not isinstance(settings, dict):
+        raise ConfigError("settings.json ist kein JSON-Objekt")
+    live = settings.get('live_trading_settings', {})
+    if not isinstance(live, dict) or not isinstance(live.get('active_strategies', []), list):
+        raise ConfigError("live_trading_settings.active_strategies muss eine Liste sein")
+    return settings
+
+
+def _file_signature(stat_result) -> Tuple[int, int]:
+    return stat_result.st_mtime_ns, stat_result.st_size
+
+
+class ConfigService:
+    """
+    Hält alle Strategie-Configs und die settings.json im Speicher
+
+    Beispiel:
+        service = get_config_service()
+        service.start()  # optional: Hintergrund-Polling
+        params = service.get_config('BTC/USDT:USDT', '30m')
+    """
+
+    def __init__(self, configs_dir: str = CONFIGS_DIR, settings_file: str = SETTINGS_FILE,
+                 poll_interval_s: float = POLL_INTERVAL_S):
+        self.configs_dir = configs_dir
+        self.settings_file = settings_file
+        self.poll_interval_s = poll_interval_s
+        self._signatures: Dict[str, Tuple[int, int]] = {}  # Pfad -> (mtime_ns, Größe) des letzten Leseversuchs
+        self._reload_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._snapshot = ConfigSnapshot(0, {}, {}, 0.0)
+        self.reload()
+
+    @property
+    def snapshot(self) -> ConfigSnapshot:
+        return self._snapshot
+
+    @property
+    def version(self) -> int:
+        return self._snapshot.version
+
+    @property
+    def live_settings(self) -> Dict:
+        return self._snapshot.settings.get('live_trading_settings', {})
+
+    def _stat_files(self) -> Dict[str, Tuple[int, int]]:
+        signatures = {}
+        try:
+            with os.scandir(self.configs_dir) as entries:
+                for entry in entries:
+                    name = entry.name
+                    if (name.startswith('config_') and name.endswith('.json')
+                            and not name.startswith(TEMPLATE_PREFIX) and entry.is_file()):
+                        signatures[entry.path] = _file_signature(entry.stat())
+        except FileNotFoundError:
+            pass
+        try:
+            signatures[self.settings_file] = _file_signature(os.stat(self.settings_file))
+        except FileNotFoundError:
+            pass
+        return signatures
+
+    def _load(self, path: str):
+        with open(path, 'r') as f:
+            data = json.load(f)
+        if path == self.settings_file:
+            return validate_settings(data)
+        return validate_config(data, os.path.basename(path))
+
+    def reload(self) -> bool:
+        """
+        Liest geänderte, neue und gelöschte Dateien ein
+
+        Returns:
+            True, wenn ein neuer Stand aktiviert wurde
+        """
+        with self._reload_lock:
+            current = self._snapshot
+            signatures = self._stat_files()
+            changed = [path for path, sig in signatures.items() if self._signatures.get(path) != sig]
+            removed = [path for path in self._signatures if path not in signatures]
+            if not changed and not removed:
+                return False
+
+            settings = current.settings
+            strategies = dict(current.strategies)
+            for path in removed:
+                strategies.pop(os.path.basename(path), None)
+            updated = bool(removed)
+
+            for path in changed:
+                self._signatures[path] = signatures[path]
+                try:
+                    data = self._load(path)
+                except (OSError, ValueError) as e:  # json.JSONDecodeError und ConfigError sind ValueErrors
+                    logger.warning(f"Config {os.path.basename(path)} ungültig, behalte bisherigen Stand: {e}")
+                    continue
+                if path == self.settings_file:
+                    settings = data
+                else:
+                    strategies[os.path.basename(path)] = data
+                updated = True
+            for path in removed:
+                del self._signatures[path]
+
+            if not updated:
+                return False
+            self._snapshot = ConfigSnapshot(current.version + 1, settings, strategies, time.time())
+            if current.version:
+                logger.info(f"Konfiguration neu geladen (Version {self._snapshot.version}, "
+                            f"{len(changed)} geändert, {len(removed)} entfernt)")
+            return True
+
+    def get_config(self, symbol: str, timeframe: str, use_macd_filter: bool = False) -> Optional[Dict]:
+        """
+        Config für Symbol/Timeframe (Kopie) oder None
+
+        Reihenfolge wie bisher in run.load_config: gewünschter Suffix, ohne
+        Suffix, dann _macd.
+        """
+        strategies = self._snapshot.strategies
+        base = config_basename(symbol, timeframe)
+        for suffix in ("_macd" if use_macd_filter else "", "", "_macd"):
+            config = strategies.get(f"{base}{suffix}.json")
+            if config is not None:
+                return copy.deepcopy(config)
+        return None
+
+    def _poll(self):
+        while not self._stop.wait(self.poll_interval_s):
+            try:
+                self.reload()
+            except Exception as e:
+                logger.error(f"Fehler beim Config-Reload: {e}")
+
+    def start(self):
+        """Startet das Hintergrund-Polling (idempotent)"""
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._poll, name='config-service', daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.poll_interval_s + 1)
+
+
+_service: Optional[ConfigService] = None
+_service_pid: Optional[int] = None
+
+
+def get_config_service() -> ConfigService:
+    """Gibt die ConfigService-Instanz des Prozesses zurück"""
+    global _service, _service_pid
+    if _service is None or _service_pid != os.getpid():
+        _service = ConfigService()
+        _service_pid = os.getpid()
+    return _service
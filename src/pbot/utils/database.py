@@ -2,10 +2,18 @@
 """
 Database Integration für Trade-Logging und Performance-Analyse
 Nutzt SQLite für lokale Speicherung, kann später auf PostgreSQL/TimescaleDB migriert werden
+
+Mehrere Bot-Prozesse schreiben gleichzeitig in dieselbe Datei. Deshalb:
+- WAL-Journal (Leser blockieren Schreiber nicht, kurze Schreib-Locks)
+- eine langlebige Connection pro Prozess (Statement-Cache bleibt erhalten)
+- busy_timeout statt sofortigem "database is locked"
+- batch() für mehrere Schreibvorgänge in einer Transaktion
 """
 import sqlite3
 import json
 import os
+import threading
+import time
 from datetime import datetime
 from typing import Dict, List, Optional
 from contextlib import contextmanager
@@ -13,6 +21,13 @@ from contextlib import contextmanager
 PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', '..'))
 DB_PATH = os.path.join(PROJECT_ROOT, 'artifacts', 'db', 'pbot_trades.db')
 
+BUSY_TIMEOUT_MS = 15000      # Wartezeit auf Schreib-Lock anderer Prozesse
+STATEMENT_CACHE_SIZE = 128   # Vorbereitete Statements pro Connection
+
+# Equity-Zeitreihe: Rollup-Auflösungen (Sekunden pro Bucket) und Aufbewahrung in Tagen
+EQUITY_ROLLUPS = {'minute': 60, 'hour': 3600, 'day': 86400}
+EQUITY_RETENTION_DAYS = {'raw': 2, 'minute': 14, 'hour': 365, 'day': None}  # None = unbegrenzt
+
 
 class TradeDatabase:
     """
@@ -20,24 +35,80 @@ class TradeDatabase:
     Speichert alle Trades persistent für spätere Analyse
     """
     
-    def __init__(self, db_path: str = DB_PATH):
+    def __init__(self, db_path: str = DB_PATH, busy_timeout_ms: int = BUSY_TIMEOUT_MS):
         self.db_path = db_path
+        self.busy_timeout_ms = busy_timeout_ms
+        self._conn = None
+        self._conn_pid = None
+        self._lock = threading.RLock()  # Connection wird zwischen Threads geteilt
+        self._batch_depth = 0
         os.makedirs(os.path.dirname(db_path), exist_ok=True)
         self._init_database()
     
+    def _connection(self) -> sqlite3.Connection:
+        """Langlebige Connection dieses Prozesses (nach fork() neu aufgebaut)"""
+        if self._conn is None or self._conn_pid != os.getpid():
+            conn = sqlite3.connect(
+                self.db_path,
+                timeout=self.busy_timeout_ms / 1000.0,
+                check_same_thread=False,
+                cached_statements=STATEMENT_CACHE_SIZE
+            )
+            conn.row_factory = sqlite3.Row  # Ermöglicht dict-like access
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')  # In WAL sicher, spart fsync pro Commit
+            conn.execute(f'PRAGMA busy_timeout={int(self.busy_timeout_ms)}')
+            self._conn = conn
+            self._conn_pid = os.getpid()
+            self._batch_depth = 0
+        return self._conn
+    
     @contextmanager
     def _get_connection(self):
-        """Context Manager für DB-Connections"""
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row  # Ermöglicht dict-like access
-        try:
-            yield conn
-            conn.commit()
-        except Exception as e:
-            conn.rollback()
-            raise e
-        finally:
-            conn.close()
+        """Context Manager für DB-Zugriffe (Commit am Ende, außer innerhalb von batch())"""
+        with self._lock:
+            conn = self._connection()
+            try:
+                yield conn
+                if self._batch_depth == 0:
+                    conn.commit()
+            except Exception as e:
+                if self._batch_depth == 0:
+                    conn.rollback()
+                raise e
+    
+    @contextmanager
+    def batch(self):
+        """
+        Fasst mehrere Schreibvorgänge in einer Transaktion zusammen
+        
+        Beispiel:
+            with db.batch():
+                for info in latencies:
+                    db.log_signal_latency(info)
+        """
+        with self._lock:
+            conn = self._connection()
+            self._batch_depth += 1
+            try:
+                yield self
+            except Exception:
+                self._batch_depth -= 1
+                if self._batch_depth == 0:
+                    conn.rollback()
+                raise
+            else:
+                self._batch_depth -= 1
+                if self._batch_depth == 0:
+                    conn.commit()
+    
+    def close(self):
+        """Schließt die Connection dieses Prozesses"""
+        with self._lock:
+            if self._conn is not None and self._conn_pid == os.getpid():
+                self._conn.close()
+            self._conn = None
+            self._conn_pid = None
     
     def _init_database(self):
         """Erstellt die Datenbank-Struktur"""
@@ -123,10 +194,77 @@ class TradeDatabase:
                 )
             ''')
             
+            # Ausführungs-Latenz pro Signal (Kerzenschluss -> Fill)
+            # Zeitstempel als Unix-Sekunden (UTC), NULL wenn die Stufe nicht erreicht wurde
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS signal_latency (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    symbol TEXT NOT NULL,
+                    timeframe TEXT NOT NULL,
+                    side TEXT NOT NULL,
+                    
+                    candle_close_ts REAL NOT NULL,
+                    data_received_ts REAL,
+                    decision_ts REAL,
+                    order_sent_ts REAL,
+                    order_filled_ts REAL,      -- lastTradeTimestamp der Order (falls geliefert)
+                    position_confirmed_ts REAL, -- Position auf der Börse bestätigt
+                    protected_ts REAL,         -- SL und TSL/TP platziert
+                    
+                    order_id TEXT,
+                    status TEXT NOT NULL,      -- 'filled', 'skipped', 'order_failed', 'error'
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                )
+            ''')
+            
+            # Equity-Zeitreihe: Rohdaten pro Zyklus (Unix-Sekunden) ...
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS equity_snapshots (
+                    ts REAL NOT NULL,
+                    equity REAL NOT NULL,
+                    available REAL,
+                    unrealized_pnl REAL,
+                    open_risk_pct REAL,
+                    open_positions INTEGER
+                )
+            ''')
+            
+            # ... und fortlaufend aktualisierte Rollups (OHLC der Equity pro Bucket)
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS equity_rollups (
+                    resolution TEXT NOT NULL,  -- 'minute', 'hour', 'day'
+                    bucket_ts INTEGER NOT NULL, -- Bucket-Beginn (Unix-Sekunden, UTC)
+                    samples INTEGER NOT NULL,
+                    
+                    equity_open REAL NOT NULL,
+                    equity_high REAL NOT NULL,
+                    equity_low REAL NOT NULL,
+                    equity_close REAL NOT NULL,
+                    equity_sum REAL NOT NULL,
+                    
+                    unrealized_pnl_close REAL,
+                    open_risk_pct_max REAL,
+                    open_positions_max INTEGER,
+                    
+                    PRIMARY KEY (resolution, bucket_ts)
+                ) WITHOUT ROWID
+            ''')
+            
             # Indizes für schnellere Queries
             cursor.execute('CREATE INDEX IF NOT EXISTS idx_trades_symbol ON trades(symbol)')
             cursor.execute('CREATE INDEX IF NOT EXISTS idx_trades_entry_time ON trades(entry_time)')
             cursor.execute('CREATE INDEX IF NOT EXISTS idx_trades_status ON trades(status)')
+            # Covering-Index für get_trade_statistics (Filter + Aggregation ohne Tabellenzugriff)
+            cursor.execute('''
+                CREATE INDEX IF NOT EXISTS idx_trades_closed_stats
+                ON trades(status, exit_time, pnl_usd, symbol, timeframe)
+            ''')
+            # Migration: ältere Datenbanken kennen protected_ts noch nicht
+            latency_columns = {row[1] for row in cursor.execute('PRAGMA table_info(signal_latency)')}
+            if 'protected_ts' not in latency_columns:
+                cursor.execute('ALTER TABLE signal_latency ADD COLUMN protected_ts REAL')
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_latency_close ON signal_latency(candle_close_ts)')
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_equity_snapshots_ts ON equity_snapshots(ts)')
     
     def log_trade_open(self, trade_info: Dict) -> str:
         """
@@ -229,53 +367,293 @@ class TradeDatabase:
         """
         Berechnet Performance-Statistiken
         
+        Die Aggregation läuft komplett in SQLite (ein Durchlauf über den
+        Covering-Index, gruppiert nach Symbol/Timeframe); Python fasst nur
+        die wenigen Gruppen zu Gesamt- und Teilstatistiken zusammen.
+        
         Args:
             days: Anzahl Tage zurück
             
         Returns:
-            Dict mit Performance-Metriken
+            Dict mit Performance-Metriken, zusätzlich 'by_symbol' und
+            'by_timeframe' mit denselben Kennzahlen pro Gruppe
         """
         with self._get_connection() as conn:
             cursor = conn.cursor()
             
-            # Alle geschlossenen Trades der letzten X Tage
+            # Geschlossene Trades der letzten X Tage, aggregiert pro Symbol/Timeframe
+            # INDEXED BY: ohne Hinweis wählt der Planer wegen GROUP BY idx_trades_symbol (Full Scan)
             cursor.execute('''
-                SELECT * FROM trades 
-                WHERE status = 'closed' 
+                SELECT symbol, timeframe,
+                    COUNT(*) AS trades_count,
+                    SUM(pnl_usd > 0) AS wins_count,
+                    SUM(pnl_usd <= 0) AS losses_count,
+                    SUM(pnl_usd) AS total_pnl,
+                    SUM(CASE WHEN pnl_usd > 0 THEN pnl_usd ELSE 0 END) AS sum_wins,
+                    SUM(CASE WHEN pnl_usd <= 0 THEN pnl_usd ELSE 0 END) AS sum_losses,
+                    MAX(CASE WHEN pnl_usd > 0 THEN pnl_usd END) AS max_win,
+                    MIN(CASE WHEN pnl_usd <= 0 THEN pnl_usd END) AS max_loss
+                FROM trades INDEXED BY idx_trades_closed_stats
+                WHERE status = 'closed'
                 AND exit_time >= datetime('now', '-' || ? || ' days')
-                ORDER BY exit_time DESC
+                GROUP BY symbol, timeframe
+            ''', (days,))
+            
+            groups = [dict(row) for row in cursor.fetchall()]
+        
+        if not groups:
+            return {
+                'trades_count': 0,
+                'win_rate': 0,
+                'total_pnl_usd': 0,
+                'avg_pnl_per_trade': 0,
+                'by_symbol': {},
+                'by_timeframe': {}
+            }
+        
+        by_symbol, by_timeframe = {}, {}
+        for group in groups:
+            _merge_aggregates(by_symbol.setdefault(group['symbol'], {}), group)
+            _merge_aggregates(by_timeframe.setdefault(group['timeframe'], {}), group)
+        
+        total = {}
+        for group in groups:
+            _merge_aggregates(total, group)
+        
+        stats = _stats_from_aggregates(total)
+        stats['by_symbol'] = {k: _stats_from_aggregates(v) for k, v in by_symbol.items()}
+        stats['by_timeframe'] = {k: _stats_from_aggregates(v) for k, v in by_timeframe.items()}
+        return stats
+
+    def log_signal_latency(self, latency_info: Dict) -> int:
+        """
+        Speichert die Zeitstempel eines Signals (Kerzenschluss bis Schutz-Orders)
+        
+        Args:
+            latency_info: Dict mit symbol, timeframe, side, status und *_ts Feldern
+            
+        Returns:
+            ID des Datensatzes
+        """
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            
+            cursor.execute('''
+                INSERT INTO signal_latency (
+                    symbol, timeframe, side,
+                    candle_close_ts, data_received_ts, decision_ts,
+                    order_sent_ts, order_filled_ts, position_confirmed_ts, protected_ts,
+                    order_id, status
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ''', (
+                latency_info['symbol'],
+                latency_info['timeframe'],
+                latency_info['side'],
+                latency_info['candle_close_ts'],
+                latency_info.get('data_received_ts'),
+                latency_info.get('decision_ts'),
+                latency_info.get('order_sent_ts'),
+                latency_info.get('order_filled_ts'),
+                latency_info.get('position_confirmed_ts'),
+                latency_info.get('protected_ts'),
+                latency_info.get('order_id'),
+                latency_info.get('status', 'skipped')
+            ))
+            
+            return cursor.lastrowid
+    
+    def get_latency_report(self, days: int = 30, percentiles=(50, 90, 99)) -> List[Dict]:
+        """
+        Latenz-Perzentile pro Symbol/Timeframe
+        
+        Args:
+            days: Anzahl Tage zurück
+            percentiles: Zu berechnende Perzentile
+            
+        Returns:
+            Liste von Dicts (eine Zeile pro Symbol/Timeframe) mit Perzentilen
+            je Stufe in Millisekunden, z.B. 'close_to_fill_p90'
+        """
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            
+            # Stufen-Differenzen direkt in SQL berechnen (ms)
+            cursor.execute('''
+                SELECT symbol, timeframe,
+                    (data_received_ts - candle_close_ts) * 1000 AS close_to_data,
+                    (decision_ts - data_received_ts) * 1000 AS data_to_decision,
+                    (order_sent_ts - decision_ts) * 1000 AS decision_to_order,
+                    (COALESCE(order_filled_ts, position_confirmed_ts) - order_sent_ts) * 1000 AS order_to_fill,
+                    (COALESCE(order_filled_ts, position_confirmed_ts) - candle_close_ts) * 1000 AS close_to_fill,
+                    (protected_ts - COALESCE(order_filled_ts, position_confirmed_ts)) * 1000 AS fill_to_protection
+                FROM signal_latency
+                WHERE candle_close_ts >= strftime('%s', 'now') - ? * 86400
+                ORDER BY symbol, timeframe
             ''', (days,))
             
-            trades = [dict(row) for row in cursor.fetchall()]
+            groups = {}
+            for row in cursor.fetchall():
+                groups.setdefault((row['symbol'], row['timeframe']), []).append(row)
+        
+        report = []
+        for (symbol, timeframe), rows in groups.items():
+            entry = {'symbol': symbol, 'timeframe': timeframe, 'signals': len(rows)}
+            for stage in LATENCY_STAGES:
+                values = sorted(row[stage] for row in rows if row[stage] is not None)
+                entry[f'{stage}_count'] = len(values)
+                for p in percentiles:
+                    entry[f'{stage}_p{p}'] = _percentile(values, p)
+            report.append(entry)
+        
+        return report
+
+
+    def record_equity_snapshot(self, snapshot: Dict):
+        """
+        Speichert einen Equity-Snapshot und aktualisiert die Rollups
+        
+        Rohdaten, Minuten-, Stunden- und Tages-Buckets werden in einer
+        Transaktion geschrieben (UPSERT pro Auflösung); abgelaufene Daten
+        laut EQUITY_RETENTION_DAYS werden dabei gleich entfernt.
+        
+        Args:
+            snapshot: Dict mit equity und optional ts, available,
+                      unrealized_pnl, open_risk_pct, open_positions
+        """
+        ts = snapshot.get('ts') or time.time()
+        equity = snapshot['equity']
+        unrealized_pnl = snapshot.get('unrealized_pnl')
+        open_risk_pct = snapshot.get('open_risk_pct')
+        open_positions = snapshot.get('open_positions')
+        
+        with self.batch(), self._get_connection() as conn:
+            conn.execute('''
+                INSERT INTO equity_snapshots (ts, equity, available, unrealized_pnl, open_risk_pct, open_positions)
+                VALUES (?, ?, ?, ?, ?, ?)
+            ''', (ts, equity, snapshot.get('available'), unrealized_pnl, open_risk_pct, open_positions))
+            
+            for resolution, seconds in EQUITY_ROLLUPS.items():
+                bucket_ts = int(ts // seconds * seconds)
+                conn.execute('''
+                    INSERT INTO equity_rollups (
+                        resolution, bucket_ts, samples,
+                        equity_open, equity_high, equity_low, equity_close, equity_sum,
+                        unrealized_pnl_close, open_risk_pct_max, open_positions_max
+                    ) VALUES (?, ?, 1, ?, ?, ?, ?, ?, ?, ?, ?)
+                    ON CONFLICT (resolution, bucket_ts) DO UPDATE SET
+                        samples = samples + 1,
+                        equity_high = MAX(equity_high, excluded.equity_high),
+                        equity_low = MIN(equity_low, excluded.equity_low),
+                        equity_close = excluded.equity_close,
+                        equity_sum = equity_sum + excluded.equity_sum,
+                        unrealized_pnl_close = excluded.unrealized_pnl_close,
+                        open_risk_pct_max = MAX(COALESCE(open_risk_pct_max, excluded.open_risk_pct_max), COALESCE(excluded.open_risk_pct_max, open_risk_pct_max)),
+                        open_positions_max = MAX(COALESCE(open_positions_max, excluded.open_positions_max), COALESCE(excluded.open_positions_max, open_positions_max))
+                ''', (
+                    resolution, bucket_ts,
+                    equity, equity, equity, equity, equity,
+                    unrealized_pnl, open_risk_pct, open_positions
+                ))
             
-            if not trades:
-                return {
-                    'trades_count': 0,
-                    'win_rate': 0,
-                    'total_pnl_usd': 0,
-                    'avg_pnl_per_trade': 0
-                }
+            self._prune_equity(conn, ts)
+    
+    def _prune_equity(self, conn: sqlite3.Connection, now_ts: float):
+        """Löscht Equity-Daten außerhalb der Aufbewahrungsfrist"""
+        for resolution, days in EQUITY_RETENTION_DAYS.items():
+            if days is None:
+                continue
+            cutoff = now_ts - days * 86400
+            if resolution == 'raw':
+                conn.execute('DELETE FROM equity_snapshots WHERE ts < ?', (cutoff,))
+            else:
+                conn.execute('DELETE FROM equity_rollups WHERE resolution = ? AND bucket_ts < ?', (resolution, cutoff))
+    
+    def get_last_equity_snapshot(self) -> Optional[Dict]:
+        """Gibt den jüngsten Equity-Snapshot zurück (None wenn keiner existiert)"""
+        with self._get_connection() as conn:
+            row = conn.execute('SELECT * FROM equity_snapshots ORDER BY ts DESC LIMIT 1').fetchone()
+            return dict(row) if row else None
+    
+    def get_equity_history(self, resolution: str = 'hour', days: int = 30) -> List[Dict]:
+        """
+        Liefert die Equity-Zeitreihe ohne Börsen-Abfrage
+        
+        Args:
+            resolution: 'raw', 'minute', 'hour' oder 'day'
+            days: Anzahl Tage zurück
             
-            wins = [t for t in trades if t['pnl_usd'] > 0]
-            losses = [t for t in trades if t['pnl_usd'] <= 0]
+        Returns:
+            Liste von Dicts (aufsteigend nach Zeit); Rollups enthalten
+            equity_open/high/low/close und equity_avg
+        """
+        since = time.time() - days * 86400
+        with self._get_connection() as conn:
+            if resolution == 'raw':
+                cursor = conn.execute(
+                    'SELECT * FROM equity_snapshots WHERE ts >= ? ORDER BY ts', (since,)
+                )
+                return [dict(row) for row in cursor.fetchall()]
             
-            total_pnl = sum(t['pnl_usd'] for t in trades)
-            total_wins = sum(t['pnl_usd'] for t in wins) if wins else 0
-            total_losses = abs(sum(t['pnl_usd'] for t in losses)) if losses else 1
+            if resolution not in EQUITY_ROLLUPS:
+                raise ValueError(f"Unbekannte Auflösung: {resolution}")
             
-            return {
-                'trades_count': len(trades),
-                'wins_count': len(wins),
-                'losses_count': len(losses),
-                'win_rate': (len(wins) / len(trades) * 100) if trades else 0,
-                'total_pnl_usd': total_pnl,
-                'avg_pnl_per_trade': total_pnl / len(trades) if trades else 0,
-                'max_win': max((t['pnl_usd'] for t in wins), default=0),
-                'max_loss': min((t['pnl_usd'] for t in losses), default=0),
-                'avg_win': total_wins / len(wins) if wins else 0,
-                'avg_loss': total_losses / len(losses) if losses else 0,
-                'profit_factor': total_wins / total_losses if total_losses > 0 else 0,
-            }
+            cursor = conn.execute('''
+                SELECT bucket_ts, samples, equity_open, equity_high, equity_low, equity_close,
+                    equity_sum / samples AS equity_avg,
+                    unrealized_pnl_close, open_risk_pct_max, open_positions_max
+                FROM equity_rollups
+                WHERE resolution = ? AND bucket_ts >= ?
+                ORDER BY bucket_ts
+            ''', (resolution, int(since // EQUITY_ROLLUPS[resolution] * EQUITY_ROLLUPS[resolution])))
+            return [dict(row) for row in cursor.fetchall()]
+
+
+def _merge_aggregates(target: Dict, group: Dict):
+    """Addiert die SQL-Aggregate einer Gruppe auf ein Sammel-Dict"""
+    for key in ('trades_count', 'wins_count', 'losses_count', 'total_pnl', 'sum_wins', 'sum_losses'):
+        target[key] = target.get(key, 0) + (group[key] or 0)
+    for key, pick in (('max_win', max), ('max_loss', min)):
+        values = [v for v in (target.get(key), group[key]) if v is not None]
+        target[key] = pick(values) if values else None
+
+
+def _stats_from_aggregates(agg: Dict) -> Dict:
+    """Leitet die Performance-Kennzahlen aus Summen/Zählern ab"""
+    trades_count = agg['trades_count']
+    wins_count = agg['wins_count']
+    losses_count = agg['losses_count']
+    total_pnl = agg['total_pnl']
+    total_wins = agg['sum_wins'] if wins_count else 0
+    total_losses = abs(agg['sum_losses']) if losses_count else 1
+    
+    return {
+        'trades_count': trades_count,
+        'wins_count': wins_count,
+        'losses_count': losses_count,
+        'win_rate': (wins_count / trades_count * 100) if trades_count else 0,
+        'total_pnl_usd': total_pnl,
+        'avg_pnl_per_trade': total_pnl / trades_count if trades_count else 0,
+        'max_win': agg['max_win'] if agg['max_win'] is not None else 0,
+        'max_loss': agg['max_loss'] if agg['max_loss'] is not None else 0,
+        'avg_win': total_wins / wins_count if wins_count else 0,
+        'avg_loss': total_losses / losses_count if losses_count else 0,
+        'profit_factor': total_wins / total_losses if total_losses > 0 else 0,
+    }
+
+
+# Latenz-Stufen (Spaltennamen im Report)
+LATENCY_STAGES = ('close_to_data', 'data_to_decision', 'decision_to_order', 'order_to_fill', 'close_to_fill',
+                  'fill_to_protection')
+
+
+def _percentile(sorted_values: List[float], p: float) -> Optional[float]:
+    """Perzentil mit linearer Interpolation (wie numpy.percentile) für eine sortierte Liste"""
+    if not sorted_values:
+        return None
+    k = (len(sorted_values) - 1) * p / 100.0
+    lower = int(k)
+    upper = min(lower + 1, len(sorted_values) - 1)
+    return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * (k - lower)
 
 
 # Singleton-Instanz
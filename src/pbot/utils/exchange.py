@@ -1,14 +1,24 @@
 # /root/pbot/src/pbot/utils/exchange.py
 # VERSION V28 - FINAL HYBRID: Live-Data Priority + Robust Execution + Brute Force Cleanup
-import ccxt
-import pandas as pd
 from datetime import datetime, timezone, timedelta
 import time
 import logging
 import os
 
+from pbot.utils.lazy_import import lazy_module
+from pbot.utils.timing import span, timed
+
+ccxt = lazy_module('ccxt')
+pd = lazy_module('pandas')
+
 logger = logging.getLogger(__name__)
 
+# --- Warten auf Börsenzustand (wait_until): erst kurz, dann exponentiell länger pollen ---
+WAIT_INITIAL_S = 0.05
+WAIT_MAX_INTERVAL_S = 0.5
+WAIT_TIMEOUT_S = 5.0
+CANCEL_SETTLE_S = 1.0  # Massen-Löschung: so lange auf leere Trigger-Liste warten, dann einzeln löschen
+
 # --- Pfad für Fallback-Cache ---
 PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', '..'))
 
@@ -33,6 +43,7 @@ def load_data_from_cache_or_fetch(symbol, timeframe, start_date_str, end_date_st
 class Exchange:
     def __init__(self, account_config):
         self.account = account_config
+        self.market_feed = None  # MarketFeed (run.py --resident): Kerzen aus dem Speicher statt per REST
         self.exchange = getattr(ccxt, 'bitget')({
             'apiKey': self.account.get('apiKey'),
             'secret': self.account.get('secret'),
@@ -43,7 +54,8 @@ class Exchange:
             'enableRateLimit': True,
         })
         try:
-            self.markets = self.exchange.load_markets()
+            with span('exchange.load_markets'):
+                self.markets = self.exchange.load_markets()
             logger.info("Bitget Märkte erfolgreich geladen.")
         except Exception as e:
             logger.critical(f"FATAL: Fehler beim Laden der Märkte: {e}")
@@ -51,7 +63,16 @@ class Exchange:
 
     # --- 1. DATA FETCHING (Live Data Priority) ---
     
+    def attach_market_feed(self, feed):
+        """fetch_recent_ohlcv bedient abonnierte (Symbol, Timeframe) ab jetzt aus dem Feed"""
+        self.market_feed = feed
+
+    @timed('exchange.fetch_recent_ohlcv')
     def fetch_recent_ohlcv(self, symbol, timeframe, limit=300):
+        if self.market_feed is not None:
+            data = self.market_feed.frame(symbol, timeframe, limit)
+            if data is not None:
+                return data
         if not self.markets: return pd.DataFrame()
 
         # IMMER zuerst Live-API versuchen!
@@ -144,8 +165,8 @@ class Exchange:
         df.set_index('timestamp', inplace=True)
         df = df[~df.index.duplicated(keep='first')].sort_index()
         return df.loc[start_dt:end_dt]
-            return pd.DataFrame()
 
+    @timed('exchange.fetch_ticker')
     def fetch_ticker(self, symbol):
         if not self.markets: return None
         try:
@@ -156,6 +177,7 @@ class Exchange:
 
     # --- 2. EXECUTION LOGIC (Robust) ---
 
+    @timed('exchange.set_margin_mode')
     def set_margin_mode(self, symbol, mode='isolated'):
         if not self.markets: return False
         try:
@@ -166,6 +188,7 @@ class Exchange:
             logger.warning(f"Info: Margin-Modus ({mode}) konnte nicht explizit gesetzt werden: {e}")
             return True # Trotzdem weitermachen
 
+    @timed('exchange.set_leverage')
     def set_leverage(self, symbol, level=10):
         if not self.markets: return False
         try:
@@ -176,6 +199,7 @@ class Exchange:
             logger.warning(f"Info: Hebel ({level}x) konnte nicht explizit gesetzt werden: {e}")
             return True # Trotzdem weitermachen
 
+    @timed('exchange.create_market_order')
     def create_market_order(self, symbol, side, amount, params={}):
         # Params werden NICHT gefiltert (marginMode wird durchgereicht)
         if not self.markets: return None
@@ -195,6 +219,17 @@ class Exchange:
             logger.error(f"Fehler bei Market Order ({symbol}): {e}")
             return None
 
+    @timed('exchange.fetch_order')
+    def fetch_order(self, order_id, symbol):
+        """Order-Status (filled, average, ...) per ID; None bei Fehler"""
+        if not self.markets: return None
+        try:
+            return self.exchange.fetch_order(order_id, symbol, params={'productType': 'USDT-FUTURES'})
+        except Exception as e:
+            logger.error(f"Fehler bei fetch_order ({symbol}, {order_id}): {e}")
+            return None
+
+    @timed('exchange.place_trigger_market_order')
     def place_trigger_market_order(self, symbol, side, amount, trigger_price, params={}):
         if not self.markets: return None
         try:
@@ -216,6 +251,7 @@ class Exchange:
             logger.error(f"Fehler bei Trigger Order: {e}")
             return None
 
+    @timed('exchange.place_trailing_stop_order')
     def place_trailing_stop_order(self, symbol, side, amount, activation_price, callback_rate_decimal, params={}):
         if not self.markets: return None
         try:
@@ -236,6 +272,7 @@ class Exchange:
 
     # --- 3. MANAGEMENT & CLEANUP (New Brute Force Logic) ---
 
+    @timed('exchange.fetch_open_positions')
     def fetch_open_positions(self, symbol):
         if not self.markets: return []
         try:
@@ -246,6 +283,19 @@ class Exchange:
             logger.error(f"Fehler bei fetch_open_positions: {e}")
             return []
 
+    @timed('exchange.fetch_all_open_positions')
+    def fetch_all_open_positions(self):
+        """Alle offenen Positionen des Accounts mit einem Aufruf; None bei Fehler (für den AccountSnapshotService)"""
+        if not self.markets: return None
+        try:
+            params = {'productType': 'USDT-FUTURES'}
+            positions = self.exchange.fetch_positions(None, params=params)
+            return [p for p in positions if float(p.get('contracts') or 0) > 0]
+        except Exception as e:
+            logger.error(f"Fehler bei fetch_all_open_positions: {e}")
+            return None
+
+    @timed('exchange.fetch_open_trigger_orders')
     def fetch_open_trigger_orders(self, symbol):
         if not self.markets: return []
         try:
@@ -255,22 +305,72 @@ class Exchange:
             logger.error(f"Fehler bei Trigger Orders: {e}")
             return []
 
+    @staticmethod
+    def _parse_free_usdt(balance):
+        """Verfügbares USDT aus einer fetch_balance-Antwort"""
+        if 'USDT' in balance and 'free' in balance['USDT']:
+            return float(balance['USDT']['free'])
+        if 'info' in balance and 'data' in balance['info']:
+             for asset in balance['info']['data']:
+                 if asset.get('marginCoin') == 'USDT':
+                     return float(asset.get('available', 0))
+        return 0
+
+    @staticmethod
+    def _parse_equity(balance):
+        """Equity, verfügbares Guthaben und unrealisierter PnL (USDT) aus einer fetch_balance-Antwort"""
+        if 'info' in balance and isinstance(balance['info'], list):
+            for asset in balance['info']:
+                if asset.get('marginCoin') == 'USDT':
+                    return {
+                        'equity': float(asset.get('accountEquity') or asset.get('usdtEquity') or 0),
+                        'available': float(asset.get('available') or 0),
+                        'unrealized_pnl': float(asset.get('unrealizedPL') or 0),
+                    }
+        usdt = balance.get('USDT', {})
+        if usdt.get('total') is not None:
+            return {'equity': float(usdt['total']), 'available': float(usdt.get('free') or 0), 'unrealized_pnl': None}
+        return None
+
+    @timed('exchange.fetch_balance_usdt')
     def fetch_balance_usdt(self):
         if not self.markets: return 0
         try:
             params = {'productType': 'USDT-FUTURES'}
-            balance = self.exchange.fetch_balance(params=params)
-            if 'USDT' in balance and 'free' in balance['USDT']:
-                return float(balance['USDT']['free'])
-            if 'info' in balance and 'data' in balance['info']:
-                 for asset in balance['info']['data']:
-                     if asset.get('marginCoin') == 'USDT':
-                         return float(asset.get('available', 0))
-            return 0
+            return self._parse_free_usdt(self.exchange.fetch_balance(params=params))
         except Exception as e:
             logger.error(f"Fehler bei Balance: {e}")
             return 0
 
+    @timed('exchange.fetch_equity_snapshot')
+    def fetch_equity_snapshot(self):
+        """Equity, verfügbares Guthaben und unrealisierter PnL (USDT) aus einem fetch_balance"""
+        if not self.markets: return None
+        try:
+            params = {'productType': 'USDT-FUTURES'}
+            return self._parse_equity(self.exchange.fetch_balance(params=params))
+        except Exception as e:
+            logger.error(f"Fehler bei Equity-Snapshot: {e}")
+            return None
+
+    @timed('exchange.fetch_account_balance')
+    def fetch_account_balance(self):
+        """
+        Freies USDT und Equity-Snapshot aus EINEM fetch_balance (für den AccountSnapshotService)
+
+        Returns:
+            {'free': float, 'equity': {...} oder None}; None bei Fehler
+        """
+        if not self.markets: return None
+        try:
+            params = {'productType': 'USDT-FUTURES'}
+            balance = self.exchange.fetch_balance(params=params)
+            return {'free': self._parse_free_usdt(balance), 'equity': self._parse_equity(balance)}
+        except Exception as e:
+            logger.error(f"Fehler bei fetch_account_balance: {e}")
+            return None
+
+    @timed('exchange.cancel_all_orders_for_symbol')
     def cancel_all_orders_for_symbol(self, symbol):
         """Brute Force Löschung: Erst Massen-Löschen, dann gezieltes Einzel-Löschen"""
         if not self.markets: return 0
@@ -287,17 +387,20 @@ class Exchange:
             count += 1
         except Exception: pass
         
-        time.sleep(0.5) # Kurz warten
+        # Warten, bis die Börse keine Trigger-Orders mehr meldet (statt fest 0.5s)
+        with span('exchange.cancel_settle'):
+            cleared, open_triggers = self.wait_until(lambda: self.fetch_open_trigger_orders(symbol),
+                                                     lambda orders: not orders, timeout_s=CANCEL_SETTLE_S)
+        if cleared:
+            return count
 
         # 2. Versuch: Gezielte Einzel-Löschung (Der "Zombie-Killer")
         try:
-            # Hole ALLE offenen Orders (auch Trigger)
-            open_triggers = self.fetch_open_trigger_orders(symbol)
             for order in open_triggers:
                 try:
+                    # Rate Limit übernimmt ccxt (enableRateLimit)
                     self.exchange.cancel_order(order['id'], symbol, params={'productType': 'USDT-FUTURES', 'stop': True})
                     count += 1
-                    time.sleep(0.1) # Rate Limit beachten
                 except Exception as e:
                     logger.warning(f"Konnte Einzel-Order {order['id']} nicht löschen: {e}")
         except Exception as e:
@@ -307,3 +410,67 @@ class Exchange:
     
     def cleanup_all_open_orders(self, symbol):
         return self.cancel_all_orders_for_symbol(symbol)
+
+    # --- 4. WARTEN AUF ZUSTAND (statt fester Sleeps) ---
+
+    def wait_until(self, probe, condition=bool, timeout_s=WAIT_TIMEOUT_S,
+                   initial_s=WAIT_INITIAL_S, max_interval_s=WAIT_MAX_INTERVAL_S):
+        """
+        Ruft probe() auf, bis condition(Ergebnis) erfüllt ist oder die Deadline abläuft
+
+        Abstände: initial_s, verdoppelt bis max_interval_s. Der erste Aufruf
+        erfolgt sofort, der letzte spätestens zur Deadline.
+
+        Returns:
+            (erfüllt: bool, letztes Ergebnis von probe)
+        """
+        deadline = time.monotonic() + timeout_s
+        interval = initial_s
+        while True:
+            result = probe()
+            if condition(result):
+                return True, result
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False, result
+            time.sleep(min(interval, remaining))
+            interval = min(interval * 2, max_interval_s)
+
+    @timed('exchange.wait_for_order_fill')
+    def wait_for_order_fill(self, order_id, symbol, timeout_s=WAIT_TIMEOUT_S):
+        """Pollt fetch_order bis die Order vollständig gefüllt ist; letzte Order-Antwort oder None"""
+        _, order = self.wait_until(lambda: self.fetch_order(order_id, symbol), self.is_fully_filled, timeout_s)
+        return order
+
+    @staticmethod
+    def is_fully_filled(order):
+        """Order komplett ausgeführt (status 'closed' oder filled >= amount); Teil-Fills zählen nicht"""
+        if not order:
+            return False
+        filled = float(order.get('filled') or 0)
+        if filled <= 0:
+            return False
+        amount = float(order.get('amount') or 0)
+        return order.get('status') == 'closed' or (amount > 0 and filled >= amount * (1 - 1e-9))
+
+    def _positions_or_none(self, symbol):
+        # Wie fetch_open_positions, aber Fehler (None) von "keine Position" ([]) unterscheidbar
+        try:
+            positions = self.exchange.fetch_positions([symbol], params={'productType': 'USDT-FUTURES'})
+            return [p for p in positions if float(p.get('contracts') or 0) > 0]
+        except Exception as e:
+            logger.warning(f"Fehler beim Positions-Polling ({symbol}): {e}")
+            return None
+
+    @timed('exchange.wait_for_position')
+    def wait_for_position(self, symbol, is_open=True, timeout_s=WAIT_TIMEOUT_S):
+        """
+        Pollt die Position, bis sie offen (is_open=True) bzw. geschlossen ist
+
+        Returns:
+            (erreicht: bool, offene Positionen beim letzten Abruf; [] wenn unbekannt)
+        """
+        if not self.markets: return False, []
+        reached, positions = self.wait_until(lambda: self._positions_or_none(symbol),
+                                             lambda p: p is not None and bool(p) == is_open, timeout_s)
+        return reached, positions or []
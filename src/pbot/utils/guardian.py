@@ -2,7 +2,7 @@
 import logging
 from functools import wraps
 # *** Geänderter Importpfad ***
-from pbot.utils.telegram import send_message
+from pbot.utils.telegram import queue_message
 
 def guardian_decorator(func):
     """
@@ -52,7 +52,7 @@ def guardian_decorator(func):
             try:
                 # *** Geänderter Name ***
                 telegram_message = f"🚨 *Kritischer Systemfehler* im Guardian-Decorator für *{symbol} ({timeframe})*."
-                send_message(
+                queue_message(
                     telegram_config.get('bot_token'),
                     telegram_config.get('chat_id'),
                     telegram_message
@@ -0,0 +1,45 @@
+# src/pbot/utils/lazy_import.py
+"""
+Verzögerte Imports für schwere Abhängigkeiten (ccxt, optuna, plotly, ta, pandas)
+
+    ccxt = lazy_module('ccxt')
+
+ersetzt `import ccxt`: das Modul wird erst beim ersten Attributzugriff
+(z.B. ccxt.bitget(...) oder `except ccxt.NetworkError`) geladen. Skripte,
+die nur Argumente prüfen, Hilfe ausgeben oder früh aussteigen, zahlen die
+Importzeit so gar nicht. Nur für Zugriffe innerhalb von Funktionen
+verwenden - Annotationen oder Klassen-Basen auf Modulebene laden sofort.
+"""
+import importlib
+import sys
+
+
+class LazyModule:
+    """Stellvertreter, der beim ersten Attributzugriff das echte Modul importiert"""
+
+    __slots__ = ('_name', '_module')
+
+    def __init__(self, name):
+        self._name = name
+        self._module = None
+
+    def _load(self):
+        if self._module is None:
+            self._module = importlib.import_module(self._name)
+        return self._module
+
+    def __getattr__(self, attr):
+        return getattr(self._load(), attr)
+
+    def __dir__(self):
+        return dir(self._load())
+
+    def __repr__(self):
+        state = 'geladen' if self._module is not None else 'noch nicht geladen'
+        return f"<LazyModule {self._name} ({state})>"
+
+
+def lazy_module(name):
+    """Liefert das Modul direkt, falls es schon importiert ist, sonst einen LazyModule-Stellvertreter"""
+    module = sys.modules.get(name)
+    return module if module is not None else LazyModule(name)
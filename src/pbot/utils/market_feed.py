@@ -0,0 +1,259 @@
+# src/pbot/utils/market_feed.py
+"""
+Kerzen-Feed per WebSocket mit REST-Fallback (für run.py --resident)
+
+Der Cron-Pfad lädt bei jedem Lauf fetch_ohlcv(limit=300), also 299 bekannte
+Kerzen, um eine neue zu erfahren. Der MarketFeed lädt die Historie einmal
+per REST, abonniert danach die Kerzen-Kanäle (ccxt.pro watch_ohlcv) und hält
+pro (Symbol, Timeframe) einen OHLCVRingBuffer im Speicher:
+
+- Kerzenschluss: Sobald die erste Kerze mit neuem Zeitstempel eintrifft, ist
+  die vorherige final -> on_close(symbol, timeframe) wird aufgerufen.
+- frame(): geschlossene Kerzen + laufende Kerze als DataFrame im Format von
+  Exchange.fetch_recent_ohlcv (die laufende Kerze ist wie beim Cron-Lauf kurz
+  nach Kerzenschluss die letzte Zeile); window() liefert dieselben Kerzen als
+  NumPy-Views ohne Kopie.
+- Verbindungsabbruch: Wiederverbinden mit Backoff, verpasste Kerzen per
+  fetch_ohlcv(since=...) nachladen.
+
+Die Quelle (source) ist alles mit den Coroutinen watch_ohlcv, fetch_ohlcv
+und close - ccxt.pro.bitget live, ReplayCandleSource für Tests/Benchmarks.
+"""
+import asyncio
+import logging
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from pbot.utils.lazy_import import lazy_module
+from pbot.utils.ring_buffer import OHLCVRingBuffer, OHLCVWindow
+from pbot.utils.timeframe_utils import timeframe_to_seconds
+
+ccxt = lazy_module('ccxt')
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_HISTORY = 300          # wie fetch_recent_ohlcv(limit=300)
+RECONNECT_DELAY_S = 1.0        # erster Wiederverbindungsversuch
+MAX_RECONNECT_DELAY_S = 30.0   # Obergrenze des exponentiellen Backoffs
+
+
+def bitget_pro_source():
+    """Öffentlicher ccxt.pro-Client für Bitget-Futures (im Event-Loop des Feeds erzeugen)"""
+    import ccxt.pro
+    return ccxt.pro.bitget({'options': {'defaultType': 'swap'}, 'enableRateLimit': True})
+
+
+class MarketFeed:
+    """
+    Kerzen-Puffer pro (Symbol, Timeframe), gespeist aus einem WebSocket-Stream
+
+    Args:
+        source_factory: Erzeugt die Quelle im Event-Loop des Feeds
+        subscriptions:  [(symbol, timeframe), ...]
+        on_close:       Wird nach jedem Kerzenschluss mit (symbol, timeframe) aufgerufen
+        history:        Anzahl Kerzen, die frame() maximal liefert
+    """
+
+    def __init__(self, subscriptions: Iterable[Tuple[str, str]], on_close: Optional[Callable[[str, str], None]] = None,
+                 source_factory: Callable = bitget_pro_source, history: int = DEFAULT_HISTORY,
+                 reconnect_delay_s: float = RECONNECT_DELAY_S):
+        self.subscriptions = list(dict.fromkeys(subscriptions))
+        self.on_close = on_close
+        self.source_factory = source_factory
+        self.history = history
+        self.reconnect_delay_s = reconnect_delay_s
+        # Letzte Kerze im Puffer = laufende Kerze, alle davor sind geschlossen
+        self._buffers: Dict[Tuple[str, str], OHLCVRingBuffer] = {key: OHLCVRingBuffer(history) for key in self.subscriptions}
+        self._lock = threading.Lock()  # Puffer werden im Feed-Thread geschrieben, in run.py gelesen
+        self._ready = threading.Event()
+        self._stopped = threading.Event()
+        self._thread = None
+        self.source = None
+        self.reconnects = 0
+
+    # ------------------------------------------------------------------ #
+    # Lesen
+    # ------------------------------------------------------------------ #
+    def frame(self, symbol: str, timeframe: str, limit: Optional[int] = None):
+        """OHLCV-DataFrame (geschlossene Kerzen + laufende Kerze); None, wenn nicht abonniert/leer"""
+        buffer = self._buffers.get((symbol, timeframe))
+        if buffer is None:
+            return None
+        with self._lock:
+            return buffer.to_frame(limit) if len(buffer) else None
+
+    def window(self, symbol: str, timeframe: str, limit: Optional[int] = None) -> Optional[OHLCVWindow]:
+        """
+        NumPy-Views auf die letzten Kerzen (ohne Kopie); None, wenn nicht abonniert
+
+        Die Views werden vom Feed-Thread weiter beschrieben - nur innerhalb des
+        on_close-Callbacks (läuft im Feed-Thread) verwenden oder kopieren.
+        """
+        buffer = self._buffers.get((symbol, timeframe))
+        return buffer.window(limit) if buffer is not None else None
+
+    def last_closed_ts(self, symbol: str, timeframe: str) -> Optional[int]:
+        """Zeitstempel (ms) der letzten geschlossenen Kerze"""
+        buffer = self._buffers.get((symbol, timeframe))
+        return buffer.timestamp_at(-2) if buffer is not None and len(buffer) > 1 else None
+
+    # ------------------------------------------------------------------ #
+    # Puffer-Pflege
+    # ------------------------------------------------------------------ #
+    def _apply(self, key: Tuple[str, str], candles: List[List]) -> int:
+        """Übernimmt Kerzen (aufsteigend); liefert die Anzahl neu geschlossener Kerzen"""
+        closed_count = 0
+        buffer = self._buffers[key]
+        with self._lock:
+            for candle in candles:
+                timestamp, values = int(candle[0]), [float(v) for v in candle[1:6]]
+                forming_ts = buffer.last_timestamp
+                if forming_ts is None:
+                    buffer.append(timestamp, *values)
+                elif timestamp == forming_ts:
+                    buffer.update_last(timestamp, *values)
+                elif timestamp > forming_ts:
+                    buffer.append(timestamp, *values)
+                    closed_count += 1
+                # ältere Kerzen (verspätete Updates) ignorieren
+        return closed_count
+
+    def _has_gap(self, key: Tuple[str, str], candles: List[List]) -> bool:
+        """True, wenn zwischen laufender und neuer Kerze Kerzen fehlen"""
+        forming_ts = self._buffers[key].last_timestamp
+        if forming_ts is None or not candles:
+            return False
+        step_s = timeframe_to_seconds(key[1])
+        return bool(step_s) and int(candles[0][0]) > forming_ts + step_s * 1000
+
+    async def _backfill(self, key: Tuple[str, str], initial: bool = False):
+        """Lädt die Historie (initial) bzw. die seit der laufenden Kerze verpassten Kerzen per REST"""
+        symbol, timeframe = key
+        forming_ts = self._buffers[key].last_timestamp
+        if initial or forming_ts is None:
+            candles = await self.source.fetch_ohlcv(symbol, timeframe, limit=self.history)
+        else:
+            candles = await self.source.fetch_ohlcv(symbol, timeframe, since=forming_ts, limit=self.history)
+        closed_count = self._apply(key, sorted(candles or [], key=lambda c: c[0]))
+        if closed_count and not initial:
+            logger.info(f"MarketFeed: {closed_count} Kerze(n) für {symbol} ({timeframe}) per REST nachgeladen.")
+        return closed_count
+
+    def _notify(self, key: Tuple[str, str]):
+        if self.on_close is None:
+            return
+        try:
+            self.on_close(*key)
+        except Exception as e:
+            logger.error(f"MarketFeed: Fehler im Kerzenschluss-Callback für {key}: {e}", exc_info=True)
+
+    # ------------------------------------------------------------------ #
+    # Stream
+    # ------------------------------------------------------------------ #
+    async def _watch(self, key: Tuple[str, str]):
+        symbol, timeframe = key
+        delay = self.reconnect_delay_s
+        while not self._stopped.is_set():
+            try:
+                candles = sorted(await self.source.watch_ohlcv(symbol, timeframe), key=lambda c: c[0])
+                closed_count = await self._backfill(key) if self._has_gap(key, candles) else 0
+                closed_count += self._apply(key, candles)
+                delay = self.reconnect_delay_s
+                if closed_count:
+                    self._notify(key)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                if self._stopped.is_set():
+                    break
+                self.reconnects += 1
+                logger.warning(f"MarketFeed: Stream {symbol} ({timeframe}) unterbrochen: {e} – neuer Versuch in {delay:.0f}s.")
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, MAX_RECONNECT_DELAY_S)
+                try:
+                    if await self._backfill(key):
+                        self._notify(key)
+                except Exception as fill_error:
+                    logger.warning(f"MarketFeed: REST-Nachladen für {symbol} ({timeframe}) fehlgeschlagen: {fill_error}")
+
+    async def run(self):
+        """Lädt die Historie und verarbeitet die Streams, bis stop() aufgerufen wird"""
+        self.source = self.source_factory()
+        try:
+            await asyncio.gather(*(self._backfill(key, initial=True) for key in self.subscriptions))
+            self._ready.set()
+            tasks = [asyncio.ensure_future(self._watch(key)) for key in self.subscriptions]
+            while not self._stopped.is_set():
+                await asyncio.sleep(0.05)
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+        finally:
+            self._ready.set()
+            await self.source.close()
+
+    def start(self, timeout_s: float = 60.0) -> bool:
+        """Startet den Feed in einem Hintergrund-Thread; True, sobald die Historie geladen ist"""
+        self._thread = threading.Thread(target=lambda: asyncio.run(self.run()), name='market-feed', daemon=True)
+        self._thread.start()
+        return self._ready.wait(timeout_s) and self._thread.is_alive()
+
+    def stop(self, timeout_s: float = 10.0):
+        """Beendet die Streams und schließt die Quelle"""
+        self._stopped.set()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(timeout_s)
+
+
+class ReplayCandleSource:
+    """
+    Lokaler Ersatz für den Bitget-Stream: spielt vorgegebene Kerzen ab
+
+    Jeder watch_ohlcv-Aufruf liefert nach interval_s das nächste Update einer
+    Kerzenliste (Zeitstempel in ms, aufsteigend; mehrere Updates derselben
+    Kerze erlaubt). fetch_ohlcv beantwortet REST-Anfragen aus den bereits
+    "vergangenen" Kerzen. disconnect_at: Update-Index -> Anzahl Updates, die
+    während des Abbruchs verloren gehen (watch_ohlcv wirft NetworkError).
+    """
+
+    def __init__(self, updates: Dict[Tuple[str, str], List[List]], history: Dict[Tuple[str, str], List[List]] = None,
+                 interval_s: float = 0.0, disconnect_at: Dict[int, int] = None):
+        self.updates = {key: list(rows) for key, rows in updates.items()}
+        self.history = {key: list(rows) for key, rows in (history or {}).items()}
+        self.interval_s = interval_s
+        self.disconnect_at = dict(disconnect_at or {})
+        self.position = {key: 0 for key in self.updates}
+        self.sent_ts = {}     # key -> perf_counter-Zeit des zuletzt gesendeten Updates
+        self.rest_calls = 0
+
+    def _past(self, key):
+        """Bis zur aktuellen Position bekannte Kerzen (letzter Stand je Zeitstempel)"""
+        rows = {row[0]: row for row in self.history.get(key, [])}
+        for row in self.updates[key][:self.position[key]]:
+            rows[row[0]] = row
+        return [rows[ts] for ts in sorted(rows)]
+
+    async def fetch_ohlcv(self, symbol, timeframe, since=None, limit=None):
+        self.rest_calls += 1
+        rows = self._past((symbol, timeframe))
+        if since is not None:
+            rows = [row for row in rows if row[0] >= since]
+        return rows[-limit:] if limit else rows
+
+    async def watch_ohlcv(self, symbol, timeframe):
+        key = (symbol, timeframe)
+        await asyncio.sleep(self.interval_s)
+        position = self.position[key]
+        if position in self.disconnect_at:
+            self.position[key] += self.disconnect_at.pop(position)
+            raise ccxt.NetworkError('Replay: Verbindung getrennt')
+        if position >= len(self.updates[key]):
+            await asyncio.sleep(max(self.interval_s, 0.01))  # Ende der Aufzeichnung: ruhiger Markt
+            return [self.updates[key][-1]] if self.updates[key] else []
+        self.position[key] += 1
+        self.sent_ts[key] = time.perf_counter()
+        return [self.updates[key][position]]
+
+    async def close(self):
+        pass
@@ -0,0 +1,103 @@
+# src/pbot/utils/ring_buffer.py
+"""
+OHLCV-Ringpuffer fester Größe für Live-Daten
+
+Spalten liegen als zusammenhängende NumPy-Arrays doppelter Kapazität vor;
+jede Kerze wird an Position i und i + capacity geschrieben ("gespiegelter"
+Puffer). Dadurch ist jedes Fenster der letzten n Kerzen ein zusammenhängender
+Slice:
+
+- append()/update_last(): O(1), keine Allokation
+- window(n): Views ohne Kopie (für Indikatoren auf NumPy-Basis)
+- to_frame(n): DataFrame im Format von Exchange.fetch_recent_ohlcv, nur wenn
+  pandas wirklich gebraucht wird (PredictorEngine, Logging, Charts)
+"""
+from typing import Iterable, NamedTuple, Optional, Sequence
+
+import numpy as np
+
+from pbot.utils.lazy_import import lazy_module
+
+pd = lazy_module('pandas')
+
+PRICE_COLUMNS = ('open', 'high', 'low', 'close', 'volume')
+
+
+class OHLCVWindow(NamedTuple):
+    """Views auf die letzten n Kerzen (nur lesen; werden beim Weiterschreiben überschrieben)"""
+    timestamp: np.ndarray  # int64, Millisekunden UTC
+    open: np.ndarray
+    high: np.ndarray
+    low: np.ndarray
+    close: np.ndarray
+    volume: np.ndarray
+
+
+class OHLCVRingBuffer:
+    """
+    Die letzten `capacity` Kerzen eines (Symbol, Timeframe), aufsteigend nach Zeit
+
+    Die letzte Kerze darf noch laufen: update_last() ersetzt sie, append()
+    schließt sie ab und beginnt eine neue.
+    """
+
+    __slots__ = ('capacity', '_timestamps', '_values', '_end', '_size')
+
+    def __init__(self, capacity: int):
+        if capacity <= 0:
+            raise ValueError("capacity muss positiv sein")
+        self.capacity = capacity
+        self._timestamps = np.zeros(2 * capacity, dtype=np.int64)
+        self._values = np.zeros((len(PRICE_COLUMNS), 2 * capacity), dtype=np.float64)  # eine Zeile pro Spalte
+        self._end = 0   # Schreibposition in [0, capacity)
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def _write(self, index: int, timestamp: int, values: Sequence[float]):
+        for position in (index, index + self.capacity):
+            self._timestamps[position] = timestamp
+            self._values[:, position] = values
+
+    def append(self, timestamp: int, open_: float, high: float, low: float, close: float, volume: float):
+        """Neue Kerze anhängen; bei voller Kapazität fällt die älteste heraus"""
+        self._write(self._end, timestamp, (open_, high, low, close, volume))
+        self._end = (self._end + 1) % self.capacity
+        self._size = min(self._size + 1, self.capacity)
+
+    def update_last(self, timestamp: int, open_: float, high: float, low: float, close: float, volume: float):
+        """Ersetzt die letzte (laufende) Kerze"""
+        if not self._size:
+            raise IndexError("update_last auf leerem Puffer")
+        self._write((self._end - 1) % self.capacity, timestamp, (open_, high, low, close, volume))
+
+    def extend(self, rows: Iterable[Sequence]):
+        """Hängt [timestamp, open, high, low, close, volume]-Zeilen an (z.B. aus fetch_ohlcv)"""
+        for row in rows:
+            self.append(int(row[0]), *(float(v) for v in row[1:6]))
+
+    @property
+    def last_timestamp(self) -> Optional[int]:
+        """Zeitstempel (ms) der letzten Kerze; None bei leerem Puffer"""
+        return int(self._timestamps[self._end + self.capacity - 1]) if self._size else None
+
+    def timestamp_at(self, index: int) -> int:
+        """Zeitstempel per Index wie bei einer Liste (-1 = letzte Kerze)"""
+        if not -self._size <= index < self._size:
+            raise IndexError("Index außerhalb des Puffers")
+        start = self._end + self.capacity - self._size
+        return int(self._timestamps[start + index % self._size])
+
+    def window(self, n: Optional[int] = None) -> OHLCVWindow:
+        """Views auf die letzten n Kerzen (alle, wenn n None ist)"""
+        n = self._size if n is None else min(n, self._size)
+        stop = self._end + self.capacity
+        start = stop - n
+        return OHLCVWindow(self._timestamps[start:stop], *(row[start:stop] for row in self._values))
+
+    def to_frame(self, n: Optional[int] = None):
+        """Kopie der letzten n Kerzen als DataFrame (DatetimeIndex 'timestamp' in UTC)"""
+        window = self.window(n)
+        index = pd.DatetimeIndex(pd.to_datetime(window.timestamp, unit='ms', utc=True), name='timestamp')
+        return pd.DataFrame({name: column.copy() for name, column in zip(PRICE_COLUMNS, window[1:])}, index=index)
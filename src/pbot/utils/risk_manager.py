@@ -2,14 +2,23 @@
 """
 Portfolio-Level Risk Manager
 Verhindert Over-Exposure und kontrolliert Gesamt-Risiko
+
+Der State liegt im gemeinsamen State-Store (state_store.py), damit parallele
+run.py-Prozesse keine Updates verlieren:
+- risk/daily:             daily_pnl, last_reset, total_trades_today (Änderung per CAS)
+- risk_positions/SYMBOL:  risk_pct der offenen Position (ein Eintrag pro Symbol)
 """
 import json
 import os
-from datetime import datetime, timedelta
-from typing import Dict, List, Optional
+from datetime import datetime
+from typing import Dict, Optional
+
+from pbot.utils.state_store import StateStore, get_state_store
 
 PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', '..'))
-RISK_STATE_FILE = os.path.join(PROJECT_ROOT, 'artifacts', 'db', 'risk_state.json')
+RISK_STATE_FILE = os.path.join(PROJECT_ROOT, 'artifacts', 'db', 'risk_state.json')  # Altformat, wird übernommen
+RISK_NAMESPACE = 'risk'
+RISK_POSITIONS_NAMESPACE = 'risk_positions'
 
 
 class PortfolioRiskManager:
@@ -17,12 +26,14 @@ class PortfolioRiskManager:
     Überwacht Portfolio-weites Risiko und verhindert Over-Exposure
     """
     
-    def __init__(self, config: Optional[Dict] = None):
+    def __init__(self, config: Optional[Dict] = None, store: Optional[StateStore] = None):
         """
         Args:
             config: Risk-Manager Konfiguration
+            store: State-Store (Default: globale Instanz)
         """
         self.config = config or {}
+        self.store = store or get_state_store()
         
         # --- KRITISCHE LIMITS ---
         self.max_concurrent_positions = self.config.get('max_concurrent_positions', 3)
@@ -30,40 +41,41 @@ class PortfolioRiskManager:
         self.max_total_risk_pct = self.config.get('max_total_risk_pct', 4.0)  # Max 4% Gesamt-Exposure
         self.min_adjusted_risk_pct = self.config.get('min_adjusted_risk_pct', 0.1)  # Minimum sinnvolle Positionsgroesse nach Kappung
         
-        # State laden
-        self.state = self._load_state()
+        self._migrate_legacy_state()
+    
+    @property
+    def state(self) -> Dict:
+        """Aktueller Risk-State aller Prozesse (bei jedem Zugriff frisch aus dem Store)"""
+        return self._load_state()
     
     def _load_state(self) -> Dict:
         """Lädt den aktuellen Risk-State"""
-        os.makedirs(os.path.dirname(RISK_STATE_FILE), exist_ok=True)
+        daily = self.store.get(RISK_NAMESPACE, 'daily')
         
-        if os.path.exists(RISK_STATE_FILE):
-            try:
-                with open(RISK_STATE_FILE, 'r') as f:
-                    state = json.load(f)
-                    
-                # Reset Daily Loss zu Mitternacht
-                last_reset = datetime.fromisoformat(state.get('last_reset', datetime.now().isoformat()))
-                if last_reset.date() < datetime.now().date():
-                    state['daily_pnl'] = 0.0
-                    state['last_reset'] = datetime.now().isoformat()
-                    
-                return state
-            except Exception:
-                pass
+        # Reset Daily Loss zu Mitternacht (genau ein Prozess schreibt den Reset)
+        if daily is None or datetime.fromisoformat(daily['last_reset']).date() < datetime.now().date():
+            daily = self.store.update(RISK_NAMESPACE, 'daily', _reset_daily_if_stale, default=_default_daily())
         
-        # Default State
-        return {
-            'daily_pnl': 0.0,
-            'last_reset': datetime.now().isoformat(),
-            'active_positions': {},  # {symbol: risk_pct}
-            'total_trades_today': 0
-        }
+        return {**daily, 'active_positions': self.store.items(RISK_POSITIONS_NAMESPACE)}
     
-    def _save_state(self):
-        """Speichert den Risk-State"""
-        with open(RISK_STATE_FILE, 'w') as f:
-            json.dump(self.state, f, indent=2)
+    def _migrate_legacy_state(self):
+        """Übernimmt einmalig eine alte risk_state.json (bestehende Store-Einträge haben Vorrang)"""
+        if not os.path.exists(RISK_STATE_FILE):
+            return
+        try:
+            with open(RISK_STATE_FILE, 'r') as f:
+                legacy = json.load(f)
+            for symbol, risk_pct in legacy.get('active_positions', {}).items():
+                self.store.compare_and_set(RISK_POSITIONS_NAMESPACE, symbol, risk_pct, 0)
+            daily = _default_daily()
+            daily.update({k: legacy[k] for k in daily if k in legacy})
+            self.store.compare_and_set(RISK_NAMESPACE, 'daily', daily, 0)
+        except Exception:
+            pass
+        try:
+            os.replace(RISK_STATE_FILE, RISK_STATE_FILE + '.migrated')
+        except OSError:
+            pass
     
     def can_open_position(self, symbol: str, risk_pct: float, logger=None) -> tuple[bool, str, float]:
         """
@@ -77,22 +89,24 @@ class PortfolioRiskManager:
         Returns:
             (erlaubt: bool, grund: str, verwendetes_risk_pct: float)
         """
+        state = self.state
+        
         # 1. Check: Max Concurrent Positions
-        active_count = len(self.state['active_positions'])
+        active_count = len(state['active_positions'])
         if active_count >= self.max_concurrent_positions:
             msg = f"🚫 Max Positionen erreicht ({active_count}/{self.max_concurrent_positions})"
             if logger: logger.warning(msg)
             return False, msg, risk_pct
         
         # 2. Check: Daily Loss Limit
-        daily_loss_pct = abs(min(0, self.state['daily_pnl']))
+        daily_loss_pct = abs(min(0, state['daily_pnl']))
         if daily_loss_pct >= self.max_daily_loss_pct:
             msg = f"🚫 Daily Loss Limit erreicht ({daily_loss_pct:.2f}% / {self.max_daily_loss_pct}%)"
             if logger: logger.warning(msg)
             return False, msg, risk_pct
         
         # 3. Check: Total Risk Exposure
-        current_total_risk = sum(self.state['active_positions'].values())
+        current_total_risk = sum(state['active_positions'].values())
         new_total_risk = current_total_risk + risk_pct
         
         if new_total_risk > self.max_total_risk_pct:
@@ -112,7 +126,7 @@ class PortfolioRiskManager:
             return True, msg, adjusted_risk
         
         # 4. Check: Position bereits offen für dieses Symbol?
-        if symbol in self.state['active_positions']:
+        if symbol in state['active_positions']:
             msg = f"🚫 Position für {symbol} bereits aktiv"
             if logger: logger.warning(msg)
             return False, msg, risk_pct
@@ -127,13 +141,13 @@ class PortfolioRiskManager:
             symbol: Trading-Symbol
             risk_pct: Risiko in % des Kontos
         """
-        self.state['active_positions'][symbol] = risk_pct
-        self.state['total_trades_today'] += 1
-        self._save_state()
+        self.store.put(RISK_POSITIONS_NAMESPACE, symbol, risk_pct)
+        self._update_daily(lambda daily: {**daily, 'total_trades_today': daily['total_trades_today'] + 1})
         
         if logger:
-            active_symbols = list(self.state['active_positions'].keys())
-            total_risk = sum(self.state['active_positions'].values())
+            active_positions = self.store.items(RISK_POSITIONS_NAMESPACE)
+            active_symbols = list(active_positions.keys())
+            total_risk = sum(active_positions.values())
             logger.info(f"✅ Position registriert: {symbol} (Risiko: {risk_pct:.2f}%)")
             logger.info(f"📊 Portfolio: {len(active_symbols)} Positionen, Total Risk: {total_risk:.2f}%")
     
@@ -145,36 +159,50 @@ class PortfolioRiskManager:
             symbol: Trading-Symbol
             pnl_pct: Profit/Loss in % des Kontos
         """
-        if symbol in self.state['active_positions']:
-            risk = self.state['active_positions'].pop(symbol)
-            self.state['daily_pnl'] += pnl_pct
-            self._save_state()
+        # delete() ist atomar: nur der Prozess, der den Eintrag entfernt, bucht den PnL
+        if self.store.delete(RISK_POSITIONS_NAMESPACE, symbol):
+            daily = self._update_daily(lambda daily: {**daily, 'daily_pnl': daily['daily_pnl'] + pnl_pct})
             
             if logger:
                 logger.info(f"🔒 Position geschlossen: {symbol} (PnL: {pnl_pct:+.2f}%)")
-                logger.info(f"📊 Daily PnL: {self.state['daily_pnl']:+.2f}%")
+                logger.info(f"📊 Daily PnL: {daily['daily_pnl']:+.2f}%")
     
     def get_status(self) -> Dict:
         """Gibt aktuellen Risk-Status zurück"""
-        total_risk = sum(self.state['active_positions'].values())
-        daily_loss = abs(min(0, self.state['daily_pnl']))
+        state = self.state
+        total_risk = sum(state['active_positions'].values())
+        daily_loss = abs(min(0, state['daily_pnl']))
         
         return {
-            'active_positions_count': len(self.state['active_positions']),
-            'active_symbols': list(self.state['active_positions'].keys()),
+            'active_positions_count': len(state['active_positions']),
+            'active_symbols': list(state['active_positions'].keys()),
             'total_risk_pct': total_risk,
-            'daily_pnl_pct': self.state['daily_pnl'],
+            'daily_pnl_pct': state['daily_pnl'],
             'daily_loss_pct': daily_loss,
             'daily_loss_remaining_pct': max(0, self.max_daily_loss_pct - daily_loss),
-            'can_trade': daily_loss < self.max_daily_loss_pct and len(self.state['active_positions']) < self.max_concurrent_positions
+            'can_trade': daily_loss < self.max_daily_loss_pct and len(state['active_positions']) < self.max_concurrent_positions
         }
     
     def reset_daily_stats(self):
         """Manuelles Reset der Daily-Statistiken (für Testing)"""
-        self.state['daily_pnl'] = 0.0
-        self.state['last_reset'] = datetime.now().isoformat()
-        self.state['total_trades_today'] = 0
-        self._save_state()
+        self.store.put(RISK_NAMESPACE, 'daily', _default_daily())
+    
+    def _update_daily(self, fn) -> Dict:
+        """Atomare Änderung der Tages-Statistik (inkl. Mitternachts-Reset)"""
+        return self.store.update(
+            RISK_NAMESPACE, 'daily', lambda daily: fn(_reset_daily_if_stale(daily)), default=_default_daily()
+        )
+
+
+def _default_daily() -> Dict:
+    return {'daily_pnl': 0.0, 'last_reset': datetime.now().isoformat(), 'total_trades_today': 0}
+
+
+def _reset_daily_if_stale(daily: Dict) -> Dict:
+    """Setzt den Daily PnL zurück, wenn der letzte Reset vor heute war"""
+    if datetime.fromisoformat(daily['last_reset']).date() < datetime.now().date():
+        daily = {**daily, 'daily_pnl': 0.0, 'last_reset': datetime.now().isoformat()}
+    return daily
 
 
 # Singleton-Instanz für globalen Zugriff
@@ -0,0 +1,85 @@
+# src/pbot/utils/scheduler.py
+"""
+Kerzenschluss-Scheduler für den Master Runner
+
+Statt alle Strategien im festen Cron-Takt zu starten, wird pro Timeframe der
+nächste Kerzenschluss berechnet (epoch-ausgerichtet wie bei Bitget). Der
+Scheduler schläft bis kurz nach dem frühesten Schluss (grace_s, damit die
+Börse die Kerze finalisiert hat) und liefert genau die Strategien, deren
+Kerze dann geschlossen hat – z.B. um 06:00 UTC 15m, 30m und 6h gemeinsam,
+um 06:15 nur 15m.
+"""
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+from pbot.utils.timeframe_utils import next_candle_close_ts, timeframe_to_seconds
+
+DEFAULT_GRACE_S = 2.0  # Sekunden nach Kerzenschluss, bis die Kerze abgeschlossen abrufbar ist
+
+
+def due_strategies(strategies: List[Dict], close_ts: int) -> List[Dict]:
+    """Strategien, deren Timeframe zum Zeitpunkt close_ts eine Kerze schließt"""
+    return [s for s in strategies if close_ts % timeframe_to_seconds(s['timeframe']) == 0]
+
+
+class CandleScheduler:
+    """
+    Weckt nach jedem Kerzenschluss der konfigurierten Timeframes
+
+    Args:
+        strategies: Dicts mit mindestens 'timeframe' (z.B. aus settings.json)
+        grace_s: Wartezeit nach dem Schluss
+        clock: Zeitquelle (Unix-Sekunden), für Tests ersetzbar
+    """
+
+    def __init__(self, strategies: List[Dict], grace_s: float = DEFAULT_GRACE_S, clock: Callable[[], float] = time.time):
+        unknown = sorted({s['timeframe'] for s in strategies if not timeframe_to_seconds(s['timeframe'])})
+        if unknown:
+            raise ValueError(f"Unbekannte Timeframes: {', '.join(unknown)}")
+        self.strategies = list(strategies)
+        self.grace_s = grace_s
+        self.clock = clock
+        self._stop = threading.Event()
+
+    def next_close(self, now_ts: Optional[float] = None) -> Optional[Tuple[int, List[Dict]]]:
+        """(Zeitpunkt des nächsten Kerzenschlusses, dann fällige Strategien); None ohne Strategien"""
+        if not self.strategies:
+            return None
+        now_ts = self.clock() if now_ts is None else now_ts
+        close_ts = min(next_candle_close_ts(tf, now_ts) for tf in {s['timeframe'] for s in self.strategies})
+        return close_ts, due_strategies(self.strategies, close_ts)
+
+    def wait_for_next_close(self) -> Optional[Tuple[int, List[Dict]]]:
+        """
+        Blockiert bis grace_s nach dem nächsten Kerzenschluss
+
+        Ein Aufruf innerhalb der Grace-Zeit bedient noch den gerade erfolgten
+        Schluss; danach gilt er als bedient bzw. verpasst.
+
+        Returns:
+            (close_ts, fällige Strategien); None nach stop() oder ohne Strategien
+        """
+        upcoming = self.next_close(self.clock() - self.grace_s)
+        if upcoming is None:
+            return None
+        close_ts, due = upcoming
+        while not self._stop.is_set():
+            remaining = close_ts + self.grace_s - self.clock()
+            if remaining <= 0:
+                return close_ts, due
+            self._stop.wait(remaining)
+        return None
+
+    def run(self, callback: Callable[[int, List[Dict]], None], max_rounds: Optional[int] = None):
+        """Ruft callback(close_ts, fällige Strategien) nach jedem Kerzenschluss auf, bis stop()"""
+        rounds = 0
+        while max_rounds is None or rounds < max_rounds:
+            upcoming = self.wait_for_next_close()
+            if upcoming is None:
+                return
+            callback(*upcoming)
+            rounds += 1
+
+    def stop(self):
+        self._stop.set()
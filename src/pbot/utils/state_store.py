@@ -0,0 +1,204 @@
+# src/pbot/utils/state_store.py
+"""
+Gemeinsamer Prozess-Zustand (Trade-Locks, Portfolio-Risiko) in SQLite
+
+Bis zu sieben run.py-Prozesse lesen und schreiben denselben Zustand. Statt
+ganzer JSON-Dateien (read-modify-write ohne Locking -> verlorene Updates)
+liegt jeder Eintrag als eigene Zeile (namespace, key) mit Versionszähler in
+einer WAL-Datenbank:
+
+- get():               Lookup über den Primärschlüssel, kein Parsen einer Datei
+- put()/delete():      einzelnes atomares Statement
+- compare_and_set():   schreibt nur, wenn die Version noch der gelesenen entspricht
+- update():            optimistische Read-Modify-Write-Schleife auf Basis von CAS
+
+Werte sind JSON-serialisierbar.
+"""
+import copy
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Callable, Dict, Optional, Tuple
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', '..'))
+STATE_DB_PATH = os.path.join(PROJECT_ROOT, 'artifacts', 'db', 'pbot_state.db')
+STATE_DB_ENV = 'PBOT_STATE_DB'   # überschreibt STATE_DB_PATH (z.B. Tests)
+
+BUSY_TIMEOUT_MS = 15000   # Wartezeit auf den Schreib-Lock anderer Prozesse
+MAX_CAS_RETRIES = 1000    # update(): Versuche, bevor ein Konflikt als Fehler gilt
+
+
+class StateConflictError(RuntimeError):
+    """update() konnte nach MAX_CAS_RETRIES Versuchen nicht schreiben"""
+
+
+class StateStore:
+    """
+    Versionierter Key/Value-Speicher für mehrere Prozesse
+
+    Version 0 bedeutet "Eintrag existiert nicht"; jede Schreiboperation
+    erhöht die Version um 1.
+    """
+
+    def __init__(self, db_path: str = STATE_DB_PATH, busy_timeout_ms: int = BUSY_TIMEOUT_MS):
+        self.db_path = db_path
+        self.busy_timeout_ms = busy_timeout_ms
+        self._conn = None
+        self._conn_pid = None
+        self._lock = threading.Lock()  # Connection wird zwischen Threads geteilt
+        os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        with self._lock:
+            self._connection().execute('''
+                CREATE TABLE IF NOT EXISTS state (
+                    namespace TEXT NOT NULL,
+                    key TEXT NOT NULL,
+                    value TEXT NOT NULL,       -- JSON
+                    version INTEGER NOT NULL,
+                    updated_at REAL NOT NULL,  -- Unix-Sekunden
+                    PRIMARY KEY (namespace, key)
+                ) WITHOUT ROWID
+            ''')
+
+    def _connection(self) -> sqlite3.Connection:
+        """Langlebige Connection dieses Prozesses (nach fork() neu aufgebaut), Autocommit"""
+        if self._conn is None or self._conn_pid != os.getpid():
+            conn = sqlite3.connect(
+                self.db_path,
+                timeout=self.busy_timeout_ms / 1000.0,
+                check_same_thread=False,
+                isolation_level=None  # jedes Statement ist seine eigene Transaktion
+            )
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            conn.execute(f'PRAGMA busy_timeout={int(self.busy_timeout_ms)}')
+            self._conn = conn
+            self._conn_pid = os.getpid()
+        return self._conn
+
+    def _execute(self, sql: str, params: tuple = ()) -> Tuple[list, int]:
+        """Führt ein Statement aus; liefert (Zeilen, rowcount)"""
+        with self._lock:
+            cursor = self._connection().execute(sql, params)
+            rows = cursor.fetchall()
+            return rows, cursor.rowcount
+
+    def close(self):
+        """Schließt die Connection dieses Prozesses"""
+        with self._lock:
+            if self._conn is not None and self._conn_pid == os.getpid():
+                self._conn.close()
+            self._conn = None
+            self._conn_pid = None
+
+    # ------------------------------------------------------------------ #
+    # Lesen
+    # ------------------------------------------------------------------ #
+    def get_versioned(self, namespace: str, key: str) -> Tuple[Any, int]:
+        """(Wert, Version); (None, 0), wenn der Eintrag fehlt"""
+        rows, _ = self._execute(
+            'SELECT value, version FROM state WHERE namespace = ? AND key = ?', (namespace, key)
+        )
+        return (json.loads(rows[0][0]), rows[0][1]) if rows else (None, 0)
+
+    def get(self, namespace: str, key: str, default: Any = None) -> Any:
+        value, version = self.get_versioned(namespace, key)
+        return value if version else default
+
+    def items(self, namespace: str) -> Dict[str, Any]:
+        """Alle Einträge eines Namespace als {key: Wert}"""
+        rows, _ = self._execute('SELECT key, value FROM state WHERE namespace = ? ORDER BY key', (namespace,))
+        return {key: json.loads(value) for key, value in rows}
+
+    # ------------------------------------------------------------------ #
+    # Schreiben
+    # ------------------------------------------------------------------ #
+    def put(self, namespace: str, key: str, value: Any) -> int:
+        """Schreibt bedingungslos; liefert die neue Version"""
+        rows, _ = self._execute('''
+            INSERT INTO state (namespace, key, value, version, updated_at) VALUES (?, ?, ?, 1, ?)
+            ON CONFLICT (namespace, key) DO UPDATE SET
+                value = excluded.value, version = version + 1, updated_at = excluded.updated_at
+            RETURNING version
+        ''', (namespace, key, json.dumps(value), time.time()))
+        return rows[0][0]
+
+    def compare_and_set(self, namespace: str, key: str, value: Any, expected_version: int) -> bool:
+        """
+        Schreibt value nur, wenn der Eintrag noch expected_version hat
+
+        expected_version=0 legt den Eintrag nur an, wenn er noch nicht existiert.
+
+        Returns:
+            True bei Erfolg, False wenn ein anderer Prozess dazwischen geschrieben hat
+        """
+        encoded, now = json.dumps(value), time.time()
+        if expected_version == 0:
+            _, rowcount = self._execute('''
+                INSERT INTO state (namespace, key, value, version, updated_at) VALUES (?, ?, ?, 1, ?)
+                ON CONFLICT (namespace, key) DO NOTHING
+            ''', (namespace, key, encoded, now))
+        else:
+            _, rowcount = self._execute('''
+                UPDATE state SET value = ?, version = version + 1, updated_at = ?
+                WHERE namespace = ? AND key = ? AND version = ?
+            ''', (encoded, now, namespace, key, expected_version))
+        return rowcount == 1
+
+    def update(self, namespace: str, key: str, fn: Callable[[Any], Any], default: Any = None) -> Any:
+        """
+        Atomares Read-Modify-Write: value = fn(aktueller Wert oder default)
+
+        fn kann bei Konflikten mehrfach aufgerufen werden und darf den
+        übergebenen Wert verändern (er ist jedes Mal frisch gelesen).
+
+        Returns:
+            Der geschriebene Wert
+        """
+        for _ in range(MAX_CAS_RETRIES):
+            value, version = self.get_versioned(namespace, key)
+            new_value = fn(value if version else copy.deepcopy(default))
+            if self.compare_and_set(namespace, key, new_value, version):
+                return new_value
+        raise StateConflictError(f"Konflikt bei {namespace}/{key} nach {MAX_CAS_RETRIES} Versuchen")
+
+    def delete(self, namespace: str, key: str) -> bool:
+        """Entfernt einen Eintrag; True, wenn er existierte"""
+        _, rowcount = self._execute('DELETE FROM state WHERE namespace = ? AND key = ?', (namespace, key))
+        return rowcount == 1
+
+    def import_json_file(self, namespace: str, path: str, transform: Optional[Callable[[Dict], Dict]] = None) -> int:
+        """
+        Übernimmt eine alte JSON-Zustandsdatei ({key: Wert}) einmalig in den Store
+
+        Bereits vorhandene Keys werden nicht überschrieben; die Datei wird danach
+        in *.migrated umbenannt.
+
+        Returns:
+            Anzahl übernommener Einträge
+        """
+        try:
+            with open(path, 'r') as f:
+                data = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return 0
+        if transform is not None:
+            data = transform(data)
+        imported = sum(self.compare_and_set(namespace, key, value, 0) for key, value in data.items())
+        try:
+            os.replace(path, path + '.migrated')
+        except OSError:
+            pass
+        return imported
+
+
+# Singleton-Instanz pro Prozess
+_store_instance = None
+
+def get_state_store() -> StateStore:
+    """Gibt die globale StateStore-Instanz zurück (Pfad aus $PBOT_STATE_DB, sonst STATE_DB_PATH)"""
+    global _store_instance
+    if _store_instance is None:
+        _store_instance = StateStore(os.environ.get(STATE_DB_ENV) or STATE_DB_PATH)
+    return _store_instance
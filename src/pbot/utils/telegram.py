@@ -1,28 +1,63 @@
 # /root/pbot/src/pbot/utils/telegram.py
-import requests
+"""
+Telegram-Benachrichtigungen
+
+send_message/send_document/send_photo senden synchron (Skripte, Reports).
+Im Handelszyklus wird queue_message verwendet: die Nachricht landet in einer
+begrenzten Queue, ein Hintergrund-Thread (TelegramDispatcher) fasst kurz
+aufeinanderfolgende Nachrichten an denselben Chat zu einer zusammen, hält
+Telegrams Rate-Limit ein (429 + retry_after), wiederholt Netzwerk-/Serverfehler
+mit Backoff und leert die Queue beim Prozessende (atexit). Lehnt Telegram eine
+zusammengefasste Nachricht ab (4xx, z.B. kaputtes HTML in einer davon), werden
+die Einzelnachrichten getrennt gesendet, damit nur die fehlerhafte verloren geht.
+"""
+import atexit
 import logging
 import os
+import queue
+import threading
+import time
+
+from pbot.utils.lazy_import import lazy_module
+
+requests = lazy_module('requests')
 
 logger = logging.getLogger(__name__)
 
-def send_message(bot_token, chat_id, message):
-    if not bot_token or not chat_id:
-        logger.warning("Telegram Bot-Token oder Chat-ID nicht konfiguriert.")
-        return
+TELEGRAM_API_URL = 'https://api.telegram.org'
+TELEGRAM_MAX_LENGTH = 4096   # Zeichen pro Nachricht
+
+QUEUE_SIZE = 100             # Nachrichten; bei voller Queue wird verworfen statt zu blockieren
+COALESCE_WINDOW_S = 0.5      # Nachrichten innerhalb dieses Fensters werden zusammengefasst
+MIN_INTERVAL_S = 1.0         # Telegram: ca. 1 Nachricht pro Sekunde und Chat
+MAX_RETRIES = 5
+BACKOFF_S = 1.0              # erster Retry, danach verdoppelt
+MAX_BACKOFF_S = 30.0
+FLUSH_TIMEOUT_S = 10.0       # maximale Wartezeit beim Prozessende
+
+
+def _post_message(bot_token, chat_id, message, timeout=10):
+    """Ein sendMessage-Request; liefert die Response (wirft bei Netzwerkfehlern)"""
+    api_url = f"{TELEGRAM_API_URL}/bot{bot_token}/sendMessage"
 
-    api_url = f"https://api.telegram.org/bot{bot_token}/sendMessage"
-    
     # Wir nutzen HTML, das ist viel robuster als MarkdownV2
     # und verhindert 400 Bad Request Fehler bei Preisen mit Punkten.
     payload = {
-        'chat_id': chat_id, 
-        'text': message, 
+        'chat_id': chat_id,
+        'text': message,
         'parse_mode': 'HTML',
         'disable_web_page_preview': True
     }
+    return requests.post(api_url, data=payload, timeout=timeout)
+
+
+def send_message(bot_token, chat_id, message):
+    if not bot_token or not chat_id:
+        logger.warning("Telegram Bot-Token oder Chat-ID nicht konfiguriert.")
+        return
 
     try:
-        response = requests.post(api_url, data=payload, timeout=10)
+        response = _post_message(bot_token, chat_id, message)
         response.raise_for_status()
     except requests.exceptions.RequestException as e:
         logger.error(f"Netzwerkfehler beim Senden der Telegram-Nachricht: {e}")
@@ -39,7 +74,7 @@ def send_document(bot_token, chat_id, file_path, caption=""):
         logger.warning("Telegram Bot-Token oder Chat-ID nicht konfiguriert.")
         return
 
-    api_url = f"https://api.telegram.org/bot{bot_token}/sendDocument"
+    api_url = f"{TELEGRAM_API_URL}/bot{bot_token}/sendDocument"
     
     # Auch hier HTML für die Caption nutzen
     payload = {
@@ -56,3 +91,199 @@ def send_document(bot_token, chat_id, file_path, caption=""):
             response.raise_for_status()
     except Exception as e:
         logger.error(f"Fehler beim Senden des Dokuments: {e}")
+
+
+def send_photo(bot_token, chat_id, photo_path, caption=""):
+    """Sendet ein Bild (PNG/JPG) an einen Telegram-Chat. Gibt True bei Erfolg zurück."""
+    if not bot_token or not chat_id:
+        logger.warning("Telegram Bot-Token oder Chat-ID nicht konfiguriert.")
+        return False
+
+    api_url = f"{TELEGRAM_API_URL}/bot{bot_token}/sendPhoto"
+
+    payload = {
+        'chat_id': chat_id,
+        'caption': caption,
+        'parse_mode': 'HTML'
+    }
+
+    try:
+        with open(photo_path, 'rb') as photo:
+            response = requests.post(api_url, data=payload, files={'photo': photo}, timeout=30)
+            response.raise_for_status()
+        return bool(response.json().get('ok'))
+    except Exception as e:
+        logger.error(f"Fehler beim Senden des Bildes: {e}")
+        return False
+
+
+class TelegramDispatcher:
+    """
+    Versendet Nachrichten aus einer begrenzten Queue in einem Hintergrund-Thread
+
+    enqueue() blockiert nie; flush() wartet, bis alle angenommenen
+    Nachrichten zugestellt oder endgültig gescheitert sind.
+    """
+
+    def __init__(self, queue_size=QUEUE_SIZE, coalesce_window_s=COALESCE_WINDOW_S, min_interval_s=MIN_INTERVAL_S,
+                 max_retries=MAX_RETRIES, backoff_s=BACKOFF_S):
+        self.coalesce_window_s = coalesce_window_s
+        self.min_interval_s = min_interval_s
+        self.max_retries = max_retries
+        self.backoff_s = backoff_s
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._pending = 0
+        self._pending_changed = threading.Condition()
+        self._last_sent = {}  # chat_id -> monotonic-Zeit des letzten Requests
+        self.stats = {'queued': 0, 'requests': 0, 'sent': 0, 'failed': 0, 'dropped': 0}
+        self._thread = threading.Thread(target=self._run, name='telegram-dispatcher', daemon=True)
+        self._thread.start()
+
+    def enqueue(self, bot_token, chat_id, message) -> bool:
+        """Nimmt eine Nachricht an; False, wenn die Queue voll ist (Nachricht verworfen)"""
+        with self._pending_changed:
+            self._pending += 1
+        try:
+            self._queue.put_nowait((bot_token, chat_id, message))
+        except queue.Full:
+            self._done(1)
+            self.stats['dropped'] += 1
+            logger.warning("Telegram-Queue voll – Nachricht verworfen.")
+            return False
+        self.stats['queued'] += 1
+        return True
+
+    def flush(self, timeout_s=FLUSH_TIMEOUT_S) -> bool:
+        """Wartet, bis die Queue abgearbeitet ist; False bei Timeout"""
+        deadline = time.monotonic() + timeout_s
+        with self._pending_changed:
+            while self._pending:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    logger.warning(f"Telegram: {self._pending} Nachricht(en) beim Beenden nicht zugestellt.")
+                    return False
+                self._pending_changed.wait(remaining)
+        return True
+
+    def _done(self, count):
+        with self._pending_changed:
+            self._pending -= count
+            self._pending_changed.notify_all()
+
+    # ------------------------------------------------------------------ #
+    # Hintergrund-Thread
+    # ------------------------------------------------------------------ #
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.coalesce_window_s
+            while True:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            try:
+                chats = {}
+                for bot_token, chat_id, message in batch:
+                    chats.setdefault((bot_token, chat_id), []).append(message)
+                for (bot_token, chat_id), messages in chats.items():
+                    for parts in _coalesce(messages):
+                        self._deliver(bot_token, chat_id, parts)
+            except Exception as e:
+                logger.error(f"Telegram-Dispatcher: unerwarteter Fehler: {e}", exc_info=True)
+            finally:
+                self._done(len(batch))
+
+    def _wait_for_rate_limit(self, chat_id):
+        last = self._last_sent.get(chat_id)
+        if last is not None:
+            time.sleep(max(0.0, last + self.min_interval_s - time.monotonic()))
+        self._last_sent[chat_id] = time.monotonic()
+
+    def _deliver(self, bot_token, chat_id, parts) -> bool:
+        """Sendet die Teile als eine Nachricht mit Retries; True bei Erfolg"""
+        text = "\n\n".join(parts)
+        delay = self.backoff_s
+        for attempt in range(1, self.max_retries + 1):
+            self._wait_for_rate_limit(chat_id)
+            self.stats['requests'] += 1
+            try:
+                response = _post_message(bot_token, chat_id, text)
+            except requests.exceptions.RequestException as e:
+                logger.warning(f"Telegram: Netzwerkfehler (Versuch {attempt}/{self.max_retries}): {e}")
+                time.sleep(delay)
+                delay = min(delay * 2, MAX_BACKOFF_S)
+                continue
+
+            if response.status_code == 429:
+                try:
+                    retry_after = float(response.json().get('parameters', {}).get('retry_after', delay))
+                except ValueError:
+                    retry_after = delay
+                logger.warning(f"Telegram: Rate-Limit erreicht, warte {retry_after:.0f}s.")
+                time.sleep(retry_after)
+                continue
+            if response.status_code >= 500:
+                logger.warning(f"Telegram: Serverfehler {response.status_code} (Versuch {attempt}/{self.max_retries}).")
+                time.sleep(delay)
+                delay = min(delay * 2, MAX_BACKOFF_S)
+                continue
+            if not response.ok and len(parts) > 1:
+                # 4xx für die ganze Sammelnachricht: Teile einzeln, nur der fehlerhafte geht verloren
+                logger.warning(f"Telegram Antwort {response.status_code} für {len(parts)} zusammengefasste "
+                               f"Nachrichten – sende einzeln.")
+                return all([self._deliver(bot_token, chat_id, [part]) for part in parts])
+            if not response.ok:
+                # 4xx (z.B. Formatierung): Wiederholen hilft nicht
+                logger.error(f"Telegram Antwort {response.status_code}: {response.text}")
+                self.stats['failed'] += 1
+                return False
+            self.stats['sent'] += 1
+            return True
+
+        logger.error(f"Telegram: Nachricht nach {self.max_retries} Versuchen verworfen.")
+        self.stats['failed'] += 1
+        return False
+
+
+def _coalesce(messages):
+    """Gruppiert Nachrichten zu möglichst wenigen Sammelnachrichten <= TELEGRAM_MAX_LENGTH (Liste der Teile je Gruppe)"""
+    groups, current, length = [], [], 0
+    for message in messages:
+        candidate = length + 2 + len(message) if current else len(message)
+        if current and candidate > TELEGRAM_MAX_LENGTH:
+            groups.append(current)
+            current, length = [message], len(message)
+        else:
+            current.append(message)
+            length = candidate
+    if current:
+        groups.append(current)
+    return groups
+
+
+# Ein Dispatcher pro Prozess, beim ersten queue_message gestartet
+_dispatcher = None
+_dispatcher_pid = None
+_dispatcher_lock = threading.Lock()
+
+def get_dispatcher() -> TelegramDispatcher:
+    """Gibt den Dispatcher dieses Prozesses zurück (nach fork() neu gestartet)"""
+    global _dispatcher, _dispatcher_pid
+    with _dispatcher_lock:
+        if _dispatcher is None or _dispatcher_pid != os.getpid():
+            _dispatcher = TelegramDispatcher()
+            _dispatcher_pid = os.getpid()
+            atexit.register(_dispatcher.flush)
+        return _dispatcher
+
+
+def queue_message(bot_token, chat_id, message):
+    """Wie send_message, aber ohne zu blockieren: Versand im Hintergrund-Thread"""
+    if not bot_token or not chat_id:
+        logger.warning("Telegram Bot-Token oder Chat-ID nicht konfiguriert.")
+        return
+    get_dispatcher().enqueue(bot_token, chat_id, message)
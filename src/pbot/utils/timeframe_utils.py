@@ -1,6 +1,38 @@
 # /root/pbot/src/pbot/utils/timeframe_utils.py
 import math
 
+# Timeframe-Dauer in Minuten (unterstützte Handels- und HTF-Zeitrahmen)
+TIMEFRAME_MINUTES = {'5m': 5, '15m': 15, '30m': 30, '1h': 60, '2h': 120, '4h': 240, '6h': 360, '1d': 1440}
+
+
+def timeframe_to_seconds(timeframe):
+    """Gibt die Kerzendauer eines Timeframes in Sekunden zurück (None bei unbekanntem TF)."""
+    minutes = TIMEFRAME_MINUTES.get(timeframe)
+    return minutes * 60 if minutes is not None else None
+
+
+def last_candle_close_ts(timeframe, now_ts):
+    """
+    Unix-Zeitstempel (Sekunden, UTC) des letzten Kerzenschlusses vor `now_ts`.
+    Kerzen sind an der Epoche ausgerichtet (wie bei Bitget/ccxt).
+    """
+    seconds = timeframe_to_seconds(timeframe)
+    if not seconds:
+        return None
+    return math.floor(now_ts / seconds) * seconds
+
+
+def next_candle_close_ts(timeframe, now_ts):
+    """
+    Unix-Zeitstempel (Sekunden, UTC) des nächsten Kerzenschlusses nach `now_ts`
+    (liegt `now_ts` genau auf einem Schluss, ist es der darauffolgende).
+    """
+    seconds = timeframe_to_seconds(timeframe)
+    if not seconds:
+        return None
+    return last_candle_close_ts(timeframe, now_ts) + seconds
+
+
 def determine_htf(timeframe):
     """
     Bestimmt den nächsthöheren Zeitrahmen (mindestens 4x größer) 
@@ -8,7 +40,7 @@ def determine_htf(timeframe):
     """
     # Definiere die Hierarchie in Minuten
     # Verwenden Sie 1440m (1d) als maximalen HTF
-    tf_map = {'5m': 5, '15m': 15, '30m': 30, '1h': 60, '2h': 120, '4h': 240, '6h': 360, '1d': 1440}
+    tf_map = TIMEFRAME_MINUTES
     tf_minutes = tf_map.get(timeframe)
     
     if tf_minutes is None:
@@ -0,0 +1,214 @@
+# /root/pbot/src/pbot/utils/timing.py
+"""
+Stage-Timing für den Live-Handelszyklus
+Misst die Dauer einzelner Stufen (Märkte laden, OHLCV-Abruf, Analyse, Orders, Wartezeiten)
+und gibt pro Zyklus eine Latenz-Aufschlüsselung aus (Log + logs/timing.jsonl).
+
+Aktivierung über `run.py --timing` oder die Umgebungsvariable PBOT_TIMING=1.
+Ist das Timing deaktiviert, liefert span() einen geteilten No-Op-Kontext (praktisch kein Overhead).
+"""
+import json
+import os
+import threading
+import time
+from functools import wraps
+from typing import Dict, List, Optional
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', '..'))
+TIMING_LOG_FILE = os.path.join(PROJECT_ROOT, 'logs', 'timing.jsonl')
+
+_enabled = os.environ.get('PBOT_TIMING', '').lower() in ('1', 'true', 'yes', 'ja')
+_current_cycle = None
+
+
+class _NullSpan:
+    """No-Op Kontext für deaktiviertes Timing"""
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    __slots__ = ('cycle', 'name', 'start', 'depth')
+
+    def __init__(self, cycle, name):
+        self.cycle = cycle
+        self.name = name
+
+    def __enter__(self):
+        self.depth = self.cycle._enter()
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        duration = time.perf_counter() - self.start
+        self.cycle._exit()
+        self.cycle.record(self.name, duration, start=self.start, depth=self.depth, failed=exc_type is not None)
+        return False
+
+
+class CycleTimer:
+    """
+    Sammelt die Stage-Dauern eines Handelszyklus
+    """
+
+    def __init__(self, label: str):
+        self.label = label
+        self.started_at = time.time()
+        self._t0 = time.perf_counter()
+        self._local = threading.local()  # Verschachtelungstiefe je Thread (parallele Spans sind Geschwister)
+        self._lock = threading.Lock()
+        self.stages: List[Dict] = []
+
+    def current_depth(self) -> int:
+        """Tiefe des nächsten Spans im aufrufenden Thread"""
+        return getattr(self._local, 'depth', 0)
+
+    def _enter(self) -> int:
+        depth = self.current_depth()
+        self._local.depth = depth + 1
+        return depth
+
+    def _exit(self):
+        self._local.depth = max(0, self.current_depth() - 1)
+
+    def record(self, name: str, seconds: float, start: Optional[float] = None, depth: int = 0, failed: bool = False):
+        """Registriert eine gemessene Stufe (Start relativ zum Zyklusbeginn)"""
+        offset = (start if start is not None else time.perf_counter() - seconds) - self._t0
+        with self._lock:
+            self.stages.append({
+                'name': name,
+                'offset_ms': offset * 1000,
+                'duration_ms': seconds * 1000,
+                'depth': depth,
+                'failed': failed
+            })
+
+    def total_ms(self) -> float:
+        return (time.perf_counter() - self._t0) * 1000
+
+    def summary(self) -> Dict[str, Dict]:
+        """Aggregiert die Dauern pro Stufen-Name (Anzahl, Summe, Maximum)"""
+        result = {}
+        for stage in self.stages:
+            entry = result.setdefault(stage['name'], {'count': 0, 'total_ms': 0.0, 'max_ms': 0.0})
+            entry['count'] += 1
+            entry['total_ms'] += stage['duration_ms']
+            entry['max_ms'] = max(entry['max_ms'], stage['duration_ms'])
+        return result
+
+    def format_breakdown(self) -> str:
+        """Erzeugt eine lesbare Latenz-Aufschlüsselung in Startreihenfolge"""
+        lines = [f"Latenz-Aufschlüsselung {self.label} (gesamt {self.total_ms():.0f} ms):"]
+        for stage in sorted(self.stages, key=lambda s: s['offset_ms']):
+            indent = '  ' * (stage['depth'] + 1)
+            marker = ' [FEHLER]' if stage['failed'] else ''
+            lines.append(f"{indent}{stage['name']:<40} {stage['duration_ms']:>9.1f} ms  (+{stage['offset_ms']:.0f} ms){marker}")
+        return "\n".join(lines)
+
+    def to_record(self) -> Dict:
+        return {
+            'label': self.label,
+            'started_at': self.started_at,
+            'total_ms': self.total_ms(),
+            'stages': sorted(self.stages, key=lambda s: s['offset_ms'])
+        }
+
+
+def enable(flag: bool = True):
+    """Schaltet das Stage-Timing global an/aus"""
+    global _enabled
+    _enabled = flag
+
+
+def is_enabled() -> bool:
+    return _enabled
+
+
+def current_cycle() -> Optional[CycleTimer]:
+    return _current_cycle
+
+
+def start_cycle(label: str) -> Optional[CycleTimer]:
+    """Startet einen neuen Messzyklus (nur wenn Timing aktiv ist)"""
+    global _current_cycle
+    _current_cycle = CycleTimer(label) if _enabled else None
+    return _current_cycle
+
+
+def end_cycle(logger=None, log_file: Optional[str] = TIMING_LOG_FILE) -> Optional[CycleTimer]:
+    """
+    Beendet den aktuellen Zyklus, loggt die Aufschlüsselung und hängt
+    einen JSON-Datensatz an die Timing-Datei an.
+    """
+    global _current_cycle
+    cycle, _current_cycle = _current_cycle, None
+    if cycle is None:
+        return None
+
+    if logger:
+        logger.info(cycle.format_breakdown())
+
+    if log_file:
+        try:
+            os.makedirs(os.path.dirname(log_file), exist_ok=True)
+            with open(log_file, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(cycle.to_record()) + "\n")
+        except OSError as e:
+            if logger: logger.warning(f"Timing-Datensatz konnte nicht geschrieben werden: {e}")
+
+    return cycle
+
+
+def span(name: str):
+    """Kontextmanager für eine gemessene Stufe: `with span('ohlcv.fetch'): ...`"""
+    cycle = _current_cycle
+    if cycle is None:
+        return _NULL_SPAN
+    return _Span(cycle, name)
+
+
+def bind(func):
+    """
+    Übernimmt die Span-Tiefe des aufrufenden Threads für func in einem Worker-Thread
+
+    Beispiel: `pool.submit(bind(task), ...)` - parallele Spans erscheinen unter dem
+    umgebenden Span statt auf Tiefe 0.
+    """
+    cycle = _current_cycle
+    if cycle is None:
+        return func
+    parent_depth = cycle.current_depth()
+
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        previous = cycle.current_depth()  # Pool-Threads werden wiederverwendet
+        cycle._local.depth = parent_depth
+        try:
+            return func(*args, **kwargs)
+        finally:
+            cycle._local.depth = previous
+    return wrapper
+
+
+def timed(name: Optional[str] = None):
+    """Decorator-Variante von span() für Funktionen und Methoden"""
+    def decorator(func):
+        stage_name = name or func.__qualname__
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            cycle = _current_cycle
+            if cycle is None:
+                return func(*args, **kwargs)
+            with _Span(cycle, stage_name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
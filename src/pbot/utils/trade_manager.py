@@ -1,21 +1,24 @@
 # /root/pbot/src/pbot/utils/trade_manager.py
-import json
 import logging
 import os
 import time
-from datetime import datetime, timedelta
-
-import ccxt
-import numpy as np
-import pandas as pd
-import ta
-import math
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
 
 from pbot.strategy.predictor_engine import PredictorEngine
 from pbot.strategy.trade_logic import get_pbot_signal
+from pbot.utils.account_snapshot import get_account_snapshot
+from pbot.utils.database import get_trade_db
 from pbot.utils.exchange import Exchange
-from pbot.utils.telegram import send_message
-from pbot.utils.timeframe_utils import determine_htf
+from pbot.utils.lazy_import import lazy_module
+from pbot.utils.risk_manager import PortfolioRiskManager
+from pbot.utils.state_store import get_state_store
+from pbot.utils.telegram import queue_message
+from pbot.utils.timeframe_utils import determine_htf, last_candle_close_ts
+from pbot.utils.timing import bind, span, timed
+
+ccxt = lazy_module('ccxt')
+pd = lazy_module('pandas')
 
 # --------------------------------------------------------------------------- #
 # Pfade
@@ -23,62 +26,174 @@ from pbot.utils.timeframe_utils import determine_htf
 PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', '..'))
 ARTIFACTS_PATH = os.path.join(PROJECT_ROOT, 'artifacts')
 DB_PATH = os.path.join(ARTIFACTS_PATH, 'db')
-TRADE_LOCK_FILE = os.path.join(DB_PATH, 'trade_lock.json')
+TRADE_LOCK_FILE = os.path.join(DB_PATH, 'trade_lock.json')  # Altformat, wird in den State-Store übernommen
+EQUITY_SNAPSHOT_INTERVAL_S = 60  # mehrere Strategien pro Lauf teilen sich einen Snapshot
 
 
 # --------------------------------------------------------------------------- #
 # Trade-Lock-Hilfsfunktionen
 # --------------------------------------------------------------------------- #
-def load_or_create_trade_lock():
-    os.makedirs(DB_PATH, exist_ok=True)
-    if os.path.exists(TRADE_LOCK_FILE):
-        with open(TRADE_LOCK_FILE, 'r') as f:
-            try:
-                return json.load(f)
-            except json.JSONDecodeError:
-                return {}
-    return {}
-
-def save_trade_lock(trade_lock):
-    with open(TRADE_LOCK_FILE, 'w') as f:
-        json.dump(trade_lock, f, indent=4)
+# Ablaufzeit pro Strategie (Unix-Sekunden) im gemeinsamen State-Store:
+# Lookup per Primärschlüssel statt trade_lock.json pro Prüfung neu zu parsen,
+# Setzen ohne Read-Modify-Write der ganzen Datei (keine verlorenen Locks).
+TRADE_LOCK_NAMESPACE = 'trade_lock'
+_trade_lock_migrated = False
+
+def _trade_lock_store():
+    global _trade_lock_migrated
+    store = get_state_store()
+    if not _trade_lock_migrated:
+        # Einmalig: alte trade_lock.json ("%Y-%m-%d %H:%M:%S", lokale Zeit) übernehmen
+        store.import_json_file(TRADE_LOCK_NAMESPACE, TRADE_LOCK_FILE, lambda locks: {
+            key: datetime.strptime(value, "%Y-%m-%d %H:%M:%S").timestamp() for key, value in locks.items()
+        })
+        _trade_lock_migrated = True
+    return store
 
 def is_trade_locked(symbol_timeframe):
-    trade_lock = load_or_create_trade_lock()
-    lock_time_str = trade_lock.get(symbol_timeframe)
-    if lock_time_str:
-        lock_time = datetime.strptime(lock_time_str, "%Y-%m-%d %H:%M:%S")
-        if datetime.now() < lock_time:
-            return True
-    return False
+    locked_until = _trade_lock_store().get(TRADE_LOCK_NAMESPACE, symbol_timeframe)
+    return locked_until is not None and time.time() < locked_until
 
 def set_trade_lock(symbol_timeframe, lock_duration_minutes=60):
-    lock_time = datetime.now() + timedelta(minutes=lock_duration_minutes)
-    trade_lock = load_or_create_trade_lock()
-    trade_lock[symbol_timeframe] = lock_time.strftime("%Y-%m-%d %H:%M:%S")
-    save_trade_lock(trade_lock)
+    _trade_lock_store().put(TRADE_LOCK_NAMESPACE, symbol_timeframe, time.time() + lock_duration_minutes * 60)
+
+# --------------------------------------------------------------------------- #
+# Latenz-Messung (Kerzenschluss -> Fill)
+# --------------------------------------------------------------------------- #
+def _order_fill_ts(order):
+    """
+    Fill-Zeitpunkt (Unix-Sekunden) aus der ccxt-Order-Antwort, falls vorhanden.
+
+    Nur lastTradeTimestamp: 'timestamp' ist der Erstellungszeitpunkt der Order
+    und würde die Latenz bis zum Fill zu kurz ausweisen.
+    """
+    if not order:
+        return None
+    fill_ms = order.get('lastTradeTimestamp')
+    return fill_ms / 1000.0 if fill_ms else None
+
+def _record_signal_latency(latency, logger):
+    try:
+        get_trade_db().log_signal_latency(latency)
+        close_ts = latency['candle_close_ts']
+        fill_ts = latency.get('order_filled_ts') or latency.get('position_confirmed_ts')
+        if fill_ts:
+            logger.info(f"Latenz Kerzenschluss -> Fill: {(fill_ts - close_ts) * 1000:.0f} ms")
+    except Exception as e:
+        logger.warning(f"Latenz-Datensatz konnte nicht gespeichert werden: {e}")
+
+# --------------------------------------------------------------------------- #
+# Entry-Bestätigung und Schutz-Orders
+# --------------------------------------------------------------------------- #
+def _order_fill(order):
+    """{'contracts', 'price', 'fill_ts'} aus einer ccxt-Order, nur wenn vollständig gefüllt"""
+    if not Exchange.is_fully_filled(order):
+        return None  # Teil-Fill: Schutz-Orders würden nur einen Teil der Position abdecken
+    filled = float(order['filled'])
+    average = order.get('average') or order.get('price')
+    return {'contracts': filled, 'price': float(average) if average else None, 'fill_ts': _order_fill_ts(order)}
+
+def _confirm_entry_fill(exchange, symbol, entry_order):
+    """
+    Fill der Entry-Order: aus der Order-Antwort, sonst per fetch_order gepollt,
+    als letzter Ausweg (auch bei bleibendem Teil-Fill) über die offene Position –
+    deren Kontrakte sind dann maßgeblich für SL/TSL/TP.
+    """
+    fill = _order_fill(entry_order)
+    if fill is None and entry_order.get('id'):
+        with span('entry.wait_for_fill'):
+            fill = _order_fill(exchange.wait_for_order_fill(entry_order['id'], symbol))
+    if fill is None:
+        with span('entry.wait_for_position'):
+            _, position = exchange.wait_for_position(symbol, is_open=True)
+        if position:
+            pos_info = position[0]
+            fill = {'contracts': float(pos_info['contracts']),
+                    'price': float(pos_info['entryPrice']) if pos_info.get('entryPrice') else None, 'fill_ts': None}
+    return fill
+
+def _run_in_span(name, func, *args):
+    with span(name):
+        return func(*args)
+
+def _place_protection(exchange, symbol, close_side, contracts, sl_price, act_price, callback_pct, tp_price, logger):
+    """
+    Setzt Stop-Loss und Trailing-Stop gleichzeitig (zwei Requests parallel statt
+    nacheinander); schlägt der Trailing-Stop fehl, folgt ein fester Take Profit.
+
+    Bitgets Batch-Endpunkt nimmt keine Plan-/Trigger-Orders an, daher parallele Einzel-Requests.
+
+    Returns:
+        {'stop_loss', 'trailing_stop', 'take_profit': Order oder None, 'protected': bool}
+    """
+    sl_rounded = float(exchange.exchange.price_to_precision(symbol, sl_price))
+    with ThreadPoolExecutor(max_workers=2, thread_name_prefix='protection') as pool:
+        sl_future = pool.submit(bind(_run_in_span), 'protection.stop_loss', exchange.place_trigger_market_order,
+                                      symbol, close_side, contracts, sl_rounded, {'reduceOnly': True})
+        tsl_future = pool.submit(bind(_run_in_span), 'protection.trailing_stop', exchange.place_trailing_stop_order,
+                                       symbol, close_side, contracts, act_price, callback_pct, {'reduceOnly': True})
+        sl_order, tsl_order = sl_future.result(), tsl_future.result()
+
+    tp_order = None
+    if tsl_order:
+        logger.info("Trailing-Stop platziert.")
+    else:
+        # Fallback auf Hard Take Profit, wenn TSL fehlschlägt oder nicht gewollt
+        tp_rounded = float(exchange.exchange.price_to_precision(symbol, tp_price))
+        logger.warning("Trailing-Stop nicht gesetzt. Setze festen Take Profit.")
+        with span('protection.take_profit'):
+            tp_order = exchange.place_trigger_market_order(symbol, close_side, contracts, tp_rounded, {'reduceOnly': True})
+
+    if not sl_order:
+        logger.error("Stop-Loss konnte nicht platziert werden!")
+    return {'stop_loss': sl_order, 'trailing_stop': tsl_order, 'take_profit': tp_order,
+            'protected': bool(sl_order and (tsl_order or tp_order))}
+
+# --------------------------------------------------------------------------- #
+# Equity-Zeitreihe
+# --------------------------------------------------------------------------- #
+def record_equity_snapshot(exchange, logger):
+    """Schreibt Equity, offenes Risiko und unrealisierten PnL in die Trade-DB (max. 1x pro Intervall)."""
+    try:
+        db = get_trade_db()
+        last = db.get_last_equity_snapshot()
+        if last and time.time() - last['ts'] < EQUITY_SNAPSHOT_INTERVAL_S:
+            return
+        snapshot = get_account_snapshot(exchange).equity()
+        if not snapshot:
+            return
+        risk_status = PortfolioRiskManager().get_status()  # frischer State aus dem State-Store
+        snapshot['open_risk_pct'] = risk_status['total_risk_pct']
+        snapshot['open_positions'] = risk_status['active_positions_count']
+        db.record_equity_snapshot(snapshot)
+    except Exception as e:
+        logger.warning(f"Equity-Snapshot konnte nicht gespeichert werden: {e}")
 
 # --------------------------------------------------------------------------- #
 # Housekeeper
 # --------------------------------------------------------------------------- #
+@timed('housekeeper')
 def housekeeper_routine(exchange, symbol, logger):
     try:
         logger.info(f"Housekeeper: Starte Aufräumroutine für {symbol}...")
-        exchange.cancel_all_orders_for_symbol(symbol)
-        time.sleep(2)
+        exchange.cancel_all_orders_for_symbol(symbol)  # wartet selbst, bis die Trigger-Orders weg sind
 
-        position = exchange.fetch_open_positions(symbol)
+        account = get_account_snapshot(exchange)
+        position = account.open_positions(symbol)
         if position:
             pos_info = position[0]
             close_side = 'sell' if pos_info['side'] == 'long' else 'buy'
             logger.warning(f"Housekeeper: Schließe verwaiste Position ({pos_info['side']} {pos_info['contracts']})...")
             exchange.create_market_order(symbol, close_side, float(pos_info['contracts']), {'reduceOnly': True})
-            time.sleep(3)
-
-        if exchange.fetch_open_positions(symbol):
-            logger.error("Housekeeper: Position konnte nicht geschlossen werden!")
-        else:
-            logger.info(f"Housekeeper: {symbol} ist jetzt sauber.")
+            # Close-Order verändert Positionen und freie Margin: Snapshot für alle verwerfen
+            account.invalidate()
+            with span('housekeeper.wait_for_close'):
+                closed, _ = exchange.wait_for_position(symbol, is_open=False)
+            if not closed:
+                logger.error("Housekeeper: Position konnte nicht geschlossen werden!")
+                return True
+
+        logger.info(f"Housekeeper: {symbol} ist jetzt sauber.")
         return True
     except Exception as e:
         logger.error(f"Housekeeper-Fehler: {e}", exc_info=True)
@@ -88,6 +203,7 @@ def housekeeper_routine(exchange, symbol, logger):
 # --------------------------------------------------------------------------- #
 # Hauptfunktion: Trade öffnen + SL/TP/TSL setzen (PBot Version)
 # --------------------------------------------------------------------------- #
+@timed('check_and_open_new_position')
 def check_and_open_new_position(exchange, model, scaler, params, telegram_config, logger):
     symbol = params['market']['symbol']
     timeframe = params['market']['timeframe']
@@ -98,6 +214,7 @@ def check_and_open_new_position(exchange, model, scaler, params, telegram_config
         logger.info(f"Trade für {symbol_timeframe} gesperrt – überspringe.")
         return
 
+    latency = None  # Wird bei einem Signal befüllt und am Ende gespeichert
     try:
         # --------------------------------------------------- #
         # 1. Daten holen + Predictor Engine ausführen
@@ -105,7 +222,8 @@ def check_and_open_new_position(exchange, model, scaler, params, telegram_config
         logger.info(f"Prüfe PBot-Signal für {symbol} ({timeframe})...")
 
         # Aktuelle Daten holen
-        recent_data = exchange.fetch_recent_ohlcv(symbol, timeframe, limit=300)
+        with span('ohlcv.ltf'):
+            recent_data = exchange.fetch_recent_ohlcv(symbol, timeframe, limit=300)
         if recent_data.empty or len(recent_data) < 100:
             logger.warning("Nicht genügend OHLCV-Daten für Predictor – überspringe.")
             return
@@ -114,9 +232,11 @@ def check_and_open_new_position(exchange, model, scaler, params, telegram_config
         htf_data = pd.DataFrame()
         if htf and htf != timeframe:
             # Wir brauchen genug Daten für den EMA auf dem HTF
-            htf_data = exchange.fetch_recent_ohlcv(symbol, htf, limit=100)
+            with span('ohlcv.htf'):
+                htf_data = exchange.fetch_recent_ohlcv(symbol, htf, limit=100)
             if htf_data.empty:
                 logger.warning(f"Konnte HTF Daten ({htf}) nicht laden. MTF Filter wird ignoriert.")
+        data_received_ts = time.time()
 
         # Engine initialisieren
         strategy_params = params.get('strategy', {})
@@ -129,7 +249,8 @@ def check_and_open_new_position(exchange, model, scaler, params, telegram_config
 
         # Analyse durchführen
         # Die Engine berechnet intern ATR, RSI, Score, etc.
-        analysis_result = predictor.analyze(recent_data, htf_data)
+        with span('predictor.analyze'):
+            analysis_result = predictor.analyze(recent_data, htf_data)
 
         # Supertrend-Filter Logging (zeigt, ob veto erfolgte)
         st_trend = analysis_result.get('st_trend') if analysis_result else None
@@ -146,7 +267,18 @@ def check_and_open_new_position(exchange, model, scaler, params, telegram_config
             logger.info(f"Kein Signal (Score: {score:.2f}) – überspringe.")
             return
 
-        if exchange.fetch_open_positions(symbol):
+        latency = {
+            'symbol': symbol,
+            'timeframe': timeframe,
+            'side': signal_side,
+            'candle_close_ts': last_candle_close_ts(timeframe, data_received_ts) or data_received_ts,
+            'data_received_ts': data_received_ts,
+            'decision_ts': time.time(),
+            'protected_ts': None,
+            'status': 'skipped'
+        }
+
+        if get_account_snapshot(exchange).open_positions(symbol):
             logger.info("Position bereits offen – überspringe.")
             return
 
@@ -174,7 +306,7 @@ def check_and_open_new_position(exchange, model, scaler, params, telegram_config
         # --------------------------------------------------- #
         # 3. Balance & Risiko berechnen
         # --------------------------------------------------- #
-        balance = exchange.fetch_balance_usdt()
+        balance = get_account_snapshot(exchange).free_balance()
         if balance <= 0:
             logger.error("Kein USDT-Guthaben.")
             return
@@ -270,6 +402,7 @@ def check_and_open_new_position(exchange, model, scaler, params, telegram_config
         # --------------------------------------------------- #
         logger.info(f"Eröffne {pos_side.upper()}-Position: {amount:.6f} Contracts @ ${entry_price:.6f} | Risk: {risk_usdt:.2f} USDT")
 
+        latency['order_sent_ts'] = time.time()
         entry_order = exchange.create_market_order(
             symbol, pos_side, amount,
             {
@@ -280,28 +413,27 @@ def check_and_open_new_position(exchange, model, scaler, params, telegram_config
 
         if not entry_order:
             logger.error("Market-Order fehlgeschlagen.")
+            latency['status'] = 'order_failed'
             return
 
-        time.sleep(2)
-        position = exchange.fetch_open_positions(symbol)
-        if not position:
+        latency['order_id'] = entry_order.get('id')
+
+        get_account_snapshot(exchange).invalidate()  # Margin gebunden: nächste Strategie sized auf frischer Balance
+        fill = _confirm_entry_fill(exchange, symbol, entry_order)
+        if not fill:
             logger.error("Position wurde nicht eröffnet.")
+            latency['status'] = 'order_failed'
             return
 
-        pos_info = position[0]
-        entry_price = float(pos_info.get('entryPrice', entry_price))
-        contracts = float(pos_info['contracts'])
-
-        # --------------------------------------------------- #
-        # 5. SL & TP (Trigger-Market-Orders)
-        # --------------------------------------------------- #
-        sl_rounded = float(exchange.exchange.price_to_precision(symbol, sl_price))
+        latency['position_confirmed_ts'] = time.time()
+        latency['order_filled_ts'] = fill['fill_ts']  # None (NULL) ohne Fill-Zeit der Börse
+        latency['status'] = 'filled'
 
-        # Sende Hard Stop Loss
-        exchange.place_trigger_market_order(symbol, tsl_side, contracts, sl_rounded, {'reduceOnly': True})
+        entry_price = fill['price'] or entry_price
+        contracts = fill['contracts']
 
         # --------------------------------------------------- #
-        # 6. Trailing-Stop-Loss (Optional, falls konfiguriert)
+        # 5. SL + Trailing-Stop-Loss (TP als Fallback), gleichzeitig gesendet
         # --------------------------------------------------- #
         # Wenn TSL konfiguriert ist, übernimmt er die Rolle des TP und zieht den SL nach
         act_rr = risk_params.get('trailing_stop_activation_rr', 1.5)
@@ -314,17 +446,11 @@ def check_and_open_new_position(exchange, model, scaler, params, telegram_config
 
         act_price_rounded = float(exchange.exchange.price_to_precision(symbol, act_price))
 
-        tsl = exchange.place_trailing_stop_order(
-            symbol, tsl_side, contracts, act_price, callback_pct, {'reduceOnly': True}
-        )
-
-        if tsl:
-            logger.info("Trailing-Stop platziert.")
-        else:
-            # Fallback auf Hard Take Profit, wenn TSL fehlschlägt oder nicht gewollt
-            tp_rounded = float(exchange.exchange.price_to_precision(symbol, tp_price))
-            logger.warning("Trailing-Stop nicht gesetzt. Setze festen Take Profit.")
-            exchange.place_trigger_market_order(symbol, tsl_side, contracts, tp_rounded, {'reduceOnly': True})
+        protection = _place_protection(exchange, symbol, tsl_side, contracts, sl_price, act_price, callback_pct, tp_price, logger)
+        if protection['protected']:
+            latency['protected_ts'] = time.time()
+            fill_ts = latency['order_filled_ts'] or latency['position_confirmed_ts']
+            logger.info(f"Time-to-Protection (Fill -> SL/TSL platziert): {(latency['protected_ts'] - fill_ts) * 1000:.0f} ms")
 
         set_trade_lock(symbol_timeframe)
 
@@ -353,32 +479,41 @@ def check_and_open_new_position(exchange, model, scaler, params, telegram_config
                 f"⚙️ Hebel: {leverage}x\n"
                 f"🛡️ Risiko: {risk_pct*100:.1f}% ({risk_usdt:.2f} USDT)"
             )
-            send_message(telegram_config['bot_token'], telegram_config['chat_id'], msg)
+            with span('telegram.enqueue'):
+                queue_message(telegram_config['bot_token'], telegram_config['chat_id'], msg)
 
 
         logger.info("Trade-Eröffnung erfolgreich abgeschlossen.")
 
     except ccxt.InsufficientFunds as e:
         logger.error(f"InsufficientFunds: {e}")
+        if latency and latency['status'] == 'skipped': latency['status'] = 'error'
     except ccxt.ExchangeError as e:
         logger.error(f"Börsenfehler: {e}", exc_info=True)
+        if latency and latency['status'] == 'skipped': latency['status'] = 'error'
     except Exception as e:
         logger.error(f"Unerwarteter Fehler: {e}", exc_info=True)
+        if latency and latency['status'] == 'skipped': latency['status'] = 'error'
         housekeeper_routine(exchange, symbol, logger)
+    finally:
+        if latency is not None:
+            _record_signal_latency(latency, logger)
 
 
 # --------------------------------------------------------------------------- #
 # Vollständiger Handelszyklus (Unverändert übernommen)
 # --------------------------------------------------------------------------- #
+@timed('full_trade_cycle')
 def full_trade_cycle(exchange, model, scaler, params, telegram_config, logger):
     symbol = params['market']['symbol']
     try:
-        pos = exchange.fetch_open_positions(symbol)
+        pos = get_account_snapshot(exchange).open_positions(symbol)
         if pos:
             logger.info(f"Position offen – Management via SL/TP/TSL.")
         else:
             housekeeper_routine(exchange, symbol, logger)
             check_and_open_new_position(exchange, model, scaler, params, telegram_config, logger)
+        record_equity_snapshot(exchange, logger)
     except ccxt.DDoSProtection:
         logger.warning("Rate-Limit – warte 10s.")
         time.sleep(10)
@@ -0,0 +1,41 @@
+# tests/conftest.py
+import os
+import sys
+
+import pytest
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(os.path.join(PROJECT_ROOT, 'src'))
+
+from pbot.analysis import result_cache
+from pbot.utils import state_store
+
+
+@pytest.fixture(autouse=True)
+def isolated_result_cache(tmp_path):
+    """Ergebnis-Cache pro Test in ein temporäres Verzeichnis umlenken (kein Schreiben nach artifacts/)."""
+    previous = dict(result_cache._settings)
+    result_cache.configure(cache_dir=str(tmp_path / 'result_cache'))
+    yield
+    result_cache._settings.update(previous)
+
+
+@pytest.fixture(scope='session', autouse=True)
+def isolated_state_session(tmp_path_factory):
+    """Sitzungsweite Umlenkung, greift auch in Modul-Fixtures (laufen vor den Funktions-Fixtures)."""
+    state_dir = tmp_path_factory.mktemp('state_session')
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setenv(state_store.STATE_DB_ENV, str(state_dir / 'pbot_state.db'))
+        mp.setattr(state_store, '_store_instance', None)
+        mp.setattr('pbot.utils.risk_manager.RISK_STATE_FILE', str(state_dir / 'risk_state.json'))
+        mp.setattr('pbot.utils.trade_manager.TRADE_LOCK_FILE', str(state_dir / 'trade_lock.json'))
+        yield
+
+
+@pytest.fixture(autouse=True)
+def isolated_state_store(tmp_path, monkeypatch):
+    """Gemeinsamen State-Store (Trade-Locks, Risk-State) pro Test in eine temporäre DB umlenken."""
+    monkeypatch.setenv(state_store.STATE_DB_ENV, str(tmp_path / 'state' / 'pbot_state.db'))
+    monkeypatch.setattr(state_store, '_store_instance', None)
+    monkeypatch.setattr('pbot.utils.risk_manager.RISK_STATE_FILE', str(tmp_path / 'state' / 'risk_state.json'))
+    monkeypatch.setattr('pbot.utils.trade_manager.TRADE_LOCK_FILE', str(tmp_path / 'state' / 'trade_lock.json'))
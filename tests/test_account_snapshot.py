@@ -0,0 +1,150 @@
+# tests/test_account_snapshot.py
+import os
+import sys
+import time
+import logging
+import multiprocessing as mp
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(os.path.join(PROJECT_ROOT, 'src'))
+
+from pbot.utils import account_snapshot, state_store, trade_manager
+from pbot.utils.account_snapshot import AccountSnapshotService, get_account_snapshot
+from pbot.utils.state_store import StateStore, get_state_store
+
+
+class FakeExchange:
+    """Zählt REST-Aufrufe; Positionen pro Symbol frei setzbar."""
+
+    def __init__(self, positions=None, latency_s=0.0):
+        self.positions = positions or {}
+        self.latency_s = latency_s
+        self.calls = {'fetch_all_open_positions': 0, 'fetch_account_balance': 0, 'fetch_open_positions': 0}
+        self.account = {'name': 'test'}
+
+    def _open(self, symbol):
+        contracts = self.positions.get(symbol, 0)
+        return [{'symbol': symbol, 'side': 'long', 'contracts': contracts, 'entryPrice': 1.0}] if contracts else []
+
+    def fetch_all_open_positions(self):
+        self.calls['fetch_all_open_positions'] += 1
+        time.sleep(self.latency_s)
+        return [p for symbol in self.positions for p in self._open(symbol)]
+
+    def fetch_account_balance(self):
+        self.calls['fetch_account_balance'] += 1
+        return {'free': 100.0, 'equity': {'equity': 120.0, 'available': 100.0, 'unrealized_pnl': 1.5}}
+
+    def fetch_open_positions(self, symbol):
+        self.calls['fetch_open_positions'] += 1
+        return self._open(symbol)
+
+    def wait_for_position(self, symbol, is_open=True, timeout_s=5.0):
+        positions = self.fetch_open_positions(symbol)
+        return bool(positions) == is_open, positions
+
+    def cancel_all_orders_for_symbol(self, symbol):
+        pass
+
+    def create_market_order(self, symbol, side, amount, params={}):
+        self.positions[symbol] = 0
+        return {'id': 'close'}
+
+
+def test_snapshot_shared_between_services_and_updates():
+    """Ein Abruf für alle Symbole + Balance; weitere Prozesse lesen aus dem Store; Events patchen den Snapshot."""
+    exchange = FakeExchange({'BTC/USDT:USDT': 2, 'ETH/USDT:USDT': 0})
+    first = AccountSnapshotService(exchange)
+    assert first.open_positions('BTC/USDT:USDT')[0]['contracts'] == 2
+    assert first.open_positions('ETH/USDT:USDT') == []
+
+    second = AccountSnapshotService(exchange)
+    assert second.free_balance() == 100.0 and second.equity()['unrealized_pnl'] == 1.5
+    assert exchange.calls['fetch_all_open_positions'] == exchange.calls['fetch_account_balance'] == 1
+
+    first.consume([[{'symbol': 'ETH/USDT:USDT', 'side': 'short', 'contracts': 3}],
+                   [{'symbol': 'BTC/USDT:USDT', 'side': 'long', 'contracts': 0}]])
+    third = AccountSnapshotService(exchange)
+    assert third.open_positions('ETH/USDT:USDT')[0]['side'] == 'short'
+    assert third.open_positions('BTC/USDT:USDT') == []
+    assert exchange.calls['fetch_all_open_positions'] == 1
+
+    third.invalidate()
+    assert AccountSnapshotService(exchange).open_positions('BTC/USDT:USDT')[0]['contracts'] == 2
+    assert exchange.calls['fetch_all_open_positions'] == 2
+
+    expired = AccountSnapshotService(exchange, ttl_s=0)
+    expired.open_positions('BTC/USDT:USDT')
+    assert exchange.calls['fetch_all_open_positions'] == 3
+
+
+def test_invalidation_wins_over_refresh_in_flight():
+    """Abruf läuft -> anderer Prozess invalidiert -> Abruf endet: Ergebnis wird nicht geteilt, nächster Zugriff ruft neu ab."""
+    exchange = FakeExchange({'BTC/USDT:USDT': 1})
+    service, other = AccountSnapshotService(exchange), AccountSnapshotService(exchange)
+    fetch = exchange.fetch_all_open_positions
+
+    def fetch_then_invalidate():
+        positions = fetch()
+        other.invalidate()  # Entry eines anderen Prozesses, während unser Abruf unterwegs ist
+        exchange.positions['ETH/USDT:USDT'] = 2
+        return positions
+
+    exchange.fetch_all_open_positions = fetch_then_invalidate
+    assert service.open_positions('ETH/USDT:USDT') == []  # Aufrufer bekommt sein Ergebnis
+    assert get_state_store().get(account_snapshot.ACCOUNT_NAMESPACE, 'snapshot:test') is None
+
+    exchange.fetch_all_open_positions = fetch
+    assert other.open_positions('ETH/USDT:USDT')[0]['contracts'] == 2
+    assert exchange.calls['fetch_all_open_positions'] == 2
+
+    # Invalidierung eines anderen Prozesses greift sofort, nicht erst nach Ablauf der TTL
+    other.invalidate()
+    assert service.open_positions('BTC/USDT:USDT')[0]['contracts'] == 1
+    assert exchange.calls['fetch_all_open_positions'] == 3
+
+
+def _lease_worker(db_path, start_event, results):
+    exchange = FakeExchange({'BTC/USDT:USDT': 1}, latency_s=0.3)
+    service = AccountSnapshotService(exchange, store=StateStore(db_path))
+    start_event.wait()
+    positions = service.open_positions('BTC/USDT:USDT')
+    results.put((exchange.calls['fetch_all_open_positions'], positions[0]['contracts']))
+
+
+def test_lease_lets_one_process_fetch():
+    """Sechs Prozesse mit veraltetem Snapshot gleichzeitig: genau einer ruft ab, alle bekommen dasselbe Ergebnis."""
+    db_path = state_store.get_state_store().db_path
+    StateStore(db_path)
+    ctx = mp.get_context('fork')
+    start_event, results = ctx.Event(), ctx.Queue()
+    procs = [ctx.Process(target=_lease_worker, args=(db_path, start_event, results)) for _ in range(6)]
+    for p in procs: p.start()
+    start_event.set()
+    outcomes = [results.get(timeout=30) for _ in procs]
+    for p in procs: p.join()
+    assert sum(calls for calls, _ in outcomes) == 1
+    assert all(contracts == 1 for _, contracts in outcomes)
+
+
+def test_cycle_without_positions_uses_one_refresh(monkeypatch):
+    """Sieben Strategien ohne Position: ein Positions- und ein Balance-Abruf insgesamt."""
+    exchange = FakeExchange()
+    monkeypatch.setattr(account_snapshot, '_services', {})
+    monkeypatch.setattr(trade_manager.time, 'sleep', lambda s: None)
+    monkeypatch.setattr(trade_manager, 'check_and_open_new_position', lambda *a: None)
+    monkeypatch.setattr(trade_manager, 'record_equity_snapshot', lambda ex, log: get_account_snapshot(ex).equity())
+    logger = logging.getLogger('test')
+
+    for i in range(7):
+        params = {'market': {'symbol': f'S{i}/USDT:USDT', 'timeframe': '15m'}}
+        trade_manager.full_trade_cycle(exchange, None, None, params, {}, logger)
+    assert exchange.calls == {'fetch_all_open_positions': 1, 'fetch_account_balance': 1, 'fetch_open_positions': 0}
+
+    # Verwaiste Position: Housekeeper schließt sie, verwirft den Snapshot und prüft einmal gezielt
+    exchange.positions['S0/USDT:USDT'] = 1
+    get_state_store().delete(account_snapshot.ACCOUNT_NAMESPACE, 'snapshot:test')
+    monkeypatch.setattr(account_snapshot, '_services', {})
+    trade_manager.housekeeper_routine(exchange, 'S0/USDT:USDT', logger)
+    assert exchange.calls['fetch_open_positions'] == 1
+    assert get_state_store().get(account_snapshot.ACCOUNT_NAMESPACE, 'snapshot:test') is None
@@ -0,0 +1,81 @@
+# tests/test_chart_builder.py
+import os
+import sys
+import json
+
+import numpy as np
+import pandas as pd
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(os.path.join(PROJECT_ROOT, 'src'))
+
+from pbot.analysis.chart_builder import build_price_chart, build_trade_traces, lttb_indices, resample_ohlc
+from pbot.analysis.interactive_status import create_interactive_chart, simulate_trades
+from pbot.analysis.trade_log import TRADE_LOG_DTYPE
+
+
+def _ohlcv(n):
+    rng = np.random.default_rng(1)
+    close = 100 + np.cumsum(rng.normal(0, 1, n))
+    index = pd.date_range('2024-01-01', periods=n, freq='5min', tz='UTC')
+    return pd.DataFrame({'open': close, 'high': close + 1, 'low': close - 1, 'close': close,
+                         'ema_20': pd.Series(close).ewm(span=20).mean().to_numpy()}, index=index)
+
+
+def test_trade_markers_use_fixed_number_of_traces():
+    """Die Anzahl Marker-Traces hängt nicht von der Anzahl Trades ab."""
+    df = _ohlcv(300)
+    trades = [{'entry_time': df.index[i], 'entry_price': 100.0, 'exit_time': df.index[i + 5],
+               'exit_price': 101.0 if i % 20 else 99.0, 'profit': 1.0 if i % 20 else -1.0} for i in range(0, 250, 10)]
+
+    traces = build_trade_traces(trades)
+    assert len(traces) == 5
+    connectors = [t for t in traces if t.mode == 'lines']
+    assert sum(len(t.x) for t in connectors) == 3 * len(trades)  # Entry, Exit, Lücke je Trade
+
+
+def test_downsampling_keeps_extremes_and_budget():
+    """OHLC-Buckets erhalten High/Low, LTTB hält das Punkt-Budget inkl. Endpunkten ein."""
+    df = _ohlcv(10_000)
+    candles = resample_ohlc(df, 500)
+    assert len(candles) == 500
+    assert candles['high'].max() == df['high'].max() and candles['low'].min() == df['low'].min()
+    assert candles['open'].iloc[0] == df['open'].iloc[0] and candles['close'].iloc[-1] == df['close'].iloc[-1]
+
+    idx = lttb_indices(np.arange(len(df)), df['close'].to_numpy(), 500)
+    assert len(idx) == 500 and idx[0] == 0 and idx[-1] == len(df) - 1
+    assert np.all(np.diff(idx) > 0)
+
+    fig = build_price_chart(df, [], 'Test', max_points=500)
+    assert all(len(trace.x) <= 500 for trace in fig.data)
+
+
+def test_interactive_chart_shows_simulated_trades():
+    """Status-Chart zeigt die Trades aus dem Backtest der gewählten Config."""
+    df = pd.read_csv(os.path.join(PROJECT_ROOT, 'data', 'cache', 'AAVE-USDT-USDT_1d.csv'), index_col='timestamp', parse_dates=True)
+    df.index = pd.to_datetime(df.index, utc=True)
+    with open(os.path.join(PROJECT_ROOT, 'src', 'pbot', 'strategy', 'configs', 'config_AAVEUSDTUSDT_1h.json')) as f:
+        config = json.load(f)
+
+    trade_log = simulate_trades(config, df)
+    assert len(trade_log) > 0 and trade_log['exit_idx'].max() < len(df)
+    fig = create_interactive_chart('AAVE/USDT:USDT', '1d', df, trade_log, None, None)
+    assert len(fig.data) > len(build_price_chart(df, [], 'Test').data)
+
+
+def test_interactive_chart_window_drops_outside_trades():
+    """Mit window liegen Kerzen und alle Trade-Marker im gewählten Zeitraum."""
+    index = pd.date_range(end=pd.Timestamp.now(tz='UTC').floor('h'), periods=300, freq='h')
+    close = np.linspace(100, 130, 300)
+    df = pd.DataFrame({'open': close, 'high': close + 1, 'low': close - 1, 'close': close}, index=index)
+    log = np.zeros(3, dtype=TRADE_LOG_DTYPE)
+    log['entry_idx'], log['exit_idx'] = [10, 190, 250], [40, 220, 290]  # erster Trade liegt vor dem Fenster
+    log['entry_price'], log['exit_price'], log['pnl'] = [101, 117, 125], [104, 119, 129], [3.0, 2.0, 4.0]
+
+    fig = create_interactive_chart('BTC/USDT:USDT', '1h', df, log, None, None, window=5)
+    shown = df.index[df.index >= pd.Timestamp.now(tz='UTC') - pd.Timedelta(days=5)]
+    markers = [trace for trace in fig.data if trace.type == 'scatter' and trace.mode == 'markers']
+    times = pd.to_datetime([x for trace in markers for x in trace.x], utc=True)
+    assert len(times) == 4  # Entry + Exit der beiden Trades im Fenster
+    assert times.min() >= shown[0] and times.max() <= shown[-1]
+    assert fig.data[0].x[0] >= shown[0]
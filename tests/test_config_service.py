@@ -0,0 +1,83 @@
+# tests/test_config_service.py
+import os
+import sys
+import json
+import time
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(os.path.join(PROJECT_ROOT, 'src'))
+
+from pbot.utils.config_service import ConfigService
+
+CONFIG = {
+    "market": {"symbol": "BTC/USDT:USDT", "timeframe": "30m"},
+    "strategy": {"length": 14, "min_score": 1.0},
+    "risk": {"risk_reward_ratio": 2.0, "risk_per_trade_pct": 1.0, "leverage": 10, "margin_mode": "isolated"},
+    "behavior": {"use_longs": True, "use_shorts": True}
+}
+
+
+def write_json(path, data, mtime_offset=0):
+    tmp = f"{path}.tmp"
+    with open(tmp, 'w') as f:
+        f.write(data if isinstance(data, str) else json.dumps(data))
+    os.replace(tmp, path)
+    stamp = time.time() + mtime_offset  # mtime sicher verschieden, auch bei grober Dateisystem-Auflösung
+    os.utime(path, (stamp, stamp))
+
+
+def test_validated_reload_keeps_last_good_config(tmp_path):
+    """Geänderte Dateien werden übernommen, ungültige verworfen, gelöschte entfernt; Vorlagen ignoriert."""
+    configs, settings = tmp_path / 'configs', tmp_path / 'settings.json'
+    configs.mkdir()
+    btc = str(configs / 'config_BTCUSDTUSDT_30m.json')
+    write_json(btc, CONFIG)
+    write_json(str(configs / 'config_ETHUSDTUSDT_6h_macd.json'), {**CONFIG, 'market': {'symbol': 'ETH/USDT:USDT', 'timeframe': '6h'}})
+    write_json(str(configs / 'config_TEMPLATE_v2.json'), CONFIG)
+    write_json(str(settings), {'live_trading_settings': {'active_strategies': []}})
+
+    service = ConfigService(str(configs), str(settings))
+    assert service.version == 1 and sorted(service.snapshot.strategies) == [
+        'config_BTCUSDTUSDT_30m.json', 'config_ETHUSDTUSDT_6h_macd.json']
+    params = service.get_config('BTC/USDT:USDT', '30m')
+    assert params['market']['htf'] == '2h' and params['risk']['leverage'] == 10
+    assert service.get_config('ETH/USDT:USDT', '6h')['market']['htf'] == '1d'  # Fallback auf _macd
+    params['risk']['leverage'] = 99
+    assert service.get_config('BTC/USDT:USDT', '30m')['risk']['leverage'] == 10  # Aufrufer bekommt Kopien
+    assert not service.reload()
+
+    write_json(btc, {**CONFIG, 'risk': {**CONFIG['risk'], 'leverage': 5}}, mtime_offset=1)
+    assert service.reload() and service.version == 2
+    assert service.get_config('BTC/USDT:USDT', '30m')['risk']['leverage'] == 5
+
+    for broken in ('{"market": {"symb', {**CONFIG, 'risk': {'leverage': -3}},
+                   {**CONFIG, 'market': {'symbol': 'ETH/USDT:USDT', 'timeframe': '30m'}}):
+        write_json(btc, broken, mtime_offset=2 + len(str(broken)))
+        assert not service.reload() and service.version == 2
+        assert service.get_config('BTC/USDT:USDT', '30m')['risk']['leverage'] == 5
+
+    write_json(str(settings), {'live_trading_settings': {'active_strategies': [{'symbol': 'BTC/USDT:USDT'}]}}, mtime_offset=1)
+    os.remove(btc)
+    assert service.reload() and service.version == 3
+    assert service.get_config('BTC/USDT:USDT', '30m') is None
+    assert service.live_settings['active_strategies'] == [{'symbol': 'BTC/USDT:USDT'}]
+
+
+def test_background_polling_swaps_in_optimizer_output(tmp_path):
+    """start(): neue Optimizer-Config ist ohne Neustart aktiv, stop() beendet das Polling."""
+    configs = tmp_path / 'configs'
+    configs.mkdir()
+    service = ConfigService(str(configs), str(tmp_path / 'settings.json'), poll_interval_s=0.02)
+    assert service.get_config('BTC/USDT:USDT', '30m') is None
+    version = service.version
+    service.start()
+    try:
+        write_json(str(configs / 'config_BTCUSDTUSDT_30m.json'), CONFIG)
+        deadline = time.time() + 5
+        while service.get_config('BTC/USDT:USDT', '30m') is None and time.time() < deadline:
+            time.sleep(0.01)
+        assert service.get_config('BTC/USDT:USDT', '30m')['strategy']['length'] == 14
+        assert service.version == version + 1
+    finally:
+        service.stop()
+    assert not service._thread.is_alive()
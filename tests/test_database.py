@@ -0,0 +1,156 @@
+# tests/test_database.py
+import os
+import sys
+import time
+import sqlite3
+import multiprocessing as mp
+from datetime import datetime, timedelta
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(os.path.join(PROJECT_ROOT, 'src'))
+
+from pbot.utils.database import TradeDatabase
+
+
+def test_latency_report_percentiles(tmp_path):
+    """Latenz-Perzentile werden pro Symbol/Timeframe aus den Zeitstempeln berechnet."""
+    db = TradeDatabase(str(tmp_path / "trades.db"))
+    close_ts = time.time() - 3600
+
+    for i in range(11):
+        db.log_signal_latency({
+            'symbol': 'BTC/USDT:USDT', 'timeframe': '15m', 'side': 'buy',
+            'candle_close_ts': close_ts,
+            'data_received_ts': close_ts + 1.0,
+            'decision_ts': close_ts + 1.1,
+            'order_sent_ts': close_ts + 1.2,
+            'order_filled_ts': close_ts + 1.2 + i * 0.1,
+            'status': 'filled'
+        })
+    # Signal ohne Order: zählt nur für die frühen Stufen
+    db.log_signal_latency({
+        'symbol': 'ETH/USDT:USDT', 'timeframe': '6h', 'side': 'sell',
+        'candle_close_ts': close_ts, 'data_received_ts': close_ts + 2.0,
+        'decision_ts': close_ts + 2.5, 'status': 'skipped'
+    })
+
+    report = {(r['symbol'], r['timeframe']): r for r in db.get_latency_report(days=1)}
+
+    btc = report[('BTC/USDT:USDT', '15m')]
+    assert btc['signals'] == 11
+    assert round(btc['close_to_data_p50']) == 1000
+    assert round(btc['order_to_fill_p50']) == 500
+    assert round(btc['order_to_fill_p90']) == 900
+    assert round(btc['close_to_fill_p99']) == 2190
+
+    eth = report[('ETH/USDT:USDT', '6h')]
+    assert round(eth['data_to_decision_p50']) == 500
+    assert eth['close_to_fill_count'] == 0
+    assert eth['close_to_fill_p50'] is None
+
+
+def test_trade_statistics_breakdown(tmp_path):
+    """Gesamt- und Gruppenstatistik aus der SQL-Aggregation entsprechen den Einzeltrades."""
+    db = TradeDatabase(str(tmp_path / "trades.db"))
+    now = datetime.now()
+    trades = [('BTC/USDT:USDT', '15m', 30.0), ('BTC/USDT:USDT', '1h', -10.0),
+              ('ETH/USDT:USDT', '15m', 20.0), ('ETH/USDT:USDT', '15m', -5.0)]
+
+    for i, (symbol, timeframe, pnl) in enumerate(trades):
+        trade_id = db.log_trade_open({
+            'symbol': symbol, 'timeframe': timeframe, 'side': 'buy',
+            'entry_time': now - timedelta(hours=2, minutes=i), 'entry_price': 100.0, 'stop_loss': 99.0,
+            'position_size': 1.0, 'notional_value': 100.0, 'leverage': 10, 'risk_pct': 1.0, 'risk_usd': 1.0
+        })
+        db.log_trade_close(trade_id, {
+            'exit_time': now - timedelta(hours=1), 'exit_price': 100.0,
+            'exit_reason': 'test', 'pnl_usd': pnl, 'pnl_pct': pnl
+        })
+
+    stats = db.get_trade_statistics(days=1)
+    assert stats['trades_count'] == 4
+    assert stats['win_rate'] == 50
+    assert stats['total_pnl_usd'] == 35.0
+    assert stats['max_win'] == 30.0 and stats['max_loss'] == -10.0
+    assert stats['profit_factor'] == 50.0 / 15.0
+
+    btc = stats['by_symbol']['BTC/USDT:USDT']
+    assert btc['trades_count'] == 2 and btc['total_pnl_usd'] == 20.0
+    tf_15m = stats['by_timeframe']['15m']
+    assert tf_15m['trades_count'] == 3 and tf_15m['max_loss'] == -5.0
+    assert stats['by_symbol']['ETH/USDT:USDT']['avg_loss'] == 5.0
+    assert stats['by_timeframe']['15m']['profit_factor'] == 50.0 / 5.0
+
+
+def _writer_process(db_path, worker, writes, errors):
+    db = TradeDatabase(db_path)
+    for i in range(writes):
+        try:
+            with db.batch():
+                db.log_signal_latency({
+                    'symbol': f'SYM{worker}/USDT:USDT', 'timeframe': '5m', 'side': 'buy',
+                    'candle_close_ts': time.time(), 'status': 'skipped'
+                })
+        except sqlite3.OperationalError:
+            errors.put(1)
+    db.close()
+
+
+def test_concurrent_writer_processes(tmp_path):
+    """Viele Schreib-Prozesse gleichzeitig: WAL + busy_timeout verliert keine Zeile."""
+    db_path = str(tmp_path / "trades.db")
+    db = TradeDatabase(db_path)
+    assert db._connection().execute('PRAGMA journal_mode').fetchone()[0] == 'wal'
+
+    processes, writes = 8, 50
+    errors = mp.Queue()
+    procs = [mp.Process(target=_writer_process, args=(db_path, w, writes, errors)) for w in range(processes)]
+    for p in procs: p.start()
+    for p in procs: p.join()
+
+    assert errors.empty()
+    with db._get_connection() as conn:
+        rows = conn.execute('SELECT COUNT(*) FROM signal_latency').fetchone()[0]
+    assert rows == processes * writes
+
+
+def test_batch_rolls_back_on_error(tmp_path):
+    """Ein Fehler innerhalb von batch() verwirft alle Schreibvorgänge des Batches."""
+    db = TradeDatabase(str(tmp_path / "trades.db"))
+    info = {'symbol': 'BTC/USDT:USDT', 'timeframe': '1h', 'side': 'sell', 'candle_close_ts': time.time()}
+
+    try:
+        with db.batch():
+            db.log_signal_latency(info)
+            db.log_signal_latency({'symbol': 'fehlt'})
+    except KeyError:
+        pass
+
+    db.log_signal_latency(info)
+    with db._get_connection() as conn:
+        assert conn.execute('SELECT COUNT(*) FROM signal_latency').fetchone()[0] == 1
+
+
+def test_equity_rollups_and_retention(tmp_path):
+    """Equity-Snapshots landen in Minuten/Stunden/Tages-Rollups, alte Rohdaten werden entfernt."""
+    db = TradeDatabase(str(tmp_path / "trades.db"))
+    hour = (int(time.time()) // 86400 * 86400) - 86400  # gestern 00:00 UTC
+
+    db.record_equity_snapshot({'ts': hour - 5 * 86400, 'equity': 900.0})  # außerhalb Rohdaten-Frist
+    for i, equity in enumerate([1000.0, 1040.0, 980.0, 1010.0]):
+        db.record_equity_snapshot({
+            'ts': hour + i * 600, 'equity': equity, 'unrealized_pnl': equity - 1000.0,
+            'open_risk_pct': 1.0 if i == 1 else None, 'open_positions': i % 2
+        })
+
+    hourly = [h for h in db.get_equity_history('hour', days=3) if h['bucket_ts'] == hour][0]
+    assert hourly['samples'] == 4
+    assert (hourly['equity_open'], hourly['equity_high'], hourly['equity_low'], hourly['equity_close']) == (1000.0, 1040.0, 980.0, 1010.0)
+    assert hourly['equity_avg'] == 1007.5
+    assert hourly['unrealized_pnl_close'] == 10.0
+    assert hourly['open_risk_pct_max'] == 1.0 and hourly['open_positions_max'] == 1
+
+    assert len(db.get_equity_history('minute', days=3)) == 4
+    assert [r['equity'] for r in db.get_equity_history('raw', days=30)] == [1000.0, 1040.0, 980.0, 1010.0]
+    assert [d['equity_close'] for d in db.get_equity_history('day', days=30)] == [900.0, 1010.0]
+    assert db.get_last_equity_snapshot()['equity'] == 1010.0
@@ -0,0 +1,58 @@
+# tests/test_equity_curve.py
+import os
+import sys
+import json
+import pickle
+
+import numpy as np
+import pandas as pd
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(os.path.join(PROJECT_ROOT, 'src'))
+
+from pbot.analysis.equity_curve import EquityCurveRecorder
+from pbot.analysis.portfolio_simulator import run_portfolio_simulation
+
+
+def test_recorder_matches_pandas_peak_and_drawdown():
+    """Peak/Drawdown aus der Schleife entsprechen cummax/Division mit pandas (inkl. Peak 0)."""
+    rng = np.random.default_rng(5)
+    values = np.concatenate([[0.0, 0.0], 1000 * np.cumprod(1 + rng.normal(0, 0.02, 500))])
+    timestamps = list(pd.date_range('2025-01-01', periods=len(values), freq='5min', tz='UTC'))
+    recorder = EquityCurveRecorder(timestamps)
+    for value in values.tolist():
+        recorder.record(value)
+
+    df = recorder.to_frame()
+    peak = pd.Series(values).cummax()
+    expected_dd = ((peak - values) / peak.replace(0, np.nan)).fillna(0)
+    assert df['peak'].tolist() == peak.tolist()
+    assert df['drawdown_pct'].tolist() == expected_dd.tolist()
+    assert list(df.columns) == ['timestamp', 'equity', 'peak', 'drawdown_pct']
+    assert df.index.equals(pd.DatetimeIndex(timestamps, name='timestamp'))
+    assert EquityCurveRecorder([]).to_frame().empty
+
+
+def test_portfolio_curve_is_lazy_and_optional():
+    """Kurve entsteht erst beim Zugriff (auch nach Cache-Roundtrip); ohne Kurve gleiche Kennzahlen."""
+    data = pd.read_csv(os.path.join(PROJECT_ROOT, 'data', 'cache', 'AAVE-USDT-USDT_1d.csv'), index_col='timestamp', parse_dates=True)
+    data.index = pd.to_datetime(data.index, utc=True)
+    with open(os.path.join(PROJECT_ROOT, 'src', 'pbot', 'strategy', 'configs', 'config_AAVEUSDTUSDT_1h.json')) as f:
+        config = json.load(f)
+    strategies = {'AAVE_1d': {'symbol': 'AAVE/USDT:USDT', 'timeframe': '1d', 'htf': '1d', 'data': data,
+                              'smc_params': dict(config['strategy']), 'risk_params': config['risk']}}
+
+    full = run_portfolio_simulation(1000, strategies, '2023-01-01', '2025-12-01', use_cache=False)
+    assert dict.get(full, 'equity_curve') is None  # noch nicht materialisiert
+    curve = full['equity_curve']
+    assert len(curve) == len(data) and curve['equity'].iloc[-1] == full['end_capital']
+    assert full.get('equity_curve') is curve
+
+    restored = pickle.loads(pickle.dumps(run_portfolio_simulation(1000, strategies, '2023-01-01', '2025-12-01')))
+    assert restored['equity_curve'].equals(curve)
+
+    summary = run_portfolio_simulation(1000, strategies, '2023-01-01', '2025-12-01', use_cache=False,
+                                       record_equity_curve=False)
+    assert summary['equity_curve'] is None and 'equity_curve' in summary
+    for key in ('end_capital', 'max_drawdown_pct', 'trade_count', 'min_equity'):
+        assert summary[key] == full[key]
@@ -0,0 +1,88 @@
+# tests/test_exchange_wait.py
+import os
+import sys
+import time
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(os.path.join(PROJECT_ROOT, 'src'))
+
+from pbot.utils import exchange as exchange_module
+from pbot.utils.exchange import Exchange
+
+
+class FakeCcxt:
+    """Positionen und Trigger-Orders werden erst nach n Abfragen sichtbar bzw. verschwinden."""
+
+    def __init__(self, position_after=0, close_after=None, triggers_after_cancel=0):
+        self.position_polls = 0
+        self.position_after = position_after
+        self.close_after = close_after
+        self.trigger_polls = 0
+        self.triggers_after_cancel = triggers_after_cancel
+        self.cancelled = []
+
+    def fetch_positions(self, symbols, params=None):
+        self.position_polls += 1
+        if self.position_polls == 1 and self.close_after is not None:
+            raise RuntimeError("Timeout")  # Fehler darf nicht als "geschlossen" gelten
+        if self.close_after is not None:
+            return [] if self.position_polls > self.close_after else [{'contracts': 1.0}]
+        return [{'contracts': 1.0}] if self.position_polls > self.position_after else [{'contracts': 0}]
+
+    def cancel_all_orders(self, symbol, params=None):
+        pass
+
+    def fetch_open_orders(self, symbol, params=None):
+        self.trigger_polls += 1
+        return [{'id': 'zombie'}] if self.trigger_polls <= self.triggers_after_cancel else []
+
+    def cancel_order(self, order_id, symbol, params=None):
+        self.cancelled.append(order_id)
+
+
+def offline_exchange(client):
+    exchange = Exchange.__new__(Exchange)
+    exchange.account, exchange.exchange, exchange.markets, exchange.market_feed = {}, client, {'BTC/USDT:USDT': {}}, None
+    return exchange
+
+
+def test_wait_until_backs_off_and_respects_deadline(monkeypatch):
+    """Abstände verdoppeln sich bis zum Maximum; nach der Deadline kommt das letzte Ergebnis zurück."""
+    sleeps = []
+    monkeypatch.setattr(exchange_module.time, 'sleep', lambda s: sleeps.append(s))
+    exchange = offline_exchange(FakeCcxt())
+    polls = iter(range(100))
+    reached, value = exchange.wait_until(lambda: next(polls), lambda v: v == 5, initial_s=0.05, max_interval_s=0.3)
+    assert reached and value == 5
+    assert sleeps == [0.05, 0.1, 0.2, 0.3, 0.3]
+
+    monkeypatch.undo()
+    t0 = time.monotonic()
+    reached, value = exchange.wait_until(lambda: None, timeout_s=0.2, initial_s=0.01, max_interval_s=0.05)
+    assert not reached and value is None
+    assert 0.2 <= time.monotonic() - t0 < 0.3
+
+
+def test_position_and_cancel_waits_return_on_state_change():
+    """Position offen/geschlossen und Trigger-Löschung enden mit dem Zustandswechsel statt nach festen Sleeps."""
+    exchange = offline_exchange(FakeCcxt(position_after=2))
+    t0 = time.monotonic()
+    reached, positions = exchange.wait_for_position('BTC/USDT:USDT', is_open=True)
+    assert reached and positions == [{'contracts': 1.0}] and exchange.exchange.position_polls == 3
+    assert time.monotonic() - t0 < 0.5
+
+    exchange = offline_exchange(FakeCcxt(close_after=3))
+    reached, positions = exchange.wait_for_position('BTC/USDT:USDT', is_open=False)
+    assert reached and positions == [] and exchange.exchange.position_polls == 4
+    reached, _ = offline_exchange(FakeCcxt(close_after=100)).wait_for_position('BTC/USDT:USDT', is_open=False,
+                                                                                timeout_s=0.1)
+    assert not reached
+
+    client = FakeCcxt(triggers_after_cancel=1)
+    t0 = time.monotonic()
+    assert offline_exchange(client).cancel_all_orders_for_symbol('BTC/USDT:USDT') == 2
+    assert client.trigger_polls == 2 and client.cancelled == [] and time.monotonic() - t0 < 0.3
+
+    client = FakeCcxt(triggers_after_cancel=100)
+    offline_exchange(client).cancel_all_orders_for_symbol('BTC/USDT:USDT')
+    assert client.cancelled == ['zombie']  # bleibt nach CANCEL_SETTLE_S liegen -> Einzel-Löschung
@@ -0,0 +1,103 @@
+# tests/test_market_feed.py
+import os
+import sys
+import time
+import queue
+import threading
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(os.path.join(PROJECT_ROOT, 'src'))
+
+from pbot.utils.market_feed import MarketFeed, ReplayCandleSource
+from pbot.strategy.run import htf_closed, wait_for_htf_close
+
+KEY = ('BTC/USDT:USDT', '15m')
+STEP_MS = 15 * 60 * 1000
+
+
+def _candles(start, count):
+    """Je Kerze zwei Updates (laufend, final) wie im Bitget-Stream"""
+    updates = []
+    for i in range(start, start + count):
+        ts = i * STEP_MS
+        updates.append([ts, 100 + i, 101 + i, 99 + i, 100.5 + i, 1.0])
+        updates.append([ts, 100 + i, 102 + i, 98 + i, 101 + i, 2.0])
+    return updates
+
+
+def _run_until(feed, closes, count, timeout_s=10):
+    assert feed.start()
+    deadline = time.time() + timeout_s
+    while len(closes) < count and time.time() < deadline:
+        time.sleep(0.01)
+    feed.stop()
+
+
+def test_close_callback_and_frame():
+    """Historie per REST, danach Kerzenschluss bei jeder neuen Kerze; frame() endet mit der laufenden Kerze."""
+    history = [u for u in _candles(0, 50) if u[5] == 2.0]
+    source = ReplayCandleSource({KEY: _candles(50, 5)}, history={KEY: history})
+    closes = []
+    feed = MarketFeed([KEY], on_close=lambda s, tf: closes.append(feed.last_closed_ts(s, tf)),
+                      source_factory=lambda: source, history=20)
+    _run_until(feed, closes, 5)
+
+    assert closes == [i * STEP_MS for i in range(49, 54)]
+    df = feed.frame(*KEY)
+    assert len(df) == 20 and df.index.is_monotonic_increasing and str(df.index.tz) == 'UTC'
+    assert df.index[-1].value // 10**6 == 54 * STEP_MS
+    closed = df.iloc[-2]  # letzte geschlossene Kerze: finales Update
+    assert (closed['high'], closed['close'], closed['volume']) == (155.0, 154.0, 2.0)
+    assert feed.frame('ETH/USDT:USDT', '15m') is None
+    assert source.rest_calls == 1
+
+
+def test_reconnect_fills_gap_via_rest():
+    """Verbindungsabbruch mit verlorenen Updates: Kerzen werden per REST nachgeladen, Puffer lückenlos."""
+    source = ReplayCandleSource({KEY: _candles(10, 10)}, history={KEY: _candles(0, 10)[1::2]},
+                                disconnect_at={3: 6})
+    closes = []
+    feed = MarketFeed([KEY], on_close=lambda s, tf: closes.append(feed.last_closed_ts(s, tf)),
+                      source_factory=lambda: source, reconnect_delay_s=0.01)
+    _run_until(feed, closes, 8)
+
+    # Schlüsse 9, 10, dann 11-13 nach dem Nachladen (ein Callback), danach 14-18 aus dem Stream
+    assert closes == [i * STEP_MS for i in (9, 10, 13, 14, 15, 16, 17, 18)]
+    assert feed.reconnects == 1 and source.rest_calls == 2
+    df = feed.frame(*KEY)
+    steps = df.index.to_series().diff().dropna().dt.total_seconds().unique()
+    assert list(steps) == [STEP_MS / 1000]
+    assert df.index[-1].value // 10**6 == 19 * STEP_MS
+    assert df.loc[df.index[-2], 'volume'] == 2.0
+
+
+class _ClosedTimestamps:
+    """Ersatz-Feed: nur last_closed_ts (ms) pro Timeframe"""
+
+    def __init__(self, closed):
+        self.closed = closed
+
+    def last_closed_ts(self, symbol, timeframe):
+        return self.closed.get(timeframe)
+
+
+def test_resident_cycle_waits_for_simultaneous_htf_close():
+    """30m-Schluss um 06:00 ist auch 2h-Schluss: Zyklus wartet, bis die HTF-Kerze 04:00-06:00 geschlossen ist."""
+    hour_ms = 3600 * 1000
+    feed = _ClosedTimestamps({'30m': 5 * hour_ms + hour_ms // 2, '2h': 2 * hour_ms})  # 05:30 und 02:00 geschlossen
+    assert not htf_closed(feed, 'BTC/USDT:USDT', '30m', '2h')
+
+    closes = queue.Queue()
+    def htf_event():
+        time.sleep(0.1)
+        feed.closed['2h'] = 4 * hour_ms
+        closes.put('2h')
+    threading.Thread(target=htf_event).start()
+    t0 = time.monotonic()
+    assert wait_for_htf_close(closes, feed, 'BTC/USDT:USDT', '30m', '2h', timeout_s=2)
+    assert 0.05 < time.monotonic() - t0 < 1
+
+    feed.closed['30m'] = 6 * hour_ms  # 06:30: keine HTF-Grenze, kein Warten
+    assert wait_for_htf_close(queue.Queue(), feed, 'BTC/USDT:USDT', '30m', '2h', timeout_s=0)
+    feed.closed.update({'30m': 7 * hour_ms + hour_ms // 2})  # 08:00-Grenze, HTF-Event bleibt aus
+    assert not wait_for_htf_close(queue.Queue(), feed, 'BTC/USDT:USDT', '30m', '2h', timeout_s=0.05)
@@ -0,0 +1,41 @@
+# tests/test_monte_carlo.py
+import os
+import sys
+
+import numpy as np
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(os.path.join(PROJECT_ROOT, 'src'))
+
+from pbot.analysis.monte_carlo import run_monte_carlo, simulate_paths, trade_returns
+
+
+def test_paths_match_sequential_equity():
+    """Drawdown/Endkapital des vektorisierten Pfads entsprechen der sequentiellen Rechnung."""
+    pnl = np.array([100.0, -220.0, 50.0, 300.0, -80.0])
+    returns = trade_returns(pnl, 1000.0)
+    equity = 1000.0 + np.cumsum(pnl)
+    peak = np.maximum.accumulate(np.concatenate(([1000.0], equity)))[1:]
+
+    final, max_dd = simulate_paths(returns, 200, 'shuffle', np.random.default_rng(0))
+    assert np.allclose(final * 1000.0, equity[-1])  # Reihenfolge ändert das Endkapital nicht
+    assert np.all((max_dd >= 0) & (max_dd <= 1))
+
+    # Originalreihenfolge als einzelner Pfad
+    class KeepOrder:
+        def permuted(self, a, axis):
+            return np.array(a)
+
+    final, max_dd = simulate_paths(returns, 1, 'shuffle', KeepOrder())
+    assert np.isclose(max_dd[0], ((peak - equity) / peak).max())
+
+
+def test_sharded_run_is_reproducible():
+    """Gleicher Seed und gleiche Worker-Anzahl liefern identische Perzentile."""
+    pnl = np.random.default_rng(5).normal(1.0, 10.0, 120)
+    a = run_monte_carlo(pnl, 1000.0, n_paths=3000, seed=42, workers=2, max_drawdown_limit=0.2)
+    b = run_monte_carlo(pnl, 1000.0, n_paths=3000, seed=42, workers=2, max_drawdown_limit=0.2)
+    assert a == b
+    assert a['paths'] == 3000 and a['trades'] == 120
+    assert a['final_equity_p5'] <= a['final_equity_p50'] <= a['final_equity_p95']
+    assert 0.0 <= a['prob_drawdown_exceeds'] <= 1.0
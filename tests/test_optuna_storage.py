@@ -0,0 +1,35 @@
+# tests/test_optuna_storage.py
+import os
+import sys
+
+import optuna
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(os.path.join(PROJECT_ROOT, 'src'))
+
+from pbot.analysis.optuna_storage import create_storage, merge_into_sqlite, study_db_path
+
+
+def _run(backend, name, db_dir, n_trials):
+    study = optuna.create_study(study_name=name, storage=create_storage(backend, name, db_dir),
+                                sampler=optuna.samplers.RandomSampler(seed=0), load_if_exists=True)
+    study.optimize(lambda t: t.suggest_float('x', 0, 1), n_trials=n_trials)
+
+
+def test_merge_journal_and_per_study_into_sqlite(tmp_path):
+    """Journal- und Per-Study-Studien landen vollständig und ohne Duplikate in der gemeinsamen DB."""
+    db_dir = str(tmp_path)
+    optuna.logging.set_verbosity(optuna.logging.WARNING)
+    _run('journal', 'pbot_A_1h', db_dir, 5)
+    _run('per_study', 'pbot_B_4h', db_dir, 3)
+    assert os.path.exists(study_db_path('pbot_B_4h', db_dir))
+
+    assert sorted(merge_into_sqlite(db_dir)) == ['pbot_A_1h', 'pbot_B_4h']
+
+    # Weitere Trials und erneuter Merge: Ziel wird ersetzt, nicht doppelt befüllt
+    _run('journal', 'pbot_A_1h', db_dir, 2)
+    merge_into_sqlite(db_dir, study_names=['pbot_A_1h'])
+
+    target = create_storage('sqlite', None, db_dir)
+    assert len(optuna.load_study(study_name='pbot_A_1h', storage=target).trials) == 7
+    assert len(optuna.load_study(study_name='pbot_B_4h', storage=target).trials) == 3
@@ -0,0 +1,50 @@
+# tests/test_pareto.py
+import os
+import sys
+
+import numpy as np
+import optuna
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(os.path.join(PROJECT_ROOT, 'src'))
+
+from pbot.analysis.pareto import DIRECTIONS, front_from_study, non_dominated_mask, pick_from_front, trial_constraints
+
+
+def test_non_dominated_mask_matches_brute_force():
+    """Vektorisierte Front entspricht dem paarweisen Vergleich (max PnL, min DD, max Sharpe)."""
+    rng = np.random.default_rng(1)
+    values = rng.normal(size=(200, 3)).round(1)  # Rundung erzeugt auch Gleichstände
+
+    def dominates(a, b):
+        ca, cb = a * [-1, 1, -1], b * [-1, 1, -1]
+        return np.all(ca <= cb) and np.any(ca < cb)
+
+    expected = [not any(dominates(values[j], values[i]) for j in range(len(values))) for i in range(len(values))]
+    assert non_dominated_mask(values).tolist() == expected
+
+
+def test_front_skips_infeasible_trials_and_picks():
+    """Constraint-Verletzer und Trials ohne Constraints landen nie auf der Front; Auswahl nach Risikoappetit."""
+    points = {0: (50.0, 0.10, 1.0), 1: (20.0, 0.02, 2.0), 2: (500.0, 0.50, 3.0), 3: (10.0, 0.20, 0.5),
+              4: (900.0, 0.01, 9.0)}
+
+    def objective(trial):
+        x = trial.suggest_categorical('x', list(points))
+        pnl, dd, sharpe = points[x]
+        if x != 4:  # 4 dominiert alle, hat aber keine Constraints gespeichert
+            trial.set_user_attr('constraints', [dd - 0.30])
+        return pnl, dd, sharpe
+
+    study = optuna.create_study(directions=DIRECTIONS)
+    for x in points:
+        study.enqueue_trial({'x': x})
+    study.optimize(objective, n_trials=len(points))
+
+    front = front_from_study(study)
+    assert [p['params']['x'] for p in front] == [1, 0]  # 2 verletzt den DD, 3 ist dominiert, 4 unzulässig
+    assert trial_constraints(study.trials[4]) == [1.0]
+    assert pick_from_front(front, 'max_pnl')['params']['x'] == 0
+    assert pick_from_front(front, 'min_drawdown')['params']['x'] == 1
+    assert pick_from_front(front, 'max_sharpe')['params']['x'] == 1
+    assert pick_from_front(front, '1')['params']['x'] == 0
@@ -0,0 +1,71 @@
+# tests/test_position_book.py
+import os
+import sys
+import math
+import random
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(os.path.join(PROJECT_ROOT, 'src'))
+
+from pbot.analysis.position_book import PendingOrder, Position, PositionBook
+
+
+def _position(margin, side='sell', entry=100.0):
+    return Position(side, entry, entry * 1.02, entry * 0.96, entry * 0.97, 0.005, margin * 10, margin=margin)
+
+
+def test_running_margin_matches_sum_and_keeps_open_order():
+    """Laufende Margin entspricht der Summe der offenen Positionen; Iteration in Eröffnungsreihenfolge."""
+    rng = random.Random(7)
+    book = PositionBook(30)
+    opened = []
+    for _ in range(2000):
+        slot = rng.randrange(30)
+        if book.positions[slot] is None:
+            book.open(slot, _position(math.ceil(rng.uniform(0.5, 500) * 100) / 100))
+            opened.append(slot)
+        else:
+            book.close(slot)
+            opened.remove(slot)
+        assert [s for s, _ in book.open_items()] == opened
+        assert round(book.margin_used, 2) == round(sum(book.positions[s].margin for s in opened), 2)
+
+    for slot, _ in book.open_items():
+        book.close(slot)
+    assert book.margin_used == 0 and len(book) == 0
+
+
+def test_pending_orders_and_exit_checks():
+    """Pending Orders blockieren den Slot; Short-Exit: SL vor TP, Trailing nach Aktivierung."""
+    book = PositionBook(2)
+    book.add_pending(1, PendingOrder('sell', atr=1.5))
+    book.add_pending(0, PendingOrder('buy', atr=2.0))
+    assert [s for s, _ in book.pending_items()] == [1, 0]
+    assert book.is_busy(0) and book.is_busy(1)
+    assert book.remove_pending(1).atr == 1.5
+    assert not book.is_busy(1)
+
+    pos = _position(10.0)
+    assert pos.check_exit(high=101.0, low=99.0) == (None, None)
+    assert pos.check_exit(high=103.0, low=95.0) == (102.0, 'stop_loss')
+    assert pos.check_exit(high=101.0, low=95.0) == (96.0, 'take_profit')
+
+    pos.update_trailing(high=100.0, low=96.5)  # Aktivierung bei 97
+    assert pos.trailing_active and math.isclose(pos.stop_loss, 96.5 * 1.005)
+    assert pos.check_exit(high=97.5, low=90.0) == (pos.stop_loss, 'trailing_stop')
+    assert math.isclose(pos.pnl_pct(90.0), 0.10)
+
+
+def test_long_position_exits_and_pnl():
+    """'buy' ist Long: SL unter, TP über dem Entry; Verlust beim Stop, Gewinn beim TP."""
+    for side in ('buy', 'long'):
+        pos = Position(side, 100.0, 98.0, 104.0, 103.0, 0.01, 1000.0)
+        assert pos.direction == 1
+        assert pos.check_exit(high=100.5, low=99.5) == (None, None)
+        assert pos.check_exit(high=101.0, low=97.0) == (98.0, 'stop_loss')
+        assert pos.check_exit(high=105.0, low=99.0) == (104.0, 'take_profit')
+        assert math.isclose(pos.pnl_pct(98.0), -0.02) and math.isclose(pos.pnl_pct(104.0), 0.04)
+
+        pos.update_trailing(high=106.0, low=100.0)  # Aktivierung bei 103
+        assert pos.trailing_active and math.isclose(pos.stop_loss, 106.0 * 0.99)
+        assert pos.check_exit(high=106.5, low=104.0) == (pos.stop_loss, 'trailing_stop')
@@ -0,0 +1,107 @@
+# tests/test_protection.py
+import os
+import sys
+import time
+import sqlite3
+import logging
+import threading
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(os.path.join(PROJECT_ROOT, 'src'))
+
+from pbot.utils import trade_manager
+from pbot.utils.database import TradeDatabase
+
+
+class FakeCcxt:
+    def price_to_precision(self, symbol, price):
+        return f"{price:.2f}"
+
+
+class SlowExchange:
+    """Jeder Order-Request dauert latency_s; zeichnet Aufrufe samt Thread auf."""
+
+    def __init__(self, latency_s=0.2, tsl_fails=False, fetched_order=None, positions=None):
+        self.exchange = FakeCcxt()
+        self.latency_s = latency_s
+        self.tsl_fails = tsl_fails
+        self.fetched_order = fetched_order
+        self.positions = positions or []
+        self.calls = []
+
+    def _request(self, name, *args):
+        self.calls.append((name, threading.current_thread().name) + args)
+        time.sleep(self.latency_s)
+
+    def place_trigger_market_order(self, symbol, side, amount, trigger_price, params={}):
+        self._request('trigger', trigger_price)
+        return {'id': f'trigger-{trigger_price}'}
+
+    def place_trailing_stop_order(self, symbol, side, amount, activation_price, callback_rate_decimal, params={}):
+        self._request('trailing', activation_price)
+        return None if self.tsl_fails else {'id': 'tsl'}
+
+    def fetch_order(self, order_id, symbol):
+        self._request('fetch_order', order_id)
+        return self.fetched_order
+
+    def wait_for_order_fill(self, order_id, symbol):
+        return self.fetch_order(order_id, symbol)
+
+    def wait_for_position(self, symbol, is_open=True):
+        self._request('wait_for_position')
+        return bool(self.positions) == is_open, self.positions
+
+
+def test_stop_loss_and_trailing_stop_sent_concurrently():
+    """SL und TSL laufen parallel (Dauer ~ ein Request); fällt der TSL aus, folgt der TP."""
+    logger = logging.getLogger('test')
+    exchange = SlowExchange(latency_s=0.2)
+    t0 = time.perf_counter()
+    protection = trade_manager._place_protection(exchange, 'BTC/USDT:USDT', 'sell', 1.0, 95.0, 110.0, 0.005, 120.0, logger)
+    assert time.perf_counter() - t0 < 0.35
+    assert protection['protected'] and protection['take_profit'] is None
+    assert {call[0] for call in exchange.calls} == {'trigger', 'trailing'}
+    assert len({call[1] for call in exchange.calls}) == 2  # zwei Worker-Threads
+
+    exchange = SlowExchange(latency_s=0.0, tsl_fails=True)
+    protection = trade_manager._place_protection(exchange, 'BTC/USDT:USDT', 'sell', 1.0, 95.0, 110.0, 0.005, 120.0, logger)
+    assert protection['protected'] and protection['take_profit'] == {'id': 'trigger-120.0'}
+    assert exchange.calls[-1][0] == 'trigger'
+
+
+def test_entry_fill_from_order_and_protection_stage(tmp_path):
+    """Fill aus der Order-Antwort ohne Wartezeit, sonst per fetch_order; Teil-Fills -> Position; Fill-Zeit nur aus
+    lastTradeTimestamp; alte DBs erhalten protected_ts."""
+    exchange = SlowExchange(latency_s=0.0, fetched_order={'filled': 2.0, 'amount': 2.0, 'average': 101.5,
+                                                          'lastTradeTimestamp': 1_700_000_000_500})
+    fill = trade_manager._confirm_entry_fill(exchange, 'BTC/USDT:USDT', {'id': '1', 'filled': 3.0, 'amount': 3.0,
+                                                                          'status': 'closed', 'average': 100.0,
+                                                                          'timestamp': 1_699_999_999_000})
+    assert fill['contracts'] == 3.0 and fill['price'] == 100.0 and exchange.calls == []
+    assert fill['fill_ts'] is None  # 'timestamp' ist die Erstellungszeit, kein Fill-Zeitpunkt
+
+    fill = trade_manager._confirm_entry_fill(exchange, 'BTC/USDT:USDT', {'id': '2', 'filled': None})
+    assert fill == {'contracts': 2.0, 'price': 101.5, 'fill_ts': 1_700_000_000.5}
+    assert [call[0] for call in exchange.calls] == ['fetch_order']
+
+    # Teil-Fill bleibt: Schutz-Orders werden auf die tatsächliche Position bemessen
+    partial = {'id': '3', 'filled': 1.0, 'amount': 3.0, 'status': 'open', 'average': 100.0}
+    exchange = SlowExchange(latency_s=0.0, fetched_order=partial, positions=[{'contracts': 3.0, 'entryPrice': 100.2}])
+    fill = trade_manager._confirm_entry_fill(exchange, 'BTC/USDT:USDT', partial)
+    assert fill['contracts'] == 3.0 and fill['price'] == 100.2
+    assert [call[0] for call in exchange.calls] == ['fetch_order', 'wait_for_position']
+
+    db_path = str(tmp_path / "trades.db")
+    with sqlite3.connect(db_path) as conn:  # Schema vor protected_ts
+        conn.execute('''CREATE TABLE signal_latency (id INTEGER PRIMARY KEY AUTOINCREMENT, symbol TEXT NOT NULL,
+            timeframe TEXT NOT NULL, side TEXT NOT NULL, candle_close_ts REAL NOT NULL, data_received_ts REAL,
+            decision_ts REAL, order_sent_ts REAL, order_filled_ts REAL, position_confirmed_ts REAL, order_id TEXT,
+            status TEXT NOT NULL, created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP)''')
+    db = TradeDatabase(db_path)
+    close_ts = time.time() - 60
+    db.log_signal_latency({'symbol': 'BTC/USDT:USDT', 'timeframe': '15m', 'side': 'buy', 'candle_close_ts': close_ts,
+                           'order_filled_ts': close_ts + 1.0, 'protected_ts': close_ts + 1.25, 'status': 'filled'})
+    entry = db.get_latency_report(days=1)[0]
+    assert entry['fill_to_protection_count'] == 1
+    assert abs(entry['fill_to_protection_p50'] - 250) < 1e-6
@@ -0,0 +1,71 @@
+# tests/test_result_cache.py
+import os
+import sys
+import json
+import time
+
+import numpy as np
+import pandas as pd
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(os.path.join(PROJECT_ROOT, 'src'))
+
+from pbot.analysis import backtester, result_cache
+
+
+def _load_backtest_inputs():
+    data = pd.read_csv(os.path.join(PROJECT_ROOT, 'data', 'cache', 'AAVE-USDT-USDT_1d.csv'), index_col='timestamp', parse_dates=True)
+    data.index = pd.to_datetime(data.index, utc=True)
+    with open(os.path.join(PROJECT_ROOT, 'src', 'pbot', 'strategy', 'configs', 'config_AAVEUSDTUSDT_1h.json')) as f:
+        config = json.load(f)
+    return data, config['strategy'], config['risk']
+
+
+def test_backtest_cache_hits_and_invalidates(monkeypatch):
+    """Gleiche Eingaben kommen aus dem Cache; andere Daten/Parameter rechnen neu."""
+    data, strategy_params, risk_params = _load_backtest_inputs()
+    calls = []
+    simulate = backtester._simulate_backtest
+    monkeypatch.setattr(backtester, '_simulate_backtest', lambda *a: calls.append(1) or simulate(*a))
+
+    first = backtester.run_pbot_backtest(data, strategy_params, risk_params, 1000, record_trades=True)
+    again = backtester.run_pbot_backtest(data.copy(), dict(strategy_params), risk_params, 1000, record_trades=True)
+    assert len(calls) == 1
+    assert again['total_pnl_pct'] == first['total_pnl_pct']
+    assert np.array_equal(again['trade_log'], first['trade_log'])
+
+    changed = data.copy()
+    changed.iloc[-1, changed.columns.get_loc('close')] *= 1.01
+    backtester.run_pbot_backtest(changed, strategy_params, risk_params, 1000, record_trades=True)
+    backtester.run_pbot_backtest(data, strategy_params, {**risk_params, 'leverage': 3}, 1000, record_trades=True)
+    backtester.run_pbot_backtest(data, strategy_params, risk_params, 1000, record_trades=True, use_cache=False)
+    assert len(calls) == 4
+
+    result_cache.configure(enabled=False)
+    backtester.run_pbot_backtest(data, strategy_params, risk_params, 1000, record_trades=True)
+    assert len(calls) == 5
+
+
+def test_prune_evicts_least_recently_used(tmp_path):
+    """Bei Überschreiten der Größe fliegen die am längsten nicht benutzten Einträge zuerst."""
+    result_cache.configure(cache_dir=str(tmp_path), max_bytes=10**9)
+    payload = np.zeros(1000)
+    for i in range(4):
+        result_cache.store('t', f'k{i}', payload)
+        os.utime(tmp_path / f't_k{i}.pkl', (time.time() - 100 + i, time.time() - 100 + i))
+
+    assert result_cache.load('t', 'k0') is not None  # k0 wird zum jüngsten Eintrag
+    size = os.path.getsize(tmp_path / 't_k0.pkl')
+    result_cache.prune(str(tmp_path), 2 * size)
+    assert sorted(os.listdir(tmp_path)) == ['t_k0.pkl', 't_k3.pkl']
+
+
+def test_store_prunes_periodically(tmp_path, monkeypatch):
+    """prune() läuft beim ersten store() und danach erst nach max_bytes / PRUNE_INTERVAL_DIVISOR neuen Bytes."""
+    calls = []
+    monkeypatch.setattr(result_cache, 'prune', lambda cache_dir, max_bytes: calls.append(cache_dir))
+    payload = np.zeros(1000)
+    result_cache.configure(cache_dir=str(tmp_path), max_bytes=result_cache.PRUNE_INTERVAL_DIVISOR * 20_000)
+    for i in range(6):
+        result_cache.store('t', f'k{i}', payload)  # je ca. 8 KB
+    assert len(calls) == 2  # erster store() und nach ca. 20 KB
@@ -0,0 +1,59 @@
+# tests/test_ring_buffer.py
+import os
+import sys
+from collections import deque
+
+import numpy as np
+import pandas as pd
+import pytest
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(os.path.join(PROJECT_ROOT, 'src'))
+
+from pbot.utils.ring_buffer import OHLCVRingBuffer
+
+
+def test_wraparound_matches_reference_and_views_are_zero_copy():
+    """Über mehrere Umläufe identisch zu einer deque; Fenster sind Views auf den Puffer."""
+    buffer, reference = OHLCVRingBuffer(7), deque(maxlen=7)
+    rng = np.random.default_rng(1)
+    for i in range(30):
+        row = [i * 60_000] + rng.random(5).tolist()
+        buffer.append(*row)
+        reference.append(row)
+        if i % 4 == 0:  # laufende Kerze aktualisieren
+            row = [row[0]] + rng.random(5).tolist()
+            buffer.update_last(*row)
+            reference[-1] = row
+
+        expected = np.array(reference)
+        window = buffer.window()
+        assert len(buffer) == len(reference)
+        assert np.array_equal(window.timestamp, expected[:, 0].astype(np.int64))
+        assert np.array_equal(np.vstack(window[1:]).T, expected[:, 1:])
+        assert buffer.last_timestamp == reference[-1][0] and buffer.timestamp_at(0) == reference[0][0]
+
+    tail = buffer.window(3)
+    assert np.shares_memory(tail.close, buffer.window().close) and len(tail.close) == 3
+    buffer.update_last(buffer.last_timestamp, 1, 2, 0.5, 1.5, 9)
+    assert tail.close[-1] == 1.5  # View sieht den neuen Wert ohne Kopie
+
+    with pytest.raises(IndexError):
+        OHLCVRingBuffer(3).update_last(0, 1, 1, 1, 1, 1)
+
+
+def test_to_frame_matches_rest_format():
+    """to_frame() liefert dasselbe DataFrame wie Exchange.fetch_recent_ohlcv aus fetch_ohlcv-Zeilen."""
+    rows = [[1_700_000_000_000 + i * 900_000, 1.0 + i, 2.0 + i, 0.5 + i, 1.5 + i, 10.0 * i] for i in range(12)]
+    buffer = OHLCVRingBuffer(10)
+    buffer.extend(rows)
+
+    df = pd.DataFrame(rows, columns=['timestamp', 'open', 'high', 'low', 'close', 'volume'])
+    df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms', utc=True)
+    df.set_index('timestamp', inplace=True)
+    pd.testing.assert_frame_equal(buffer.to_frame(), df.iloc[-10:])
+    pd.testing.assert_frame_equal(buffer.to_frame(4), df.iloc[-4:])
+
+    frame = buffer.to_frame()
+    frame.iloc[-1, 0] = -1.0
+    assert buffer.window().open[-1] == 12.0  # DataFrame ist eine Kopie
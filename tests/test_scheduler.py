@@ -0,0 +1,99 @@
+# tests/test_scheduler.py
+import os
+import sys
+import threading
+from datetime import datetime, timezone
+
+import pytest
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(os.path.join(PROJECT_ROOT, 'src'))
+
+from pbot.utils.scheduler import CandleScheduler
+
+STRATEGIES = [
+    {'symbol': 'DOGE/USDT:USDT', 'timeframe': '15m'},
+    {'symbol': 'SOL/USDT:USDT', 'timeframe': '30m'},
+    {'symbol': 'BTC/USDT:USDT', 'timeframe': '30m'},
+    {'symbol': 'ETH/USDT:USDT', 'timeframe': '6h'},
+]
+
+
+def utc(hour, minute, second=0):
+    return datetime(2024, 5, 1, hour, minute, second, tzinfo=timezone.utc).timestamp()
+
+
+def symbols(due):
+    return sorted(s['symbol'] for s in due)
+
+
+def test_next_close_groups_due_strategies():
+    """Gemeinsame Schlüsse werden gebündelt; 6h nur um 00/06/12/18 UTC."""
+    scheduler = CandleScheduler(STRATEGIES)
+    close_ts, due = scheduler.next_close(utc(5, 50))
+    assert close_ts == utc(6, 0)
+    assert symbols(due) == ['BTC/USDT:USDT', 'DOGE/USDT:USDT', 'ETH/USDT:USDT', 'SOL/USDT:USDT']
+
+    close_ts, due = scheduler.next_close(utc(6, 0))  # genau auf dem Schluss -> der nächste
+    assert close_ts == utc(6, 15) and symbols(due) == ['DOGE/USDT:USDT']
+    close_ts, due = scheduler.next_close(utc(6, 20))
+    assert close_ts == utc(6, 30) and symbols(due) == ['BTC/USDT:USDT', 'DOGE/USDT:USDT', 'SOL/USDT:USDT']
+
+    assert CandleScheduler([]).next_close(utc(6, 0)) is None
+    with pytest.raises(ValueError):
+        CandleScheduler([{'symbol': 'X', 'timeframe': '7m'}])
+
+
+def test_run_wakes_after_grace_once_per_close():
+    """Jeder Schluss wird genau einmal nach grace_s bedient; stop() beendet auch ein laufendes Warten."""
+    now = [utc(5, 59, 59)]
+
+    class FakeEvent(threading.Event):
+        def wait(self, timeout=None):
+            now[0] += timeout  # Schlafen = Uhr vorstellen
+            return self.is_set()
+
+    scheduler = CandleScheduler(STRATEGIES, grace_s=2.0, clock=lambda: now[0])
+    scheduler._stop = FakeEvent()
+    calls = []
+
+    def callback(close_ts, due):
+        calls.append((close_ts, now[0], symbols(due)))
+        now[0] += 5.0  # Laufzeit der Strategien
+
+    scheduler.run(callback, max_rounds=3)
+    assert [(c[0], c[1]) for c in calls] == [(utc(6, 0), utc(6, 0, 2)), (utc(6, 15), utc(6, 15, 2)),
+                                             (utc(6, 30), utc(6, 30, 2))]
+    assert [len(c[2]) for c in calls] == [4, 1, 3]
+
+    # Start innerhalb der Grace-Zeit: der gerade erfolgte Schluss wird noch bedient
+    now[0] = utc(6, 45, 1)
+    assert scheduler.wait_for_next_close()[0] == utc(6, 45)
+
+    real = CandleScheduler(STRATEGIES)
+    threading.Timer(0.05, real.stop).start()
+    assert real.wait_for_next_close() is None
+
+
+def test_run_scheduled_survives_empty_strategy_reload(monkeypatch, tmp_path):
+    """Ein Reload ohne gültige Strategien beendet den Daemon nicht; er pollt, bis wieder welche da sind."""
+    sys.path.append(PROJECT_ROOT)
+    import master_runner
+
+    loaded = [[], [], [STRATEGIES[0]]]
+    sleeps, launched = [], []
+    monkeypatch.setattr(master_runner, 'load_strategies', lambda settings, results: loaded.pop(0))
+    monkeypatch.setattr(master_runner.time, 'sleep', sleeps.append)
+    monkeypatch.setattr(master_runner.CandleScheduler, 'wait_for_next_close',
+                        lambda self: (utc(6, 0), self.strategies) if self.strategies else None)
+
+    def launch(python_executable, bot_runner_script, strategy):
+        launched.append(strategy['symbol'])
+        raise KeyboardInterrupt  # Strg+C nach dem ersten Start
+
+    monkeypatch.setattr(master_runner, 'launch_strategy', launch)
+    master_runner.run_scheduled(str(tmp_path / 'settings.json'), str(tmp_path / 'results.json'),
+                                'python', 'run.py', grace_s=2.0)
+
+    assert len(sleeps) == 2 and not loaded
+    assert launched == ['DOGE/USDT:USDT']
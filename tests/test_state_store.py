@@ -0,0 +1,92 @@
+# tests/test_state_store.py
+import os
+import sys
+import json
+import multiprocessing as mp
+from datetime import datetime, timedelta
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(os.path.join(PROJECT_ROOT, 'src'))
+
+from pbot.utils import risk_manager, state_store
+from pbot.utils.risk_manager import PortfolioRiskManager
+from pbot.utils.state_store import StateStore
+
+
+def test_versions_and_compare_and_set(tmp_path):
+    """Version 0 = fehlt; CAS schreibt nur auf die gelesene Version."""
+    store = StateStore(str(tmp_path / 'state.db'))
+    assert store.get_versioned('ns', 'a') == (None, 0)
+    assert store.compare_and_set('ns', 'a', {'n': 1}, 0)
+    assert not store.compare_and_set('ns', 'a', {'n': 2}, 0)  # existiert schon
+    assert store.get_versioned('ns', 'a') == ({'n': 1}, 1)
+
+    assert store.put('ns', 'a', {'n': 5}) == 2
+    assert not store.compare_and_set('ns', 'a', {'n': 6}, 1)  # veraltete Version
+    assert store.compare_and_set('ns', 'a', {'n': 6}, 2)
+    assert store.update('ns', 'b', lambda v: v + [1], default=[]) == [1]
+    assert store.items('ns') == {'a': {'n': 6}, 'b': [1]}
+    assert store.delete('ns', 'a') and not store.delete('ns', 'a')
+    assert store.get('ns', 'a', 'weg') == 'weg'
+
+
+def _stress_worker(db_path, worker, rounds):
+    store = StateStore(db_path)
+    state_store._store_instance = store
+    manager = PortfolioRiskManager()
+    for _ in range(rounds):
+        store.update('stress', 'counter', lambda n: n + 1, default=0)
+        store.update('stress', 'workers', lambda d: {**d, str(worker): d.get(str(worker), 0) + 1}, default={})
+        symbol = f'W{worker}/USDT:USDT'
+        manager.register_position(symbol, 0.5)
+        manager.close_position(symbol, -0.01)
+    store.close()
+
+
+def test_no_lost_updates_across_processes(tmp_path):
+    """8 Prozesse schreiben gleichzeitig: Zähler, gemeinsames Dict und Risk-State bleiben exakt."""
+    db_path = str(tmp_path / 'state.db')
+    StateStore(db_path)
+    processes, rounds = 8, 60
+    ctx = mp.get_context('fork')
+    procs = [ctx.Process(target=_stress_worker, args=(db_path, w, rounds)) for w in range(processes)]
+    for p in procs: p.start()
+    for p in procs: p.join()
+    assert all(p.exitcode == 0 for p in procs)
+
+    store = StateStore(db_path)
+    assert store.get('stress', 'counter') == processes * rounds
+    assert store.get('stress', 'workers') == {str(w): rounds for w in range(processes)}
+    state = PortfolioRiskManager(store=store).state
+    assert state['total_trades_today'] == processes * rounds
+    assert round(state['daily_pnl'], 6) == round(-0.01 * processes * rounds, 6)
+    assert state['active_positions'] == {}
+
+
+def test_trade_lock_and_legacy_migration(monkeypatch):
+    """Trade-Locks laufen ab; alte risk_state.json/trade_lock.json werden einmalig übernommen."""
+    from pbot.utils import trade_manager
+
+    with open(_ensure_dir(trade_manager.TRADE_LOCK_FILE), 'w') as f:
+        json.dump({'OLD_1h': (datetime.now() + timedelta(minutes=30)).strftime("%Y-%m-%d %H:%M:%S")}, f)
+    monkeypatch.setattr(trade_manager, '_trade_lock_migrated', False)
+    assert trade_manager.is_trade_locked('OLD_1h')
+    assert os.path.exists(trade_manager.TRADE_LOCK_FILE + '.migrated')
+    trade_manager.set_trade_lock('BTC_15m', lock_duration_minutes=1)
+    assert trade_manager.is_trade_locked('BTC_15m')
+    trade_manager.set_trade_lock('BTC_15m', lock_duration_minutes=-1)
+    assert not trade_manager.is_trade_locked('BTC_15m')
+
+    with open(_ensure_dir(risk_manager.RISK_STATE_FILE), 'w') as f:
+        json.dump({'daily_pnl': -1.5, 'last_reset': datetime.now().isoformat(),
+                   'active_positions': {'ETH/USDT:USDT': 1.0}, 'total_trades_today': 2}, f)
+    manager = PortfolioRiskManager()
+    status = manager.get_status()
+    assert status['active_symbols'] == ['ETH/USDT:USDT'] and status['daily_pnl_pct'] == -1.5
+    assert manager.can_open_position('ETH/USDT:USDT', 1.0)[0] is False
+    assert not os.path.exists(risk_manager.RISK_STATE_FILE)
+
+
+def _ensure_dir(path):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    return path
@@ -0,0 +1,47 @@
+# tests/test_static_charts.py
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(os.path.join(PROJECT_ROOT, 'src'))
+
+from pbot.analysis import static_charts
+from pbot.analysis.trade_log import TRADE_LOG_DTYPE
+
+
+def test_equity_chart_is_cached_by_data_hash(tmp_path, monkeypatch):
+    """Gleiche Daten liefern das vorhandene PNG, geänderte Daten ein neues."""
+    ts = pd.date_range('2025-01-01', periods=50, freq='h', tz='UTC')
+    equity = np.linspace(100, 150, 50)
+    drawdown = np.zeros(50)
+
+    path = static_charts.render_equity_chart(ts, equity, drawdown, 'Test', cache_dir=str(tmp_path))
+    with open(path, 'rb') as f:
+        assert f.read(8) == b'\x89PNG\r\n\x1a\n'
+
+    # Cache-Treffer darf nicht rendern
+    monkeypatch.setattr('matplotlib.figure.Figure.savefig', lambda *a, **k: (_ for _ in ()).throw(AssertionError("neu gerendert")))
+    assert static_charts.render_equity_chart(ts, equity, drawdown, 'Test', cache_dir=str(tmp_path)) == path
+    monkeypatch.undo()
+
+    changed = static_charts.render_equity_chart(ts, equity + 1, drawdown, 'Test', cache_dir=str(tmp_path))
+    assert changed != path and os.path.exists(changed)
+
+
+def test_candlestick_snapshot_accepts_trade_log(tmp_path):
+    """Trade-Log (Indizes auf df) und gleichwertige Trade-Dicts ergeben dasselbe PNG; Trades vor dem Ausschnitt fallen weg."""
+    index = pd.date_range('2025-01-01', periods=400, freq='h', tz='UTC')
+    close = np.linspace(100, 120, 400)
+    df = pd.DataFrame({'open': close, 'high': close + 1, 'low': close - 1, 'close': close}, index=index)
+    log = np.zeros(3, dtype=TRADE_LOG_DTYPE)
+    log['entry_idx'], log['exit_idx'] = [10, 150, 300], [20, 160, 390]
+    log['entry_price'], log['exit_price'], log['pnl'] = [101, 108, 115], [102, 107, 119], [1.0, -1.0, 4.0]
+
+    path = static_charts.render_candlestick_snapshot(df, 'Test', trades=log, cache_dir=str(tmp_path))
+    dicts = [{'entry_time': index[t['entry_idx']], 'entry_price': t['entry_price'], 'exit_time': index[t['exit_idx']],
+              'exit_price': t['exit_price'], 'profit': t['pnl']} for t in log[1:]]
+    assert static_charts.render_candlestick_snapshot(df, 'Test', trades=dicts, cache_dir=str(tmp_path)) == path
+    assert static_charts.render_candlestick_snapshot(df, 'Test', cache_dir=str(tmp_path)) != path
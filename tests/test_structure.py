@@ -1,6 +1,7 @@
 # /root/pbot/tests/test_structure.py
 import os
 import sys
+import subprocess
 import pytest
 
 # Füge das Projektverzeichnis zum Python-Pfad hinzu, damit Imports funktionieren
@@ -41,3 +42,19 @@ def test_core_script_imports():
 
     except ImportError as e:
         pytest.fail(f"Kritischer Import-Fehler. Die Code-Struktur scheint defekt zu sein. Fehler: {e}")
+
+
+def test_entry_scripts_start_without_heavy_imports():
+    """run.py, master_runner.py und die CLI laden ccxt/pandas/optuna/plotly/ta erst bei Bedarf."""
+    heavy = ['ccxt', 'pandas', 'optuna', 'plotly', 'ta', 'requests']
+    check = (
+        "import runpy, sys\n"
+        "sys.argv = ['x']\n"
+        f"runpy.run_path({{!r}}, run_name='bench')\n"
+        f"print(','.join(m for m in {heavy!r} if m in sys.modules))"
+    )
+    for script in ('src/pbot/strategy/run.py', 'master_runner.py', 'src/pbot/cli.py'):
+        result = subprocess.run([sys.executable, '-c', check.format(os.path.join(PROJECT_ROOT, script))],
+                                cwd=PROJECT_ROOT, capture_output=True, text=True)
+        assert result.returncode == 0, result.stderr
+        assert result.stdout.strip() == '', f"{script} lädt beim Start: {result.stdout.strip()}"
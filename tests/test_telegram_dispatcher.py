@@ -0,0 +1,107 @@
+# tests/test_telegram_dispatcher.py
+import os
+import sys
+import json
+import time
+import threading
+import subprocess
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs
+
+import pytest
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(os.path.join(PROJECT_ROOT, 'src'))
+
+from pbot.utils import telegram
+from pbot.utils.telegram import TelegramDispatcher
+
+
+@pytest.fixture
+def telegram_server(monkeypatch):
+    """Lokaler Ersatz für api.telegram.org: zeichnet Requests auf, Antworten per Liste vorgebbar."""
+    state = {'requests': [], 'responses': [], 'delay_s': 0.0}
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            body = self.rfile.read(int(self.headers['Content-Length'])).decode()
+            state['requests'].append({k: v[0] for k, v in parse_qs(body).items()})
+            time.sleep(state['delay_s'])
+            status, payload = state['responses'].pop(0) if state['responses'] else (200, {'ok': True})
+            data = json.dumps(payload).encode()
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    monkeypatch.setattr(telegram, 'TELEGRAM_API_URL', f"http://127.0.0.1:{server.server_port}")
+    yield state
+    server.shutdown()
+
+
+def test_burst_is_coalesced_and_rate_limit_respected(telegram_server):
+    """Fünf Nachrichten ohne Wartezeit für den Aufrufer -> eine Nachricht; 429 wird mit retry_after wiederholt."""
+    telegram_server['delay_s'] = 0.3
+    telegram_server['responses'] = [(429, {'ok': False, 'error_code': 429, 'parameters': {'retry_after': 0}})]
+    dispatcher = TelegramDispatcher(coalesce_window_s=0.2, min_interval_s=0.0, backoff_s=0.01)
+
+    t0 = time.perf_counter()
+    for i in range(5):
+        assert dispatcher.enqueue('TOKEN', '42', f"Nachricht {i}")
+    assert time.perf_counter() - t0 < 0.05
+    assert dispatcher.flush(timeout_s=5)
+
+    assert len(telegram_server['requests']) == 2  # 429, dann Erfolg
+    request = telegram_server['requests'][-1]
+    assert request['chat_id'] == '42' and request['parse_mode'] == 'HTML'
+    assert request['text'] == "\n\n".join(f"Nachricht {i}" for i in range(5))
+    assert dispatcher.stats['sent'] == 1 and dispatcher.stats['failed'] == 0
+
+
+def test_retry_backoff_client_errors_and_overflow(telegram_server):
+    """5xx wird wiederholt, 4xx nicht; volle Queue verwirft statt zu blockieren."""
+    telegram_server['responses'] = [(502, {'ok': False}), (200, {'ok': True}), (400, {'ok': False})]
+    dispatcher = TelegramDispatcher(coalesce_window_s=0.0, min_interval_s=0.0, backoff_s=0.01)
+    dispatcher.enqueue('TOKEN', '1', 'erst Fehler, dann ok')
+    assert dispatcher.flush(timeout_s=5)
+    dispatcher.enqueue('TOKEN', '1', '<b kaputt')
+    assert dispatcher.flush(timeout_s=5)
+    assert [r['text'] for r in telegram_server['requests']] == ['erst Fehler, dann ok'] * 2 + ['<b kaputt']
+    assert dispatcher.stats['sent'] == 1 and dispatcher.stats['failed'] == 1
+
+    telegram_server['delay_s'] = 0.2
+    small = TelegramDispatcher(queue_size=2, coalesce_window_s=0.0, min_interval_s=0.0)
+    results = [small.enqueue('TOKEN', '2', f"m{i}") for i in range(6)]
+    assert not all(results) and small.stats['dropped'] == results.count(False)
+    assert small.flush(timeout_s=5)
+
+
+def test_rejected_batch_is_resent_one_by_one(telegram_server):
+    """400 auf die Sammelnachricht: Teile werden einzeln gesendet, nur der fehlerhafte geht verloren."""
+    telegram_server['responses'] = [(400, {'ok': False}), (200, {'ok': True}), (400, {'ok': False})]
+    dispatcher = TelegramDispatcher(coalesce_window_s=0.2, min_interval_s=0.0, backoff_s=0.01)
+    for message in ('Trade eröffnet', '<b kaputt', 'Stop-Loss gesetzt'):
+        dispatcher.enqueue('TOKEN', '3', message)
+    assert dispatcher.flush(timeout_s=5)
+
+    texts = [r['text'] for r in telegram_server['requests']]
+    assert texts == ["Trade eröffnet\n\n<b kaputt\n\nStop-Loss gesetzt", 'Trade eröffnet', '<b kaputt', 'Stop-Loss gesetzt']
+    assert dispatcher.stats['sent'] == 2 and dispatcher.stats['failed'] == 1
+
+
+def test_queue_is_flushed_on_exit(telegram_server):
+    """Prozess endet direkt nach queue_message: atexit stellt die Nachricht noch zu."""
+    code = (
+        "import sys; sys.path.insert(0, sys.argv[1]);"
+        "from pbot.utils import telegram; telegram.TELEGRAM_API_URL = sys.argv[2];"
+        "telegram.queue_message('TOKEN', '7', 'Letzte Worte')"
+    )
+    subprocess.run([sys.executable, '-c', code, os.path.join(PROJECT_ROOT, 'src'), telegram.TELEGRAM_API_URL],
+                   check=True, timeout=30)
+    assert [r['text'] for r in telegram_server['requests']] == ['Letzte Worte']
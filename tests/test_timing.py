@@ -0,0 +1,80 @@
+# tests/test_timing.py
+import os
+import sys
+import json
+import logging
+import time
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(os.path.join(PROJECT_ROOT, 'src'))
+
+from pbot.utils import timing
+
+
+def test_span_is_noop_when_disabled():
+    """Ohne aktiven Zyklus liefert span() den geteilten No-Op-Kontext."""
+    timing.enable(False)
+    assert timing.start_cycle("test") is None
+    assert timing.span("irgendwas") is timing._NULL_SPAN
+
+    @timing.timed("dekoriert")
+    def add(a, b):
+        return a + b
+
+    assert add(1, 2) == 3
+    assert timing.end_cycle() is None
+
+
+def test_cycle_records_stages_and_writes_jsonl(tmp_path):
+    """Gemessene Stufen landen in der Aufschlüsselung und in der JSONL-Datei."""
+    timing.enable(True)
+    try:
+        timing.start_cycle("BTC/USDT:USDT (15m)")
+
+        @timing.timed("exchange.fetch")
+        def fetch():
+            time.sleep(0.01)
+            return 42
+
+        with timing.span("zyklus"):
+            assert fetch() == 42
+            with timing.span("analyse"):
+                pass
+
+        log_file = tmp_path / "timing.jsonl"
+        cycle = timing.end_cycle(log_file=str(log_file))
+    finally:
+        timing.enable(False)
+
+    summary = cycle.summary()
+    assert set(summary) == {"zyklus", "exchange.fetch", "analyse"}
+    assert summary["exchange.fetch"]["total_ms"] >= 10
+    assert summary["zyklus"]["total_ms"] >= summary["exchange.fetch"]["total_ms"]
+
+    breakdown = cycle.format_breakdown()
+    assert breakdown.index("zyklus") < breakdown.index("exchange.fetch")
+
+    record = json.loads(log_file.read_text().strip())
+    assert record["label"] == "BTC/USDT:USDT (15m)"
+    assert [s["depth"] for s in record["stages"]] == [0, 1, 1]
+    assert timing.current_cycle() is None
+
+
+def test_parallel_protection_spans_are_siblings():
+    """Parallele Spans aus dem Thread-Pool liegen auf derselben Tiefe unter dem umgebenden Span."""
+    sys.path.append(PROJECT_ROOT)
+    from tests.test_protection import SlowExchange
+    from pbot.utils import trade_manager
+
+    timing.enable(True)
+    try:
+        timing.start_cycle("ETH/USDT:USDT (30m)")
+        with timing.span("trade.open"):
+            trade_manager._place_protection(SlowExchange(latency_s=0.05), 'ETH/USDT:USDT', 'sell', 1.0,
+                                            95.0, 110.0, 0.005, 120.0, logging.getLogger('test'))
+        cycle = timing.end_cycle(log_file=None)
+    finally:
+        timing.enable(False)
+
+    depths = {s['name']: s['depth'] for s in cycle.stages}
+    assert depths == {'trade.open': 0, 'protection.stop_loss': 1, 'protection.trailing_stop': 1}
@@ -0,0 +1,45 @@
+# tests/test_trade_log.py
+import os
+import sys
+import json
+
+import numpy as np
+import pandas as pd
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(os.path.join(PROJECT_ROOT, 'src'))
+
+from pbot.analysis.backtester import run_pbot_backtest
+from pbot.analysis.chart_builder import build_trade_traces
+from pbot.analysis.trade_log import TRADE_LOG_DTYPE, trade_log_to_chart_trades
+
+
+def _load_backtest_inputs():
+    data = pd.read_csv(os.path.join(PROJECT_ROOT, 'data', 'cache', 'AAVE-USDT-USDT_1h.csv'), index_col='timestamp', parse_dates=True)
+    data.index = pd.to_datetime(data.index, utc=True)
+    with open(os.path.join(PROJECT_ROOT, 'src', 'pbot', 'strategy', 'configs', 'config_AAVEUSDTUSDT_1h.json')) as f:
+        config = json.load(f)
+    return data.iloc[-1500:], config['strategy'], config['risk']
+
+
+def test_trade_log_matches_backtest_totals():
+    """Das Trade-Log ist optional und deckt sich mit den aggregierten Backtest-Kennzahlen."""
+    data, strategy_params, risk_params = _load_backtest_inputs()
+
+    plain = run_pbot_backtest(data, strategy_params, risk_params, 1000)
+    result = run_pbot_backtest(data, strategy_params, risk_params, 1000, record_trades=True)
+    log = result['trade_log']
+
+    assert 'trade_log' not in plain
+    assert plain['end_capital'] == result['end_capital']
+    assert log.dtype == TRADE_LOG_DTYPE
+    assert len(log) == result['trades_count'] > 0
+    assert np.isclose(1000 + log['pnl'].sum(), result['end_capital'])
+    assert (log['pnl'] > 0).sum() == round(result['win_rate'] * len(log) / 100)
+    assert np.all(log['exit_idx'] >= log['entry_idx'])
+
+    # Chart-Builder nimmt das Log direkt, Trade-Dicts ergeben dieselben Marker
+    traces = build_trade_traces(log, data.index)
+    dict_traces = build_trade_traces(trade_log_to_chart_trades(log, data.index))
+    assert len(traces) == len(dict_traces) <= 5
+    assert list(traces[0].x) == list(dict_traces[0].x)